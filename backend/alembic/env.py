@@ -1,7 +1,10 @@
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config
+from sqlalchemy import inspect
 from sqlalchemy import pool
 from alembic import context
+from alembic.operations import Operations
+import importlib.util
 import os
 import sys
 
@@ -31,11 +34,47 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+# Squashed 001+002+003 schema applied to empty databases only
+SQUASHED_INITIAL = os.path.join(
+    os.path.dirname(__file__), "squashed", "000_squashed_initial.py"
+)
+
+
 def get_database_url():
     """Get database URL from environment or config"""
     return os.getenv("DATABASE_URL", config.get_main_option("sqlalchemy.url"))
 
 
+def is_upgrade_command() -> bool:
+    """Check whether alembic was invoked as ``alembic upgrade``"""
+    cmd = getattr(config.cmd_opts, "cmd", None)
+    return bool(cmd) and cmd[0].__name__ == "upgrade"
+
+
+def bootstrap_fresh_database(connection) -> None:
+    """Apply the squashed initial schema to an empty database.
+
+    A database with neither an alembic_version table nor daloRADIUS tables
+    gets 000_squashed_initial and is stamped at the revision it replaces;
+    the regular chain then continues from there. Any other database,
+    including legacy ones without alembic_version, goes through
+    001 -> 002 -> 003 as before.
+
+    """
+    inspector = inspect(connection)
+    if inspector.has_table("alembic_version") or inspector.has_table("operators"):
+        return
+
+    spec = importlib.util.spec_from_file_location("squashed_initial", SQUASHED_INITIAL)
+    squashed = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(squashed)
+
+    migration_context = context.get_context()
+    with Operations.context(migration_context):
+        squashed.upgrade()
+    migration_context.stamp(context.script, squashed.stamps)
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -70,10 +109,22 @@ def run_migrations_online() -> None:
     configuration = config.get_section(config.config_ini_section)
     configuration["sqlalchemy.url"] = get_database_url()
     
+    # The revisions issue many statements of the same shape (ADD COLUMN,
+    # CREATE INDEX); keep their compiled form around for the whole run.
+    # The migration context executes on this connection and shares its cache.
+    #
+    # A single pooled connection is opened once and reused by every revision
+    # (op.get_bind() and the inspectors in the revisions return it); the
+    # pre-ping is skipped because the connection is brand new.
     connectable = engine_from_config(
         configuration,
         prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
+        poolclass=pool.QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_pre_ping=False,
+        query_cache_size=1200,
+        execution_options={"compiled_cache": {}},
     )
 
     with connectable.connect() as connection:
@@ -82,8 +133,12 @@ def run_migrations_online() -> None:
         )
 
         with context.begin_transaction():
+            if is_upgrade_command():
+                bootstrap_fresh_database(connection)
             context.run_migrations()
 
+    connectable.dispose()
+
 
 if context.is_offline_mode():
     run_migrations_offline()
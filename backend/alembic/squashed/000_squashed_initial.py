@@ -0,0 +1,429 @@
+"""Squashed initial schema for fresh installs
+
+Revision ID: 000_squashed_initial
+Stamps: 003_radius_groups
+Create Date: 2025-10-12 12:00:00.000000
+
+Creates the union of 001_initial, 002_fix_ipv6_operators and
+003_radius_groups in one pass, so a fresh database does not create radacct
+and operators only to ALTER them again. This file lives outside versions/
+on purpose: env.py applies it to an empty database and stamps
+003_radius_groups, after which the regular chain continues. Existing
+deployments keep upgrading through 001 -> 002 -> 003.
+
+The radacct IPv6 columns are created directly as INET/CIDR with their GiST
+indexes, the shape 026_radacct_ipv6_network_types converts 002's VARCHAR
+columns to; 026 leaves them alone.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.migration_helpers import create_monthly_partitions, create_table_if_not_exists
+
+# revision identifiers, used by env.py
+revision = '000_squashed_initial'
+stamps = '003_radius_groups'
+
+
+def upgrade() -> None:
+    """Create the daloRADIUS schema as of 003_radius_groups"""
+    
+    # Create operators table; fillfactor leaves room in each page so the
+    # frequent last_login/updated_at updates can stay HOT
+    create_table_if_not_exists('operators',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('password', sa.String(length=255), nullable=False),
+        sa.Column('fullname', sa.String(length=200), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('department', sa.String(length=200), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False, default=True),
+        sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('permissions', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_by', sa.String(length=128), nullable=True),
+        sa.Column('updated_by', sa.String(length=128), nullable=True),
+        sa.Column('firstname', sa.String(length=32), nullable=True),
+        sa.Column('lastname', sa.String(length=32), nullable=True),
+        sa.Column('title', sa.String(length=32), nullable=True),
+        sa.Column('company', sa.String(length=32), nullable=True),
+        sa.Column('phone1', sa.String(length=64), nullable=True),
+        sa.Column('phone2', sa.String(length=64), nullable=True),
+        sa.Column('email1', sa.String(length=254), nullable=True),
+        sa.Column('email2', sa.String(length=254), nullable=True),
+        sa.Column('messenger1', sa.Text(), nullable=True),
+        sa.Column('messenger2', sa.Text(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username')
+    )
+    op.execute('ALTER TABLE operators SET (fillfactor = 85)')
+    op.create_index('idx_operators_username', 'operators', ['username'], if_not_exists=True)
+    op.create_index('idx_operators_active', 'operators', ['is_active'], if_not_exists=True)
+
+    # Create users table (new modern table), same fillfactor as operators
+    create_table_if_not_exists('users',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('password_hash', sa.String(length=255), nullable=True),
+        sa.Column('auth_type', sa.Enum('LOCAL', 'LDAP', 'RADIUS', 'SQL', name='authtype'), nullable=False, default='LOCAL'),
+        sa.Column('is_active', sa.Boolean(), nullable=False, default=True),
+        sa.Column('status', sa.Enum('ACTIVE', 'INACTIVE', 'SUSPENDED', 'EXPIRED', name='userstatus'), nullable=False, default='ACTIVE'),
+        sa.Column('first_name', sa.String(length=200), nullable=True),
+        sa.Column('last_name', sa.String(length=200), nullable=True),
+        sa.Column('department', sa.String(length=200), nullable=True),
+        sa.Column('company', sa.String(length=200), nullable=True),
+        sa.Column('work_phone', sa.String(length=200), nullable=True),
+        sa.Column('home_phone', sa.String(length=200), nullable=True),
+        sa.Column('mobile_phone', sa.String(length=200), nullable=True),
+        sa.Column('address', sa.String(length=200), nullable=True),
+        sa.Column('city', sa.String(length=200), nullable=True),
+        sa.Column('state', sa.String(length=200), nullable=True),
+        sa.Column('country', sa.String(length=100), nullable=True),
+        sa.Column('zip_code', sa.String(length=200), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('mac_address', postgresql.MACADDR(), nullable=True),
+        sa.Column('pin_code', sa.String(length=32), nullable=True),
+        sa.Column('portal_login_password', sa.String(length=128), nullable=True),
+        sa.Column('enable_portal_login', sa.Boolean(), nullable=False, default=False),
+        sa.Column('change_user_info', sa.Boolean(), nullable=False, default=False),
+        sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('password_changed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_by', sa.String(length=128), nullable=True),
+        sa.Column('updated_by', sa.String(length=128), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username'),
+        sa.UniqueConstraint('email')
+    )
+    op.execute('ALTER TABLE users SET (fillfactor = 85)')
+    # users indexes are built after data load in 006_post_load_indexes
+
+    # Create legacy userinfo table for compatibility
+    create_table_if_not_exists('userinfo',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('firstname', sa.String(length=200), nullable=True),
+        sa.Column('lastname', sa.String(length=200), nullable=True),
+        sa.Column('email', sa.String(length=200), nullable=True),
+        sa.Column('department', sa.String(length=200), nullable=True),
+        sa.Column('company', sa.String(length=200), nullable=True),
+        sa.Column('workphone', sa.String(length=200), nullable=True),
+        sa.Column('homephone', sa.String(length=200), nullable=True),
+        sa.Column('mobilephone', sa.String(length=200), nullable=True),
+        sa.Column('address', sa.String(length=200), nullable=True),
+        sa.Column('city', sa.String(length=200), nullable=True),
+        sa.Column('state', sa.String(length=200), nullable=True),
+        sa.Column('country', sa.String(length=100), nullable=True),
+        sa.Column('zip', sa.String(length=200), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('changeuserinfo', sa.Integer(), default=0),
+        sa.Column('portalloginpassword', sa.String(length=128), nullable=True),
+        sa.Column('enableportallogin', sa.Integer(), default=0),
+        sa.Column('creationdate', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('creationby', sa.String(length=128), nullable=True),
+        sa.Column('updatedate', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updateby', sa.String(length=128), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_userinfo_username', 'userinfo', ['username'], if_not_exists=True)
+
+    # Create radcheck table
+    create_table_if_not_exists('radcheck',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('attribute', sa.String(length=64), nullable=False),
+        sa.Column('op', sa.String(length=2), nullable=False, default='=='),
+        sa.Column('value', sa.String(length=253), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Covering index so the per-auth attribute lookup is index-only; it also
+    # serves plain key lookups, so no separate single-column index
+    op.create_index('idx_radcheck_username_covering', 'radcheck', ['username'],
+                    postgresql_include=['attribute', 'op', 'value'], if_not_exists=True)
+    op.execute('ANALYZE radcheck')
+
+    # Create radreply table
+    create_table_if_not_exists('radreply',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('attribute', sa.String(length=64), nullable=False),
+        sa.Column('op', sa.String(length=2), nullable=False, default='='),
+        sa.Column('value', sa.String(length=253), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Covering index so the per-auth attribute lookup is index-only; it also
+    # serves plain key lookups, so no separate single-column index
+    op.create_index('idx_radreply_username_covering', 'radreply', ['username'],
+                    postgresql_include=['attribute', 'op', 'value'], if_not_exists=True)
+    op.execute('ANALYZE radreply')
+
+    # Create radacct table (accounting), range-partitioned by session start
+    # so time-window queries prune old months. The partition key has to be
+    # part of the primary key, hence (radacctid, acctstarttime).
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS radacct (
+            radacctid BIGSERIAL NOT NULL,
+            acctsessionid VARCHAR(64) NOT NULL,
+            acctuniqueid VARCHAR(32) NOT NULL,
+            username VARCHAR(64) NOT NULL,
+            realm VARCHAR(64),
+            nasipaddress INET NOT NULL,
+            nasportid VARCHAR(32),
+            nasporttype VARCHAR(32),
+            acctstarttime TIMESTAMP WITH TIME ZONE NOT NULL,
+            acctupdatetime TIMESTAMP WITH TIME ZONE,
+            acctstoptime TIMESTAMP WITH TIME ZONE,
+            acctinterval INTEGER,
+            acctsessiontime INTEGER,
+            acctauthentic VARCHAR(32),
+            connectinfo_start VARCHAR(128),
+            connectinfo_stop VARCHAR(128),
+            acctinputoctets BIGINT,
+            acctoutputoctets BIGINT,
+            calledstationid VARCHAR(50),
+            callingstationid VARCHAR(50),
+            acctterminatecause VARCHAR(32),
+            servicetype VARCHAR(32),
+            framedprotocol VARCHAR(32),
+            framedipaddress INET,
+            groupname VARCHAR(64),
+            framedipv6address INET,
+            framedipv6prefix CIDR,
+            framedinterfaceid VARCHAR(44),
+            delegatedipv6prefix CIDR,
+            class VARCHAR(64),
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            PRIMARY KEY (radacctid, acctstarttime)
+        ) PARTITION BY RANGE (acctstarttime)
+    """)
+    # radacct is append-only: pack pages fully, vacuum early
+    create_monthly_partitions('radacct', storage_parameters={
+        'fillfactor': 100,
+        'autovacuum_vacuum_scale_factor': 0.02,
+    })
+    op.create_index('idx_radacct_groupname', 'radacct', ['groupname'], if_not_exists=True)
+    op.create_index('idx_radacct_framedipv6address_gist', 'radacct', ['framedipv6address'],
+                    postgresql_using='gist', postgresql_ops={'framedipv6address': 'inet_ops'},
+                    if_not_exists=True)
+    op.create_index('idx_radacct_framedipv6prefix_gist', 'radacct', ['framedipv6prefix'],
+                    postgresql_using='gist', postgresql_ops={'framedipv6prefix': 'inet_ops'},
+                    if_not_exists=True)
+    op.create_index('idx_radacct_framedinterfaceid', 'radacct', ['framedinterfaceid'], if_not_exists=True)
+    op.create_index('idx_radacct_delegatedipv6prefix_gist', 'radacct', ['delegatedipv6prefix'],
+                    postgresql_using='gist', postgresql_ops={'delegatedipv6prefix': 'inet_ops'},
+                    if_not_exists=True)
+    op.create_index('idx_radacct_bulk_close', 'radacct',
+                    ['acctstoptime', 'nasipaddress', 'acctstarttime'], if_not_exists=True)
+    # remaining radacct indexes are built after data load in 006_post_load_indexes
+
+    # Create nas table
+    create_table_if_not_exists('nas',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('nasname', sa.String(length=128), nullable=False),
+        sa.Column('shortname', sa.String(length=32), nullable=True),
+        sa.Column('type', sa.String(length=30), nullable=True, default='other'),
+        sa.Column('ports', sa.Integer(), nullable=True),
+        sa.Column('secret', sa.String(length=60), nullable=False),
+        sa.Column('server', sa.String(length=64), nullable=True),
+        sa.Column('community', sa.String(length=50), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('nasname')
+    )
+    op.create_index('idx_nas_nasname', 'nas', ['nasname'], if_not_exists=True)
+
+    # Create groups table
+    create_table_if_not_exists('radgroups',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('groupname', sa.String(length=64), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('priority', sa.Integer(), nullable=False, default=1),
+        sa.Column('is_active', sa.Boolean(), nullable=False, default=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_by', sa.String(length=128), nullable=True),
+        sa.Column('updated_by', sa.String(length=128), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('groupname')
+    )
+    op.create_index('idx_radgroups_groupname', 'radgroups', ['groupname'], if_not_exists=True)
+
+    # Create radusergroup table
+    create_table_if_not_exists('radusergroup',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('groupname', sa.String(length=64), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False, default=1),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_by', sa.String(length=128), nullable=True),
+        sa.Column('updated_by', sa.String(length=128), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username', 'groupname', name='uq_user_group')
+    )
+    op.create_index('idx_user_group_username', 'radusergroup', ['username'], if_not_exists=True)
+    op.create_index('idx_user_group_groupname', 'radusergroup', ['groupname'], if_not_exists=True)
+
+    # Create billing info table
+    create_table_if_not_exists('dalouserbillinfo',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('planname', sa.String(length=128), nullable=True),
+        sa.Column('contactperson', sa.String(length=200), nullable=True),
+        sa.Column('company', sa.String(length=200), nullable=True),
+        sa.Column('email', sa.String(length=200), nullable=True),
+        sa.Column('phone', sa.String(length=200), nullable=True),
+        sa.Column('address', sa.String(length=200), nullable=True),
+        sa.Column('city', sa.String(length=200), nullable=True),
+        sa.Column('state', sa.String(length=200), nullable=True),
+        sa.Column('country', sa.String(length=200), nullable=True),
+        sa.Column('zip', sa.String(length=200), nullable=True),
+        sa.Column('paymentmethod', sa.String(length=200), nullable=True),
+        sa.Column('cash', sa.String(length=200), nullable=True),
+        sa.Column('creditcardname', sa.String(length=200), nullable=True),
+        sa.Column('creditcardnumber', sa.String(length=200), nullable=True),
+        sa.Column('creditcardverification', sa.String(length=200), nullable=True),
+        sa.Column('creditcardtype', sa.String(length=200), nullable=True),
+        sa.Column('creditcardexp', sa.String(length=200), nullable=True),
+        sa.Column('lead', sa.String(length=200), nullable=True),
+        sa.Column('coupon', sa.String(length=200), nullable=True),
+        sa.Column('ordertaker', sa.String(length=200), nullable=True),
+        sa.Column('billstatus', sa.String(length=200), nullable=True),
+        sa.Column('lastbill', sa.Date(), nullable=True),
+        sa.Column('nextbill', sa.Date(), nullable=True),
+        sa.Column('nextinvoicedue', sa.Date(), nullable=True),
+        sa.Column('billdue', sa.Date(), nullable=True),
+        sa.Column('postalinvoice', sa.String(length=200), nullable=True),
+        sa.Column('faxinvoice', sa.String(length=200), nullable=True),
+        sa.Column('emailinvoice', sa.String(length=200), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('changeuserbillinfo', sa.Integer(), default=0),
+        sa.Column('batch_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_by', sa.String(length=128), nullable=True),
+        sa.Column('updated_by', sa.String(length=128), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_userbillinfo_username', 'dalouserbillinfo', ['username'], if_not_exists=True)
+    op.create_index('idx_userbillinfo_planname', 'dalouserbillinfo', ['planname'], if_not_exists=True)
+
+    # Create batch_history table
+    create_table_if_not_exists('batch_history',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('batch_name', sa.String(length=128), nullable=False),
+        sa.Column('batch_description', sa.Text(), nullable=True),
+        sa.Column('hotspot_id', sa.Integer(), nullable=True),
+        sa.Column('creationdate', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('creationby', sa.String(length=128), nullable=True),
+        sa.Column('updatedate', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updateby', sa.String(length=128), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Create radgroupcheck table
+    create_table_if_not_exists('radgroupcheck',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('groupname', sa.String(length=64), nullable=False),
+        sa.Column('attribute', sa.String(length=64), nullable=False),
+        sa.Column('op', sa.String(length=2), nullable=False, default='=='),
+        sa.Column('value', sa.String(length=253), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Covering index so the per-auth attribute lookup is index-only; it also
+    # serves plain key lookups, so no separate single-column index
+    op.create_index('idx_radgroupcheck_groupname_covering', 'radgroupcheck', ['groupname'],
+                    postgresql_include=['attribute', 'op', 'value'], if_not_exists=True)
+    op.execute('ANALYZE radgroupcheck')
+
+    # Create radgroupreply table
+    create_table_if_not_exists('radgroupreply',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('groupname', sa.String(length=64), nullable=False),
+        sa.Column('attribute', sa.String(length=64), nullable=False),
+        sa.Column('op', sa.String(length=2), nullable=False, default='='),
+        sa.Column('value', sa.String(length=253), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Covering index so the per-auth attribute lookup is index-only; it also
+    # serves plain key lookups, so no separate single-column index
+    op.create_index('idx_radgroupreply_groupname_covering', 'radgroupreply', ['groupname'],
+                    postgresql_include=['attribute', 'op', 'value'], if_not_exists=True)
+    op.execute('ANALYZE radgroupreply')
+
+    # Create radpostauth table
+    create_table_if_not_exists('radpostauth',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('username', sa.String(length=64), nullable=False),
+        sa.Column('pass', sa.String(length=64), nullable=False),
+        sa.Column('reply', sa.String(length=32), nullable=False),
+        sa.Column('authdate', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('class', sa.String(length=64), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_radpostauth_username', 'radpostauth', ['username'], if_not_exists=True)
+    op.create_index('idx_radpostauth_authdate', 'radpostauth', ['authdate'], if_not_exists=True)
+
+    # Create nasreload table
+    create_table_if_not_exists('nasreload',
+        sa.Column('nasipaddress', postgresql.INET(), nullable=False),
+        sa.Column('reloadtime', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('nasipaddress')
+    )
+
+    # Create radippool table
+    create_table_if_not_exists('radippool',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        sa.Column('pool_name', sa.String(length=30), nullable=False),
+        sa.Column('framedipaddress', postgresql.INET(), nullable=False),
+        sa.Column('nasipaddress', postgresql.INET(), nullable=False),
+        sa.Column('calledstationid', sa.String(length=30), nullable=True),
+        sa.Column('callingstationid', sa.String(length=30), nullable=True),
+        sa.Column('expiry_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('username', sa.String(length=64), nullable=True),
+        sa.Column('pool_key', sa.String(length=30), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_radippool_pool_name', 'radippool', ['pool_name'], if_not_exists=True)
+    op.create_index('idx_radippool_framedipaddress', 'radippool', ['framedipaddress'], if_not_exists=True)
+    op.create_index('idx_radippool_nasipaddress', 'radippool', ['nasipaddress'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Drop the squashed daloRADIUS schema"""
+    op.drop_table('radippool')
+    op.drop_table('nasreload')
+    op.drop_table('radpostauth')
+    op.drop_table('radgroupreply')
+    op.drop_table('radgroupcheck')
+    op.drop_table('batch_history')
+    op.drop_table('dalouserbillinfo')
+    op.drop_table('radusergroup')
+    op.drop_table('radgroups')
+    op.drop_table('nas')
+    op.drop_table('radacct')
+    op.drop_table('radreply')
+    op.drop_table('radcheck')
+    op.drop_table('userinfo')
+    op.drop_table('users')
+    op.drop_table('operators')
@@ -9,6 +9,12 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from app.db.migration_helpers import (
+    create_index_concurrently,
+    create_monthly_partitions,
+    create_table_if_not_exists,
+)
+
 # revision identifiers, used by Alembic.
 revision = '001_initial'
 down_revision = None
@@ -19,9 +25,10 @@ depends_on = None
 def upgrade() -> None:
     """Create initial daloRADIUS tables"""
     
-    # Create operators table
-    op.create_table('operators',
-        sa.Column('id', sa.Integer(), nullable=False),
+    # Create operators table; fillfactor leaves room in each page so the
+    # frequent last_login/updated_at updates can stay HOT
+    create_table_if_not_exists('operators',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('username', sa.String(length=64), nullable=False),
         sa.Column('password', sa.String(length=255), nullable=False),
         sa.Column('fullname', sa.String(length=200), nullable=True),
@@ -37,12 +44,13 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('username')
     )
-    op.create_index('idx_operators_username', 'operators', ['username'])
-    op.create_index('idx_operators_active', 'operators', ['is_active'])
+    op.execute('ALTER TABLE operators SET (fillfactor = 85)')
+    op.create_index('idx_operators_username', 'operators', ['username'], if_not_exists=True)
+    op.create_index('idx_operators_active', 'operators', ['is_active'], if_not_exists=True)
 
-    # Create users table (new modern table)
-    op.create_table('users',
-        sa.Column('id', sa.Integer(), nullable=False),
+    # Create users table (new modern table), same fillfactor as operators
+    create_table_if_not_exists('users',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('username', sa.String(length=64), nullable=False),
         sa.Column('email', sa.String(length=255), nullable=True),
         sa.Column('password_hash', sa.String(length=255), nullable=True),
@@ -62,7 +70,7 @@ def upgrade() -> None:
         sa.Column('country', sa.String(length=100), nullable=True),
         sa.Column('zip_code', sa.String(length=200), nullable=True),
         sa.Column('notes', sa.Text(), nullable=True),
-        sa.Column('mac_address', sa.String(length=17), nullable=True),
+        sa.Column('mac_address', postgresql.MACADDR(), nullable=True),
         sa.Column('pin_code', sa.String(length=32), nullable=True),
         sa.Column('portal_login_password', sa.String(length=128), nullable=True),
         sa.Column('enable_portal_login', sa.Boolean(), nullable=False, default=False),
@@ -77,13 +85,12 @@ def upgrade() -> None:
         sa.UniqueConstraint('username'),
         sa.UniqueConstraint('email')
     )
-    op.create_index('idx_users_username_active', 'users', ['username', 'is_active'])
-    op.create_index('idx_users_email_active', 'users', ['email', 'is_active'])
-    op.create_index('idx_users_status', 'users', ['status'])
+    op.execute('ALTER TABLE users SET (fillfactor = 85)')
+    # users indexes are built after data load in 006_post_load_indexes
 
     # Create legacy userinfo table for compatibility
-    op.create_table('userinfo',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+    create_table_if_not_exists('userinfo',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('username', sa.String(length=64), nullable=False),
         sa.Column('firstname', sa.String(length=200), nullable=True),
         sa.Column('lastname', sa.String(length=200), nullable=True),
@@ -108,11 +115,11 @@ def upgrade() -> None:
         sa.Column('updateby', sa.String(length=128), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_userinfo_username', 'userinfo', ['username'])
+    create_index_concurrently('idx_userinfo_username', 'userinfo', ['username'])
 
     # Create radcheck table
-    op.create_table('radcheck',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+    create_table_if_not_exists('radcheck',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('username', sa.String(length=64), nullable=False),
         sa.Column('attribute', sa.String(length=64), nullable=False),
         sa.Column('op', sa.String(length=2), nullable=False, default='=='),
@@ -121,12 +128,15 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_radcheck_username', 'radcheck', ['username'])
-    op.create_index('idx_radcheck_username_attribute', 'radcheck', ['username', 'attribute'])
+    # Covering index so the per-auth attribute lookup is index-only; it also
+    # serves plain key lookups, so no separate single-column index
+    op.create_index('idx_radcheck_username_covering', 'radcheck', ['username'],
+                    postgresql_include=['attribute', 'op', 'value'], if_not_exists=True)
+    op.execute('ANALYZE radcheck')
 
     # Create radreply table
-    op.create_table('radreply',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+    create_table_if_not_exists('radreply',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('username', sa.String(length=64), nullable=False),
         sa.Column('attribute', sa.String(length=64), nullable=False),
         sa.Column('op', sa.String(length=2), nullable=False, default='='),
@@ -135,47 +145,57 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_radreply_username', 'radreply', ['username'])
-    op.create_index('idx_radreply_username_attribute', 'radreply', ['username', 'attribute'])
+    # Covering index so the per-auth attribute lookup is index-only; it also
+    # serves plain key lookups, so no separate single-column index
+    op.create_index('idx_radreply_username_covering', 'radreply', ['username'],
+                    postgresql_include=['attribute', 'op', 'value'], if_not_exists=True)
+    op.execute('ANALYZE radreply')
 
-    # Create radacct table (accounting)
-    op.create_table('radacct',
-        sa.Column('radacctid', sa.BigInteger(), nullable=False, autoincrement=True),
-        sa.Column('acctsessionid', sa.String(length=64), nullable=False),
-        sa.Column('acctuniqueid', sa.String(length=32), nullable=False),
-        sa.Column('username', sa.String(length=64), nullable=False),
-        sa.Column('realm', sa.String(length=64), nullable=True),
-        sa.Column('nasipaddress', postgresql.INET(), nullable=False),
-        sa.Column('nasportid', sa.String(length=32), nullable=True),
-        sa.Column('nasporttype', sa.String(length=32), nullable=True),
-        sa.Column('acctstarttime', sa.DateTime(timezone=True), nullable=True),
-        sa.Column('acctupdatetime', sa.DateTime(timezone=True), nullable=True),
-        sa.Column('acctstoptime', sa.DateTime(timezone=True), nullable=True),
-        sa.Column('acctinterval', sa.Integer(), nullable=True),
-        sa.Column('acctsessiontime', sa.Integer(), nullable=True),
-        sa.Column('acctauthentic', sa.String(length=32), nullable=True),
-        sa.Column('connectinfo_start', sa.String(length=128), nullable=True),
-        sa.Column('connectinfo_stop', sa.String(length=128), nullable=True),
-        sa.Column('acctinputoctets', sa.BigInteger(), nullable=True),
-        sa.Column('acctoutputoctets', sa.BigInteger(), nullable=True),
-        sa.Column('calledstationid', sa.String(length=50), nullable=True),
-        sa.Column('callingstationid', sa.String(length=50), nullable=True),
-        sa.Column('acctterminatecause', sa.String(length=32), nullable=True),
-        sa.Column('servicetype', sa.String(length=32), nullable=True),
-        sa.Column('framedprotocol', sa.String(length=32), nullable=True),
-        sa.Column('framedipaddress', postgresql.INET(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
-        sa.PrimaryKeyConstraint('radacctid')
-    )
-    op.create_index('idx_radacct_username', 'radacct', ['username'])
-    op.create_index('idx_radacct_acctstarttime', 'radacct', ['acctstarttime'])
-    op.create_index('idx_radacct_acctstoptime', 'radacct', ['acctstoptime'])
-    op.create_index('idx_radacct_nasipaddress', 'radacct', ['nasipaddress'])
-    op.create_index('idx_radacct_acctsessionid', 'radacct', ['acctsessionid'])
+    # Create radacct table (accounting), range-partitioned by session start
+    # so time-window queries prune old months. The partition key has to be
+    # part of the primary key, hence (radacctid, acctstarttime). Databases
+    # created before this keep their unpartitioned radacct; no later
+    # revision converts it.
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS radacct (
+            radacctid BIGSERIAL NOT NULL,
+            acctsessionid VARCHAR(64) NOT NULL,
+            acctuniqueid VARCHAR(32) NOT NULL,
+            username VARCHAR(64) NOT NULL,
+            realm VARCHAR(64),
+            nasipaddress INET NOT NULL,
+            nasportid VARCHAR(32),
+            nasporttype VARCHAR(32),
+            acctstarttime TIMESTAMP WITH TIME ZONE NOT NULL,
+            acctupdatetime TIMESTAMP WITH TIME ZONE,
+            acctstoptime TIMESTAMP WITH TIME ZONE,
+            acctinterval INTEGER,
+            acctsessiontime INTEGER,
+            acctauthentic VARCHAR(32),
+            connectinfo_start VARCHAR(128),
+            connectinfo_stop VARCHAR(128),
+            acctinputoctets BIGINT,
+            acctoutputoctets BIGINT,
+            calledstationid VARCHAR(50),
+            callingstationid VARCHAR(50),
+            acctterminatecause VARCHAR(32),
+            servicetype VARCHAR(32),
+            framedprotocol VARCHAR(32),
+            framedipaddress INET,
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            PRIMARY KEY (radacctid, acctstarttime)
+        ) PARTITION BY RANGE (acctstarttime)
+    """)
+    # radacct is append-only: pack pages fully, vacuum early
+    create_monthly_partitions('radacct', storage_parameters={
+        'fillfactor': 100,
+        'autovacuum_vacuum_scale_factor': 0.02,
+    })
+    # radacct indexes are built after data load in 006_post_load_indexes
 
     # Create nas table
-    op.create_table('nas',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+    create_table_if_not_exists('nas',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('nasname', sa.String(length=128), nullable=False),
         sa.Column('shortname', sa.String(length=32), nullable=True),
         sa.Column('type', sa.String(length=30), nullable=True, default='other'),
@@ -189,11 +209,11 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('nasname')
     )
-    op.create_index('idx_nas_nasname', 'nas', ['nasname'])
+    op.create_index('idx_nas_nasname', 'nas', ['nasname'], if_not_exists=True)
 
     # Create groups table
-    op.create_table('radgroups',
-        sa.Column('id', sa.Integer(), nullable=False),
+    create_table_if_not_exists('radgroups',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('groupname', sa.String(length=64), nullable=False),
         sa.Column('description', sa.Text(), nullable=True),
         sa.Column('priority', sa.Integer(), nullable=False, default=1),
@@ -205,11 +225,11 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('groupname')
     )
-    op.create_index('idx_radgroups_groupname', 'radgroups', ['groupname'])
+    op.create_index('idx_radgroups_groupname', 'radgroups', ['groupname'], if_not_exists=True)
 
     # Create radusergroup table
-    op.create_table('radusergroup',
-        sa.Column('id', sa.Integer(), nullable=False),
+    create_table_if_not_exists('radusergroup',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('user_id', sa.Integer(), nullable=True),
         sa.Column('username', sa.String(length=64), nullable=False),
         sa.Column('groupname', sa.String(length=64), nullable=False),
@@ -222,12 +242,12 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('username', 'groupname', name='uq_user_group')
     )
-    op.create_index('idx_user_group_username', 'radusergroup', ['username'])
-    op.create_index('idx_user_group_groupname', 'radusergroup', ['groupname'])
+    op.create_index('idx_user_group_username', 'radusergroup', ['username'], if_not_exists=True)
+    op.create_index('idx_user_group_groupname', 'radusergroup', ['groupname'], if_not_exists=True)
 
     # Create billing info table
-    op.create_table('dalouserbillinfo',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+    create_table_if_not_exists('dalouserbillinfo',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('user_id', sa.Integer(), nullable=True),
         sa.Column('username', sa.String(length=64), nullable=False),
         sa.Column('planname', sa.String(length=128), nullable=True),
@@ -268,12 +288,12 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_userbillinfo_username', 'dalouserbillinfo', ['username'])
-    op.create_index('idx_userbillinfo_planname', 'dalouserbillinfo', ['planname'])
+    op.create_index('idx_userbillinfo_username', 'dalouserbillinfo', ['username'], if_not_exists=True)
+    op.create_index('idx_userbillinfo_planname', 'dalouserbillinfo', ['planname'], if_not_exists=True)
 
     # Create batch_history table
-    op.create_table('batch_history',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+    create_table_if_not_exists('batch_history',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('batch_name', sa.String(length=128), nullable=False),
         sa.Column('batch_description', sa.Text(), nullable=True),
         sa.Column('hotspot_id', sa.Integer(), nullable=True),
@@ -9,6 +9,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
 # revision identifiers, used by Alembic.
 revision = '002_fix_ipv6_operators'
 down_revision = '001_initial'
@@ -16,103 +18,145 @@ branch_labels = None
 depends_on = None
 
 
+# Columns added by this revision as (name, type); downgrade() drops the same
+# columns in reverse order
+RADACCT_ADD = [
+    ('groupname', sa.String(length=64)),
+    ('framedipv6address', sa.String(length=45)),
+    ('framedipv6prefix', sa.String(length=45)),
+    ('framedinterfaceid', sa.String(length=44)),
+    ('delegatedipv6prefix', sa.String(length=45)),
+    ('class', sa.String(length=64)),
+]
+
+OPERATORS_ADD = [
+    ('firstname', sa.String(length=32)),
+    ('lastname', sa.String(length=32)),
+    ('title', sa.String(length=32)),
+    ('company', sa.String(length=32)),
+    ('phone1', sa.String(length=64)),
+    ('phone2', sa.String(length=64)),
+    ('email1', sa.String(length=254)),
+    ('email2', sa.String(length=254)),
+    ('messenger1', sa.Text()),
+    ('messenger2', sa.Text()),
+    ('notes', sa.Text()),
+]
+
+# Indexes on the new radacct columns as (name, columns)
+RADACCT_INDEXES = [
+    ('idx_radacct_groupname', ['groupname']),
+    ('idx_radacct_framedipv6address', ['framedipv6address']),
+    ('idx_radacct_framedipv6prefix', ['framedipv6prefix']),
+    ('idx_radacct_framedinterfaceid', ['framedinterfaceid']),
+    ('idx_radacct_delegatedipv6prefix', ['delegatedipv6prefix']),
+    # Bulk close index for performance (MySQL/MariaDB style)
+    ('idx_radacct_bulk_close', ['acctstoptime', 'nasipaddress', 'acctstarttime']),
+]
+
+
+def _add_missing_columns(table: str, columns: list, cache: set) -> None:
+    """Add every (name, type) column not yet in ``cache`` with a single ALTER TABLE.
+
+    Batching the ADD COLUMN clauses takes the table lock once instead of
+    once per column. The cache is updated afterwards so later guards see
+    the new columns without another catalog roundtrip.
+    """
+    missing = [(name, type_) for name, type_ in columns if name not in cache]
+    if not missing:
+        return
+
+    conn = op.get_bind()
+    quote = conn.dialect.identifier_preparer.quote
+    clauses = ", ".join(
+        f"ADD COLUMN {quote(name)} {type_.compile(dialect=conn.dialect)}"
+        for name, type_ in missing
+    )
+    op.execute(f"ALTER TABLE {quote(table)} {clauses}")
+    cache.update(name for name, _ in missing)
+
+
+def _drop_columns(table: str, names: list) -> None:
+    """Drop several columns with a single ALTER TABLE"""
+    quote = op.get_bind().dialect.identifier_preparer.quote
+    clauses = ", ".join(f"DROP COLUMN IF EXISTS {quote(name)}" for name in names)
+    op.execute(f"ALTER TABLE {quote(table)} {clauses}")
+
+
+def _load_catalog(conn, tables: tuple) -> tuple:
+    """Read column types and index names for ``tables`` in two roundtrips.
+
+    Returns ``({table: {column: type}}, {table: {index_name}})``. Types are
+    lower-case SQL type names (``inet``, ``character varying(45)``...).
+    """
+    columns = {table: {} for table in tables}
+    indexes = {table: set() for table in tables}
+
+    if conn.dialect.name != 'postgresql':
+        from sqlalchemy import inspect
+        inspector = inspect(conn)
+        for table in tables:
+            columns[table] = {col['name']: str(col['type']).lower() for col in inspector.get_columns(table)}
+            indexes[table] = {idx['name'] for idx in inspector.get_indexes(table)}
+        return columns, indexes
+
+    params = {'tables': list(tables)}
+    rows = conn.execute(sa.text(
+        "SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod) "
+        "FROM pg_attribute a JOIN pg_class c ON c.oid = a.attrelid "
+        "WHERE a.attrelid = ANY (SELECT to_regclass(t) FROM unnest(CAST(:tables AS text[])) t) "
+        "AND a.attnum > 0 AND NOT a.attisdropped"
+    ), params)
+    for table, column, type_name in rows:
+        columns[table][column] = type_name
+
+    rows = conn.execute(sa.text(
+        "SELECT c.relname, ic.relname "
+        "FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indrelid "
+        "JOIN pg_class ic ON ic.oid = i.indexrelid "
+        "WHERE i.indrelid = ANY (SELECT to_regclass(t) FROM unnest(CAST(:tables AS text[])) t)"
+    ), params)
+    for table, index in rows:
+        indexes[table].add(index)
+
+    return columns, indexes
+
+
+def _ensure_index(name: str, table: str, columns: list, index_cache: set, column_cache: set) -> None:
+    """Create an index unless it already exists or its columns are missing"""
+    if name not in index_cache and set(columns) <= column_cache:
+        create_index_concurrently(name, table, columns)
+        index_cache.add(name)
+
+
 def upgrade() -> None:
     """Add missing IPv6 fields to radacct table and extend operators table"""
     
-    # Check if columns exist before adding them
-    from sqlalchemy import inspect
-    conn = op.get_bind()
-    inspector = inspect(conn)
-    radacct_columns = [col['name'] for col in inspector.get_columns('radacct')]
-    operators_columns = [col['name'] for col in inspector.get_columns('operators')]
+    # Read the existing columns and indexes once and reuse the cached sets
+    column_types, index_names = _load_catalog(op.get_bind(), ('radacct', 'operators'))
+    radacct_cols = set(column_types['radacct'])
+    operators_cols = set(column_types['operators'])
+    radacct_idx = index_names['radacct']
     
     # 1. Add IPv6 and missing fields to radacct table (only if they don't exist)
-    if 'groupname' not in radacct_columns:
-        op.add_column('radacct', sa.Column('groupname', sa.String(length=64), nullable=True))
-    if 'framedipv6address' not in radacct_columns:
-        op.add_column('radacct', sa.Column('framedipv6address', sa.String(length=45), nullable=True))
-    if 'framedipv6prefix' not in radacct_columns:
-        op.add_column('radacct', sa.Column('framedipv6prefix', sa.String(length=45), nullable=True))
-    if 'framedinterfaceid' not in radacct_columns:
-        op.add_column('radacct', sa.Column('framedinterfaceid', sa.String(length=44), nullable=True))
-    if 'delegatedipv6prefix' not in radacct_columns:
-        op.add_column('radacct', sa.Column('delegatedipv6prefix', sa.String(length=45), nullable=True))
-    if 'class' not in radacct_columns:
-        op.add_column('radacct', sa.Column('class', sa.String(length=64), nullable=True))
+    _add_missing_columns('radacct', RADACCT_ADD, radacct_cols)
     
     # 2. Add missing fields to operators table (only if they don't exist)
-    if 'firstname' not in operators_columns:
-        op.add_column('operators', sa.Column('firstname', sa.String(length=32), nullable=True))
-    if 'lastname' not in operators_columns:
-        op.add_column('operators', sa.Column('lastname', sa.String(length=32), nullable=True))
-    if 'title' not in operators_columns:
-        op.add_column('operators', sa.Column('title', sa.String(length=32), nullable=True))
-    if 'company' not in operators_columns:
-        op.add_column('operators', sa.Column('company', sa.String(length=32), nullable=True))
-    if 'phone1' not in operators_columns:
-        op.add_column('operators', sa.Column('phone1', sa.String(length=32), nullable=True))
-    if 'phone2' not in operators_columns:
-        op.add_column('operators', sa.Column('phone2', sa.String(length=32), nullable=True))
-    if 'email1' not in operators_columns:
-        op.add_column('operators', sa.Column('email1', sa.String(length=32), nullable=True))
-    if 'email2' not in operators_columns:
-        op.add_column('operators', sa.Column('email2', sa.String(length=32), nullable=True))
-    if 'messenger1' not in operators_columns:
-        op.add_column('operators', sa.Column('messenger1', sa.String(length=32), nullable=True))
-    if 'messenger2' not in operators_columns:
-        op.add_column('operators', sa.Column('messenger2', sa.String(length=32), nullable=True))
-    if 'notes' not in operators_columns:
-        op.add_column('operators', sa.Column('notes', sa.String(length=128), nullable=True))
+    _add_missing_columns('operators', OPERATORS_ADD, operators_cols)
     
-    # 3. Add indexes for new radacct IPv6 fields (check if they exist first)
-    existing_indexes = [idx['name'] for idx in inspector.get_indexes('radacct')]
-    
-    if 'idx_radacct_groupname' not in existing_indexes and 'groupname' in [col['name'] for col in inspector.get_columns('radacct')]:
-        op.create_index('idx_radacct_groupname', 'radacct', ['groupname'])
-    if 'idx_radacct_framedipv6address' not in existing_indexes and 'framedipv6address' in [col['name'] for col in inspector.get_columns('radacct')]:
-        op.create_index('idx_radacct_framedipv6address', 'radacct', ['framedipv6address'])
-    if 'idx_radacct_framedipv6prefix' not in existing_indexes and 'framedipv6prefix' in [col['name'] for col in inspector.get_columns('radacct')]:
-        op.create_index('idx_radacct_framedipv6prefix', 'radacct', ['framedipv6prefix'])
-    if 'idx_radacct_framedinterfaceid' not in existing_indexes and 'framedinterfaceid' in [col['name'] for col in inspector.get_columns('radacct')]:
-        op.create_index('idx_radacct_framedinterfaceid', 'radacct', ['framedinterfaceid'])
-    if 'idx_radacct_delegatedipv6prefix' not in existing_indexes and 'delegatedipv6prefix' in [col['name'] for col in inspector.get_columns('radacct')]:
-        op.create_index('idx_radacct_delegatedipv6prefix', 'radacct', ['delegatedipv6prefix'])
-    
-    # 4. Add bulk close index for performance (MySQL/MariaDB style)
-    if 'idx_radacct_bulk_close' not in existing_indexes:
-        op.create_index('idx_radacct_bulk_close', 'radacct', ['acctstoptime', 'nasipaddress', 'acctstarttime'])
+    # 3. Add indexes for the new radacct fields (check if they exist first)
+    for name, columns in RADACCT_INDEXES:
+        _ensure_index(name, 'radacct', columns, radacct_idx, radacct_cols)
 
 
 def downgrade() -> None:
     """Remove the added fields and indexes"""
     
     # Remove indexes first
-    op.drop_index('idx_radacct_bulk_close', 'radacct')
-    op.drop_index('idx_radacct_delegatedipv6prefix', 'radacct')
-    op.drop_index('idx_radacct_framedinterfaceid', 'radacct')
-    op.drop_index('idx_radacct_framedipv6prefix', 'radacct')
-    op.drop_index('idx_radacct_framedipv6address', 'radacct')
-    op.drop_index('idx_radacct_groupname', 'radacct')
-    
-    # Remove operators fields
-    op.drop_column('operators', 'notes')
-    op.drop_column('operators', 'messenger2')
-    op.drop_column('operators', 'messenger1')
-    op.drop_column('operators', 'email2')
-    op.drop_column('operators', 'email1')
-    op.drop_column('operators', 'phone2')
-    op.drop_column('operators', 'phone1')
-    op.drop_column('operators', 'company')
-    op.drop_column('operators', 'title')
-    op.drop_column('operators', 'lastname')
-    op.drop_column('operators', 'firstname')
+    for name, _ in reversed(RADACCT_INDEXES):
+        drop_index_concurrently(name)
     
-    # Remove radacct fields
-    op.drop_column('radacct', 'acctauthentic')
-    op.drop_column('radacct', 'acctinterval')
-    op.drop_column('radacct', 'class')
-    op.drop_column('radacct', 'delegatedipv6prefix')
-    op.drop_column('radacct', 'framedinterfaceid')
-    op.drop_column('radacct', 'framedipv6prefix')
-    op.drop_column('radacct', 'framedipv6address')
-    op.drop_column('radacct', 'groupname')
\ No newline at end of file
+    # Remove operators and radacct fields
+    _drop_columns('operators', [name for name, _ in reversed(OPERATORS_ADD)])
+    _drop_columns('radacct', [name for name, _ in reversed(RADACCT_ADD)])
@@ -9,6 +9,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from app.db.migration_helpers import create_table_if_not_exists
+
 # revision identifiers, used by Alembic.
 revision = '003_radius_groups'
 down_revision = '002_fix_ipv6_operators'
@@ -20,8 +22,8 @@ def upgrade() -> None:
     """Create RADIUS group management tables"""
     
     # Create radgroupcheck table
-    op.create_table('radgroupcheck',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+    create_table_if_not_exists('radgroupcheck',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('groupname', sa.String(length=64), nullable=False),
         sa.Column('attribute', sa.String(length=64), nullable=False),
         sa.Column('op', sa.String(length=2), nullable=False, default='=='),
@@ -30,12 +32,15 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_radgroupcheck_groupname', 'radgroupcheck', ['groupname'])
-    op.create_index('idx_radgroupcheck_groupname_attribute', 'radgroupcheck', ['groupname', 'attribute'])
+    # Covering index so the per-auth attribute lookup is index-only; it also
+    # serves plain key lookups, so no separate single-column index
+    op.create_index('idx_radgroupcheck_groupname_covering', 'radgroupcheck', ['groupname'],
+                    postgresql_include=['attribute', 'op', 'value'], if_not_exists=True)
+    op.execute('ANALYZE radgroupcheck')
 
     # Create radgroupreply table
-    op.create_table('radgroupreply',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+    create_table_if_not_exists('radgroupreply',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('groupname', sa.String(length=64), nullable=False),
         sa.Column('attribute', sa.String(length=64), nullable=False),
         sa.Column('op', sa.String(length=2), nullable=False, default='='),
@@ -44,12 +49,15 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_radgroupreply_groupname', 'radgroupreply', ['groupname'])
-    op.create_index('idx_radgroupreply_groupname_attribute', 'radgroupreply', ['groupname', 'attribute'])
+    # Covering index so the per-auth attribute lookup is index-only; it also
+    # serves plain key lookups, so no separate single-column index
+    op.create_index('idx_radgroupreply_groupname_covering', 'radgroupreply', ['groupname'],
+                    postgresql_include=['attribute', 'op', 'value'], if_not_exists=True)
+    op.execute('ANALYZE radgroupreply')
 
     # Create radpostauth table
-    op.create_table('radpostauth',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+    create_table_if_not_exists('radpostauth',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('username', sa.String(length=64), nullable=False),
         sa.Column('pass', sa.String(length=64), nullable=False),
         sa.Column('reply', sa.String(length=32), nullable=False),
@@ -57,19 +65,19 @@ def upgrade() -> None:
         sa.Column('class', sa.String(length=64), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_radpostauth_username', 'radpostauth', ['username'])
-    op.create_index('idx_radpostauth_authdate', 'radpostauth', ['authdate'])
+    op.create_index('idx_radpostauth_username', 'radpostauth', ['username'], if_not_exists=True)
+    op.create_index('idx_radpostauth_authdate', 'radpostauth', ['authdate'], if_not_exists=True)
 
     # Create nasreload table
-    op.create_table('nasreload',
+    create_table_if_not_exists('nasreload',
         sa.Column('nasipaddress', postgresql.INET(), nullable=False),
         sa.Column('reloadtime', sa.DateTime(timezone=True), nullable=False),
         sa.PrimaryKeyConstraint('nasipaddress')
     )
 
     # Create radippool table
-    op.create_table('radippool',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+    create_table_if_not_exists('radippool',
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('pool_name', sa.String(length=30), nullable=False),
         sa.Column('framedipaddress', postgresql.INET(), nullable=False),
         sa.Column('nasipaddress', postgresql.INET(), nullable=False),
@@ -80,9 +88,9 @@ def upgrade() -> None:
         sa.Column('pool_key', sa.String(length=30), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_radippool_pool_name', 'radippool', ['pool_name'])
-    op.create_index('idx_radippool_framedipaddress', 'radippool', ['framedipaddress'])
-    op.create_index('idx_radippool_nasipaddress', 'radippool', ['nasipaddress'])
+    op.create_index('idx_radippool_pool_name', 'radippool', ['pool_name'], if_not_exists=True)
+    op.create_index('idx_radippool_framedipaddress', 'radippool', ['framedipaddress'], if_not_exists=True)
+    op.create_index('idx_radippool_nasipaddress', 'radippool', ['nasipaddress'], if_not_exists=True)
 
 
 def downgrade() -> None:
@@ -9,6 +9,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from app.db.migration_helpers import create_index_concurrently
+
 # revision identifiers, used by Alembic.
 revision = '004_billing_system'
 down_revision = '003_radius_groups'
@@ -21,7 +23,7 @@ def upgrade() -> None:
     
     # Create billing_plans table
     op.create_table('billing_plans',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('planName', sa.String(length=128), nullable=True),
         sa.Column('planId', sa.String(length=128), nullable=True),
         sa.Column('planType', sa.String(length=128), nullable=True),
@@ -37,9 +39,9 @@ def upgrade() -> None:
         sa.Column('planRecurring', sa.String(length=128), nullable=True),
         sa.Column('planRecurringPeriod', sa.String(length=128), nullable=True),
         sa.Column('planRecurringBillingSchedule', sa.String(length=128), nullable=False, default='Fixed'),
-        sa.Column('planCost', sa.String(length=128), nullable=True),
-        sa.Column('planSetupCost', sa.String(length=128), nullable=True),
-        sa.Column('planTax', sa.String(length=128), nullable=True),
+        sa.Column('planCost', sa.Numeric(precision=14, scale=4), nullable=True),
+        sa.Column('planSetupCost', sa.Numeric(precision=14, scale=4), nullable=True),
+        sa.Column('planTax', sa.Numeric(precision=14, scale=4), nullable=True),
         sa.Column('planCurrency', sa.String(length=128), nullable=True),
         sa.Column('planGroup', sa.String(length=128), nullable=True),
         sa.Column('planActive', sa.String(length=32), nullable=False, default='yes'),
@@ -50,26 +52,30 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id')
     )
     op.create_index('idx_billing_plans_planName', 'billing_plans', ['planName'])
-    op.create_index('idx_billing_plans_planActive', 'billing_plans', ['planActive'])
+    # Plan pickers only list active plans, by name
+    op.create_index('idx_billing_plans_active_only', 'billing_plans', ['planName'],
+                    postgresql_where=sa.text('"planActive" = \'yes\''))
 
     # Create billing_history table
     op.create_table('billing_history',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('username', sa.String(length=128), nullable=True),
         sa.Column('planId', sa.Integer(), nullable=True),
-        sa.Column('billAmount', sa.String(length=200), nullable=True),
+        sa.Column('billAmount', sa.Numeric(precision=14, scale=4), nullable=True),
+        sa.Column('planName_snapshot', sa.String(length=128), nullable=True),
+        sa.Column('planCost_snapshot', sa.Numeric(precision=14, scale=4), nullable=True),
         sa.Column('billAction', sa.String(length=128), nullable=False, default='Unavailable'),
         sa.Column('billPerformer', sa.String(length=200), nullable=True),
         sa.Column('billReason', sa.String(length=200), nullable=True),
         sa.Column('paymentmethod', sa.String(length=200), nullable=True),
-        sa.Column('cash', sa.String(length=200), nullable=True),
+        sa.Column('cash', sa.Numeric(precision=14, scale=4), nullable=True),
         sa.Column('creditcardname', sa.String(length=200), nullable=True),
         sa.Column('creditcardnumber', sa.String(length=200), nullable=True),
         sa.Column('creditcardverification', sa.String(length=200), nullable=True),
         sa.Column('creditcardtype', sa.String(length=200), nullable=True),
         sa.Column('creditcardexp', sa.String(length=200), nullable=True),
         sa.Column('coupon', sa.String(length=200), nullable=True),
-        sa.Column('discount', sa.String(length=200), nullable=True),
+        sa.Column('discount', sa.Numeric(precision=14, scale=4), nullable=True),
         sa.Column('notes', sa.String(length=200), nullable=True),
         sa.Column('creationdate', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
         sa.Column('creationby', sa.String(length=128), nullable=True),
@@ -77,12 +83,10 @@ def upgrade() -> None:
         sa.Column('updateby', sa.String(length=128), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_billing_history_username', 'billing_history', ['username'])
-    op.create_index('idx_billing_history_planId', 'billing_history', ['planId'])
 
     # Create billing_merchant table
     op.create_table('billing_merchant',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('username', sa.String(length=128), nullable=False),
         sa.Column('password', sa.String(length=128), nullable=False),
         sa.Column('mac', sa.String(length=200), nullable=False),
@@ -96,11 +100,11 @@ def upgrade() -> None:
         sa.Column('txn_type', sa.String(length=200), nullable=False),
         sa.Column('txn_id', sa.String(length=200), nullable=False),
         sa.Column('payment_type', sa.String(length=200), nullable=False),
-        sa.Column('payment_tax', sa.String(length=200), nullable=False),
-        sa.Column('payment_cost', sa.String(length=200), nullable=False),
-        sa.Column('payment_fee', sa.String(length=200), nullable=False),
-        sa.Column('payment_total', sa.String(length=200), nullable=False),
-        sa.Column('payment_currency', sa.String(length=200), nullable=False),
+        sa.Column('payment_tax', sa.Numeric(precision=14, scale=4), nullable=False),
+        sa.Column('payment_cost', sa.Numeric(precision=14, scale=4), nullable=False),
+        sa.Column('payment_fee', sa.Numeric(precision=14, scale=4), nullable=False),
+        sa.Column('payment_total', sa.Numeric(precision=14, scale=4), nullable=False),
+        sa.Column('payment_currency', sa.CHAR(length=3), nullable=False),
         sa.Column('first_name', sa.String(length=200), nullable=False),
         sa.Column('last_name', sa.String(length=200), nullable=False),
         sa.Column('payer_email', sa.String(length=200), nullable=False),
@@ -121,12 +125,10 @@ def upgrade() -> None:
         sa.Column('payer_status', sa.String(length=200), nullable=False),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_billing_merchant_username', 'billing_merchant', ['username'])
-    op.create_index('idx_billing_merchant_txnId', 'billing_merchant', ['txnId'])
 
     # Create billing_rates table
     op.create_table('billing_rates',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('rateName', sa.String(length=128), nullable=False),
         sa.Column('rateType', sa.String(length=128), nullable=False),
         sa.Column('rateCost', sa.Integer(), nullable=False, default=0),
@@ -140,12 +142,30 @@ def upgrade() -> None:
 
     # Create billing_plans_profiles table
     op.create_table('billing_plans_profiles',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('plan_name', sa.String(length=128), nullable=False),
         sa.Column('profile_name', sa.String(length=256), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
 
+    # billing_history and billing_merchant grow to millions of rows; build
+    # their indexes without blocking writes when this revision is re-run
+    # History is read per user or per plan, newest first; the user index
+    # carries the amount and action for index-only scans
+    create_index_concurrently('idx_billing_history_user_date', 'billing_history',
+                              ['username', 'creationdate DESC'],
+                              include=['"billAmount"', '"billAction"'])
+    create_index_concurrently('idx_billing_history_plan_date', 'billing_history',
+                              ['"planId"', 'creationdate DESC'])
+    # Append-only and time-ordered, so a BRIN summary serves date ranges
+    create_index_concurrently('idx_billing_history_creationdate_brin', 'billing_history',
+                              ['creationdate'], using='brin',
+                              storage_parameters={'pages_per_range': 32})
+    create_index_concurrently('idx_billing_merchant_username', 'billing_merchant', ['username'])
+    create_index_concurrently('idx_billing_merchant_txnId', 'billing_merchant', ['"txnId"'])
+    create_index_concurrently('idx_billing_merchant_date_status', 'billing_merchant',
+                              ['payment_date', 'payment_status'])
+
 
 def downgrade() -> None:
     """Drop billing system tables"""
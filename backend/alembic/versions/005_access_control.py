@@ -9,6 +9,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from app.db.migration_helpers import bulk_insert_rows, create_index_concurrently
+
 # revision identifiers, used by Alembic.
 revision = '005_access_control'
 down_revision = '004_billing_system'
@@ -16,25 +18,66 @@ branch_labels = None
 depends_on = None
 
 
+# Default ACL files as (file, category, description, is_active)
+ACL_FILES = [
+    ('acct_custom_query', 'Accounting', 'Custom accounting queries', True),
+    ('acct_active', 'Accounting', 'Active sessions view', True),
+    ('acct_all', 'Accounting', 'All accounting records', True),
+    ('acct_ipaddress', 'Accounting', 'Search by IP address', True),
+    ('acct_username', 'Accounting', 'Search by username', True),
+    ('acct_date', 'Accounting', 'Search by date range', True),
+    ('acct_nasipaddress', 'Accounting', 'Search by NAS IP', True),
+    ('acct_hotspot_accounting', 'Accounting', 'Hotspot accounting', True),
+    ('acct_hotspot_compare', 'Accounting', 'Hotspot comparison', True),
+    ('acct_maintenance_cleanup', 'Maintenance', 'Cleanup accounting', True),
+    ('acct_maintenance_delete', 'Maintenance', 'Delete accounting', True),
+    ('acct_plans_usage', 'Plans', 'Plans usage reports', True),
+    ('bill_history_query', 'Billing', 'Billing history queries', True),
+    ('bill_merchant_transactions', 'Billing', 'Merchant transactions', True),
+    ('bill_plans_list', 'Billing', 'List billing plans', True),
+    ('bill_plans_del', 'Billing', 'Delete billing plans', True),
+    ('bill_plans_edit', 'Billing', 'Edit billing plans', True),
+    ('bill_plans_new', 'Billing', 'Create billing plans', True),
+    ('bill_rates_list', 'Billing', 'List billing rates', True),
+    ('bill_rates_new', 'Billing', 'Create billing rates', True),
+    ('bill_rates_edit', 'Billing', 'Edit billing rates', True),
+    ('bill_rates_del', 'Billing', 'Delete billing rates', True),
+    ('mng_users_list', 'Users', 'List users', True),
+    ('mng_users_new', 'Users', 'Create users', True),
+    ('mng_users_edit', 'Users', 'Edit users', True),
+    ('mng_users_del', 'Users', 'Delete users', True),
+    ('config_backup_managebackups', 'Config', 'Manage backups', True),
+    ('config_backup_createbackups', 'Config', 'Create backups', True),
+    ('config_user', 'Config', 'User configuration', True),
+]
+
+# Default portal messages as (type, content, created_by)
+MESSAGES = [
+    ('login', '<p>Dear User,<br>Welcome to the Users Portal. We are glad you joined us!</p><p>By logging in with your account username and password, you will be able to access a wide range of features. For example, you can easily edit your contact settings, update your personal information, and view some history data through visual graphs.</p><p>We take your privacy and security seriously, so please rest assured that all your data is stored securely in our database and is accessible only to you and our authorized staff.</p><p>If you need any assistance or have any questions, please do not hesitate to contact our support team. We are always happy to help!</p><p>Regards,<br/>The daloRADIUS Staff.</p>', 'administrator'),
+    ('support', '<p>Dear User,<br>We can provide support in different ways: you can email us at <strong>support@daloradius.local</strong> or you can open a new ticket through our help desk: <strong>https://helpdesk.daloradius.local</strong>.</p><p>Thank you for choosing daloRADIUS.</p><p>Best regards,<br>The daloRADIUS Support Team</p>', 'administrator'),
+    ('dashboard', '<p>Dear User,<br>We can provide support in different ways: you can email us at <strong>support@daloradius.local</strong> or you can open a new ticket through our help desk: <strong>https://helpdesk.daloradius.local</strong>.</p><p>Thank you for choosing daloRADIUS.</p><p>Best regards,<br>The daloRADIUS Support Team</p>', 'administrator'),
+]
+
+
 def upgrade() -> None:
     """Create access control tables"""
     
     # Create operators_acl table
     op.create_table('operators_acl',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('operator_id', sa.Integer(), nullable=False),
         sa.Column('file', sa.String(length=128), nullable=False),
         sa.Column('access', sa.SmallInteger(), nullable=False, default=0),
         sa.ForeignKeyConstraint(['operator_id'], ['operators.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('idx_operators_acl_operator_id', 'operators_acl', ['operator_id'])
+    # The unique (operator_id, file) index also serves operator_id lookups
     op.create_index('idx_operators_acl_file', 'operators_acl', ['file'])
-    op.create_index('idx_operators_acl_operator_file', 'operators_acl', ['operator_id', 'file'], unique=True)
+    op.create_index('uq_operators_acl_operator_file', 'operators_acl', ['operator_id', 'file'], unique=True)
 
     # Create operators_acl_files table
     op.create_table('operators_acl_files',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('file', sa.String(length=128), nullable=False),
         sa.Column('category', sa.String(length=64), nullable=True),
         sa.Column('description', sa.Text(), nullable=True),
@@ -42,12 +85,10 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('file')
     )
-    op.create_index('idx_operators_acl_files_category', 'operators_acl_files', ['category'])
-    op.create_index('idx_operators_acl_files_active', 'operators_acl_files', ['is_active'])
 
     # Create dictionary table
     op.create_table('dictionary',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
         sa.Column('Type', sa.String(length=30), nullable=True),
         sa.Column('Attribute', sa.String(length=64), nullable=True),
         sa.Column('Value', sa.String(length=64), nullable=True),
@@ -65,59 +106,29 @@ def upgrade() -> None:
 
     # Create messages table
     op.create_table('messages',
-        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
-        sa.Column('type', sa.Enum('login', 'support', 'dashboard', name='message_type'), nullable=False),
+        sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False),
+        # Plain VARCHAR + CHECK rather than a native ENUM, so new types can
+        # be allowed by swapping the constraint inside a transaction
+        sa.Column('type', sa.String(length=16), nullable=False),
         sa.Column('content', sa.Text(), nullable=False),
         sa.Column('created_on', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
         sa.Column('created_by', sa.String(length=32), nullable=True),
         sa.Column('modified_on', sa.DateTime(timezone=True), nullable=True),
         sa.Column('modified_by', sa.String(length=32), nullable=True),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.CheckConstraint("type IN ('login', 'support', 'dashboard')", name='ck_messages_type')
     )
-    op.create_index('idx_messages_type', 'messages', ['type'])
-    op.create_index('idx_messages_created_on', 'messages', ['created_on'])
-
-    # Insert default ACL files configuration
-    op.execute("""
-        INSERT INTO operators_acl_files (file, category, description, is_active) VALUES
-        ('acct_custom_query', 'Accounting', 'Custom accounting queries', true),
-        ('acct_active', 'Accounting', 'Active sessions view', true),
-        ('acct_all', 'Accounting', 'All accounting records', true),
-        ('acct_ipaddress', 'Accounting', 'Search by IP address', true),
-        ('acct_username', 'Accounting', 'Search by username', true),
-        ('acct_date', 'Accounting', 'Search by date range', true),
-        ('acct_nasipaddress', 'Accounting', 'Search by NAS IP', true),
-        ('acct_hotspot_accounting', 'Accounting', 'Hotspot accounting', true),
-        ('acct_hotspot_compare', 'Accounting', 'Hotspot comparison', true),
-        ('acct_maintenance_cleanup', 'Maintenance', 'Cleanup accounting', true),
-        ('acct_maintenance_delete', 'Maintenance', 'Delete accounting', true),
-        ('acct_plans_usage', 'Plans', 'Plans usage reports', true),
-        ('bill_history_query', 'Billing', 'Billing history queries', true),
-        ('bill_merchant_transactions', 'Billing', 'Merchant transactions', true),
-        ('bill_plans_list', 'Billing', 'List billing plans', true),
-        ('bill_plans_del', 'Billing', 'Delete billing plans', true),
-        ('bill_plans_edit', 'Billing', 'Edit billing plans', true),
-        ('bill_plans_new', 'Billing', 'Create billing plans', true),
-        ('bill_rates_list', 'Billing', 'List billing rates', true),
-        ('bill_rates_new', 'Billing', 'Create billing rates', true),
-        ('bill_rates_edit', 'Billing', 'Edit billing rates', true),
-        ('bill_rates_del', 'Billing', 'Delete billing rates', true),
-        ('mng_users_list', 'Users', 'List users', true),
-        ('mng_users_new', 'Users', 'Create users', true),
-        ('mng_users_edit', 'Users', 'Edit users', true),
-        ('mng_users_del', 'Users', 'Delete users', true),
-        ('config_backup_managebackups', 'Config', 'Manage backups', true),
-        ('config_backup_createbackups', 'Config', 'Create backups', true),
-        ('config_user', 'Config', 'User configuration', true)
-    """)
-
-    # Insert default messages
-    op.execute("""
-        INSERT INTO messages (type, content, created_by) VALUES
-        ('login', '<p>Dear User,<br>Welcome to the Users Portal. We are glad you joined us!</p><p>By logging in with your account username and password, you will be able to access a wide range of features. For example, you can easily edit your contact settings, update your personal information, and view some history data through visual graphs.</p><p>We take your privacy and security seriously, so please rest assured that all your data is stored securely in our database and is accessible only to you and our authorized staff.</p><p>If you need any assistance or have any questions, please do not hesitate to contact our support team. We are always happy to help!</p><p>Regards,<br/>The daloRADIUS Staff.</p>', 'administrator'),
-        ('support', '<p>Dear User,<br>We can provide support in different ways: you can email us at <strong>support@daloradius.local</strong> or you can open a new ticket through our help desk: <strong>https://helpdesk.daloradius.local</strong>.</p><p>Thank you for choosing daloRADIUS.</p><p>Best regards,<br>The daloRADIUS Support Team</p>', 'administrator'),
-        ('dashboard', '<p>Dear User,<br>We can provide support in different ways: you can email us at <strong>support@daloradius.local</strong> or you can open a new ticket through our help desk: <strong>https://helpdesk.daloradius.local</strong>.</p><p>Thank you for choosing daloRADIUS.</p><p>Best regards,<br>The daloRADIUS Support Team</p>', 'administrator')
-    """)
+
+    # Insert default ACL files configuration and messages
+    bulk_insert_rows('operators_acl_files', ['file', 'category', 'description', 'is_active'], ACL_FILES)
+    bulk_insert_rows('messages', ['type', 'content', 'created_by'], MESSAGES)
+
+    # Index the seeded tables only after the rows are in
+    create_index_concurrently('idx_operators_acl_files_category', 'operators_acl_files', ['category'])
+    create_index_concurrently('idx_operators_acl_files_active', 'operators_acl_files', ['is_active'])
+    create_index_concurrently('idx_messages_type', 'messages', ['type'])
+    create_index_concurrently('idx_messages_created_on_brin', 'messages', ['created_on'],
+                              using='brin', storage_parameters={'pages_per_range': 32})
 
 
 def downgrade() -> None:
@@ -0,0 +1,70 @@
+"""Create radacct and users indexes after data load
+
+Revision ID: 006_post_load_indexes
+Revises: 005_access_control
+Create Date: 2025-10-12 09:00:00.000000
+
+These indexes used to be created by 001_initial right after CREATE TABLE,
+which made every row of a bootstrap import pay B-tree maintenance. To load
+data first, run ``alembic upgrade 005_access_control``, import, then
+``alembic upgrade head``.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_deferred_indexes, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '006_post_load_indexes'
+down_revision = '005_access_control'
+branch_labels = None
+depends_on = None
+
+
+BRIN = {'using': 'brin', 'storage_parameters': {'pages_per_range': 32}}
+HOT_UPDATED = {'storage_parameters': {'fillfactor': 90}}
+
+DEFERRED_INDEXES = [
+    ('idx_users_username_active', 'users', ['username', 'is_active'], HOT_UPDATED),
+    ('idx_users_email_active', 'users', ['email', 'is_active'], HOT_UPDATED),
+    ('idx_users_status', 'users', ['status'], HOT_UPDATED),
+    # Child-side indexes for the users.id foreign keys, without them every
+    # DELETE/UPDATE on users sequentially scans the child tables
+    ('idx_radusergroup_user_id', 'radusergroup', ['user_id']),
+    ('idx_userbillinfo_user_id', 'dalouserbillinfo', ['user_id']),
+    ('idx_radacct_username', 'radacct', ['username']),
+    # radacct is insert-ordered by time, so BRIN summaries are tiny and
+    # cheap to maintain compared to B-trees on the same columns
+    ('idx_radacct_acctstarttime_brin', 'radacct', ['acctstarttime'], BRIN),
+    ('idx_radacct_acctstoptime_brin', 'radacct', ['acctstoptime'], BRIN),
+    ('idx_radacct_nasipaddress_brin', 'radacct', ['nasipaddress inet_minmax_ops'], BRIN),
+]
+
+# Only ever looked up by exact value; HASH indexes are smaller than B-trees
+# for these but are only crash-safe from PostgreSQL 10 on
+EQUALITY_INDEXES = [
+    ('idx_radacct_acctsessionid_hash', 'radacct', ['acctsessionid']),
+    ('idx_radacct_acctuniqueid_hash', 'radacct', ['acctuniqueid']),
+]
+
+
+def _equality_index_options() -> dict:
+    """Use HASH on PostgreSQL 10+ and fall back to B-tree before that"""
+    if op.get_bind().dialect.server_version_info >= (10,):
+        return {'using': 'hash'}
+    return {}
+
+
+def upgrade() -> None:
+    """Create the deferred radacct and users indexes"""
+    options = _equality_index_options()
+    create_deferred_indexes(
+        DEFERRED_INDEXES + [index + (options,) for index in EQUALITY_INDEXES]
+    )
+
+
+def downgrade() -> None:
+    """Drop the deferred radacct and users indexes"""
+    for name, *_ in reversed(DEFERRED_INDEXES + EQUALITY_INDEXES):
+        drop_index_concurrently(name)
@@ -0,0 +1,47 @@
+"""Widen undersized operators contact fields
+
+Revision ID: 007_widen_operator_fields
+Revises: 006_post_load_indexes
+Create Date: 2025-10-12 10:00:00.000000
+
+Databases that ran the original 002_fix_ipv6_operators have email1/email2
+as VARCHAR(32), which truncates valid addresses. Widening a varchar or
+moving it to text does not rewrite the table in PostgreSQL.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_widen_operator_fields'
+down_revision = '006_post_load_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Widen operators phone/email fields and move free text to TEXT"""
+    op.execute("""
+        ALTER TABLE operators
+            ALTER COLUMN phone1 TYPE VARCHAR(64),
+            ALTER COLUMN phone2 TYPE VARCHAR(64),
+            ALTER COLUMN email1 TYPE VARCHAR(254),
+            ALTER COLUMN email2 TYPE VARCHAR(254),
+            ALTER COLUMN messenger1 TYPE TEXT,
+            ALTER COLUMN messenger2 TYPE TEXT,
+            ALTER COLUMN notes TYPE TEXT
+    """)
+
+
+def downgrade() -> None:
+    """Restore the original operators field sizes (truncating longer values)"""
+    op.execute("""
+        ALTER TABLE operators
+            ALTER COLUMN phone1 TYPE VARCHAR(32) USING LEFT(phone1, 32),
+            ALTER COLUMN phone2 TYPE VARCHAR(32) USING LEFT(phone2, 32),
+            ALTER COLUMN email1 TYPE VARCHAR(32) USING LEFT(email1, 32),
+            ALTER COLUMN email2 TYPE VARCHAR(32) USING LEFT(email2, 32),
+            ALTER COLUMN messenger1 TYPE VARCHAR(32) USING LEFT(messenger1, 32),
+            ALTER COLUMN messenger2 TYPE VARCHAR(32) USING LEFT(messenger2, 32),
+            ALTER COLUMN notes TYPE VARCHAR(128) USING LEFT(notes, 128)
+    """)
@@ -0,0 +1,34 @@
+"""Store users.mac_address as macaddr
+
+Revision ID: 008_users_mac_macaddr
+Revises: 007_widen_operator_fields
+Create Date: 2025-10-12 11:00:00.000000
+
+macaddr is 6 bytes instead of a 17 character string and accepts the
+colon, dash and dot notations, normalising them to lower-case colons.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_users_mac_macaddr'
+down_revision = '007_widen_operator_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Convert users.mac_address to macaddr"""
+    op.execute(
+        "ALTER TABLE users ALTER COLUMN mac_address TYPE macaddr "
+        "USING NULLIF(mac_address::text, '')::macaddr"
+    )
+
+
+def downgrade() -> None:
+    """Convert users.mac_address back to VARCHAR(17)"""
+    op.execute(
+        "ALTER TABLE users ALTER COLUMN mac_address TYPE VARCHAR(17) "
+        "USING mac_address::text"
+    )
@@ -0,0 +1,55 @@
+"""Drop single-column indexes covered by the covering indexes
+
+Revision ID: 009_drop_redundant_indexes
+Revises: 008_users_mac_macaddr
+Create Date: 2025-10-12 13:00:00.000000
+
+idx_<table>_username / idx_<table>_groupname are leftmost prefixes of the
+covering indexes on radcheck, radreply, radgroupcheck and radgroupreply,
+so they only add write amplification on the auth path. Fresh installs no
+longer create them; this revision removes them from existing databases.
+
+Databases created before the covering indexes were added to 001 and 003
+do not have them yet, so they are built concurrently (IF NOT EXISTS)
+before the single-column indexes are dropped and lookups always keep an
+index.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '009_drop_redundant_indexes'
+down_revision = '008_users_mac_macaddr'
+branch_labels = None
+depends_on = None
+
+
+REDUNDANT_INDEXES = [
+    ('idx_radcheck_username', 'radcheck', ['username']),
+    ('idx_radreply_username', 'radreply', ['username']),
+    ('idx_radgroupcheck_groupname', 'radgroupcheck', ['groupname']),
+    ('idx_radgroupreply_groupname', 'radgroupreply', ['groupname']),
+]
+
+# The covering index replacing each redundant one, on the same key
+COVERING_INCLUDE = ['attribute', 'op', 'value']
+
+
+def upgrade() -> None:
+    """Make sure the covering indexes exist, then drop the redundant ones"""
+    for name, table, columns in REDUNDANT_INDEXES:
+        create_index_concurrently(f'{name}_covering', table, columns, include=COVERING_INCLUDE)
+    for name, _table, _columns in REDUNDANT_INDEXES:
+        drop_index_concurrently(name)
+
+
+def downgrade() -> None:
+    """Recreate the single-column indexes
+
+    The covering indexes are kept; the initial revisions create them.
+    """
+    for name, table, columns in REDUNDANT_INDEXES:
+        create_index_concurrently(name, table, columns)
@@ -0,0 +1,40 @@
+"""Add UNLOGGED radacct staging table
+
+Revision ID: 010_radacct_stage
+Revises: 009_drop_redundant_indexes
+Create Date: 2025-10-12 13:00:00.000000
+
+Accounting-Start bursts are written to ``radacct_stage`` instead of radacct
+so that they skip WAL and the radacct indexes, and are moved over in batches
+by ``AccountingRepository.flush_staged_sessions``. UNLOGGED tables are
+truncated after a crash, so anything not flushed yet is lost.
+
+The table is created with LIKE so it matches radacct column for column;
+a later revision adding a column to radacct must add it here as well.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_radacct_stage'
+down_revision = '009_drop_redundant_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create radacct_stage with only the lookup index used by updates"""
+    # INCLUDING DEFAULTS shares the radacct id sequence, so staged rows keep
+    # their radacctid when they are moved
+    op.execute(
+        'CREATE UNLOGGED TABLE IF NOT EXISTS radacct_stage '
+        '(LIKE radacct INCLUDING DEFAULTS)'
+    )
+    op.create_index('idx_radacct_stage_acctuniqueid', 'radacct_stage',
+                    ['acctuniqueid'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Drop radacct_stage, rows not flushed yet are discarded"""
+    op.execute('DROP TABLE IF EXISTS radacct_stage')
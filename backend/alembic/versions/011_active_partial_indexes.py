@@ -0,0 +1,52 @@
+"""Replace is_active indexes with partial indexes
+
+Revision ID: 011_active_partial_indexes
+Revises: 010_radacct_stage
+Create Date: 2025-10-12 14:00:00.000000
+
+Application queries on operators and users almost always filter on
+``is_active = TRUE``. Indexing only the active rows keeps the indexes
+small, and the users index carries email so the login lookup can be
+answered from the index alone.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '011_active_partial_indexes'
+down_revision = '010_radacct_stage'
+branch_labels = None
+depends_on = None
+
+
+PARTIAL_INDEXES = [
+    ('idx_operators_active_true', 'operators', ['username'], {'where': 'is_active'}),
+    ('idx_users_active_true', 'users', ['username'],
+     {'include': ['email'], 'where': 'is_active', 'storage_parameters': {'fillfactor': 90}}),
+]
+
+# Full indexes superseded by the partial ones above
+REPLACED_INDEXES = [
+    ('idx_operators_active', 'operators', ['is_active'], {}),
+    ('idx_users_username_active', 'users', ['username', 'is_active'],
+     {'storage_parameters': {'fillfactor': 90}}),
+]
+
+
+def upgrade() -> None:
+    """Create the partial indexes, then drop the full ones they replace"""
+    for name, table, columns, options in PARTIAL_INDEXES:
+        create_index_concurrently(name, table, columns, **options)
+    for name, *_ in REPLACED_INDEXES:
+        drop_index_concurrently(name)
+
+
+def downgrade() -> None:
+    """Restore the full is_active indexes"""
+    for name, table, columns, options in REPLACED_INDEXES:
+        create_index_concurrently(name, table, columns, **options)
+    for name, *_ in PARTIAL_INDEXES:
+        drop_index_concurrently(name)
@@ -0,0 +1,39 @@
+"""Drop idx_operators_acl_operator_id
+
+Revision ID: 012_operators_acl_indexes
+Revises: 011_active_partial_indexes
+Create Date: 2025-10-12 15:00:00.000000
+
+operator_id is the leftmost column of the unique (operator_id, file) index,
+which already serves every operator_id lookup. The unique index is renamed
+to uq_operators_acl_operator_file to match fresh installs.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '012_operators_acl_indexes'
+down_revision = '011_active_partial_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Drop the redundant operator_id index and rename the unique index"""
+    drop_index_concurrently('idx_operators_acl_operator_id')
+    op.execute(
+        'ALTER INDEX IF EXISTS idx_operators_acl_operator_file '
+        'RENAME TO uq_operators_acl_operator_file'
+    )
+
+
+def downgrade() -> None:
+    """Restore the original operators_acl index names"""
+    op.execute(
+        'ALTER INDEX IF EXISTS uq_operators_acl_operator_file '
+        'RENAME TO idx_operators_acl_operator_file'
+    )
+    create_index_concurrently('idx_operators_acl_operator_id', 'operators_acl', ['operator_id'])
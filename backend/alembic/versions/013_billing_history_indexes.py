@@ -0,0 +1,50 @@
+"""Replace billing_history single-column indexes with composites
+
+Revision ID: 013_billing_history_indexes
+Revises: 012_operators_acl_indexes
+Create Date: 2025-10-12 16:00:00.000000
+
+History listings filter on username or planId and order by creationdate,
+which the single-column indexes could only serve with an extra sort.
+Merchant reports filter on payment_date and payment_status.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '013_billing_history_indexes'
+down_revision = '012_operators_acl_indexes'
+branch_labels = None
+depends_on = None
+
+
+COMPOSITE_INDEXES = [
+    ('idx_billing_history_user_date', 'billing_history', ['username', 'creationdate DESC'],
+     {'include': ['"billAmount"', '"billAction"']}),
+    ('idx_billing_history_plan_date', 'billing_history', ['"planId"', 'creationdate DESC'], {}),
+    ('idx_billing_merchant_date_status', 'billing_merchant', ['payment_date', 'payment_status'], {}),
+]
+
+REPLACED_INDEXES = [
+    ('idx_billing_history_username', 'billing_history', ['username']),
+    ('idx_billing_history_planId', 'billing_history', ['"planId"']),
+]
+
+
+def upgrade() -> None:
+    """Create the composite indexes, then drop the ones they replace"""
+    for name, table, columns, options in COMPOSITE_INDEXES:
+        create_index_concurrently(name, table, columns, **options)
+    for name, _table, _columns in REPLACED_INDEXES:
+        drop_index_concurrently(name)
+
+
+def downgrade() -> None:
+    """Restore the single-column billing_history indexes"""
+    for name, table, columns in REPLACED_INDEXES:
+        create_index_concurrently(name, table, columns)
+    for name, *_ in COMPOSITE_INDEXES:
+        drop_index_concurrently(name)
@@ -0,0 +1,43 @@
+"""Add BRIN indexes on billing_history and messages timestamps
+
+Revision ID: 014_timestamp_brin_indexes
+Revises: 013_billing_history_indexes
+Create Date: 2025-10-12 17:00:00.000000
+
+billing_history.creationdate and messages.created_on only ever grow, so
+BRIN summaries serve date-range scans at a fraction of a B-tree's size.
+The messages B-tree on created_on is replaced.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '014_timestamp_brin_indexes'
+down_revision = '013_billing_history_indexes'
+branch_labels = None
+depends_on = None
+
+
+BRIN = {'using': 'brin', 'storage_parameters': {'pages_per_range': 32}}
+
+BRIN_INDEXES = [
+    ('idx_billing_history_creationdate_brin', 'billing_history', ['creationdate']),
+    ('idx_messages_created_on_brin', 'messages', ['created_on']),
+]
+
+
+def upgrade() -> None:
+    """Create the BRIN indexes and drop the messages B-tree"""
+    for name, table, columns in BRIN_INDEXES:
+        create_index_concurrently(name, table, columns, **BRIN)
+    drop_index_concurrently('idx_messages_created_on')
+
+
+def downgrade() -> None:
+    """Restore the messages B-tree and drop the BRIN indexes"""
+    create_index_concurrently('idx_messages_created_on', 'messages', ['created_on'])
+    for name, _table, _columns in BRIN_INDEXES:
+        drop_index_concurrently(name)
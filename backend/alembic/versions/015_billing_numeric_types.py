@@ -0,0 +1,62 @@
+"""Store billing amounts as NUMERIC and currency as CHAR(3)
+
+Revision ID: 015_billing_numeric_types
+Revises: 014_timestamp_brin_indexes
+Create Date: 2025-10-12 18:00:00.000000
+
+Amounts were VARCHAR, so every SUM in the billing reports cast text to
+numeric row by row. Empty strings become NULL during the conversion.
+Columns go through ::text first so databases created with the NUMERIC
+columns already in place pass through unchanged.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '015_billing_numeric_types'
+down_revision = '014_timestamp_brin_indexes'
+branch_labels = None
+depends_on = None
+
+
+# Money columns as {table: [(column, previous VARCHAR length)]}
+MONEY_COLUMNS = {
+    'billing_plans': [('planCost', 128), ('planSetupCost', 128), ('planTax', 128)],
+    'billing_history': [('billAmount', 200), ('cash', 200), ('discount', 200)],
+    'billing_merchant': [
+        ('payment_tax', 200), ('payment_cost', 200),
+        ('payment_fee', 200), ('payment_total', 200),
+    ],
+}
+
+
+def _alter_types(table: str, clauses: list) -> None:
+    """Run several ALTER COLUMN ... TYPE clauses with a single table rewrite"""
+    op.execute(f'ALTER TABLE {table} ' + ', '.join(clauses))
+
+
+def upgrade() -> None:
+    """Convert the amount columns to NUMERIC(14,4)"""
+    for table, columns in MONEY_COLUMNS.items():
+        clauses = [
+            f'ALTER COLUMN "{column}" TYPE NUMERIC(14,4) '
+            f'USING NULLIF(btrim("{column}"::text), \'\')::numeric(14,4)'
+            for column, _length in columns
+        ]
+        if table == 'billing_merchant':
+            clauses.append('ALTER COLUMN payment_currency TYPE CHAR(3) '
+                           'USING upper(left(btrim(payment_currency), 3))')
+        _alter_types(table, clauses)
+
+
+def downgrade() -> None:
+    """Convert the amount columns back to VARCHAR"""
+    for table, columns in MONEY_COLUMNS.items():
+        clauses = [
+            f'ALTER COLUMN "{column}" TYPE VARCHAR({length}) USING "{column}"::text'
+            for column, length in columns
+        ]
+        if table == 'billing_merchant':
+            clauses.append('ALTER COLUMN payment_currency TYPE VARCHAR(200)')
+        _alter_types(table, clauses)
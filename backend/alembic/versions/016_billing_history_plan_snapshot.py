@@ -0,0 +1,43 @@
+"""Snapshot plan name and cost on billing_history
+
+Revision ID: 016_billing_history_plan_snapshot
+Revises: 015_billing_numeric_types
+Create Date: 2025-10-12 19:00:00.000000
+
+billing_history is an append-only log, so the plan it was billed against
+is frozen on the row instead of being joined from billing_plans on every
+listing. Existing rows are backfilled from the current plans.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '016_billing_history_plan_snapshot'
+down_revision = '015_billing_numeric_types'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add and backfill the plan snapshot columns"""
+    op.execute(
+        'ALTER TABLE billing_history '
+        'ADD COLUMN IF NOT EXISTS "planName_snapshot" VARCHAR(128), '
+        'ADD COLUMN IF NOT EXISTS "planCost_snapshot" NUMERIC(14,4)'
+    )
+    op.execute(
+        'UPDATE billing_history h '
+        'SET "planName_snapshot" = p."planName", "planCost_snapshot" = p."planCost" '
+        'FROM billing_plans p '
+        'WHERE p.id = h."planId" AND h."planName_snapshot" IS NULL'
+    )
+
+
+def downgrade() -> None:
+    """Drop the plan snapshot columns"""
+    op.execute(
+        'ALTER TABLE billing_history '
+        'DROP COLUMN IF EXISTS "planCost_snapshot", '
+        'DROP COLUMN IF EXISTS "planName_snapshot"'
+    )
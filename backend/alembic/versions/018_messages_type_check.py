@@ -0,0 +1,44 @@
+"""Store messages.type as VARCHAR with a CHECK constraint
+
+Revision ID: 018_messages_type_check
+Revises: 017_traffic_rollup
+Create Date: 2025-10-12 21:00:00.000000
+
+A native ENUM needs ALTER TYPE to gain a value and cannot lose one at all.
+A CHECK constraint can be swapped inside a transaction, so adding a
+message type later is a single migration:
+
+    ALTER TABLE messages DROP CONSTRAINT ck_messages_type,
+        ADD CONSTRAINT ck_messages_type CHECK (type IN (..., 'new_type'));
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '018_messages_type_check'
+down_revision = '017_traffic_rollup'
+branch_labels = None
+depends_on = None
+
+
+MESSAGE_TYPES = ('login', 'support', 'dashboard')
+
+
+def upgrade() -> None:
+    """Convert messages.type to VARCHAR(16) and drop the message_type ENUM"""
+    allowed = ', '.join(f"'{value}'" for value in MESSAGE_TYPES)
+    op.execute(
+        "ALTER TABLE messages ALTER COLUMN type TYPE VARCHAR(16) USING type::text, "
+        f"ADD CONSTRAINT ck_messages_type CHECK (type IN ({allowed}))"
+    )
+    op.execute("DROP TYPE IF EXISTS message_type")
+
+
+def downgrade() -> None:
+    """Restore the message_type ENUM"""
+    sa.Enum(*MESSAGE_TYPES, name='message_type').create(op.get_bind(), checkfirst=True)
+    op.execute(
+        "ALTER TABLE messages DROP CONSTRAINT IF EXISTS ck_messages_type, "
+        "ALTER COLUMN type TYPE message_type USING type::message_type"
+    )
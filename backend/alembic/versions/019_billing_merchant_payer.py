@@ -0,0 +1,73 @@
+"""Move billing_merchant payer details into billing_merchant_payer
+
+Revision ID: 019_billing_merchant_payer
+Revises: 018_messages_type_check
+Create Date: 2025-10-12 22:00:00.000000
+
+Reporting reads the transaction, amount and status columns of
+billing_merchant, but every row also carried a dozen VARCHAR(200) payer
+and address fields. Those move to a 1:1 side table keyed by the merchant
+id, so scans of billing_merchant only read the narrow transaction rows.
+The table is rewritten at the end because dropped columns keep their
+space in existing tuples.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '019_billing_merchant_payer'
+down_revision = '018_messages_type_check'
+branch_labels = None
+depends_on = None
+
+
+# Columns moved to billing_merchant_payer, all VARCHAR(200) NOT NULL
+PAYER_COLUMNS = [
+    'first_name', 'last_name', 'payer_email', 'payer_status',
+    'payer_address_name', 'payer_address_street', 'payer_address_country',
+    'payer_address_country_code', 'payer_address_city', 'payer_address_state',
+    'payer_address_zip', 'payment_address_status',
+]
+
+
+def upgrade() -> None:
+    """Create billing_merchant_payer, copy the payer columns and drop them"""
+    column_defs = ', '.join(f'{column} VARCHAR(200) NOT NULL' for column in PAYER_COLUMNS)
+    column_list = ', '.join(PAYER_COLUMNS)
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS billing_merchant_payer ('
+        'merchant_id INTEGER PRIMARY KEY REFERENCES billing_merchant (id) ON DELETE CASCADE, '
+        f'{column_defs})'
+    )
+    op.execute(
+        f'INSERT INTO billing_merchant_payer (merchant_id, {column_list}) '
+        f'SELECT id, {column_list} FROM billing_merchant '
+        'ON CONFLICT (merchant_id) DO NOTHING'
+    )
+    op.execute(
+        'ALTER TABLE billing_merchant '
+        + ', '.join(f'DROP COLUMN {column}' for column in PAYER_COLUMNS)
+    )
+    # Reclaim the dropped columns' space from the existing rows
+    with op.get_context().autocommit_block():
+        op.execute('VACUUM FULL ANALYZE billing_merchant')
+
+
+def downgrade() -> None:
+    """Fold the payer columns back into billing_merchant"""
+    op.execute(
+        'ALTER TABLE billing_merchant '
+        + ', '.join(f"ADD COLUMN {column} VARCHAR(200) NOT NULL DEFAULT ''"
+                    for column in PAYER_COLUMNS)
+    )
+    op.execute(
+        'UPDATE billing_merchant m SET '
+        + ', '.join(f'{column} = p.{column}' for column in PAYER_COLUMNS)
+        + ' FROM billing_merchant_payer p WHERE p.merchant_id = m.id'
+    )
+    op.execute(
+        'ALTER TABLE billing_merchant '
+        + ', '.join(f'ALTER COLUMN {column} DROP DEFAULT' for column in PAYER_COLUMNS)
+    )
+    op.drop_table('billing_merchant_payer')
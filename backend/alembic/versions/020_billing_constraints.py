@@ -0,0 +1,109 @@
+"""Add planId foreign keys and tighten billing column types
+
+Revision ID: 020_billing_constraints
+Revises: 019_billing_merchant_payer
+Create Date: 2025-10-12 23:00:00.000000
+
+billing_history and billing_merchant reference billing_plans by "planId"
+without a constraint. The foreign keys are added NOT VALID, which only
+takes a brief lock, and validated afterwards in their own transaction so
+the scan of existing rows does not block writes. billing_merchant.mac
+becomes macaddr and the payer country code CHAR(2).
+
+The legacy schema never enforced these references, so rows may point at
+deleted plans. Orphaned billing_history rows get a NULL "planId". The
+column is NOT NULL on billing_merchant, so orphaned merchant rows are left
+as they are and reported. That constraint then stays NOT VALID: it still
+checks every new or updated row, and can be validated once the rows are
+fixed.
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '020_billing_constraints'
+down_revision = '019_billing_merchant_payer'
+branch_labels = None
+depends_on = None
+
+
+logger = logging.getLogger('alembic')
+
+# (constraint name, referencing table)
+PLAN_FOREIGN_KEYS = [
+    ('fk_billing_history_plan', 'billing_history'),
+    ('fk_billing_merchant_plan', 'billing_merchant'),
+]
+
+ORPHANED = (
+    '"planId" IS NOT NULL AND NOT EXISTS '
+    '(SELECT 1 FROM billing_plans p WHERE p.id = {table}."planId")'
+)
+
+
+def upgrade() -> None:
+    """Tighten the column types, then add and validate the foreign keys"""
+    # Empty MACs were stored as '' and become NULL
+    op.execute(
+        'ALTER TABLE billing_merchant ALTER COLUMN mac DROP NOT NULL, '
+        "ALTER COLUMN mac TYPE macaddr USING NULLIF(btrim(mac::text), '')::macaddr"
+    )
+    op.execute(
+        'ALTER TABLE billing_merchant_payer ALTER COLUMN payer_address_country_code TYPE CHAR(2) '
+        'USING upper(left(btrim(payer_address_country_code), 2))'
+    )
+
+    # Deleting a plan checks both tables; billing_history is covered by
+    # idx_billing_history_plan_date
+    create_index_concurrently('idx_billing_merchant_planId', 'billing_merchant', ['"planId"'])
+
+    for name, table in PLAN_FOREIGN_KEYS:
+        op.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ("planId") '
+            'REFERENCES billing_plans (id) ON DELETE RESTRICT NOT VALID'
+        )
+
+    # The NOT VALID keys already stop new orphans, so the cleanup cannot race
+    conn = op.get_bind()
+    cleared = conn.execute(sa.text(
+        'UPDATE billing_history SET "planId" = NULL WHERE '
+        + ORPHANED.format(table='billing_history')
+    )).rowcount
+    if cleared:
+        logger.warning(f'Cleared "planId" on {cleared} billing_history rows with no billing plan')
+    orphaned_merchants = conn.execute(sa.text(
+        'SELECT count(*) FROM billing_merchant WHERE ' + ORPHANED.format(table='billing_merchant')
+    )).scalar()
+
+    with op.get_context().autocommit_block():
+        for name, table in PLAN_FOREIGN_KEYS:
+            if table == 'billing_merchant' and orphaned_merchants:
+                logger.warning(
+                    f'{orphaned_merchants} billing_merchant rows reference missing billing '
+                    f'plans; {name} is left NOT VALID. Fix their "planId", then run '
+                    f'ALTER TABLE {table} VALIDATE CONSTRAINT {name}'
+                )
+                continue
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {name}')
+
+
+def downgrade() -> None:
+    """Drop the foreign keys and restore the VARCHAR columns"""
+    for name, table in reversed(PLAN_FOREIGN_KEYS):
+        op.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}')
+    drop_index_concurrently('idx_billing_merchant_planId')
+
+    op.execute(
+        'ALTER TABLE billing_merchant_payer '
+        'ALTER COLUMN payer_address_country_code TYPE VARCHAR(200)'
+    )
+    op.execute(
+        'ALTER TABLE billing_merchant '
+        "ALTER COLUMN mac TYPE VARCHAR(200) USING COALESCE(mac::text, ''), "
+        'ALTER COLUMN mac SET NOT NULL'
+    )
@@ -0,0 +1,140 @@
+"""Range-partition billing_history by month
+
+Revision ID: 021_partition_billing_history
+Revises: 020_billing_constraints
+Create Date: 2025-10-13 09:00:00.000000
+
+billing_history only grows and is read by date range, so it is rebuilt as
+a table partitioned on creationdate, like radacct on fresh installs, and
+range scans prune to the months they touch. The primary key becomes
+(id, creationdate) because it has to include the partition key. Partitions are created from
+the oldest existing row up to two months ahead, so no history lands in
+billing_history_default; later months are added by ``python -m
+app.maintenance create-billing-partitions``, which has to run at least
+monthly.
+
+The id keeps drawing from billing_history_id_seq. On databases where
+billing_history.id is still the SERIAL column from before 004 used an
+identity, that sequence already exists and is handed over to the new table.
+
+The table is locked against writes while its rows are copied.
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, create_monthly_partitions
+
+# revision identifiers, used by Alembic.
+revision = '021_partition_billing_history'
+down_revision = '020_billing_constraints'
+branch_labels = None
+depends_on = None
+
+
+# Indexes rebuilt on the new table as (name, columns, options)
+HISTORY_INDEXES = [
+    ('idx_billing_history_user_date', ['username', 'creationdate DESC'],
+     {'include': ['"billAmount"', '"billAction"']}),
+    ('idx_billing_history_plan_date', ['"planId"', 'creationdate DESC'], {}),
+    ('idx_billing_history_creationdate_brin', ['creationdate'],
+     {'using': 'brin', 'storage_parameters': {'pages_per_range': 32}}),
+]
+
+PLAN_FOREIGN_KEY = (
+    'ALTER TABLE billing_history ADD CONSTRAINT fk_billing_history_plan '
+    'FOREIGN KEY ("planId") REFERENCES billing_plans (id) ON DELETE RESTRICT'
+)
+
+
+def _is_partitioned(conn) -> bool:
+    """Check whether billing_history is already partitioned"""
+    return bool(conn.execute(sa.text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('billing_history')"
+    )).scalar())
+
+
+def _swap_out_old_table(old_name: str) -> None:
+    """Rename billing_history out of the way with its key and foreign key"""
+    op.execute('LOCK TABLE billing_history IN EXCLUSIVE MODE')
+    op.execute(f'ALTER TABLE billing_history RENAME TO {old_name}')
+    op.execute(f'ALTER INDEX billing_history_pkey RENAME TO {old_name}_pkey')
+    op.execute(f'ALTER TABLE {old_name} DROP CONSTRAINT IF EXISTS fk_billing_history_plan')
+
+
+def _finish_new_table(old_name: str) -> None:
+    """Copy the rows over, drop the old table and rebuild the dependents"""
+    op.execute(f'INSERT INTO billing_history SELECT * FROM {old_name}')
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('billing_history', 'id'), "
+        f"COALESCE((SELECT max(id) FROM {old_name}), 0) + 1, false)"
+    )
+    op.execute(f'DROP TABLE {old_name}')
+    op.execute(PLAN_FOREIGN_KEY)
+    for name, columns, options in HISTORY_INDEXES:
+        create_index_concurrently(name, 'billing_history', columns, **options)
+    op.execute('ANALYZE billing_history')
+
+
+def upgrade() -> None:
+    """Rebuild billing_history as a monthly range-partitioned table"""
+    conn = op.get_bind()
+    if _is_partitioned(conn):
+        return
+
+    old_name = 'billing_history_unpartitioned'
+    _swap_out_old_table(old_name)
+
+    # Identity columns cannot be declared on partitioned tables before
+    # PostgreSQL 17, so the new id draws from a plain owned sequence. A
+    # SERIAL id already has one; dropping an identity removes its own.
+    op.execute(f'ALTER TABLE {old_name} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+    op.execute(
+        f'CREATE TABLE billing_history (LIKE {old_name} INCLUDING DEFAULTS '
+        'INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS, '
+        'PRIMARY KEY (id, creationdate)) PARTITION BY RANGE (creationdate)'
+    )
+    op.execute('CREATE SEQUENCE IF NOT EXISTS billing_history_id_seq AS integer')
+    # Re-own the sequence so dropping the old table does not take it along
+    op.execute('ALTER SEQUENCE billing_history_id_seq OWNED BY billing_history.id')
+    op.execute("ALTER TABLE billing_history ALTER COLUMN id SET DEFAULT nextval('billing_history_id_seq')")
+
+    oldest = conn.execute(sa.text(f'SELECT min(creationdate) FROM {old_name}')).scalar()
+    today = date.today()
+    months_back = 2
+    if oldest is not None:
+        months_back = max(months_back, (today.year - oldest.year) * 12 + today.month - oldest.month)
+    create_monthly_partitions('billing_history', months_back=months_back, today=today)
+
+    _finish_new_table(old_name)
+
+
+def downgrade() -> None:
+    """Rebuild billing_history as a plain table"""
+    conn = op.get_bind()
+    if not _is_partitioned(conn):
+        return
+
+    old_name = 'billing_history_partitioned'
+    _swap_out_old_table(old_name)
+
+    op.execute(
+        f'CREATE TABLE billing_history (LIKE {old_name} INCLUDING CONSTRAINTS '
+        'INCLUDING STORAGE INCLUDING COMMENTS, PRIMARY KEY (id))'
+    )
+    # Restore the defaults except the sequence-backed id, which goes back to
+    # being an identity column
+    defaults = conn.execute(sa.text(
+        "SELECT a.attname, pg_get_expr(d.adbin, d.adrelid) FROM pg_attrdef d "
+        "JOIN pg_attribute a ON a.attrelid = d.adrelid AND a.attnum = d.adnum "
+        "WHERE d.adrelid = to_regclass(:table) AND a.attname <> 'id'"
+    ), {'table': old_name}).all()
+    for column, expression in defaults:
+        op.execute(f'ALTER TABLE billing_history ALTER COLUMN "{column}" SET DEFAULT {expression}')
+    op.execute(f'ALTER TABLE {old_name} ALTER COLUMN id DROP DEFAULT')
+    op.execute('DROP SEQUENCE IF EXISTS billing_history_id_seq')
+    op.execute('ALTER TABLE billing_history ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+
+    _finish_new_table(old_name)
@@ -0,0 +1,34 @@
+"""Replace the planActive index with a partial index on active plans
+
+Revision ID: 022_billing_plans_active_index
+Revises: 021_partition_billing_history
+Create Date: 2025-10-13 10:00:00.000000
+
+Plan lists filter on "planActive" = 'yes' and sort by name. Indexing the
+names of active plans only serves that query directly and leaves out the
+retired plans the full "planActive" index carried.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '022_billing_plans_active_index'
+down_revision = '021_partition_billing_history'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the partial index, then drop the full planActive index"""
+    create_index_concurrently('idx_billing_plans_active_only', 'billing_plans', ['"planName"'],
+                              where='"planActive" = \'yes\'')
+    drop_index_concurrently('idx_billing_plans_planActive')
+
+
+def downgrade() -> None:
+    """Restore the full planActive index"""
+    create_index_concurrently('idx_billing_plans_planActive', 'billing_plans', ['"planActive"'])
+    drop_index_concurrently('idx_billing_plans_active_only')
@@ -0,0 +1,42 @@
+"""Drop billing_merchant."txnId" in favour of txn_id
+
+Revision ID: 023_billing_merchant_txn_id
+Revises: 022_billing_plans_active_index
+Create Date: 2025-10-13 11:00:00.000000
+
+billing_merchant stored the gateway transaction id twice, as "txnId" and
+txn_id. txn_id is kept, matching the other snake_case columns; rows where
+it was left empty take the "txnId" value before the column is dropped.
+The lookup index moves with it.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '023_billing_merchant_txn_id'
+down_revision = '022_billing_plans_active_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Fold "txnId" into txn_id and drop it"""
+    op.execute(
+        'UPDATE billing_merchant SET txn_id = "txnId" '
+        "WHERE btrim(txn_id) = '' AND btrim(\"txnId\") <> ''"
+    )
+    drop_index_concurrently('idx_billing_merchant_txnId')
+    op.execute('ALTER TABLE billing_merchant DROP COLUMN "txnId"')
+    create_index_concurrently('idx_billing_merchant_txn_id', 'billing_merchant', ['txn_id'])
+
+
+def downgrade() -> None:
+    """Restore "txnId" as a copy of txn_id"""
+    op.execute('ALTER TABLE billing_merchant ADD COLUMN "txnId" VARCHAR(200) NOT NULL DEFAULT \'\'')
+    op.execute('UPDATE billing_merchant SET "txnId" = txn_id')
+    op.execute('ALTER TABLE billing_merchant ALTER COLUMN "txnId" DROP DEFAULT')
+    drop_index_concurrently('idx_billing_merchant_txn_id')
+    create_index_concurrently('idx_billing_merchant_txnId', 'billing_merchant', ['"txnId"'])
@@ -0,0 +1,33 @@
+"""Index radacct on (acctstarttime, radacctid) for keyset pagination
+
+Revision ID: 024_radacct_keyset_index
+Revises: 023_billing_merchant_txn_id
+Create Date: 2025-10-13 12:00:00.000000
+
+The sessions listing pages by cursor on (acctstarttime, radacctid). A
+B-tree on that pair serves both the row comparison and the ORDER BY, so
+each page is an index range read of page_size + 1 rows; the BRIN index on
+acctstarttime can only narrow the scan to block ranges and still needs a
+sort.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '024_radacct_keyset_index'
+down_revision = '023_billing_merchant_txn_id'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the (acctstarttime, radacctid) index"""
+    create_index_concurrently('idx_radacct_starttime_id', 'radacct', ['acctstarttime', 'radacctid'])
+
+
+def downgrade() -> None:
+    """Drop the (acctstarttime, radacctid) index"""
+    drop_index_concurrently('idx_radacct_starttime_id')
@@ -0,0 +1,43 @@
+"""Index the billing list filters together with their id sort key
+
+Revision ID: 025_billing_list_indexes
+Revises: 024_radacct_keyset_index
+Create Date: 2025-10-14 09:00:00.000000
+
+The billing list endpoints filter on an equality column and page by
+(sort column, id), id by default. A B-tree on (filter column, id) serves
+the WHERE, the ORDER BY and the keyset seek from one index range scan:
+billing history by plan, merchant transactions by business id and plans
+by type and active flag.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '025_billing_list_indexes'
+down_revision = '024_radacct_keyset_index'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns)
+LIST_INDEXES = [
+    ('idx_billing_history_plan_id', 'billing_history', ['"planId"', 'id']),
+    ('idx_billing_merchant_business_id', 'billing_merchant', ['business_id', 'id']),
+    ('idx_billing_plans_type_active', 'billing_plans', ['"planType"', '"planActive"', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Create the filter + id indexes"""
+    for name, table, columns in LIST_INDEXES:
+        create_index_concurrently(name, table, columns)
+
+
+def downgrade() -> None:
+    """Drop the filter + id indexes"""
+    for name, _, _ in reversed(LIST_INDEXES):
+        drop_index_concurrently(name)
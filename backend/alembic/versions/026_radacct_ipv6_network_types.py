@@ -0,0 +1,111 @@
+"""Store the radacct IPv6 address and prefix columns as INET/CIDR
+
+Revision ID: 026_radacct_ipv6_network_types
+Revises: 025_billing_list_indexes
+Create Date: 2025-10-15 09:00:00.000000
+
+002_fix_ipv6_operators added framedipv6address, framedipv6prefix and
+delegatedipv6prefix as VARCHAR(45) with B-tree indexes. They are converted
+in place to INET and CIDR with a USING cast, empty strings becoming NULL,
+and the B-tree indexes are replaced with GiST inet_ops indexes so prefix
+containment lookups (<<=, >>=) can use them. Columns that are already
+INET/CIDR and indexes that already exist, as on databases created from
+the squashed initial schema, are left alone.
+
+radacct_stage, built by 010 with LIKE radacct, gets the same conversion so
+the flush job's INSERT INTO radacct SELECT * keeps matching column types.
+It carries no indexes on these columns.
+
+The type change rewrites radacct under an ACCESS EXCLUSIVE lock.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '026_radacct_ipv6_network_types'
+down_revision = '025_billing_list_indexes'
+branch_labels = None
+depends_on = None
+
+
+# (column, network type, B-tree index from 002, GiST index replacing it)
+IPV6_COLUMNS = [
+    ('framedipv6address', 'inet', 'idx_radacct_framedipv6address', 'idx_radacct_framedipv6address_gist'),
+    ('framedipv6prefix', 'cidr', 'idx_radacct_framedipv6prefix', 'idx_radacct_framedipv6prefix_gist'),
+    ('delegatedipv6prefix', 'cidr', 'idx_radacct_delegatedipv6prefix', 'idx_radacct_delegatedipv6prefix_gist'),
+]
+
+
+# Tables whose IPv6 columns are converted; only radacct has indexes on them
+IPV6_TABLES = ['radacct', 'radacct_stage']
+
+
+def _column_types(conn, table: str) -> dict:
+    """Read the current SQL type name of each IPv6 column of ``table``"""
+    rows = conn.execute(sa.text(
+        "SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = to_regclass(:table) AND attnum > 0 AND NOT attisdropped "
+        "AND attname = ANY (:columns)"
+    ), {'table': table, 'columns': [column for column, _, _, _ in IPV6_COLUMNS]})
+    return dict(rows.fetchall())
+
+
+def _index_names(conn) -> set:
+    """Read the names of the indexes on radacct"""
+    rows = conn.execute(sa.text(
+        "SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = to_regclass('radacct')"
+    ))
+    return {row[0] for row in rows}
+
+
+def upgrade() -> None:
+    """Convert the VARCHAR columns to INET/CIDR and index them with GiST"""
+    conn = op.get_bind()
+    column_types = _column_types(conn, 'radacct')
+    index_names = _index_names(conn)
+
+    for column, type_name, btree_index, _ in IPV6_COLUMNS:
+        drop_index_concurrently(btree_index)
+
+    for table in IPV6_TABLES:
+        table_types = _column_types(conn, table)
+        conversions = [
+            f"ALTER COLUMN {column} TYPE {type_name} USING NULLIF({column}, '')::{type_name}"
+            for column, type_name, _, _ in IPV6_COLUMNS
+            if column in table_types and table_types[column] != type_name
+        ]
+        if conversions:
+            op.execute(f"ALTER TABLE {table} {', '.join(conversions)}")
+
+    for column, _, _, gist_index in IPV6_COLUMNS:
+        if column in column_types and gist_index not in index_names:
+            create_index_concurrently(gist_index, 'radacct', [f'{column} inet_ops'], using='gist')
+
+
+def downgrade() -> None:
+    """Convert the columns back to VARCHAR(45) with B-tree indexes"""
+    conn = op.get_bind()
+    column_types = _column_types(conn, 'radacct')
+    index_names = _index_names(conn)
+
+    for _, _, _, gist_index in reversed(IPV6_COLUMNS):
+        drop_index_concurrently(gist_index)
+
+    for table in IPV6_TABLES:
+        table_types = _column_types(conn, table)
+        # host() drops the /128 that inet::text appends to plain addresses
+        conversions = [
+            f"ALTER COLUMN {column} TYPE VARCHAR(45) USING "
+            + (f"host({column})" if type_name == 'inet' else f"{column}::text")
+            for column, type_name, _, _ in IPV6_COLUMNS
+            if column in table_types
+        ]
+        if conversions:
+            op.execute(f"ALTER TABLE {table} {', '.join(conversions)}")
+
+    for column, _, btree_index, _ in IPV6_COLUMNS:
+        if column in column_types and btree_index not in index_names:
+            create_index_concurrently(btree_index, 'radacct', [column])
@@ -0,0 +1,59 @@
+"""Track batch operations on batch_history
+
+Revision ID: 027_batch_history_operations
+Revises: 026_radacct_ipv6_network_types
+Create Date: 2025-10-15 12:00:00.000000
+
+The batch API records what each batch did: its operation type and
+details, item counts, status, run times and error. The legacy table only
+had the batch name, description and hotspot. Rows created before this
+revision are backfilled as completed 'legacy' batches. New rows get the
+application defaults afterwards: 'pending' status and no default type.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '027_batch_history_operations'
+down_revision = '026_radacct_ipv6_network_types'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the operation tracking columns"""
+    op.execute(
+        'ALTER TABLE batch_history '
+        "ADD COLUMN IF NOT EXISTS operation_type VARCHAR(50) NOT NULL DEFAULT 'legacy', "
+        'ADD COLUMN IF NOT EXISTS operation_details JSONB, '
+        'ADD COLUMN IF NOT EXISTS total_count INTEGER NOT NULL DEFAULT 0, '
+        'ADD COLUMN IF NOT EXISTS success_count INTEGER NOT NULL DEFAULT 0, '
+        'ADD COLUMN IF NOT EXISTS failure_count INTEGER NOT NULL DEFAULT 0, '
+        "ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'completed', "
+        'ADD COLUMN IF NOT EXISTS started_at TIMESTAMP WITHOUT TIME ZONE, '
+        'ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP WITHOUT TIME ZONE, '
+        'ADD COLUMN IF NOT EXISTS error_message TEXT'
+    )
+    # The defaults above only backfill existing rows
+    op.execute(
+        'ALTER TABLE batch_history '
+        'ALTER COLUMN operation_type DROP DEFAULT, '
+        "ALTER COLUMN status SET DEFAULT 'pending'"
+    )
+
+
+def downgrade() -> None:
+    """Drop the operation tracking columns"""
+    op.execute(
+        'ALTER TABLE batch_history '
+        'DROP COLUMN IF EXISTS error_message, '
+        'DROP COLUMN IF EXISTS completed_at, '
+        'DROP COLUMN IF EXISTS started_at, '
+        'DROP COLUMN IF EXISTS status, '
+        'DROP COLUMN IF EXISTS failure_count, '
+        'DROP COLUMN IF EXISTS success_count, '
+        'DROP COLUMN IF EXISTS total_count, '
+        'DROP COLUMN IF EXISTS operation_details, '
+        'DROP COLUMN IF EXISTS operation_type'
+    )
@@ -0,0 +1,47 @@
+"""Drop the radacct B-tree indexes replaced in 006
+
+Revision ID: 028_drop_replaced_radacct_indexes
+Revises: 027_batch_history_operations
+Create Date: 2025-10-16 09:00:00.000000
+
+001_initial used to create plain B-tree indexes on radacct that
+006_post_load_indexes replaced with BRIN and HASH indexes. Databases
+created before that change still carry the B-trees next to their
+replacements, so every accounting write maintains both. They are dropped
+without blocking writes; on other databases they do not exist and nothing
+happens.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migration_helpers import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision = '028_drop_replaced_radacct_indexes'
+down_revision = '027_batch_history_operations'
+branch_labels = None
+depends_on = None
+
+
+# (name, columns) of the 001 B-trees: the time columns are replaced by the
+# BRIN indexes, the NAS address by its BRIN and (nasipaddress, acctstarttime)
+# and the session id by the HASH index
+REPLACED_INDEXES = [
+    ('idx_radacct_acctstarttime', ['acctstarttime']),
+    ('idx_radacct_acctstoptime', ['acctstoptime']),
+    ('idx_radacct_nasipaddress', ['nasipaddress']),
+    ('idx_radacct_acctsessionid', ['acctsessionid']),
+]
+
+
+def upgrade() -> None:
+    """Drop the replaced B-tree indexes"""
+    for name, _ in REPLACED_INDEXES:
+        drop_index_concurrently(name)
+
+
+def downgrade() -> None:
+    """Recreate the B-tree indexes"""
+    for name, columns in reversed(REPLACED_INDEXES):
+        create_index_concurrently(name, 'radacct', columns)
@@ -0,0 +1,79 @@
+"""Convert SERIAL id columns to identity columns
+
+Revision ID: 029_identity_id_columns
+Revises: 028_drop_replaced_radacct_indexes
+Create Date: 2025-10-16 12:00:00.000000
+
+001_initial, 003, 004 and 005 create their id columns as GENERATED BY
+DEFAULT AS IDENTITY. Databases created before that still have SERIAL ids:
+an integer column with a nextval() default on an owned sequence. Each one
+is converted in place. The default and sequence are dropped and an
+identity is added that starts after both the old sequence and the highest
+id, so no value is handed out twice. Columns that are already identity
+columns, and tables that do not exist, are skipped.
+
+radacct.radacctid and billing_history.id stay sequence-backed: both tables
+can be range-partitioned, and PostgreSQL only supports identity columns on
+partitioned tables from version 17.
+
+Only the catalog changes, but each ALTER TABLE briefly takes an ACCESS
+EXCLUSIVE lock.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '029_identity_id_columns'
+down_revision = '028_drop_replaced_radacct_indexes'
+branch_labels = None
+depends_on = None
+
+
+IDENTITY_TABLES = [
+    # 001_initial
+    'operators', 'users', 'userinfo', 'radcheck', 'radreply', 'nas',
+    'radgroups', 'radusergroup', 'dalouserbillinfo', 'batch_history',
+    # 003_radius_groups
+    'radgroupcheck', 'radgroupreply', 'radpostauth', 'radippool',
+    # 004_billing_system
+    'billing_plans', 'billing_merchant', 'billing_rates', 'billing_plans_profiles',
+    # 005_access_control
+    'operators_acl', 'operators_acl_files', 'dictionary', 'messages',
+]
+
+
+def _serial_sequence(conn, table: str):
+    """Return the sequence behind a SERIAL ``table.id``, None otherwise"""
+    return conn.execute(sa.text(
+        "SELECT pg_get_serial_sequence(:table, 'id') FROM pg_attribute "
+        "WHERE attrelid = to_regclass(:table) AND attname = 'id' AND attidentity = ''"
+    ), {'table': table}).scalar()
+
+
+def upgrade() -> None:
+    """Replace the SERIAL defaults with identity columns"""
+    conn = op.get_bind()
+    for table in IDENTITY_TABLES:
+        sequence = _serial_sequence(conn, table)
+        if sequence is None:
+            continue
+
+        start = conn.execute(sa.text(
+            f"SELECT GREATEST(nextval(CAST(:sequence AS regclass)), "
+            f"(SELECT COALESCE(max(id), 0) + 1 FROM {table}))"
+        ), {'sequence': sequence}).scalar()
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT')
+        op.execute(f'DROP SEQUENCE {sequence}')
+        op.execute(
+            f'ALTER TABLE {table} ALTER COLUMN id '
+            f'ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {start})'
+        )
+
+
+def downgrade() -> None:
+    """Keep the identity columns
+
+    Fresh installs create these ids as identity columns in their initial
+    revisions, so there is no SERIAL shape to go back to.
+    """
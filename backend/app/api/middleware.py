@@ -0,0 +1,53 @@
+"""
+API Middleware
+
+This module provides ASGI middleware shared by every API route.
+"""
+
+from typing import Iterable, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.token_cache import get_token_claims, get_token_user, is_token_revoked
+
+
+def _bearer_token(headers: Iterable[Tuple[bytes, bytes]]) -> Optional[str]:
+    """Read the token of a ``Bearer`` Authorization header from raw ASGI headers"""
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, credentials = value.partition(b" ")
+            if scheme.lower() == b"bearer" and credentials:
+                return credentials.decode("latin-1")
+            return None
+    return None
+
+
+class BearerTokenMiddleware:
+    """
+    Extract the bearer token once per request
+
+    The token is stored on ``request.state.bearer_token``. When the token
+    cache already holds unexpired access-token claims and a user for it,
+    that user's frozen CachedUser snapshot is stored on
+    ``request.state.user`` as well, so the auth dependencies return it
+    without decoding the token or opening a query. No ORM row ever goes
+    into request state.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            token = _bearer_token(scope["headers"])
+            if token is not None:
+                state = scope.setdefault("state", {})
+                state["bearer_token"] = token
+                if not is_token_revoked(token):
+                    claims = get_token_claims(token)
+                    if claims is not None and claims.get("type") == "access":
+                        user = get_token_user(token)
+                        if user is not None:
+                            state["user"] = user
+
+        await self.app(scope, receive, send)
@@ -5,14 +5,19 @@ This module provides REST API endpoints for accounting/session statistics
 and reporting functionality.
 """
 
-from typing import Optional, List
+import time
+from typing import Optional, List, AsyncIterator
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import JSONResponse
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 from app.core.auth import get_current_user
-from app.core.database import get_db
+from app.db.session import get_db
 from app.core.exceptions import NotFoundError, ValidationError, BusinessLogicError
+from app.core.responses import model_response
 from app.models import User
 from app.repositories.accounting import (
     AccountingRepository,
@@ -33,24 +38,24 @@ from app.schemas.accounting import (
     NasTrafficSummaryResponse, AccountingTimeRangeEnum,
     CustomQueryRequest, MaintenanceRequest
 )
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
 
-def get_accounting_service(db: Session = Depends(get_db)) -> AccountingService:
+def get_accounting_service(db: AsyncSession = Depends(get_db)) -> AccountingService:
     """Get accounting service instance"""
     repository = AccountingRepository(db)
     return AccountingService(repository)
 
 
-def get_user_traffic_summary_service(db: Session = Depends(get_db)) -> UserTrafficSummaryService:
+def get_user_traffic_summary_service(db: AsyncSession = Depends(get_db)) -> UserTrafficSummaryService:
     """Get user traffic summary service instance"""
     repository = UserTrafficSummaryRepository(db)
     return UserTrafficSummaryService(repository)
 
 
-def get_nas_traffic_summary_service(db: Session = Depends(get_db)) -> NasTrafficSummaryService:
+def get_nas_traffic_summary_service(db: AsyncSession = Depends(get_db)) -> NasTrafficSummaryService:
     """Get NAS traffic summary service instance"""
     repository = NasTrafficSummaryRepository(db)
     return NasTrafficSummaryService(repository)
@@ -60,7 +65,7 @@ def get_nas_traffic_summary_service(db: Session = Depends(get_db)) -> NasTraffic
 # Session Management Endpoints
 # =====================================================================
 
-@router.get("/sessions", response_model=PaginatedAccountingResponse)
+@router.get("/sessions", responses={200: {"model": PaginatedAccountingResponse}})
 async def get_accounting_sessions(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
@@ -68,6 +73,8 @@ async def get_accounting_sessions(
         "acctstarttime", description="Sort field"),
     sort_order: Optional[str] = Query(
         "desc", regex="^(asc|desc)$", description="Sort order"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; replaces page"),
     # Filters
     username: Optional[str] = Query(None, description="Filter by username"),
     groupname: Optional[str] = Query(None, description="Filter by group name"),
@@ -112,11 +119,12 @@ async def get_accounting_sessions(
             page_size=page_size,
             sort_field=sort_field,
             sort_order=sort_order,
+            cursor=cursor,
             filters=filters
         )
 
         # Get sessions
-        return await service.get_accounting_sessions(query)
+        return model_response(await service.get_accounting_sessions(query))
 
     except ValidationError as e:
         raise HTTPException(
@@ -126,7 +134,64 @@ async def get_accounting_sessions(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
-@router.get("/sessions/{session_id}", response_model=RadAcctResponse)
+@router.get("/sessions/stream")
+async def stream_accounting_sessions(
+    sort_order: Optional[str] = Query(
+        "desc", regex="^(asc|desc)$", description="Sort order by start time"),
+    # Filters
+    username: Optional[str] = Query(None, description="Filter by username"),
+    groupname: Optional[str] = Query(None, description="Filter by group name"),
+    nasipaddress: Optional[str] = Query(
+        None, description="Filter by NAS IP address"),
+    framedipaddress: Optional[str] = Query(
+        None, description="Filter by framed IP address"),
+    callingstationid: Optional[str] = Query(
+        None, description="Filter by calling station ID"),
+    servicetype: Optional[str] = Query(
+        None, description="Filter by service type"),
+    time_range: Optional[AccountingTimeRangeEnum] = Query(
+        None, description="Predefined time range"),
+    start_date: Optional[datetime] = Query(
+        None, description="Start date filter"),
+    end_date: Optional[datetime] = Query(None, description="End date filter"),
+    active_only: Optional[bool] = Query(
+        None, description="Show only active sessions"),
+    # Current user dependency
+    current_user: User = Depends(get_current_user),
+    service: AccountingService = Depends(get_accounting_service)
+):
+    """Stream every matching accounting session as NDJSON, one RadAcctResponse per line"""
+    filters = AccountingQueryFilters(
+        username=username,
+        groupname=groupname,
+        nasipaddress=nasipaddress,
+        framedipaddress=framedipaddress,
+        callingstationid=callingstationid,
+        servicetype=servicetype,
+        time_range=time_range,
+        start_date=start_date,
+        end_date=end_date,
+        active_only=active_only
+    )
+
+    return StreamingResponse(
+        _iter_ndjson(service.stream_sessions(filters, sort_order)),
+        media_type="application/x-ndjson"
+    )
+
+
+def _encode_ndjson(sessions: List[RadAcctResponse]) -> bytes:
+    """Encode sessions as newline-terminated JSON lines"""
+    return b"".join(session.model_dump_json().encode() + b"\n" for session in sessions)
+
+
+async def _iter_ndjson(partitions: AsyncIterator[List[RadAcctResponse]]) -> AsyncIterator[bytes]:
+    """Encode each streamed partition on the threadpool"""
+    async for sessions in partitions:
+        yield await run_in_threadpool(_encode_ndjson, sessions)
+
+
+@router.get("/sessions/{session_id}", responses={200: {"model": RadAcctResponse}})
 async def get_session_by_id(
     session_id: int,
     current_user: User = Depends(get_current_user),
@@ -134,7 +199,7 @@ async def get_session_by_id(
 ):
     """Get accounting session by ID"""
     try:
-        return await service.get_session_by_id(session_id)
+        return model_response(await service.get_session_by_id(session_id))
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -143,7 +208,7 @@ async def get_session_by_id(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
-@router.get("/sessions/active", response_model=PaginatedAccountingResponse)
+@router.get("/sessions/active", responses={200: {"model": PaginatedAccountingResponse}})
 async def get_active_sessions(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
@@ -154,12 +219,12 @@ async def get_active_sessions(
 ):
     """Get active sessions"""
     try:
-        return await service.get_active_sessions(
+        return model_response(await service.get_active_sessions(
             page=page,
             page_size=page_size,
             nas_ip=nas_ip,
             username=username
-        )
+        ))
     except ValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -168,7 +233,7 @@ async def get_active_sessions(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
-@router.get("/sessions/user/{username}", response_model=PaginatedAccountingResponse)
+@router.get("/sessions/user/{username}", responses={200: {"model": PaginatedAccountingResponse}})
 async def get_user_sessions(
     username: str,
     page: int = Query(1, ge=1),
@@ -180,13 +245,13 @@ async def get_user_sessions(
 ):
     """Get sessions for a specific user"""
     try:
-        return await service.get_user_sessions(
+        return model_response(await service.get_user_sessions(
             username=username,
             page=page,
             page_size=page_size,
             date_from=date_from,
             date_to=date_to
-        )
+        ))
     except ValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -314,7 +379,8 @@ async def execute_custom_query(
         return await service.execute_custom_query(
             query_sql=request.query_sql,
             parameters=request.parameters,
-            limit=request.limit
+            limit=request.limit,
+            timeout_seconds=request.timeout_seconds
         )
     except ValidationError as e:
         raise HTTPException(
@@ -394,16 +460,26 @@ async def get_nas_traffic_summary(
 # Health Check
 # =====================================================================
 
+# Probes hit the health check every second or so per replica; the body is
+# re-encoded at most every HEALTH_BODY_TTL seconds and served as bytes
+HEALTH_BODY_TTL = 0.5
+_health_body = b""
+_health_expires = 0.0
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint for accounting module"""
-    return JSONResponse(
-        content={
+    global _health_body, _health_expires
+    now = time.monotonic()
+    if now >= _health_expires:
+        _health_body = orjson.dumps({
             "status": "healthy",
             "module": "accounting",
             "timestamp": datetime.utcnow().isoformat()
-        }
-    )
+        })
+        _health_expires = now + HEALTH_BODY_TTL
+    return Response(content=_health_body, media_type="application/json")
 
 
 # Export router
@@ -5,22 +5,30 @@ Comprehensive authentication endpoints including login, logout, registration,
 password management, and token operations.
 """
 
+import asyncio
+import re
 from datetime import datetime
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr, Field
 
-from app.core.database import get_db
+from app.db.session import get_db
 from app.core.config import settings
+from app.core.security import bearer_token
+from app.core.token_cache import CachedUser
 from app.services.auth import AuthService
-from app.models.user import User, UserStatus, AuthType
-from app.repositories.user import UserRepository
+from app.models.user import UserStatus, AuthType
 
 
 router = APIRouter()
-security = HTTPBearer()
+
+# Access token lifetime in seconds, reported as expires_in
+ACCESS_TOKEN_EXPIRES_IN = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+# Password reset codes are six ASCII digits; str.isdigit() would also
+# accept other Unicode digits such as "²"
+VERIFICATION_CODE_PATTERN = re.compile(r"[0-9]{6}")
 
 
 # Pydantic models for request/response
@@ -78,14 +86,24 @@ class UserResponse(BaseModel):
     permissions: List[str] = []
 
 
+def get_auth_service(db: AsyncSession = Depends(get_db)) -> AuthService:
+    """AuthService bound to the request's session; FastAPI caches it per request"""
+    return AuthService(db)
+
+
 # Dependency to get current user
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    request: Request,
+    token: str = Depends(bearer_token),
+    auth_service: AuthService = Depends(get_auth_service)
+) -> CachedUser:
     """Get current authenticated user from token"""
-    auth_service = AuthService(db)
-    user = await auth_service.get_current_user(credentials.credentials)
+    # Resolved by the middleware from the token cache
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+
+    user = await auth_service.get_current_user(token)
 
     if not user:
         raise HTTPException(
@@ -101,15 +119,13 @@ async def get_current_user(
 async def login(
     request: Request,
     login_data: LoginRequest,
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     User login authentication
 
     Authenticates user credentials and returns JWT tokens
     """
-    auth_service = AuthService(db)
-
     # Try to authenticate user first, then operator
     user = await auth_service.authenticate_user(login_data.username, login_data.password)
 
@@ -177,26 +193,27 @@ async def login(
     return LoginResponse(
         access_token=access_token,
         refresh_token=refresh_token,
-        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        expires_in=ACCESS_TOKEN_EXPIRES_IN,
         user=user_info
     )
 
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    token: str = Depends(bearer_token),
+    current_user: CachedUser = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     User logout
 
-    Invalidates the current session (in a full implementation,
-    you would add token to a blacklist)
+    Revokes the current access token on this worker
     """
-    # In a production environment, you would:
-    # 1. Add token to blacklist
+    auth_service.revoke_token(token)
+
+    # In a production environment, you would also:
+    # 1. Share the revocation across workers
     # 2. Log the logout event
-    # 3. Clear any server-side sessions
 
     return {"message": "Successfully logged out"}
 
@@ -204,34 +221,32 @@ async def logout(
 @router.post("/register", response_model=LoginResponse)
 async def register(
     register_data: RegisterRequest,
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     User registration
 
     Creates new user account and returns authentication tokens
     """
-    auth_service = AuthService(db)
-    user_repo = UserRepository(db)
+    user_repo = auth_service.user_repository
 
-    # Check if username already exists
-    existing_user = await user_repo.get_by_username(register_data.username)
-    if existing_user:
+    # Check if username or email already exists, in one round trip
+    username_taken, email_taken = await user_repo.username_or_email_taken(
+        register_data.username, register_data.email)
+    if username_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
 
-    # Check if email already exists
-    existing_email = await user_repo.get_by_email(register_data.email)
-    if existing_email:
+    if email_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
     # Create new user
-    password_hash = auth_service.hash_password(register_data.password)
+    password_hash = await asyncio.to_thread(auth_service.hash_password, register_data.password)
 
     user_data = {
         "username": register_data.username,
@@ -277,7 +292,7 @@ async def register(
     return LoginResponse(
         access_token=access_token,
         refresh_token=refresh_token,
-        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        expires_in=ACCESS_TOKEN_EXPIRES_IN,
         user=user_info
     )
 
@@ -285,15 +300,13 @@ async def register(
 @router.post("/refresh")
 async def refresh_token(
     refresh_data: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     Refresh access token
 
     Creates new access token from valid refresh token
     """
-    auth_service = AuthService(db)
-
     new_access_token = await auth_service.refresh_access_token(refresh_data.refresh_token)
 
     if not new_access_token:
@@ -305,21 +318,20 @@ async def refresh_token(
     return {
         "access_token": new_access_token,
         "token_type": "bearer",
-        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        "expires_in": ACCESS_TOKEN_EXPIRES_IN
     }
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CachedUser = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     Get current user information
 
     Returns detailed information about the authenticated user
     """
-    auth_service = AuthService(db)
     permissions = auth_service.get_user_permissions(current_user)
 
     return UserResponse(
@@ -340,16 +352,14 @@ async def get_current_user_info(
 @router.post("/change-password")
 async def change_password(
     password_data: ChangePasswordRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CachedUser = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     Change user password
 
     Changes the password for the authenticated user
     """
-    auth_service = AuthService(db)
-
     success = await auth_service.change_password(
         current_user.id,
         password_data.current_password,
@@ -368,15 +378,14 @@ async def change_password(
 @router.post("/forgot-password")
 async def forgot_password(
     forgot_data: ForgotPasswordRequest,
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     Initiate password reset
 
     Sends verification code to user's email (in production)
     """
-    auth_service = AuthService(db)
-    user_repo = UserRepository(db)
+    user_repo = auth_service.user_repository
 
     user = await user_repo.get_by_email(forgot_data.email)
     if not user:
@@ -398,18 +407,16 @@ async def forgot_password(
 @router.post("/reset-password")
 async def reset_password(
     reset_data: ResetPasswordRequest,
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """
     Reset password with verification code
 
     Resets user password using verification code
     """
-    auth_service = AuthService(db)
-
     # In production, you would verify the verification code against stored value
     # For now, we'll accept any 6-digit code
-    if len(reset_data.verification_code) != 6 or not reset_data.verification_code.isdigit():
+    if not VERIFICATION_CODE_PATTERN.fullmatch(reset_data.verification_code):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid verification code"
@@ -432,7 +439,7 @@ async def reset_password(
 
 @router.post("/validate-token")
 async def validate_token(
-    current_user: User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user)
 ):
     """
     Validate authentication token
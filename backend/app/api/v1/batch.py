@@ -5,13 +5,16 @@ This module provides API endpoints for batch operations management,
 including batch history tracking and batch operation execution.
 """
 
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Literal, Optional
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, desc, func
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import Select, and_, delete, desc, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.database import get_db
+from app.db.session import get_db, get_session_factory
 from app.core.security import get_current_user
 from app.models.user import BatchHistory, User
 from app.schemas.batch import (
@@ -33,8 +36,24 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Sortable fields of the history listing; the API names map onto the
+# legacy timestamp columns
+_SORT_COLUMNS = {
+    "id": BatchHistory.id,
+    "batch_name": BatchHistory.batch_name,
+    "hotspot_id": BatchHistory.hotspot_id,
+    "created_at": BatchHistory.creationdate,
+    "updated_at": BatchHistory.updatedate,
+}
 
-@router.get("/history", response_model=BatchHistoryListResponse, summary="Get batch operation history")
+# Validates a whole page of ORM rows in one pydantic-core call
+_BATCH_HISTORY_ITEMS = TypeAdapter(List[BatchHistoryResponse])
+
+# History rows fetched and encoded per server-side cursor round trip
+BATCH_HISTORY_STREAM_CHUNK = 50
+
+
+@router.get("/history", responses={200: {"model": BatchHistoryListResponse}}, summary="Get batch operation history")
 async def get_batch_history(
     operation_type: Optional[str] = Query(
         None, description="Filter by operation type"),
@@ -48,197 +67,209 @@ async def get_batch_history(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
     sort_by: Optional[str] = Query("created_at", description="Sort field"),
-    sort_order: Optional[str] = Query(
-        "desc", regex=r'^(asc|desc)$', description="Sort order"),
-    db: Session = Depends(get_db),
+    sort_order: Literal["asc", "desc"] = Query("desc", description="Sort order"),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
     current_user: User = Depends(get_current_user),
 ):
     """
     Retrieve batch operation history with filtering and pagination.
     """
-    try:
-        # Build query filters
-        filters = []
-        if operation_type:
-            filters.append(BatchHistory.operation_type == operation_type)
-        if status:
-            filters.append(BatchHistory.status == status)
-        if hotspot_id:
-            filters.append(BatchHistory.hotspot_id == hotspot_id)
-        if created_after:
-            filters.append(BatchHistory.created_at >= created_after)
-        if created_before:
-            filters.append(BatchHistory.created_at <= created_before)
-
-        # Get total count
-        total_query = db.query(func.count(BatchHistory.id))
-        if filters:
-            total_query = total_query.filter(and_(*filters))
-        total = total_query.scalar()
-
-        # Build main query
-        query = db.query(BatchHistory)
+    # Build query filters
+    filters = []
+    if operation_type:
+        filters.append(BatchHistory.operation_type == operation_type)
+    if status:
+        filters.append(BatchHistory.status == status)
+    if hotspot_id:
+        filters.append(BatchHistory.hotspot_id == hotspot_id)
+    if created_after:
+        filters.append(BatchHistory.created_at >= created_after)
+    if created_before:
+        filters.append(BatchHistory.created_at <= created_before)
+
+    # Build main query; count(*) OVER () carries the filtered total on
+    # every row so the page and its count come back in one round trip
+    query = select(BatchHistory, func.count().over().label("total"))
+    if filters:
+        query = query.where(and_(*filters))
+
+    # Apply sorting; unknown fields fall back to newest first
+    sort_column = _SORT_COLUMNS.get(sort_by)
+    if sort_column is None:
+        query = query.order_by(desc(BatchHistory.creationdate))
+    elif sort_order == "desc":
+        query = query.order_by(desc(sort_column))
+    else:
+        query = query.order_by(sort_column)
+
+    # Apply pagination
+    offset = (page - 1) * size
+    count_query = None
+    if offset:
+        # Past the last page no row carries the total; count separately
+        count_query = select(func.count(BatchHistory.id))
         if filters:
-            query = query.filter(and_(*filters))
-
-        # Apply sorting
-        if hasattr(BatchHistory, sort_by):
-            sort_column = getattr(BatchHistory, sort_by)
-            if sort_order == "desc":
-                query = query.order_by(desc(sort_column))
-            else:
-                query = query.order_by(sort_column)
-        else:
-            query = query.order_by(desc(BatchHistory.created_at))
-
-        # Apply pagination
-        offset = (page - 1) * size
-        items = query.offset(offset).limit(size).all()
-
-        # Calculate pagination info
-        pages = (total + size - 1) // size
-
-        return BatchHistoryListResponse(
-            items=[BatchHistoryResponse.from_orm(item) for item in items],
-            total=total,
-            page=page,
-            size=size,
-            pages=pages
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to retrieve batch history: {str(e)}"
-        )
+            count_query = count_query.where(and_(*filters))
+
+    # Rows come from a server-side cursor and are encoded as they
+    # arrive, so a page of wide operation_details is never held whole
+    return StreamingResponse(
+        _iter_history_page(
+            session_factory,
+            query.offset(offset).limit(size)
+            .execution_options(yield_per=BATCH_HISTORY_STREAM_CHUNK),
+            count_query, page, size),
+        media_type="application/json"
+    )
+
+
+async def _iter_history_page(
+    session_factory: async_sessionmaker,
+    query: Select,
+    count_query: Optional[Select],
+    page: int,
+    size: int,
+) -> AsyncIterator[bytes]:
+    """Encode a BatchHistoryListResponse body as the rows stream in
+
+    The body is sent after the endpoint has returned, when a request-scoped
+    session may already be closed, so the cursor runs on a session owned by
+    this generator.
+    """
+    total = None
+    separator = b""
+    async with session_factory() as db:
+        result = await db.stream(query)
+        yield b'{"items":['
+        try:
+            async for partition in result.partitions(BATCH_HISTORY_STREAM_CHUNK):
+                if total is None:
+                    total = partition[0].total
+                items = _BATCH_HISTORY_ITEMS.validate_python(
+                    [row[0] for row in partition], from_attributes=True)
+                yield separator + b",".join(item.model_dump_json().encode() for item in items)
+                separator = b","
+        finally:
+            await result.close()
+
+        if total is None:
+            total = await db.scalar(count_query) if count_query is not None else 0
+
+    # The pagination fields trail the items since the total is only known
+    # once the first row has arrived
+    yield b"]," + orjson.dumps({
+        "total": total,
+        "page": page,
+        "size": size,
+        "pages": (total + size - 1) // size,
+    })[1:]
 
 
 @router.get("/history/{batch_id}", response_model=BatchHistoryResponse, summary="Get batch operation details")
 async def get_batch_details(
     batch_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get detailed information about a specific batch operation.
     """
-    batch_history = db.query(BatchHistory).filter(
-        BatchHistory.id == batch_id).first()
+    batch_history = await db.get(BatchHistory, batch_id)
     if not batch_history:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Batch operation not found"
         )
 
-    return BatchHistoryResponse.from_orm(batch_history)
+    return BatchHistoryResponse.model_validate(batch_history)
 
 
 @router.post("/history", response_model=BatchHistoryResponse, summary="Create batch history record")
 async def create_batch_history(
     batch_data: BatchHistoryCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Create a new batch history record.
     """
-    try:
-        batch_history = BatchHistory(
-            batch_name=batch_data.batch_name,
-            batch_description=batch_data.batch_description,
-            hotspot_id=batch_data.hotspot_id,
-            operation_type=batch_data.operation_type,
-            operation_details=batch_data.operation_details,
-            total_count=batch_data.total_count,
-            success_count=batch_data.success_count,
-            failure_count=batch_data.failure_count,
-            status=batch_data.status,
-        )
+    # Only fields backed by a column reach the INSERT, as in the update
+    result = await db.execute(
+        insert(BatchHistory)
+        .values({
+            field: value for field, value in batch_data.model_dump().items()
+            if field in BatchHistory.__table__.columns
+        })
+        .returning(BatchHistory)
+    )
+    batch_history = result.scalar_one()
+    await db.commit()
 
-        db.add(batch_history)
-        db.commit()
-        db.refresh(batch_history)
-
-        return BatchHistoryResponse.from_orm(batch_history)
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create batch history: {str(e)}"
-        )
+    return BatchHistoryResponse.model_validate(batch_history)
 
 
 @router.put("/history/{batch_id}", response_model=BatchHistoryResponse, summary="Update batch history record")
 async def update_batch_history(
     batch_id: int,
     batch_data: BatchHistoryUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Update an existing batch history record.
     """
-    batch_history = db.query(BatchHistory).filter(
-        BatchHistory.id == batch_id).first()
+    # Update fields if provided; updatedate is bumped by its onupdate
+    # default, and the row comes back from the UPDATE itself
+    update_data = batch_data.dict(exclude_unset=True)
+    result = await db.execute(
+        update(BatchHistory)
+        .where(BatchHistory.id == batch_id)
+        .values({
+            field: value for field, value in update_data.items()
+            if field in BatchHistory.__table__.columns
+        })
+        .returning(BatchHistory)
+    )
+    batch_history = result.scalar_one_or_none()
     if not batch_history:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Batch operation not found"
         )
 
-    try:
-        # Update fields if provided
-        update_data = batch_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(batch_history, field, value)
+    await db.commit()
 
-        # Update timestamp
-        batch_history.updated_at = datetime.utcnow()
-
-        db.commit()
-        db.refresh(batch_history)
-
-        return BatchHistoryResponse.from_orm(batch_history)
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to update batch history: {str(e)}"
-        )
+    return BatchHistoryResponse.model_validate(batch_history)
 
 
 @router.delete("/history/{batch_id}", summary="Delete batch history record")
 async def delete_batch_history(
     batch_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Delete a batch history record.
     """
-    batch_history = db.query(BatchHistory).filter(
-        BatchHistory.id == batch_id).first()
-    if not batch_history:
+    result = await db.execute(
+        delete(BatchHistory)
+        .where(BatchHistory.id == batch_id)
+        .returning(BatchHistory.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Batch operation not found"
         )
 
-    try:
-        db.delete(batch_history)
-        db.commit()
-        return {"message": "Batch history record deleted successfully"}
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete batch history: {str(e)}"
-        )
+    await db.commit()
+    return {"message": "Batch history record deleted successfully"}
 
 
 @router.post("/users", response_model=BatchOperationResult, summary="Execute batch user operations")
 async def batch_user_operation(
     operation_request: BatchUserOperationRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -246,22 +277,16 @@ async def batch_user_operation(
     """
     batch_service = BatchService(db)
 
-    try:
-        result = await batch_service.execute_user_batch_operation(
-            operation_request, current_user
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to execute batch user operation: {str(e)}"
-        )
+    result = await batch_service.execute_user_batch_operation(
+        operation_request, current_user
+    )
+    return result
 
 
 @router.post("/nas", response_model=BatchOperationResult, summary="Execute batch NAS operations")
 async def batch_nas_operation(
     operation_request: BatchNasOperationRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -269,22 +294,16 @@ async def batch_nas_operation(
     """
     batch_service = BatchService(db)
 
-    try:
-        result = await batch_service.execute_nas_batch_operation(
-            operation_request, current_user
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to execute batch NAS operation: {str(e)}"
-        )
+    result = await batch_service.execute_nas_batch_operation(
+        operation_request, current_user
+    )
+    return result
 
 
 @router.post("/groups", response_model=BatchOperationResult, summary="Execute batch group operations")
 async def batch_group_operation(
     operation_request: BatchGroupOperationRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -292,16 +311,10 @@ async def batch_group_operation(
     """
     batch_service = BatchService(db)
 
-    try:
-        result = await batch_service.execute_group_batch_operation(
-            operation_request, current_user
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to execute batch group operation: {str(e)}"
-        )
+    result = await batch_service.execute_group_batch_operation(
+        operation_request, current_user
+    )
+    return result
 
 
 @router.get("/operations/types", summary="Get available batch operation types")
@@ -320,45 +333,39 @@ async def get_operation_types(
 
 @router.get("/stats", summary="Get batch operations statistics")
 async def get_batch_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get statistics about batch operations.
     """
-    try:
-        # Total operations
-        total_operations = db.query(func.count(BatchHistory.id)).scalar()
-
-        # Operations by status
-        status_stats = db.query(
+    recent_since = datetime.utcnow() - timedelta(days=7)
+
+    # One scan grouped by (status, type); the few groups that come back are
+    # folded into the totals and both distributions here. This stands in
+    # for GROUPING SETS with jsonb_object_agg: it reads the table once all
+    # the same and runs on any database, including the test one
+    rows = await db.execute(
+        select(
             BatchHistory.status,
-            func.count(BatchHistory.id)
-        ).group_by(BatchHistory.status).all()
-
-        # Operations by type
-        type_stats = db.query(
             BatchHistory.operation_type,
-            func.count(BatchHistory.id)
-        ).group_by(BatchHistory.operation_type).all()
-
-        # Recent operations (last 7 days)
-        seven_days_ago = datetime.utcnow().replace(
-            hour=0, minute=0, second=0, microsecond=0)
-        seven_days_ago = seven_days_ago.replace(day=seven_days_ago.day - 7)
-
-        recent_operations = db.query(func.count(BatchHistory.id)).filter(
-            BatchHistory.created_at >= seven_days_ago
-        ).scalar()
-
-        return {
-            "total_operations": total_operations,
-            "recent_operations": recent_operations,
-            "status_distribution": dict(status_stats),
-            "operation_type_distribution": dict(type_stats),
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get batch statistics: {str(e)}"
-        )
+            func.count(BatchHistory.id),
+            func.count(BatchHistory.id).filter(BatchHistory.created_at >= recent_since),
+        ).group_by(BatchHistory.status, BatchHistory.operation_type)
+    )
+
+    total_operations = recent_operations = 0
+    status_stats = {}
+    type_stats = {}
+    for batch_status, operation_type, count, recent in rows:
+        total_operations += count
+        recent_operations += recent
+        status_stats[batch_status] = status_stats.get(batch_status, 0) + count
+        type_stats[operation_type] = type_stats.get(operation_type, 0) + count
+
+    return {
+        "total_operations": total_operations,
+        "recent_operations": recent_operations,
+        "status_distribution": status_stats,
+        "operation_type_distribution": type_stats,
+    }
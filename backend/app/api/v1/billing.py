@@ -5,13 +5,18 @@ This module provides REST API endpoints for billing management,
 including plans, history, rates, and merchant operations.
 """
 
-from datetime import date
-from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
-from sqlalchemy.orm import Session
-
-from app.core.database import get_db
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Literal, Optional, Type, TypeVar
+import orjson
+from pydantic import TypeAdapter
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Path, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.core.cache import cached_response, etag_matches, invalidate
+from app.core.responses import ORJSONResponse, model_response
 from app.core.security import get_current_user
+from app.core.token_cache import CachedUser
 from app.repositories.billing import (
     BillingPlanRepository,
     BillingHistoryRepository,
@@ -44,129 +49,151 @@ from app.schemas.billing import (
     RefundCreate, RefundUpdate, RefundResponse,
     PaymentTypeCreate, PaymentTypeUpdate, PaymentTypeResponse,
     POSCreate, POSUpdate, POSResponse,
-    PaginatedResponse
+    PaginatedResponse,
+    PlanSortField, HistorySortField, RateSortField, MerchantTransactionSortField,
+    InvoiceSortField, PaymentSortField, RefundSortField, PaymentTypeSortField,
+    POSSortField
 )
-from app.core.exceptions import NotFoundError, ValidationError
-
-router = APIRouter()
-
-
-# Dependency injection helpers
-def get_billing_plan_service(db: Session = Depends(get_db)) -> BillingPlanService:
-    repository = BillingPlanRepository(db)
-    return BillingPlanService(repository)
 
+router = APIRouter(default_response_class=ORJSONResponse)
 
-def get_billing_history_service(db: Session = Depends(get_db)) -> BillingHistoryService:
-    repository = BillingHistoryRepository(db)
-    return BillingHistoryService(repository)
+ServiceT = TypeVar("ServiceT")
 
+# Seconds the shared plan and statistics responses are served from Redis;
+# plan writes below invalidate them straight away
+ACTIVE_PLANS_CACHE_TTL = 60
+PLAN_STATISTICS_CACHE_TTL = 10
+BILLING_STATISTICS_CACHE_TTL = 30
+PLAN_CACHE_NAMESPACES = ("billing:active_plans", "billing:plan_statistics", "billing:statistics")
 
-def get_billing_rate_service(db: Session = Depends(get_db)) -> BillingRateService:
-    repository = BillingRateRepository(db)
-    return BillingRateService(repository)
+# Most records accepted by one bulk create request
+BILLING_BATCH_MAX_ROWS = 10_000
 
+# Serializes an already-built list of history models in one pydantic-core call
+_HISTORY_ITEMS = TypeAdapter(List[BillingHistoryResponse])
 
-def get_billing_merchant_service(db: Session = Depends(get_db)) -> BillingMerchantService:
-    repository = BillingMerchantRepository(db)
-    return BillingMerchantService(repository)
+# The health body never changes, so it is encoded once
+HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "billing", "version": "1.0.0"})
 
 
-def get_invoice_service(db: Session = Depends(get_db)) -> InvoiceService:
-    repository = InvoiceRepository(db)
-    return InvoiceService(repository)
+async def invalidate_plan_caches() -> None:
+    """Drop the cached responses derived from billing plans"""
+    for namespace in PLAN_CACHE_NAMESPACES:
+        await invalidate(namespace)
 
 
-def get_payment_service(db: Session = Depends(get_db)) -> PaymentService:
-    repository = PaymentRepository(db)
-    return PaymentService(repository)
+def versioned_response(request: Request, model: Any, version: Optional[datetime]) -> Response:
+    """
+    Serve a single resource with a weak ETag built from its id and last write
 
+    The write timestamp versions the representation, so clients re-fetching
+    an unchanged resource get a bodyless 304. Resources that were never
+    timestamped are served without an ETag.
+    """
+    if version is None:
+        return model_response(model)
 
-def get_refund_service(db: Session = Depends(get_db)) -> RefundService:
-    repository = RefundRepository(db)
-    return RefundService(repository)
+    etag = f'W/"{model.id}-{int(version.timestamp() * 1_000_000)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
 
+    response = model_response(model)
+    response.headers.update(headers)
+    return response
 
-def get_payment_type_service(db: Session = Depends(get_db)) -> PaymentTypeService:
-    repository = PaymentTypeRepository(db)
-    return PaymentTypeService(repository)
 
-
-def get_pos_service(db: Session = Depends(get_db)) -> POSService:
-    repository = POSRepository(db)
-    return POSService(repository)
+# Dependency injection helpers
+def service_dependency(
+    service_cls: Type[ServiceT],
+    repository_cls: Type[Any]
+) -> Callable[[AsyncSession], ServiceT]:
+    """Build the dependency wiring ``service_cls`` to a ``repository_cls`` on the request's session"""
+    def dependency(db: AsyncSession = Depends(get_db)) -> ServiceT:
+        return service_cls(repository_cls(db))
+    return dependency
+
+
+get_billing_plan_service = service_dependency(BillingPlanService, BillingPlanRepository)
+get_billing_history_service = service_dependency(BillingHistoryService, BillingHistoryRepository)
+get_billing_rate_service = service_dependency(BillingRateService, BillingRateRepository)
+get_billing_merchant_service = service_dependency(BillingMerchantService, BillingMerchantRepository)
+get_invoice_service = service_dependency(InvoiceService, InvoiceRepository)
+get_payment_service = service_dependency(PaymentService, PaymentRepository)
+get_refund_service = service_dependency(RefundService, RefundRepository)
+get_payment_type_service = service_dependency(PaymentTypeService, PaymentTypeRepository)
+get_pos_service = service_dependency(POSService, POSRepository)
 
 
 # =====================================================================
 # Billing Plans API Endpoints
 # =====================================================================
 
-@router.get("/plans", response_model=PaginatedResponse, summary="Get billing plans")
+@router.get("/plans", responses={200: {"model": PaginatedResponse}}, summary="Get billing plans")
 async def get_billing_plans(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, deprecated=True,
+                      description="Page number; deprecated in favor of cursor"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
     name: Optional[str] = Query(None, description="Filter by plan name"),
     type_filter: Optional[str] = Query(
         None, alias="type", description="Filter by plan type"),
     active_only: bool = Query(False, description="Show only active plans"),
-    sort_field: str = Query("id", description="Sort field"),
-    sort_order: str = Query("asc", regex="^(asc|desc)$",
-                            description="Sort order"),
+    sort_field: PlanSortField = Query("id", description="Sort field"),
+    sort_order: Literal["asc", "desc"] = Query("asc", description="Sort order"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; replaces page"),
     service: BillingPlanService = Depends(get_billing_plan_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get paginated list of billing plans with optional filtering"""
-    try:
-        return await service.get_plans(
-            page=page,
-            page_size=page_size,
-            name_filter=name,
-            type_filter=type_filter,
-            active_only=active_only,
-            sort_field=sort_field,
-            sort_order=sort_order
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return model_response(await service.get_plans(
+        page=page,
+        page_size=page_size,
+        name_filter=name,
+        type_filter=type_filter,
+        active_only=active_only,
+        sort_field=sort_field,
+        sort_order=sort_order,
+        cursor=cursor
+    ))
 
 
 @router.get("/plans/active", response_model=List[BillingPlanResponse], summary="Get active billing plans")
 async def get_active_billing_plans(
+    request: Request,
     service: BillingPlanService = Depends(get_billing_plan_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get all active billing plans"""
-    try:
-        return await service.get_active_plans()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await cached_response(
+        request, "billing:active_plans", ACTIVE_PLANS_CACHE_TTL,
+        service.get_active_plans
+    )
 
 
 @router.get("/plans/statistics", response_model=Dict[str, Any], summary="Get billing plans statistics")
 async def get_billing_plan_statistics(
+    request: Request,
     service: BillingPlanService = Depends(get_billing_plan_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get billing plan statistics"""
-    try:
-        return await service.get_plan_statistics()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await cached_response(
+        request, "billing:plan_statistics", PLAN_STATISTICS_CACHE_TTL,
+        service.get_plan_statistics
+    )
 
 
-@router.get("/plans/{plan_id}", response_model=BillingPlanResponse, summary="Get billing plan by ID")
+@router.get("/plans/{plan_id}", responses={200: {"model": BillingPlanResponse}}, summary="Get billing plan by ID")
 async def get_billing_plan(
+    request: Request,
     plan_id: int = Path(..., description="Billing plan ID"),
     service: BillingPlanService = Depends(get_billing_plan_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get a specific billing plan by ID"""
-    try:
-        return await service.get_plan_by_id(plan_id)
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    plan = await service.get_plan_by_id(plan_id)
+    return versioned_response(request, plan, plan.updatedate or plan.creationdate)
 
 
 @router.post("/plans", response_model=BillingPlanResponse, status_code=201, summary="Create billing plan")
@@ -176,12 +203,9 @@ async def create_billing_plan(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new billing plan"""
-    try:
-        return await service.create_plan(plan_data)
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    plan = await service.create_plan(plan_data)
+    await invalidate_plan_caches()
+    return plan
 
 
 @router.put("/plans/{plan_id}", response_model=BillingPlanResponse, summary="Update billing plan")
@@ -192,14 +216,9 @@ async def update_billing_plan(
     current_user: dict = Depends(get_current_user)
 ):
     """Update an existing billing plan"""
-    try:
-        return await service.update_plan(plan_id, plan_data)
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    plan = await service.update_plan(plan_id, plan_data)
+    await invalidate_plan_caches()
+    return plan
 
 
 @router.delete("/plans/{plan_id}", status_code=204, summary="Delete billing plan")
@@ -209,54 +228,48 @@ async def delete_billing_plan(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a billing plan"""
-    try:
-        success = await service.delete_plan(plan_id)
-        if not success:
-            raise HTTPException(
-                status_code=404, detail="Billing plan not found")
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    success = await service.delete_plan(plan_id)
+    if not success:
+        raise HTTPException(
+            status_code=404, detail="Billing plan not found")
+    await invalidate_plan_caches()
 
 
 # =====================================================================
 # Billing History API Endpoints
 # =====================================================================
 
-@router.get("/history", response_model=PaginatedResponse, summary="Get billing history")
+@router.get("/history", responses={200: {"model": PaginatedResponse}}, summary="Get billing history")
 async def get_billing_history(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, deprecated=True,
+                      description="Page number; deprecated in favor of cursor"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
     username: Optional[str] = Query(None, description="Filter by username"),
     plan_id: Optional[int] = Query(None, description="Filter by plan ID"),
     start_date: Optional[date] = Query(None, description="Start date filter"),
     end_date: Optional[date] = Query(None, description="End date filter"),
-    sort_field: str = Query("id", description="Sort field"),
-    sort_order: str = Query("desc", regex="^(asc|desc)$",
-                            description="Sort order"),
+    sort_field: HistorySortField = Query("id", description="Sort field"),
+    sort_order: Literal["asc", "desc"] = Query("desc", description="Sort order"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; replaces page"),
     service: BillingHistoryService = Depends(get_billing_history_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get paginated billing history with optional filtering"""
-    try:
-        return await service.get_history(
-            page=page,
-            page_size=page_size,
-            username_filter=username,
-            plan_id_filter=plan_id,
-            start_date=start_date,
-            end_date=end_date,
-            sort_field=sort_field,
-            sort_order=sort_order
-        )
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get("/history/users/{username}", response_model=List[BillingHistoryResponse], summary="Get user billing history")
+    return model_response(await service.get_history(
+        page=page,
+        page_size=page_size,
+        username_filter=username,
+        plan_id_filter=plan_id,
+        start_date=start_date,
+        end_date=end_date,
+        sort_field=sort_field,
+        sort_order=sort_order,
+        cursor=cursor
+    ))
+
+
+@router.get("/history/users/{username}", responses={200: {"model": List[BillingHistoryResponse]}}, summary="Get user billing history")
 async def get_user_billing_history(
     username: str = Path(..., description="Username"),
     limit: int = Query(
@@ -265,10 +278,8 @@ async def get_user_billing_history(
     current_user: dict = Depends(get_current_user)
 ):
     """Get billing history for a specific user"""
-    try:
-        return await service.get_user_history(username, limit)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    history = await service.get_user_history(username, limit)
+    return Response(content=_HISTORY_ITEMS.dump_json(history), media_type="application/json")
 
 
 @router.get("/history/users/{username}/statistics", response_model=Dict[str, Any], summary="Get user billing statistics")
@@ -278,10 +289,7 @@ async def get_user_billing_statistics(
     current_user: dict = Depends(get_current_user)
 ):
     """Get billing statistics for a specific user"""
-    try:
-        return await service.get_user_statistics(username)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.get_user_statistics(username)
 
 
 @router.post("/history", response_model=BillingHistoryResponse, status_code=201, summary="Create billing history record")
@@ -291,43 +299,48 @@ async def create_billing_history(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new billing history record"""
-    try:
-        return await service.create_history_record(history_data)
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.create_history_record(history_data)
+
+
+@router.post("/history/batch", response_model=List[BillingHistoryResponse], status_code=201, summary="Create billing history records in bulk")
+async def create_billing_history_batch(
+    records: List[BillingHistoryCreate] = Body(..., min_length=1, max_length=BILLING_BATCH_MAX_ROWS),
+    service: BillingHistoryService = Depends(get_billing_history_service),
+    current_user: CachedUser = Depends(get_current_user)
+):
+    """Create up to 10 000 billing history records in one transaction"""
+    return await service.create_history_records(records, created_by=current_user.username)
 
 
 # =====================================================================
 # Billing Rates API Endpoints
 # =====================================================================
 
-@router.get("/rates", response_model=PaginatedResponse, summary="Get billing rates")
+@router.get("/rates", responses={200: {"model": PaginatedResponse}}, summary="Get billing rates")
 async def get_billing_rates(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, deprecated=True,
+                      description="Page number; deprecated in favor of cursor"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
     name: Optional[str] = Query(None, description="Filter by rate name"),
     type_filter: Optional[str] = Query(
         None, alias="type", description="Filter by rate type"),
-    sort_field: str = Query("id", description="Sort field"),
-    sort_order: str = Query("asc", regex="^(asc|desc)$",
-                            description="Sort order"),
+    sort_field: RateSortField = Query("id", description="Sort field"),
+    sort_order: Literal["asc", "desc"] = Query("asc", description="Sort order"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; replaces page"),
     service: BillingRateService = Depends(get_billing_rate_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get paginated list of billing rates with optional filtering"""
-    try:
-        return await service.get_rates(
-            page=page,
-            page_size=page_size,
-            name_filter=name,
-            type_filter=type_filter,
-            sort_field=sort_field,
-            sort_order=sort_order
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return model_response(await service.get_rates(
+        page=page,
+        page_size=page_size,
+        name_filter=name,
+        type_filter=type_filter,
+        sort_field=sort_field,
+        sort_order=sort_order,
+        cursor=cursor
+    ))
 
 
 @router.post("/rates", response_model=BillingRateResponse, status_code=201, summary="Create billing rate")
@@ -337,12 +350,7 @@ async def create_billing_rate(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new billing rate"""
-    try:
-        return await service.create_rate(rate_data)
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.create_rate(rate_data)
 
 
 @router.put("/rates/{rate_id}", response_model=BillingRateResponse, summary="Update billing rate")
@@ -353,14 +361,7 @@ async def update_billing_rate(
     current_user: dict = Depends(get_current_user)
 ):
     """Update an existing billing rate"""
-    try:
-        return await service.update_rate(rate_id, rate_data)
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.update_rate(rate_id, rate_data)
 
 
 @router.delete("/rates/{rate_id}", status_code=204, summary="Delete billing rate")
@@ -370,46 +371,41 @@ async def delete_billing_rate(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a billing rate"""
-    try:
-        success = await service.delete_rate(rate_id)
-        if not success:
-            raise HTTPException(
-                status_code=404, detail="Billing rate not found")
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    success = await service.delete_rate(rate_id)
+    if not success:
+        raise HTTPException(
+            status_code=404, detail="Billing rate not found")
 
 
 # =====================================================================
 # Merchant Transactions API Endpoints
 # =====================================================================
 
-@router.get("/merchants/transactions", response_model=PaginatedResponse, summary="Get merchant transactions")
+@router.get("/merchants/transactions", responses={200: {"model": PaginatedResponse}}, summary="Get merchant transactions")
 async def get_merchant_transactions(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, deprecated=True,
+                      description="Page number; deprecated in favor of cursor"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
     username: Optional[str] = Query(None, description="Filter by username"),
     business_id: Optional[str] = Query(
         None, description="Filter by business ID"),
-    sort_field: str = Query("id", description="Sort field"),
-    sort_order: str = Query("desc", regex="^(asc|desc)$",
-                            description="Sort order"),
+    sort_field: MerchantTransactionSortField = Query("id", description="Sort field"),
+    sort_order: Literal["asc", "desc"] = Query("desc", description="Sort order"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page; replaces page"),
     service: BillingMerchantService = Depends(get_billing_merchant_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get paginated list of merchant transactions with optional filtering"""
-    try:
-        return await service.get_transactions(
-            page=page,
-            page_size=page_size,
-            username_filter=username,
-            business_id_filter=business_id,
-            sort_field=sort_field,
-            sort_order=sort_order
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return model_response(await service.get_transactions(
+        page=page,
+        page_size=page_size,
+        username_filter=username,
+        business_id_filter=business_id,
+        sort_field=sort_field,
+        sort_order=sort_order,
+        cursor=cursor
+    ))
 
 
 @router.post("/merchants/transactions", response_model=MerchantTransactionResponse, status_code=201, summary="Create merchant transaction")
@@ -419,12 +415,17 @@ async def create_merchant_transaction(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new merchant transaction"""
-    try:
-        return await service.create_transaction(transaction_data)
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.create_transaction(transaction_data)
+
+
+@router.post("/merchants/transactions/batch", response_model=List[MerchantTransactionResponse], status_code=201, summary="Create merchant transactions in bulk")
+async def create_merchant_transactions_batch(
+    records: List[MerchantTransactionCreate] = Body(..., min_length=1, max_length=BILLING_BATCH_MAX_ROWS),
+    service: BillingMerchantService = Depends(get_billing_merchant_service),
+    current_user: CachedUser = Depends(get_current_user)
+):
+    """Create up to 10 000 merchant transactions in one transaction"""
+    return await service.create_transactions(records, created_by=current_user.username)
 
 
 # =====================================================================
@@ -433,26 +434,27 @@ async def create_merchant_transaction(
 
 @router.get("/statistics", response_model=Dict[str, Any], summary="Get overall billing statistics")
 async def get_billing_statistics(
+    request: Request,
     plan_service: BillingPlanService = Depends(get_billing_plan_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get comprehensive billing system statistics"""
-    try:
-        plan_stats = await plan_service.get_plan_statistics()
+    async def build_statistics() -> Dict[str, Any]:
+        # No generation timestamp in the body: its ETag would change on
+        # every refill and pollers would never get a 304
+        return {"plans": await plan_service.get_plan_statistics()}
 
-        return {
-            "plans": plan_stats,
-            "generated_at": "2024-01-01T00:00:00Z"  # Current timestamp
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await cached_response(
+        request, "billing:statistics", BILLING_STATISTICS_CACHE_TTL,
+        build_statistics
+    )
 
 
 # =====================================================================
 # Invoice API Endpoints
 # =====================================================================
 
-@router.get("/invoices", response_model=PaginatedResponse, summary="Get invoices")
+@router.get("/invoices", responses={200: {"model": PaginatedResponse}}, summary="Get invoices")
 async def get_invoices(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
@@ -462,41 +464,34 @@ async def get_invoices(
         None, description="Filter by invoice status"),
     date_from: Optional[date] = Query(None, description="Start date filter"),
     date_to: Optional[date] = Query(None, description="End date filter"),
-    sort_field: str = Query("id", description="Sort field"),
-    sort_order: str = Query("asc", regex="^(asc|desc)$",
-                            description="Sort order"),
+    sort_field: InvoiceSortField = Query("id", description="Sort field"),
+    sort_order: Literal["asc", "desc"] = Query("asc", description="Sort order"),
     service: InvoiceService = Depends(get_invoice_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get paginated list of invoices with optional filtering"""
-    try:
-        return await service.get_invoices(
-            page=page,
-            page_size=page_size,
-            customer_filter=customer,
-            status_filter=status,
-            date_from=date_from,
-            date_to=date_to,
-            sort_field=sort_field,
-            sort_order=sort_order
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get("/invoices/{invoice_id}", response_model=InvoiceResponse, summary="Get invoice by ID")
+    return model_response(await service.get_invoices(
+        page=page,
+        page_size=page_size,
+        customer_filter=customer,
+        status_filter=status,
+        date_from=date_from,
+        date_to=date_to,
+        sort_field=sort_field,
+        sort_order=sort_order
+    ))
+
+
+@router.get("/invoices/{invoice_id}", responses={200: {"model": InvoiceResponse}}, summary="Get invoice by ID")
 async def get_invoice(
+    request: Request,
     invoice_id: int = Path(..., description="Invoice ID"),
     service: InvoiceService = Depends(get_invoice_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get a specific invoice by ID"""
-    try:
-        return await service.get_invoice(invoice_id)
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    invoice = await service.get_invoice(invoice_id)
+    return versioned_response(request, invoice, invoice.updated_at)
 
 
 @router.post("/invoices", response_model=InvoiceResponse, status_code=201, summary="Create invoice")
@@ -506,12 +501,7 @@ async def create_invoice(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new invoice"""
-    try:
-        return await service.create_invoice(invoice_data)
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.create_invoice(invoice_data)
 
 
 @router.put("/invoices/{invoice_id}", response_model=InvoiceResponse, summary="Update invoice")
@@ -522,14 +512,7 @@ async def update_invoice(
     current_user: dict = Depends(get_current_user)
 ):
     """Update an existing invoice"""
-    try:
-        return await service.update_invoice(invoice_id, invoice_data)
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.update_invoice(invoice_id, invoice_data)
 
 
 @router.delete("/invoices/{invoice_id}", summary="Delete invoice")
@@ -539,25 +522,18 @@ async def delete_invoice(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete an invoice"""
-    try:
-        result = await service.delete_invoice(invoice_id)
-        if result:
-            return {"message": f"Invoice {invoice_id} deleted successfully"}
-        else:
-            raise HTTPException(status_code=404, detail="Invoice not found")
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await service.delete_invoice(invoice_id)
+    if result:
+        return {"message": f"Invoice {invoice_id} deleted successfully"}
+    else:
+        raise HTTPException(status_code=404, detail="Invoice not found")
 
 
 # =====================================================================
 # Payment API Endpoints
 # =====================================================================
 
-@router.get("/payments", response_model=PaginatedResponse, summary="Get payments")
+@router.get("/payments", responses={200: {"model": PaginatedResponse}}, summary="Get payments")
 async def get_payments(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
@@ -566,40 +542,33 @@ async def get_payments(
         None, description="Filter by payment method"),
     status: Optional[str] = Query(
         None, description="Filter by payment status"),
-    sort_field: str = Query("id", description="Sort field"),
-    sort_order: str = Query("asc", regex="^(asc|desc)$",
-                            description="Sort order"),
+    sort_field: PaymentSortField = Query("id", description="Sort field"),
+    sort_order: Literal["asc", "desc"] = Query("asc", description="Sort order"),
     service: PaymentService = Depends(get_payment_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get paginated list of payments with optional filtering"""
-    try:
-        return await service.get_payments(
-            page=page,
-            page_size=page_size,
-            customer_filter=customer,
-            payment_method_filter=payment_method,
-            status_filter=status,
-            sort_field=sort_field,
-            sort_order=sort_order
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get("/payments/{payment_id}", response_model=PaymentResponse, summary="Get payment by ID")
+    return model_response(await service.get_payments(
+        page=page,
+        page_size=page_size,
+        customer_filter=customer,
+        payment_method_filter=payment_method,
+        status_filter=status,
+        sort_field=sort_field,
+        sort_order=sort_order
+    ))
+
+
+@router.get("/payments/{payment_id}", responses={200: {"model": PaymentResponse}}, summary="Get payment by ID")
 async def get_payment(
+    request: Request,
     payment_id: int = Path(..., description="Payment ID"),
     service: PaymentService = Depends(get_payment_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get a specific payment by ID"""
-    try:
-        return await service.get_payment(payment_id)
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    payment = await service.get_payment(payment_id)
+    return versioned_response(request, payment, payment.updated_at)
 
 
 @router.post("/payments", response_model=PaymentResponse, status_code=201, summary="Create payment")
@@ -609,12 +578,7 @@ async def create_payment(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new payment"""
-    try:
-        return await service.create_payment(payment_data)
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.create_payment(payment_data)
 
 
 @router.put("/payments/{payment_id}", response_model=PaymentResponse, summary="Update payment")
@@ -625,21 +589,14 @@ async def update_payment(
     current_user: dict = Depends(get_current_user)
 ):
     """Update an existing payment"""
-    try:
-        return await service.update_payment(payment_id, payment_data)
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.update_payment(payment_id, payment_data)
 
 
 # =====================================================================
 # Refund API Endpoints
 # =====================================================================
 
-@router.get("/refunds", response_model=PaginatedResponse, summary="Get refunds")
+@router.get("/refunds", responses={200: {"model": PaginatedResponse}}, summary="Get refunds")
 async def get_refunds(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
@@ -647,25 +604,21 @@ async def get_refunds(
     status: Optional[str] = Query(None, description="Filter by refund status"),
     payment_id: Optional[int] = Query(
         None, description="Filter by payment ID"),
-    sort_field: str = Query("id", description="Sort field"),
-    sort_order: str = Query("asc", regex="^(asc|desc)$",
-                            description="Sort order"),
+    sort_field: RefundSortField = Query("id", description="Sort field"),
+    sort_order: Literal["asc", "desc"] = Query("asc", description="Sort order"),
     service: RefundService = Depends(get_refund_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get paginated list of refunds with optional filtering"""
-    try:
-        return await service.get_refunds(
-            page=page,
-            page_size=page_size,
-            customer_filter=customer,
-            status_filter=status,
-            payment_id_filter=payment_id,
-            sort_field=sort_field,
-            sort_order=sort_order
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return model_response(await service.get_refunds(
+        page=page,
+        page_size=page_size,
+        customer_filter=customer,
+        status_filter=status,
+        payment_id_filter=payment_id,
+        sort_field=sort_field,
+        sort_order=sort_order
+    ))
 
 
 @router.post("/refunds", response_model=RefundResponse, status_code=201, summary="Create refund")
@@ -675,19 +628,14 @@ async def create_refund(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new refund"""
-    try:
-        return await service.create_refund(refund_data)
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.create_refund(refund_data)
 
 
 # =====================================================================
 # Payment Type API Endpoints
 # =====================================================================
 
-@router.get("/payment-types", response_model=PaginatedResponse, summary="Get payment types")
+@router.get("/payment-types", responses={200: {"model": PaginatedResponse}}, summary="Get payment types")
 async def get_payment_types(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
@@ -695,24 +643,20 @@ async def get_payment_types(
         None, description="Filter by payment type name"),
     active_only: bool = Query(
         False, description="Show only active payment types"),
-    sort_field: str = Query("sort_order", description="Sort field"),
-    sort_order: str = Query("asc", regex="^(asc|desc)$",
-                            description="Sort order"),
+    sort_field: PaymentTypeSortField = Query("sort_order", description="Sort field"),
+    sort_order: Literal["asc", "desc"] = Query("asc", description="Sort order"),
     service: PaymentTypeService = Depends(get_payment_type_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get paginated list of payment types with optional filtering"""
-    try:
-        return await service.get_payment_types(
-            page=page,
-            page_size=page_size,
-            name_filter=name,
-            active_only=active_only,
-            sort_field=sort_field,
-            sort_order=sort_order
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return model_response(await service.get_payment_types(
+        page=page,
+        page_size=page_size,
+        name_filter=name,
+        active_only=active_only,
+        sort_field=sort_field,
+        sort_order=sort_order
+    ))
 
 
 @router.post("/payment-types", response_model=PaymentTypeResponse, status_code=201, summary="Create payment type")
@@ -722,19 +666,14 @@ async def create_payment_type(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new payment type"""
-    try:
-        return await service.create_payment_type(payment_type_data)
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.create_payment_type(payment_type_data)
 
 
 # =====================================================================
 # POS Terminal API Endpoints
 # =====================================================================
 
-@router.get("/pos-terminals", response_model=PaginatedResponse, summary="Get POS terminals")
+@router.get("/pos-terminals", responses={200: {"model": PaginatedResponse}}, summary="Get POS terminals")
 async def get_pos_terminals(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Page size"),
@@ -743,25 +682,21 @@ async def get_pos_terminals(
     location: Optional[str] = Query(None, description="Filter by location"),
     status: Optional[str] = Query(
         None, description="Filter by terminal status"),
-    sort_field: str = Query("id", description="Sort field"),
-    sort_order: str = Query("asc", regex="^(asc|desc)$",
-                            description="Sort order"),
+    sort_field: POSSortField = Query("id", description="Sort field"),
+    sort_order: Literal["asc", "desc"] = Query("asc", description="Sort order"),
     service: POSService = Depends(get_pos_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Get paginated list of POS terminals with optional filtering"""
-    try:
-        return await service.get_terminals(
-            page=page,
-            page_size=page_size,
-            name_filter=name,
-            location_filter=location,
-            status_filter=status,
-            sort_field=sort_field,
-            sort_order=sort_order
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return model_response(await service.get_terminals(
+        page=page,
+        page_size=page_size,
+        name_filter=name,
+        location_filter=location,
+        status_filter=status,
+        sort_field=sort_field,
+        sort_order=sort_order
+    ))
 
 
 @router.post("/pos-terminals", response_model=POSResponse, status_code=201, summary="Create POS terminal")
@@ -771,12 +706,7 @@ async def create_pos_terminal(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new POS terminal"""
-    try:
-        return await service.create_terminal(pos_data)
-    except ValidationError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await service.create_terminal(pos_data)
 
 
 # =====================================================================
@@ -786,8 +716,4 @@ async def create_pos_terminal(
 @router.get("/health", summary="Billing API health check")
 async def billing_health_check():
     """Health check endpoint for billing API"""
-    return {
-        "status": "healthy",
-        "service": "billing",
-        "version": "1.0.0"
-    }
+    return Response(content=HEALTH_BODY, media_type="application/json")
@@ -9,7 +9,6 @@ cron jobs, and system messages.
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body
-from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...db.session import get_db
@@ -32,13 +31,7 @@ from ...schemas.config import (
     ConfigRestoreRequest, ConfigRestoreResponse,
     ConfigSearchParams, ConfigSearchResponse,
     ConfigStatisticsResponse, BackupStatisticsResponse,
-    SystemInfoResponse, ConfigErrorResponse
-)
-from ...core.exceptions import (
-    NotFoundError as NotFoundException,
-    ValidationError as ValidationException,
-    BusinessLogicError as ConflictException,
-    DaloRadiusException as ServiceException
+    SystemInfoResponse
 )
 
 router = APIRouter()
@@ -573,48 +566,3 @@ async def restore_config_backup(
         success_count=0,
         skip_count=0
     )
-
-
-# Error handlers
-@router.exception_handler(NotFoundException)
-async def not_found_exception_handler(request, exc):
-    return JSONResponse(
-        status_code=404,
-        content=ConfigErrorResponse(
-            error=str(exc),
-            timestamp=datetime.utcnow()
-        ).dict()
-    )
-
-
-@router.exception_handler(ValidationException)
-async def validation_exception_handler(request, exc):
-    return JSONResponse(
-        status_code=400,
-        content=ConfigErrorResponse(
-            error=str(exc),
-            timestamp=datetime.utcnow()
-        ).dict()
-    )
-
-
-@router.exception_handler(ConflictException)
-async def conflict_exception_handler(request, exc):
-    return JSONResponse(
-        status_code=409,
-        content=ConfigErrorResponse(
-            error=str(exc),
-            timestamp=datetime.utcnow()
-        ).dict()
-    )
-
-
-@router.exception_handler(ServiceException)
-async def service_exception_handler(request, exc):
-    return JSONResponse(
-        status_code=500,
-        content=ConfigErrorResponse(
-            error=str(exc),
-            timestamp=datetime.utcnow()
-        ).dict()
-    )
@@ -389,8 +389,6 @@ async def validate_coordinates(
     Returns validation result with details about any errors.
     """
     try:
-        from app.services.gis import GisService
-
         # Create a temporary service instance for validation (no DB needed)
         temp_service = type('TempService', (), {
             '_validate_coordinates': lambda self, lat, lon: -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0
@@ -5,8 +5,13 @@ This module contains FastAPI routers for graphs and dashboard functionality.
 """
 
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -16,6 +21,7 @@ from app.services.graphs import (
     GraphTemplateService,
     RealTimeStatsService
 )
+from app.repositories.graphs import DashboardWidgetRepository, GraphTemplateRepository
 from app.schemas.graphs import (
     GraphDataRequest,
     GraphDataResponse,
@@ -31,12 +37,96 @@ from app.schemas.graphs import (
 )
 from app.models.graphs import GraphType, TimeGranularity
 from app.core.auth import get_current_user
+from app.core.cache import cached_response, conditional_response, etag_for, etag_matches, invalidate
+from app.core.responses import ORJSONResponse, model_response
 from app.models.user import User
 
 
 # Create API router
-graphs_router = APIRouter(prefix="/api/graphs", tags=["graphs"])
-dashboard_router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+graphs_router = APIRouter(
+    prefix="/api/graphs", tags=["graphs"], default_response_class=ORJSONResponse)
+dashboard_router = APIRouter(
+    prefix="/api/dashboard", tags=["dashboard"], default_response_class=ORJSONResponse)
+
+# Seconds a cached graph / overview response is served before recomputing;
+# the data behind them is rolled up periodically, not per request
+GRAPH_CACHE_TTL = 30
+OVERVIEW_CACHE_TTL = 15
+# Templates change only through the endpoints below, which invalidate them
+TEMPLATES_CACHE_TTL = 300
+TEMPLATES_CACHE_NAMESPACE = "graphs:templates"
+# Real-time endpoints are polled by every open dashboard; a short TTL with
+# coalesced misses turns a burst of pollers into one query
+REALTIME_STATS_CACHE_TTL = 2
+REALTIME_TRENDS_CACHE_TTL = 10
+
+# Default look-back window for the date-ranged graphs
+_THIRTY_DAYS = timedelta(days=30)
+
+
+# The graph type catalogue is static and the same for every user: encode it
+# and hash it once at import, and let shared caches keep it
+GRAPH_TYPES_MAX_AGE = 3600
+_GRAPH_TYPES = {
+    "graph_types": [
+        {
+            "id": "overall_logins",
+            "name": "Overall Logins",
+            "description": "Login statistics over time",
+            "category": "authentication"
+        },
+        {
+            "id": "download_upload_stats",
+            "name": "Download/Upload Stats",
+            "description": "Traffic download and upload statistics",
+            "category": "traffic"
+        },
+        {
+            "id": "logged_users",
+            "name": "Logged Users",
+            "description": "User activity and growth trends",
+            "category": "users"
+        },
+        {
+            "id": "alltime_stats",
+            "name": "All-time Stats",
+            "description": "Comprehensive system overview",
+            "category": "overview"
+        },
+        {
+            "id": "top_users",
+            "name": "Top Users",
+            "description": "Top users by traffic usage",
+            "category": "traffic"
+        },
+        {
+            "id": "traffic_comparison",
+            "name": "Traffic Comparison",
+            "description": "Upload vs download comparison",
+            "category": "traffic"
+        },
+        {
+            "id": "system_performance",
+            "name": "System Performance",
+            "description": "System performance metrics",
+            "category": "system"
+        }
+    ],
+    "time_granularities": [
+        {"id": "hour", "name": "Hourly"},
+        {"id": "day", "name": "Daily"},
+        {"id": "week", "name": "Weekly"},
+        {"id": "month", "name": "Monthly"},
+        {"id": "year", "name": "Yearly"}
+    ]
+}
+_GRAPH_TYPES_BODY = orjson.dumps(_GRAPH_TYPES)
+_GRAPH_TYPES_ETAG = etag_for(_GRAPH_TYPES_BODY)
+
+
+def graph_service(db: AsyncSession = Depends(get_db)) -> GraphDataService:
+    """Provide a GraphDataService bound to the request's session"""
+    return GraphDataService(db)
 
 
 # =============================================================================
@@ -46,12 +136,11 @@ dashboard_router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 @graphs_router.post("/data", response_model=GraphDataResponse)
 async def get_graph_data(
     request: GraphDataRequest,
-    db: AsyncSession = Depends(get_db),
+    service: GraphDataService = Depends(graph_service),
     current_user: User = Depends(get_current_user)
 ):
     """Get graph data based on request parameters"""
     try:
-        service = GraphDataService(db)
         return await service.get_graph_data(request)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -62,11 +151,12 @@ async def get_graph_data(
 
 @graphs_router.get("/overall-logins", response_model=GraphDataResponse)
 async def get_overall_logins(
+    http_request: Request,
     start_date: Optional[date] = Query(None, description="Start date"),
     end_date: Optional[date] = Query(None, description="End date"),
     granularity: TimeGranularity = Query(
         TimeGranularity.DAY, description="Time granularity"),
-    db: AsyncSession = Depends(get_db),
+    service: GraphDataService = Depends(graph_service),
     current_user: User = Depends(get_current_user)
 ):
     """Get overall login statistics graph"""
@@ -74,23 +164,26 @@ async def get_overall_logins(
         graph_type="overall_logins",
         data_source="login_statistics",
         time_range=GraphQueryParams(
-            start_date=start_date or date.today() - timedelta(days=30),
+            start_date=start_date or date.today() - _THIRTY_DAYS,
             end_date=end_date or date.today(),
             granularity=granularity
         )
     )
 
-    service = GraphDataService(db)
-    return await service.get_graph_data(request)
+    return await cached_response(
+        http_request, "graphs:overall_logins", GRAPH_CACHE_TTL,
+        lambda: service.get_graph_data(request), request.dict()
+    )
 
 
 @graphs_router.get("/download-upload-stats", response_model=GraphDataResponse)
 async def get_download_upload_stats(
+    http_request: Request,
     start_date: Optional[date] = Query(None, description="Start date"),
     end_date: Optional[date] = Query(None, description="End date"),
     granularity: TimeGranularity = Query(
         TimeGranularity.DAY, description="Time granularity"),
-    db: AsyncSession = Depends(get_db),
+    service: GraphDataService = Depends(graph_service),
     current_user: User = Depends(get_current_user)
 ):
     """Get download/upload statistics graph"""
@@ -98,21 +191,24 @@ async def get_download_upload_stats(
         graph_type="download_upload_stats",
         data_source="traffic_statistics",
         time_range=GraphQueryParams(
-            start_date=start_date or date.today() - timedelta(days=30),
+            start_date=start_date or date.today() - _THIRTY_DAYS,
             end_date=end_date or date.today(),
             granularity=granularity
         )
     )
 
-    service = GraphDataService(db)
-    return await service.get_graph_data(request)
+    return await cached_response(
+        http_request, "graphs:download_upload_stats", GRAPH_CACHE_TTL,
+        lambda: service.get_graph_data(request), request.dict()
+    )
 
 
 @graphs_router.get("/logged-users", response_model=GraphDataResponse)
 async def get_logged_users(
+    http_request: Request,
     start_date: Optional[date] = Query(None, description="Start date"),
     end_date: Optional[date] = Query(None, description="End date"),
-    db: AsyncSession = Depends(get_db),
+    service: GraphDataService = Depends(graph_service),
     current_user: User = Depends(get_current_user)
 ):
     """Get logged users activity graph"""
@@ -120,40 +216,40 @@ async def get_logged_users(
         graph_type="logged_users",
         data_source="user_statistics",
         time_range=GraphQueryParams(
-            start_date=start_date or date.today() - timedelta(days=30),
+            start_date=start_date or date.today() - _THIRTY_DAYS,
             end_date=end_date or date.today(),
             granularity=TimeGranularity.DAY
         )
     )
 
-    service = GraphDataService(db)
-    return await service.get_graph_data(request)
+    return await cached_response(
+        http_request, "graphs:logged_users", GRAPH_CACHE_TTL,
+        lambda: service.get_graph_data(request), request.dict()
+    )
 
 
 @graphs_router.get("/alltime-stats", response_model=GraphDataResponse)
 async def get_alltime_stats(
-    db: AsyncSession = Depends(get_db),
+    http_request: Request,
+    service: GraphDataService = Depends(graph_service),
     current_user: User = Depends(get_current_user)
 ):
     """Get all-time statistics overview"""
-    request = GraphDataRequest(
-        graph_type="alltime_stats",
-        data_source="aggregate_statistics",
-        time_range=GraphQueryParams()
+    return await cached_response(
+        http_request, "graphs:alltime_stats", GRAPH_CACHE_TTL,
+        service.alltime_stats
     )
 
-    service = GraphDataService(db)
-    return await service.get_graph_data(request)
-
 
 @graphs_router.get("/top-users", response_model=GraphDataResponse)
 async def get_top_users(
+    http_request: Request,
     start_date: Optional[date] = Query(None, description="Start date"),
     end_date: Optional[date] = Query(None, description="End date"),
     limit: int = Query(10, ge=1, le=100, description="Number of top users"),
     traffic_type: str = Query(
         "total", description="Traffic type: total, upload, download"),
-    db: AsyncSession = Depends(get_db),
+    service: GraphDataService = Depends(graph_service),
     current_user: User = Depends(get_current_user)
 ):
     """Get top users by traffic"""
@@ -161,22 +257,25 @@ async def get_top_users(
         graph_type="top_users",
         data_source="traffic_statistics",
         time_range=GraphQueryParams(
-            start_date=start_date or date.today() - timedelta(days=30),
+            start_date=start_date or date.today() - _THIRTY_DAYS,
             end_date=end_date or date.today(),
             limit=limit,
             filters={"traffic_type": traffic_type}
         )
     )
 
-    service = GraphDataService(db)
-    return await service.get_graph_data(request)
+    return await cached_response(
+        http_request, "graphs:top_users", GRAPH_CACHE_TTL,
+        lambda: service.get_graph_data(request), request.dict()
+    )
 
 
 @graphs_router.get("/traffic-comparison", response_model=GraphDataResponse)
 async def get_traffic_comparison(
+    http_request: Request,
     start_date: Optional[date] = Query(None, description="Start date"),
     end_date: Optional[date] = Query(None, description="End date"),
-    db: AsyncSession = Depends(get_db),
+    service: GraphDataService = Depends(graph_service),
     current_user: User = Depends(get_current_user)
 ):
     """Get traffic comparison (upload vs download)"""
@@ -184,20 +283,23 @@ async def get_traffic_comparison(
         graph_type="traffic_comparison",
         data_source="traffic_statistics",
         time_range=GraphQueryParams(
-            start_date=start_date or date.today() - timedelta(days=30),
+            start_date=start_date or date.today() - _THIRTY_DAYS,
             end_date=end_date or date.today(),
             granularity=TimeGranularity.DAY
         )
     )
 
-    service = GraphDataService(db)
-    return await service.get_graph_data(request)
+    return await cached_response(
+        http_request, "graphs:traffic_comparison", GRAPH_CACHE_TTL,
+        lambda: service.get_graph_data(request), request.dict()
+    )
 
 
 @graphs_router.get("/system-performance", response_model=GraphDataResponse)
 async def get_system_performance(
+    http_request: Request,
     hours: int = Query(24, ge=1, le=168, description="Hours to show"),
-    db: AsyncSession = Depends(get_db),
+    service: GraphDataService = Depends(graph_service),
     current_user: User = Depends(get_current_user)
 ):
     """Get system performance metrics"""
@@ -209,8 +311,10 @@ async def get_system_performance(
         )
     )
 
-    service = GraphDataService(db)
-    return await service.get_graph_data(request)
+    return await cached_response(
+        http_request, "graphs:system_performance", GRAPH_CACHE_TTL,
+        lambda: service.get_graph_data(request), request.dict()
+    )
 
 
 # =============================================================================
@@ -219,12 +323,16 @@ async def get_system_performance(
 
 @dashboard_router.get("/overview", response_model=DashboardOverview)
 async def get_dashboard_overview(
+    http_request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get comprehensive dashboard overview"""
     service = DashboardService(db)
-    return await service.get_dashboard_overview()
+    return await cached_response(
+        http_request, "dashboard:overview", OVERVIEW_CACHE_TTL,
+        service.get_dashboard_overview
+    )
 
 
 @dashboard_router.get("/widgets/{dashboard_id}")
@@ -241,6 +349,13 @@ async def get_dashboard_widgets(
     )
 
 
+async def _raise_widget_not_writable(repo, widget_id: int) -> None:
+    """Raise 404 or 403 after an owner-scoped widget write matched no row"""
+    if not await repo.exists(widget_id):
+        raise HTTPException(status_code=404, detail="Widget not found")
+    raise HTTPException(status_code=403, detail="Permission denied")
+
+
 @dashboard_router.post("/widgets", response_model=DashboardWidgetResponse)
 async def create_dashboard_widget(
     widget: DashboardWidgetCreate,
@@ -248,8 +363,6 @@ async def create_dashboard_widget(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new dashboard widget"""
-    from app.repositories.graphs import DashboardWidgetRepository
-
     widget_data = widget.dict()
     widget_data['created_by'] = current_user.username
 
@@ -266,27 +379,19 @@ async def update_dashboard_widget(
     current_user: User = Depends(get_current_user)
 ):
     """Update dashboard widget"""
-    from app.repositories.graphs import DashboardWidgetRepository
-
     repo = DashboardWidgetRepository(db)
 
-    # Check if widget exists and user has permission
-    existing_widget = await repo.get_by_id(widget_id)
-    if not existing_widget:
-        raise HTTPException(status_code=404, detail="Widget not found")
-
-    if existing_widget.created_by != current_user.username:
-        raise HTTPException(status_code=403, detail="Permission denied")
-
-    # Update widget
     update_data = widget_update.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        if hasattr(existing_widget, key):
-            setattr(existing_widget, key, value)
+    if not update_data:
+        widget = await repo.get_by_id(widget_id)
+        if widget and widget.created_by == current_user.username:
+            return widget
+    else:
+        widget = await repo.update_owned(widget_id, current_user.username, **update_data)
+        if widget:
+            return widget
 
-    await db.commit()
-    await db.refresh(existing_widget)
-    return existing_widget
+    await _raise_widget_not_writable(repo, widget_id)
 
 
 @dashboard_router.put("/widgets/{widget_id}/position")
@@ -298,19 +403,10 @@ async def update_widget_position(
     current_user: User = Depends(get_current_user)
 ):
     """Update widget position"""
-    from app.repositories.graphs import DashboardWidgetRepository
-
     repo = DashboardWidgetRepository(db)
 
-    # Check permission
-    widget = await repo.get_by_id(widget_id)
-    if not widget:
-        raise HTTPException(status_code=404, detail="Widget not found")
-
-    if widget.created_by != current_user.username:
-        raise HTTPException(status_code=403, detail="Permission denied")
-
-    updated_widget = await repo.update_position(widget_id, position_x, position_y)
+    if not await repo.update_position(widget_id, current_user.username, position_x, position_y):
+        await _raise_widget_not_writable(repo, widget_id)
     return {"message": "Widget position updated", "widget_id": widget_id}
 
 
@@ -323,19 +419,10 @@ async def update_widget_size(
     current_user: User = Depends(get_current_user)
 ):
     """Update widget size"""
-    from app.repositories.graphs import DashboardWidgetRepository
-
     repo = DashboardWidgetRepository(db)
 
-    # Check permission
-    widget = await repo.get_by_id(widget_id)
-    if not widget:
-        raise HTTPException(status_code=404, detail="Widget not found")
-
-    if widget.created_by != current_user.username:
-        raise HTTPException(status_code=403, detail="Permission denied")
-
-    updated_widget = await repo.update_size(widget_id, width, height)
+    if not await repo.update_size(widget_id, current_user.username, width, height):
+        await _raise_widget_not_writable(repo, widget_id)
     return {"message": "Widget size updated", "widget_id": widget_id}
 
 
@@ -346,23 +433,11 @@ async def delete_dashboard_widget(
     current_user: User = Depends(get_current_user)
 ):
     """Delete dashboard widget"""
-    from app.repositories.graphs import DashboardWidgetRepository
-
     repo = DashboardWidgetRepository(db)
 
-    # Check permission
-    widget = await repo.get_by_id(widget_id)
-    if not widget:
-        raise HTTPException(status_code=404, detail="Widget not found")
-
-    if widget.created_by != current_user.username:
-        raise HTTPException(status_code=403, detail="Permission denied")
-
-    success = await repo.delete(widget_id)
-    if success:
-        return {"message": "Widget deleted", "widget_id": widget_id}
-    else:
-        raise HTTPException(status_code=500, detail="Failed to delete widget")
+    if not await repo.delete(widget_id, current_user.username):
+        await _raise_widget_not_writable(repo, widget_id)
+    return {"message": "Widget deleted", "widget_id": widget_id}
 
 
 # =============================================================================
@@ -371,13 +446,17 @@ async def delete_dashboard_widget(
 
 @graphs_router.get("/templates", response_model=List[Dict[str, Any]])
 async def get_graph_templates(
+    http_request: Request,
     category: Optional[str] = Query(None, description="Template category"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get available graph templates"""
     service = GraphTemplateService(db)
-    return await service.get_available_templates(category)
+    return await cached_response(
+        http_request, TEMPLATES_CACHE_NAMESPACE, TEMPLATES_CACHE_TTL,
+        lambda: service.get_available_templates(category), {"category": category}
+    )
 
 
 @graphs_router.post("/templates", response_model=Dict[str, Any])
@@ -387,13 +466,12 @@ async def create_graph_template(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new graph template"""
-    from app.repositories.graphs import GraphTemplateRepository
-
     template_data = template.dict()
     template_data['created_by'] = current_user.username
 
     repo = GraphTemplateRepository(db)
     new_template = await repo.create(**template_data)
+    await invalidate(TEMPLATES_CACHE_NAMESPACE)
 
     return {
         'id': new_template.id,
@@ -405,22 +483,37 @@ async def create_graph_template(
     }
 
 
-@graphs_router.get("/templates/{template_id}", response_model=GraphTemplateResponse)
+@graphs_router.get("/templates/{template_id}", responses={200: {"model": GraphTemplateResponse}})
 async def get_graph_template(
+    http_request: Request,
     template_id: int = Path(..., description="Template ID"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get specific graph template"""
-    from app.repositories.graphs import GraphTemplateRepository
-
     repo = GraphTemplateRepository(db)
     template = await repo.get_by_id(template_id)
 
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
 
-    return template
+    # updated_at changes on every write, so it versions the representation;
+    # editors re-fetching an unchanged template get a bodyless 304
+    etag = f'W/"{template.id}-{int(template.updated_at.timestamp() * 1_000_000)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(http_request, etag):
+        return Response(status_code=304, headers=headers)
+
+    response = model_response(GraphTemplateResponse.model_validate(template))
+    response.headers.update(headers)
+    return response
+
+
+async def _raise_template_not_writable(repo, template_id: int) -> None:
+    """Raise 404 or 403 after an owner-scoped template write matched no row"""
+    if not await repo.exists(template_id):
+        raise HTTPException(status_code=404, detail="Template not found")
+    raise HTTPException(status_code=403, detail="Permission denied")
 
 
 @graphs_router.put("/templates/{template_id}", response_model=GraphTemplateResponse)
@@ -431,26 +524,21 @@ async def update_graph_template(
     current_user: User = Depends(get_current_user)
 ):
     """Update graph template"""
-    from app.repositories.graphs import GraphTemplateRepository
-
     repo = GraphTemplateRepository(db)
 
-    # Check if template exists and user has permission
-    existing_template = await repo.get_by_id(template_id)
-    if not existing_template:
-        raise HTTPException(status_code=404, detail="Template not found")
-
-    if existing_template.created_by != current_user.username:
-        raise HTTPException(status_code=403, detail="Permission denied")
-
-    # Update template
     update_data = template_update.dict(exclude_unset=True)
-    updated_template = await repo.update(template_id, **update_data)
-
+    if not update_data:
+        template = await repo.get_by_id(template_id)
+        if template and template.created_by == current_user.username:
+            return template
+        await _raise_template_not_writable(repo, template_id)
+
+    updated_template = await repo.update_owned(
+        template_id, current_user.username, **update_data)
     if not updated_template:
-        raise HTTPException(
-            status_code=500, detail="Failed to update template")
+        await _raise_template_not_writable(repo, template_id)
 
+    await invalidate(TEMPLATES_CACHE_NAMESPACE)
     return updated_template
 
 
@@ -460,82 +548,153 @@ async def update_graph_template(
 
 @graphs_router.get("/realtime/stats")
 async def get_realtime_stats(
+    http_request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get real-time system statistics"""
     service = RealTimeStatsService(db)
-    return await service.get_live_stats()
+    return await cached_response(
+        http_request, "graphs:realtime_stats", REALTIME_STATS_CACHE_TTL,
+        service.get_live_stats, coalesce=True
+    )
 
 
 @graphs_router.get("/realtime/trends")
 async def get_realtime_trends(
+    http_request: Request,
     hours: int = Query(24, ge=1, le=168, description="Hours to show"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get real-time hourly trends"""
     service = RealTimeStatsService(db)
-    return await service.get_hourly_trends(hours)
+    return await cached_response(
+        http_request, "graphs:realtime_trends", REALTIME_TRENDS_CACHE_TTL,
+        lambda: service.get_hourly_trends(hours), {"hours": hours}, coalesce=True
+    )
 
 
 # =============================================================================
 # Data Export Endpoints
 # =============================================================================
 
+def _export_request(
+    graph_type: str, start_date: Optional[date], end_date: Optional[date]
+) -> GraphDataRequest:
+    """Resolve the export date defaults against today and build the request"""
+    today = date.today()
+    return _build_export_request(graph_type, start_date or today - _THIRTY_DAYS, end_date or today)
+
+
+@lru_cache(maxsize=256)
+def _build_export_request(graph_type: str, start_date: date, end_date: date) -> GraphDataRequest:
+    """
+    Build the export request for explicit dates
+
+    Dashboards export the same few ranges over and over, so the validated
+    request is reused. Callers only read it.
+    """
+    return GraphDataRequest(
+        graph_type=graph_type,
+        data_source=f"{graph_type}_statistics",
+        time_range=GraphQueryParams(start_date=start_date, end_date=end_date)
+    )
+
+
 @graphs_router.get("/export/csv")
 async def export_graph_data_csv(
     graph_type: str = Query(..., description="Graph type"),
     start_date: Optional[date] = Query(None, description="Start date"),
     end_date: Optional[date] = Query(None, description="End date"),
-    db: AsyncSession = Depends(get_db),
+    service: GraphDataService = Depends(graph_service),
     current_user: User = Depends(get_current_user)
 ):
     """Export graph data as CSV"""
-    from fastapi.responses import StreamingResponse
-    import csv
-    import io
+    # Rows are streamed after the headers go out, so reject unknown types first
+    if graph_type not in GraphDataService.GRAPH_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported graph type: {graph_type}")
 
-    # Get graph data
-    request = GraphDataRequest(
-        graph_type=graph_type,
-        data_source=f"{graph_type}_statistics",
-        time_range=GraphQueryParams(
-            start_date=start_date or date.today() - timedelta(days=30),
-            end_date=end_date or date.today()
-        )
+    request = _export_request(graph_type, start_date, end_date)
+
+    return StreamingResponse(
+        _buffered(_iter_csv_rows(service.stream_graph_rows(request)), EXPORT_CHUNK_BYTES),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f"attachment; filename={graph_type}_export.csv"}
     )
 
-    service = GraphDataService(db)
-    graph_data = await service.get_graph_data(request)
 
-    # Convert to CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
+_CSV_SPECIAL = frozenset(',"\r\n')
+# Export rows are encoded in batches on the threadpool, so the event loop
+# only collects rows from the cursor and writes bytes to the socket
+EXPORT_ROWS_PER_CHUNK = 500
+# Encoded batches are merged until they reach this size before being sent,
+# so gzip compresses full-sized blocks instead of many small flushes
+EXPORT_CHUNK_BYTES = 16 * 1024
+
+
+def _csv_field(value: Any) -> str:
+    """Format one text cell, quoting it only when it needs to be"""
+    text = '' if value is None else str(value)
+    if _CSV_SPECIAL.isdisjoint(text):
+        return text
+    return '"' + text.replace('"', '""') + '"'
+
+
+async def _buffered(chunks: AsyncIterator[bytes], min_size: int) -> AsyncIterator[bytes]:
+    """Merge streamed chunks into chunks of at least ``min_size`` bytes"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= min_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _batched(rows: AsyncIterator[Tuple[str, Tuple]], size: int) -> AsyncIterator[List]:
+    """Group streamed export rows into lists of up to ``size`` rows"""
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _encode_csv_batch(batch: List[Tuple[str, Tuple]], header: Optional[Tuple] = None) -> bytes:
+    """Encode export rows, preceded by ``header`` when given, as CRLF-terminated CSV"""
+    # Labels and header names are free text and get csv quoting; row values
+    # are numbers (or '' for gaps) and are joined as-is instead of paying
+    # csv.writer's per-cell quoting scan
+    lines = [','.join(_csv_field(cell) for cell in header)] if header else []
+    lines.extend(
+        _csv_field(label) + ''.join(',' if value is None else f',{value}' for value in values)
+        for label, values in batch
+    )
+    lines.append('')
+    return '\r\n'.join(lines).encode('utf-8')
 
-    # Write headers
-    if graph_data.data.get('labels') and graph_data.data.get('datasets'):
-        headers = ['Date'] + [dataset['label']
-                              for dataset in graph_data.data['datasets']]
-        writer.writerow(headers)
 
-        # Write data rows
-        labels = graph_data.data['labels']
-        for i, label in enumerate(labels):
-            row = [label]
-            for dataset in graph_data.data['datasets']:
-                row.append(dataset['data'][i] if i <
-                           len(dataset['data']) else '')
-            writer.writerow(row)
+async def _iter_csv_rows(rows: AsyncIterator[Tuple[str, Tuple]]) -> AsyncIterator[bytes]:
+    """Encode streamed export rows as CSV, EXPORT_ROWS_PER_CHUNK rows per chunk"""
+    rows = rows.__aiter__()
+    try:
+        label, names = await rows.__anext__()
+    except StopAsyncIteration:
+        return
+    header = (label, *names)
 
-    output.seek(0)
+    async for batch in _batched(rows, EXPORT_ROWS_PER_CHUNK):
+        yield await run_in_threadpool(_encode_csv_batch, batch, header)
+        header = None
 
-    return StreamingResponse(
-        io.BytesIO(output.getvalue().encode('utf-8')),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename={graph_type}_export.csv"}
-    )
+    if header:
+        yield _encode_csv_batch([], header)
 
 
 @graphs_router.get("/export/json")
@@ -543,94 +702,61 @@ async def export_graph_data_json(
     graph_type: str = Query(..., description="Graph type"),
     start_date: Optional[date] = Query(None, description="Start date"),
     end_date: Optional[date] = Query(None, description="End date"),
-    db: AsyncSession = Depends(get_db),
+    service: GraphDataService = Depends(graph_service),
     current_user: User = Depends(get_current_user)
 ):
-    """Export graph data as JSON"""
-    from fastapi.responses import JSONResponse
-
-    # Get graph data
-    request = GraphDataRequest(
-        graph_type=graph_type,
-        data_source=f"{graph_type}_statistics",
-        time_range=GraphQueryParams(
-            start_date=start_date or date.today() - timedelta(days=30),
-            end_date=end_date or date.today()
-        )
-    )
+    """Export graph data as a JSON array with one object per row"""
+    # Rows are streamed after the headers go out, so reject unknown types first
+    if graph_type not in GraphDataService.GRAPH_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported graph type: {graph_type}")
 
-    service = GraphDataService(db)
-    graph_data = await service.get_graph_data(request)
+    request = _export_request(graph_type, start_date, end_date)
 
-    return JSONResponse(
-        content=graph_data.dict(),
+    return StreamingResponse(
+        _buffered(_iter_json_rows(service.stream_graph_rows(request)), EXPORT_CHUNK_BYTES),
+        media_type="application/json",
         headers={
             "Content-Disposition": f"attachment; filename={graph_type}_export.json"}
     )
 
 
+def _encode_json_batch(columns: Tuple, batch: List[Tuple[str, Tuple]], separator: bytes) -> bytes:
+    """Encode export rows as comma-separated JSON objects keyed by ``columns``"""
+    return separator + b','.join(
+        orjson.dumps(dict(zip(columns, (label, *values))), default=jsonable_encoder)
+        for label, values in batch
+    )
+
+
+async def _iter_json_rows(rows: AsyncIterator[Tuple[str, Tuple]]) -> AsyncIterator[bytes]:
+    """Encode streamed export rows as a JSON array of objects keyed by the header"""
+    rows = rows.__aiter__()
+    try:
+        label, names = await rows.__anext__()
+    except StopAsyncIteration:
+        yield b'[]'
+        return
+    columns = (label, *names)
+
+    separator = b'['
+    async for batch in _batched(rows, EXPORT_ROWS_PER_CHUNK):
+        yield await run_in_threadpool(_encode_json_batch, columns, batch, separator)
+        separator = b','
+    yield b']' if separator == b',' else b'[]'
+
+
 # =============================================================================
 # Graph Types and Metadata Endpoints
 # =============================================================================
 
 @graphs_router.get("/types")
 async def get_available_graph_types(
+    http_request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Get available graph types"""
-    return {
-        "graph_types": [
-            {
-                "id": "overall_logins",
-                "name": "Overall Logins",
-                "description": "Login statistics over time",
-                "category": "authentication"
-            },
-            {
-                "id": "download_upload_stats",
-                "name": "Download/Upload Stats",
-                "description": "Traffic download and upload statistics",
-                "category": "traffic"
-            },
-            {
-                "id": "logged_users",
-                "name": "Logged Users",
-                "description": "User activity and growth trends",
-                "category": "users"
-            },
-            {
-                "id": "alltime_stats",
-                "name": "All-time Stats",
-                "description": "Comprehensive system overview",
-                "category": "overview"
-            },
-            {
-                "id": "top_users",
-                "name": "Top Users",
-                "description": "Top users by traffic usage",
-                "category": "traffic"
-            },
-            {
-                "id": "traffic_comparison",
-                "name": "Traffic Comparison",
-                "description": "Upload vs download comparison",
-                "category": "traffic"
-            },
-            {
-                "id": "system_performance",
-                "name": "System Performance",
-                "description": "System performance metrics",
-                "category": "system"
-            }
-        ],
-        "time_granularities": [
-            {"id": "hour", "name": "Hourly"},
-            {"id": "day", "name": "Daily"},
-            {"id": "week", "name": "Weekly"},
-            {"id": "month", "name": "Monthly"},
-            {"id": "year", "name": "Yearly"}
-        ]
-    }
+    return conditional_response(
+        http_request, _GRAPH_TYPES_BODY, GRAPH_TYPES_MAX_AGE, _GRAPH_TYPES_ETAG, public=True)
 
 
 # Register routers
@@ -4,6 +4,8 @@ Notification System API Routes
 Provides notification management, templates, and delivery services for daloRADIUS system.
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
@@ -485,7 +487,6 @@ async def process_notification(notification: Dict[str, Any], notification_type:
     """
     try:
         # Simulate processing time
-        import asyncio
         await asyncio.sleep(1)
 
         # In a real implementation, this would:
@@ -11,7 +11,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from ...db.session import get_db
-from ...repositories.radius import RadcheckRepository, RadreplyRepository
+from ...repositories.radius import (
+    RadcheckRepository, RadreplyRepository, GroupCheckRepository, GroupReplyRepository
+)
 from ...schemas.radius import (
     RadcheckCreate, RadcheckUpdate, RadcheckResponse,
     RadreplyCreate, RadreplyUpdate, RadreplyResponse,
@@ -474,7 +476,6 @@ async def list_group_check_attributes(
     """
     Get list of RadGroupCheck attributes with filtering and pagination
     """
-    from ...repositories.radius import GroupCheckRepository
 
     repo = GroupCheckRepository(db)
 
@@ -509,7 +510,6 @@ async def create_group_check_attribute(
     """
     Create a new RadGroupCheck attribute
     """
-    from ...repositories.radius import GroupCheckRepository
 
     repo = GroupCheckRepository(db)
 
@@ -531,7 +531,6 @@ async def get_group_check_attribute(
     """
     Get a specific RadGroupCheck attribute by ID
     """
-    from ...repositories.radius import GroupCheckRepository
 
     repo = GroupCheckRepository(db)
     attribute = await repo.get(attribute_id)
@@ -554,7 +553,6 @@ async def update_group_check_attribute(
     """
     Update a RadGroupCheck attribute
     """
-    from ...repositories.radius import GroupCheckRepository
 
     repo = GroupCheckRepository(db)
 
@@ -579,7 +577,6 @@ async def delete_group_check_attribute(
     """
     Delete a RadGroupCheck attribute
     """
-    from ...repositories.radius import GroupCheckRepository
 
     repo = GroupCheckRepository(db)
 
@@ -608,7 +605,6 @@ async def list_group_reply_attributes(
     """
     Get list of RadGroupReply attributes with filtering and pagination
     """
-    from ...repositories.radius import GroupReplyRepository
 
     repo = GroupReplyRepository(db)
 
@@ -643,7 +639,6 @@ async def create_group_reply_attribute(
     """
     Create a new RadGroupReply attribute
     """
-    from ...repositories.radius import GroupReplyRepository
 
     repo = GroupReplyRepository(db)
 
@@ -665,7 +660,6 @@ async def get_group_reply_attribute(
     """
     Get a specific RadGroupReply attribute by ID
     """
-    from ...repositories.radius import GroupReplyRepository
 
     repo = GroupReplyRepository(db)
     attribute = await repo.get(attribute_id)
@@ -688,7 +682,6 @@ async def update_group_reply_attribute(
     """
     Update a RadGroupReply attribute
     """
-    from ...repositories.radius import GroupReplyRepository
 
     repo = GroupReplyRepository(db)
 
@@ -713,7 +706,6 @@ async def delete_group_reply_attribute(
     """
     Delete a RadGroupReply attribute
     """
-    from ...repositories.radius import GroupReplyRepository
 
     repo = GroupReplyRepository(db)
 
@@ -738,7 +730,6 @@ async def list_groups(
     """
     Get list of all RADIUS groups (from both check and reply tables)
     """
-    from ...repositories.radius import GroupCheckRepository, GroupReplyRepository
 
     check_repo = GroupCheckRepository(db)
     reply_repo = GroupReplyRepository(db)
@@ -764,7 +755,6 @@ async def get_group_attributes(
     """
     Get all attributes (check and reply) for a specific group
     """
-    from ...repositories.radius import GroupCheckRepository, GroupReplyRepository
 
     check_repo = GroupCheckRepository(db)
     reply_repo = GroupReplyRepository(db)
@@ -789,7 +779,6 @@ async def delete_group_all_attributes(
     """
     Delete all attributes (check and reply) for a specific group
     """
-    from ...repositories.radius import GroupCheckRepository, GroupReplyRepository
 
     check_repo = GroupCheckRepository(db)
     reply_repo = GroupReplyRepository(db)
@@ -814,7 +803,6 @@ async def get_group_statistics(
     """
     Get statistics about RADIUS groups
     """
-    from ...repositories.radius import GroupCheckRepository, GroupReplyRepository
 
     check_repo = GroupCheckRepository(db)
     reply_repo = GroupReplyRepository(db)
@@ -0,0 +1,201 @@
+"""
+Response Cache Module
+
+This module provides a small Redis-backed cache for read-heavy GET
+endpoints. Cached bodies are served with an ETag so polling clients can
+revalidate with If-None-Match and get a bodyless 304 back.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+import redis.asyncio as redis
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_client: Optional[redis.Redis] = None
+
+# Single-flight: how long a computing worker holds the lock, and how long
+# the others wait for its result before computing it themselves
+LOCK_TTL_MS = 5000
+LOCK_POLL_INTERVAL = 0.05
+LOCK_POLL_ATTEMPTS = 20
+
+
+def get_redis() -> redis.Redis:
+    """
+    Get the shared Redis client, created on first use
+
+    Returns:
+        redis.Redis: Async Redis client
+    """
+    global _client
+    if _client is None:
+        _client = redis.from_url(settings.REDIS_URL, password=settings.REDIS_PASSWORD)
+    return _client
+
+
+def _digest(data: bytes) -> str:
+    """Short stable digest used for cache keys and ETags"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def cache_key(namespace: str, params: Dict[str, Any]) -> str:
+    """
+    Build the cache key for a namespace and its request parameters
+
+    Args:
+        namespace: Endpoint namespace, e.g. ``graphs:top_users``
+        params: Parameters the response depends on
+
+    Returns:
+        str: Redis key
+    """
+    encoded = json.dumps(params, sort_keys=True, default=str).encode()
+    return f"cache:{namespace}:{_digest(encoded)}"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against ``etag`` (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates or "*" in candidates
+
+
+async def cached_response(
+    request: Request,
+    namespace: str,
+    ttl: int,
+    producer: Callable[[], Awaitable[Any]],
+    params: Optional[Dict[str, Any]] = None,
+    coalesce: bool = False,
+) -> Response:
+    """
+    Serve a JSON response from Redis, computing it on a miss
+
+    Redis errors are logged and the response is computed as if the cache
+    were empty, so an unavailable Redis never fails the request.
+
+    With ``coalesce``, concurrent misses on the same key are collapsed: the
+    worker that takes a SET NX lock computes the body, the others poll for
+    it every LOCK_POLL_INTERVAL seconds and only compute it themselves if
+    it has not appeared after LOCK_POLL_ATTEMPTS polls. Use it for short
+    TTLs on endpoints many clients poll at once.
+
+    Args:
+        request: Incoming request, read for If-None-Match
+        namespace: Endpoint namespace used in the cache key
+        ttl: Seconds the cached body stays valid
+        producer: Coroutine factory building the response payload
+        params: Parameters the response depends on
+        coalesce: Let one worker compute a missing body while others wait
+
+    Returns:
+        Response: 200 with the JSON body, or 304 when the ETag matches
+    """
+    key = cache_key(namespace, params or {})
+    client = get_redis()
+
+    body = None
+    try:
+        body = await client.get(key)
+        if body is None and coalesce:
+            body = await _wait_for_fill(client, key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache read failed for {namespace}: {str(e)}")
+
+    if body is None:
+        # orjson serializes dicts, lists and datetimes natively; only values
+        # it does not know (Pydantic models, Decimal) go through FastAPI's encoder
+        body = orjson.dumps(await producer(), default=jsonable_encoder)
+        try:
+            await client.set(key, body, ex=ttl)
+            if coalesce:
+                await client.delete(f"{key}:lock")
+        except redis.RedisError as e:
+            logger.warning(f"Cache write failed for {namespace}: {str(e)}")
+
+    return conditional_response(request, body, ttl)
+
+
+async def _wait_for_fill(client: redis.Redis, key: str) -> Optional[bytes]:
+    """
+    Take the fill lock for ``key``, or wait for the worker holding it
+
+    Returns:
+        Optional[bytes]: The body another worker stored, or None when the
+        caller holds the lock (or gave up waiting) and must compute it
+    """
+    if await client.set(f"{key}:lock", b"1", nx=True, px=LOCK_TTL_MS):
+        return None
+    for _ in range(LOCK_POLL_ATTEMPTS):
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        body = await client.get(key)
+        if body is not None:
+            return body
+    return None
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag for a response body"""
+    return f'"{_digest(body)}"'
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    max_age: int,
+    etag: Optional[str] = None,
+    public: bool = False,
+) -> Response:
+    """
+    Serve a JSON body with an ETag, or a bodyless 304 when the client
+    already holds it
+
+    Args:
+        request: Incoming request, read for If-None-Match
+        body: Encoded JSON body
+        max_age: Seconds clients may reuse the body without revalidating
+        etag: Precomputed ETag for ``body``, computed when omitted
+        public: Let shared caches store the body; only for bodies that are
+            the same for every user
+
+    Returns:
+        Response: 200 with the body, or 304 when the ETag matches
+    """
+    etag = etag or etag_for(body)
+    scope = "public" if public else "private"
+    headers = {"ETag": etag, "Cache-Control": f"{scope}, max-age={max_age}"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def invalidate(namespace: str) -> None:
+    """
+    Drop every cached response stored under ``namespace``
+
+    Keys are found with SCAN rather than KEYS so Redis is never blocked
+    walking the whole keyspace. Failures are logged; the entries then
+    expire with their TTL.
+
+    Args:
+        namespace: Endpoint namespace passed to cached_response
+    """
+    client = get_redis()
+    try:
+        keys = [key async for key in client.scan_iter(match=f"cache:{namespace}:*", count=500)]
+        if keys:
+            await client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache invalidation failed for {namespace}: {str(e)}")
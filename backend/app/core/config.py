@@ -67,6 +67,10 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PASSWORD: Optional[str] = None
 
+    # Response Compression
+    GZIP_MINIMUM_SIZE: int = 1024  # bytes; smaller responses are sent as-is
+    GZIP_COMPRESS_LEVEL: int = 5
+
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
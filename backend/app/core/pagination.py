@@ -4,7 +4,9 @@ Pagination Support
 This module provides pagination utilities for API responses.
 """
 
-from typing import Generic, TypeVar, List
+import base64
+import json
+from typing import Any, Generic, TypeVar, List, Sequence
 from pydantic import BaseModel, Field
 from fastapi import Query
 
@@ -45,3 +47,26 @@ def create_pagination_params(
 ) -> PaginationParams:
     """FastAPI dependency for pagination parameters"""
     return PaginationParams(page=page, size=size)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    raw = json.dumps(list(values), default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,39 @@
+"""
+Response Classes
+
+This module provides the JSON response helpers used across the API.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson
+
+    Dicts, lists, datetimes and UUIDs are serialized natively in C. Values
+    orjson does not know (Pydantic models, Decimal, enums with non-JSON
+    values) go through FastAPI's jsonable_encoder, so endpoints can return
+    raw service payloads without encoding them first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_response(model: BaseModel) -> Response:
+    """
+    Serialize an already-built response model in one pydantic-core pass
+
+    Hot read endpoints return this and document their schema with
+    ``responses={200: {"model": ...}}`` instead of ``response_model``, which
+    would validate the model again and walk it through jsonable_encoder
+    before rendering it.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
@@ -5,29 +5,45 @@ Security utilities for authentication and authorization
 from datetime import datetime, timedelta
 from typing import Optional
 from passlib.context import CryptContext
-from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import jwt
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.token_cache import (
+    CachedUser, get_token_claims, get_token_user, is_token_revoked, set_token_claims,
+    set_token_user
+)
 from app.db.session import get_db
 from app.repositories.user import UserRepository
-from app.models.user import User
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# JWT settings (these should be in config)
-SECRET_KEY = "your-secret-key-here"  # Should be from config
-ALGORITHM = "HS256"
+# Password hashing: Argon2id through argon2-cffi's native library for new
+# hashes; bcrypt hashes from earlier releases still verify and are flagged
+# for rehash. Parallelism is fixed rather than taken from the CPU count so a
+# hash made on one host does not look outdated on another.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=3,
+    argon2__memory_cost=65536,
+    argon2__parallelism=4,
+)
+
+# JWT settings; shared with AuthService so both verify the same tokens
+SECRET_KEY = settings.SECRET_KEY
+ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-security = HTTPBearer()
-
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against its hash; unknown hash formats never match"""
+    if not hashed_password:
+        return False
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except (ValueError, TypeError):
+        return False
 
 
 def get_password_hash(password: str) -> str:
@@ -35,6 +51,14 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a hash uses a deprecated scheme or outdated parameters"""
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except (ValueError, TypeError):
+        return True
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -48,39 +72,79 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def bearer_token(request: Request) -> str:
+    """
+    Get the bearer token BearerTokenMiddleware extracted from the request
+
+    Raises:
+        HTTPException: 403 when the request carries no bearer token
+    """
+    token = getattr(request.state, "bearer_token", None)
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authenticated"
+        )
+    return token
+
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    request: Request,
+    token: str = Depends(bearer_token),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> CachedUser:
     """
     Get current authenticated user from JWT token
+
+    Returns a CachedUser snapshot whether or not the token cache was hit,
+    so handlers never hold an ORM row shared with other requests.
     """
+    # Resolved by the middleware from the token cache
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+    if is_token_revoked(token):
+        raise credentials_exception
+
+    payload = get_token_claims(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.InvalidTokenError:
             raise credentials_exception
-    except JWTError:
+        set_token_claims(token, payload)
+
+    username: str = payload.get("sub")
+    if username is None:
         raise credentials_exception
 
+    user = get_token_user(token)
+    if user is not None:
+        return user
+
     user_repo = UserRepository(db)
-    user = await user_repo.get_by_username(username)
-    if user is None:
+    row = await user_repo.get_by_username(username)
+    if row is None:
         raise credentials_exception
 
+    # Only active users are cached; AuthService.get_current_user shares
+    # this cache and rejects inactive ones
+    user = CachedUser.from_user(row)
+    if user.is_active:
+        set_token_user(token, user)
     return user
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: CachedUser = Depends(get_current_user)
+) -> CachedUser:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(
@@ -90,7 +154,7 @@ async def get_current_active_user(
     return current_user
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_admin(current_user: CachedUser = Depends(get_current_user)) -> CachedUser:
     """Require admin user"""
     if not getattr(current_user, 'is_admin', False):
         raise HTTPException(
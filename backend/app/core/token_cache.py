@@ -0,0 +1,142 @@
+"""
+Token Cache Module
+
+This module keeps per-process caches for bearer tokens. Verified tokens
+map to their decoded claims and to a snapshot of the user they were issued
+for, so authenticated requests skip both the signature check and the user
+SELECT for TOKEN_USER_TTL seconds; and revoked tokens are remembered until
+they would have expired anyway.
+
+The cached user is a frozen CachedUser, never an ORM instance: it is shared
+by concurrent requests and outlives the session it was loaded in, where a
+rollback would expire an ORM row and leave it detached.
+
+Cached claims are only served while their ``exp`` is in the future. A
+deactivated user keeps working for at most TOKEN_USER_TTL seconds on a
+worker that already cached them.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+
+TOKEN_USER_TTL = 60
+TOKEN_CACHE_MAXSIZE = 50_000
+
+_token_claims: TTLCache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_USER_TTL)
+_token_users: TTLCache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_USER_TTL)
+_revoked_tokens: TTLCache = TTLCache(
+    maxsize=TOKEN_CACHE_MAXSIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """
+    Read-only snapshot of the attributes request handlers read from the
+    authenticated user
+
+    Handlers that need to change the user load the row by ``id`` in their
+    own session.
+    """
+    id: int
+    username: str
+    email: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+    is_active: bool
+    status: Any
+    auth_type: Any
+    last_login: Optional[datetime]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: Any) -> "CachedUser":
+        """Copy the snapshot fields off a loaded User row"""
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            is_active=user.is_active,
+            status=user.status,
+            auth_type=user.auth_type,
+            last_login=user.last_login,
+            created_at=user.created_at,
+        )
+
+
+def _token_key(token: str) -> bytes:
+    """Fixed-size key for a token, so raw tokens are never held in memory"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def get_token_claims(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the decoded claims of a token verified earlier
+
+    Args:
+        token: Bearer token
+
+    Returns:
+        The claims, or None on a miss or once the token has expired
+    """
+    claims = _token_claims.get(_token_key(token))
+    if claims is None or claims.get("exp", 0) <= time.time():
+        return None
+    return claims
+
+
+def set_token_claims(token: str, claims: Dict[str, Any]) -> None:
+    """Cache the claims of a token whose signature was just verified"""
+    _token_claims[_token_key(token)] = claims
+
+
+def get_token_user(token: str) -> Optional[CachedUser]:
+    """
+    Get the user snapshot cached for a verified token
+
+    Args:
+        token: Bearer token
+
+    Returns:
+        The cached snapshot, or None on a miss
+    """
+    return _token_users.get(_token_key(token))
+
+
+def set_token_user(token: str, user: CachedUser) -> None:
+    """Cache the snapshot of the user a verified token resolved to"""
+    _token_users[_token_key(token)] = user
+
+
+def revoke_token(token: str) -> None:
+    """Reject ``token`` from now on and drop its cached user"""
+    key = _token_key(token)
+    _revoked_tokens[key] = True
+    _token_claims.pop(key, None)
+    _token_users.pop(key, None)
+
+
+def is_token_revoked(token: str) -> bool:
+    """Check whether ``token`` was revoked on this worker"""
+    return _token_key(token) in _revoked_tokens
+
+
+def forget_user(user_id: int) -> None:
+    """
+    Drop every cached token entry for a user, e.g. after a password change
+
+    Args:
+        user_id: ID of the user whose entries are dropped
+    """
+    stale = [key for key, user in _token_users.items() if user.id == user_id]
+    for key in stale:
+        _token_users.pop(key, None)
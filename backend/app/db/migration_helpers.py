@@ -0,0 +1,261 @@
+"""
+Migration Helpers
+
+This module contains DDL helpers shared by the Alembic revisions, mainly
+for building and dropping indexes without blocking writes on large tables
+and for managing range partitions.
+"""
+
+import io
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.schema import CreateTable
+
+from app.db.partitions import monthly_partition_statements
+
+
+def create_table_if_not_exists(table_name: str, *columns, **kw) -> sa.Table:
+    """
+    Create a table with CREATE TABLE IF NOT EXISTS.
+
+    Takes the same arguments as ``op.create_table`` so a partially applied
+    revision can simply be re-run. Enum types used by the columns are created
+    first when missing, as ``op.create_table`` would do.
+
+    Args:
+        table_name: Table name
+        *columns: Columns and constraints
+        **kw: Extra ``sa.Table`` keyword arguments (``postgresql_with``...)
+
+    Returns:
+        sa.Table: The table object that was emitted
+    """
+    metadata = sa.MetaData()
+    table = sa.Table(table_name, metadata, *columns, **kw)
+
+    # Foreign keys only need the referenced table and column to exist in the
+    # metadata for the DDL to compile
+    for foreign_key in table.foreign_keys:
+        ref_table, ref_column = foreign_key.target_fullname.split(".")
+        if ref_table not in metadata.tables:
+            sa.Table(ref_table, metadata, sa.Column(ref_column, sa.Integer, primary_key=True))
+
+    bind = op.get_bind()
+    for column in table.columns:
+        if isinstance(column.type, sa.Enum):
+            column.type.create(bind, checkfirst=True)
+
+    op.execute(CreateTable(table, if_not_exists=True))
+    return table
+
+
+def _is_partitioned(table: str) -> bool:
+    """Check whether ``table`` is a partitioned (parent) table"""
+    return bool(op.get_bind().execute(
+        sa.text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    ).scalar())
+
+
+def _partitions(table: str) -> List[str]:
+    """List the partitions attached to ``table``"""
+    rows = op.get_bind().execute(
+        sa.text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+        ),
+        {"table": table},
+    )
+    return [row[0] for row in rows]
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    using: Optional[str] = None,
+    storage_parameters: Optional[Dict[str, Any]] = None,
+    include: Optional[Sequence[str]] = None,
+    where: Optional[str] = None,
+) -> None:
+    """
+    Create an index with CREATE INDEX CONCURRENTLY.
+
+    CONCURRENTLY cannot run inside a transaction block, so the statement is
+    executed in an autocommit block. Writes to the table keep flowing while
+    the index is being built.
+
+    Partitioned tables do not support CONCURRENTLY directly: the index is
+    created on the parent only, built concurrently on every partition and
+    then attached.
+
+    Args:
+        name: Index name
+        table: Table name
+        columns: Column names or expressions making up the index key
+        unique: Whether to create a unique index
+        using: Index access method (``brin``, ``hash``...), B-tree by default
+        storage_parameters: Index storage parameters for the WITH clause
+        include: Non-key columns stored in the index (INCLUDE clause)
+        where: Predicate making this a partial index
+
+    Index and table names are quoted when needed; key columns are emitted
+    as given so they can carry operator classes or expressions.
+    """
+    quote = op.get_bind().dialect.identifier_preparer.quote
+    unique_sql = "UNIQUE " if unique else ""
+    key_sql = ", ".join(columns)
+    if using:
+        key_sql = f"USING {using} ({key_sql})"
+    else:
+        key_sql = f"({key_sql})"
+    if include:
+        key_sql = f"{key_sql} INCLUDE ({', '.join(include)})"
+    if storage_parameters:
+        params = ", ".join(f"{key} = {value}" for key, value in storage_parameters.items())
+        key_sql = f"{key_sql} WITH ({params})"
+    if where:
+        key_sql = f"{key_sql} WHERE {where}"
+
+    if not _is_partitioned(quote(table)):
+        with op.get_context().autocommit_block():
+            op.execute(
+                f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {quote(name)} "
+                f"ON {quote(table)} {key_sql}"
+            )
+        return
+
+    op.execute(
+        f"CREATE {unique_sql}INDEX IF NOT EXISTS {quote(name)} ON ONLY {quote(table)} {key_sql}"
+    )
+    for partition in _partitions(quote(table)):
+        partition_index = quote(f"{partition}_{name}"[:63])
+        with op.get_context().autocommit_block():
+            op.execute(
+                f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {partition_index} "
+                f"ON {quote(partition)} {key_sql}"
+            )
+        op.execute(f"ALTER INDEX {quote(name)} ATTACH PARTITION {partition_index}")
+
+
+def drop_index_concurrently(name: str) -> None:
+    """
+    Drop an index with DROP INDEX CONCURRENTLY.
+
+    Indexes on partitioned tables cannot be dropped concurrently and are
+    dropped with a plain DROP INDEX, which also removes the partition indexes.
+
+    Args:
+        name: Index name
+    """
+    bind = op.get_bind()
+    name = bind.dialect.identifier_preparer.quote(name)
+    is_partitioned_index = bind.execute(
+        sa.text("SELECT relkind = 'I' FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": name},
+    ).scalar()
+
+    if is_partitioned_index:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def create_deferred_indexes(
+    indexes: Iterable[Tuple],
+    maintenance_work_mem: str = "2GB",
+    max_parallel_maintenance_workers: int = 4,
+) -> None:
+    """
+    Build indexes that were deliberately left out of the table-creating
+    revisions so that bulk data loads do not pay index maintenance per row.
+
+    The session is given a larger ``maintenance_work_mem`` and more parallel
+    maintenance workers before the builds start.
+
+    Args:
+        indexes: (name, table, columns) tuples to create, optionally with a
+            fourth element holding keyword arguments for
+            ``create_index_concurrently``
+        maintenance_work_mem: Memory available to each index build
+        max_parallel_maintenance_workers: Parallel workers per index build
+    """
+    with op.get_context().autocommit_block():
+        op.execute(f"SET maintenance_work_mem = '{maintenance_work_mem}'")
+        op.execute(
+            f"SET max_parallel_maintenance_workers = {int(max_parallel_maintenance_workers)}"
+        )
+
+    for name, table, columns, *options in indexes:
+        create_index_concurrently(name, table, columns, **(options[0] if options else {}))
+
+
+def create_monthly_partitions(
+    table: str,
+    months_back: int = 2,
+    months_ahead: int = 2,
+    today: Optional[date] = None,
+    storage_parameters: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Create monthly range partitions around the current month plus a
+    DEFAULT partition, as built by
+    ``app.db.partitions.monthly_partition_statements``.
+    The call is safe to repeat.
+    """
+    for statement in monthly_partition_statements(
+        table, months_back, months_ahead, today, storage_parameters
+    ):
+        op.execute(statement)
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_text_value(value: Any) -> str:
+    """Render one value in COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def bulk_insert_rows(
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[Tuple],
+) -> None:
+    """
+    Load seed rows with a single COPY ... FROM STDIN.
+
+    With psycopg2 the rows are streamed in COPY text format, so the server
+    parses no INSERT statements at all and the whole seed is one round
+    trip. Other drivers and offline (``--sql``) runs fall back to
+    ``op.bulk_insert``.
+
+    Args:
+        table: Table name
+        columns: Column names, in the order used by ``rows``
+        rows: Row tuples to insert
+    """
+    bind = op.get_bind()
+    if op.get_context().as_sql or bind.dialect.driver != "psycopg2":
+        target = sa.table(table, *(sa.column(name) for name in columns))
+        op.bulk_insert(target, [dict(zip(columns, row)) for row in rows], multiinsert=True)
+        return
+
+    quote = bind.dialect.identifier_preparer.quote
+    column_sql = ", ".join(quote(name) for name in columns)
+    payload = io.StringIO("".join(
+        "\t".join(_copy_text_value(value) for value in row) + "\n" for row in rows
+    ))
+    with bind.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {quote(table)} ({column_sql}) FROM STDIN", payload)
@@ -0,0 +1,58 @@
+"""
+Range Partitions
+
+This module builds the DDL for monthly range partitions. It is shared by
+the Alembic revisions and the maintenance commands that create upcoming
+partitions at runtime, so it must not depend on Alembic.
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+
+def _add_months(value: date, months: int) -> date:
+    """Return the first day of the month ``months`` away from ``value``"""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def monthly_partition_statements(
+    table: str,
+    months_back: int = 2,
+    months_ahead: int = 2,
+    today: Optional[date] = None,
+    storage_parameters: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """
+    Build the CREATE TABLE statements for monthly range partitions around
+    the current month plus a DEFAULT partition catching rows outside the
+    window.
+
+    Partitions are named ``<table>_YYYY_MM``. Every statement uses IF NOT
+    EXISTS, so existing partitions are left untouched.
+
+    Args:
+        table: Range-partitioned parent table
+        months_back: Number of past months to create
+        months_ahead: Number of future months to create
+        today: Reference date, defaults to the current date
+        storage_parameters: Table storage parameters for every partition;
+            partitioned parents cannot carry them themselves
+    """
+    current = (today or date.today()).replace(day=1)
+    with_sql = ""
+    if storage_parameters:
+        params = ", ".join(f"{key} = {value}" for key, value in storage_parameters.items())
+        with_sql = f" WITH ({params})"
+
+    statements = []
+    for offset in range(-months_back, months_ahead + 1):
+        start = _add_months(current, offset)
+        end = _add_months(start, 1)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}'){with_sql}"
+        )
+
+    statements.append(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT{with_sql}")
+    return statements
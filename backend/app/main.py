@@ -5,15 +5,23 @@ This module contains the main FastAPI application configuration,
 including middleware, CORS, database initialization, and API routing.
 """
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.security import HTTPBearer
 from contextlib import asynccontextmanager
 import logging
 
+from sqlalchemy.exc import SQLAlchemyError
+
 from app.core.config import settings
+from app.core.exceptions import (
+    BusinessLogicError, DaloRadiusException, DatabaseError, NotFoundError, ValidationError
+)
 from app.core.logging import setup_logging
+from app.core.responses import ORJSONResponse
+from app.core.security import bearer_token
+from app.api.middleware import BearerTokenMiddleware
 from app.db.base import init_db, close_db
 from app.api.v1 import auth, users, accounting, billing, nas, reports, system, radius, user_groups, radius_management, batch, configs, gis, dashboard, help, notifications
 from app.api.v1.hotspots import router as hotspots_router
@@ -23,9 +31,6 @@ from app.api.v1.hotspots import router as hotspots_router
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# Security scheme
-security = HTTPBearer()
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -57,11 +62,15 @@ def create_application() -> FastAPI:
         redoc_url="/redoc" if settings.DEBUG else None,
         openapi_url="/openapi.json" if settings.DEBUG else None,
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     # Add middleware
     setup_middleware(app)
 
+    # Map unhandled errors to 500 responses
+    setup_exception_handlers(app)
+
     # Include routers
     setup_routes(app)
 
@@ -88,10 +97,65 @@ def setup_middleware(app: FastAPI) -> None:
             allowed_hosts=settings.ALLOWED_HOSTS
         )
 
+    # Compress responses for clients that accept gzip; streamed exports are
+    # compressed chunk by chunk as they are produced
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.GZIP_MINIMUM_SIZE,
+        compresslevel=settings.GZIP_COMPRESS_LEVEL,
+    )
+
+    # Extract the bearer token once and resolve cached users before routing
+    app.add_middleware(BearerTokenMiddleware)
+
     # Add custom middleware for logging, rate limiting, etc.
     # This would be implemented in app/api/middleware.py
 
 
+def setup_exception_handlers(app: FastAPI) -> None:
+    """
+    Configure application-wide exception handlers
+
+    Endpoints let unexpected errors propagate instead of wrapping their
+    bodies in try/except; the session dependency rolls back and these
+    handlers log the error and answer with a generic 500. Service-layer
+    NotFoundError, ValidationError and BusinessLogicError map to 404, 400
+    and 409 with their message; any other application exception is logged
+    and answered with a 500 carrying its message.
+    """
+    @app.exception_handler(NotFoundError)
+    async def not_found_handler(request: Request, exc: NotFoundError) -> ORJSONResponse:
+        return ORJSONResponse(status_code=404, content={"detail": exc.message})
+
+    @app.exception_handler(ValidationError)
+    async def validation_error_handler(request: Request, exc: ValidationError) -> ORJSONResponse:
+        return ORJSONResponse(status_code=400, content={"detail": exc.message})
+
+    @app.exception_handler(BusinessLogicError)
+    async def conflict_handler(request: Request, exc: BusinessLogicError) -> ORJSONResponse:
+        return ORJSONResponse(status_code=409, content={"detail": exc.message})
+
+    @app.exception_handler(DaloRadiusException)
+    async def application_error_handler(request: Request, exc: DaloRadiusException) -> ORJSONResponse:
+        logger.error(f"Application error on {request.method} {request.url.path}: {exc}")
+        return ORJSONResponse(status_code=500, content={"detail": exc.message})
+
+    @app.exception_handler(DatabaseError)
+    async def repository_error_handler(request: Request, exc: DatabaseError) -> ORJSONResponse:
+        logger.error(f"Database error on {request.method} {request.url.path}: {exc}")
+        return ORJSONResponse(status_code=500, content={"detail": "Database error"})
+
+    @app.exception_handler(SQLAlchemyError)
+    async def database_error_handler(request: Request, exc: SQLAlchemyError) -> ORJSONResponse:
+        logger.error(f"Database error on {request.method} {request.url.path}: {exc}")
+        return ORJSONResponse(status_code=500, content={"detail": "Database error"})
+
+    @app.exception_handler(Exception)
+    async def unhandled_error_handler(request: Request, exc: Exception) -> ORJSONResponse:
+        logger.exception(f"Unhandled error on {request.method} {request.url.path}")
+        return ORJSONResponse(status_code=500, content={"detail": "Internal server error"})
+
+
 def setup_routes(app: FastAPI) -> None:
     """
     Configure application routes
@@ -107,123 +171,123 @@ def setup_routes(app: FastAPI) -> None:
         users.router,
         prefix=settings.API_V1_STR + "/users",
         tags=["users"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         dashboard.router,
         prefix=settings.API_V1_STR + "/dashboard",
         tags=["dashboard"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         accounting.router,
         prefix=settings.API_V1_STR + "/accounting",
         tags=["accounting"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         billing.router,
         prefix=settings.API_V1_STR + "/billing",
         tags=["billing"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         nas.router,
         prefix=settings.API_V1_STR + "/nas",
         tags=["nas"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         reports.router,
         prefix=settings.API_V1_STR + "/reports",
         tags=["reports"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         system.router,
         prefix=settings.API_V1_STR + "/system",
         tags=["system"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         radius.router,
         prefix=settings.API_V1_STR + "/radius",
         tags=["radius"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         user_groups.router,
         prefix=settings.API_V1_STR + "/user-groups",
         tags=["user-groups"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         radius_management.router,
         prefix=settings.API_V1_STR + "/radius-management",
         tags=["radius-management"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         batch.router,
         prefix=settings.API_V1_STR + "/batch",
         tags=["batch"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         hotspots_router,
         prefix=settings.API_V1_STR + "/hotspots",
         tags=["hotspots"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         configs.router,
         prefix=settings.API_V1_STR + "/configs",
         tags=["configurations"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         gis.router,
         prefix=settings.API_V1_STR + "/gis",
         tags=["gis"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         help.router,
         prefix=settings.API_V1_STR + "/help",
         tags=["help"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     app.include_router(
         notifications.router,
         prefix=settings.API_V1_STR + "/notifications",
         tags=["notifications"],
-        dependencies=[Depends(security)]
+        dependencies=[Depends(bearer_token)]
     )
 
     # Health check endpoint
     @app.get("/health")
     async def health_check():
         """Health check endpoint"""
-        return {
+        return ORJSONResponse(content={
             "status": "healthy",
             "version": settings.VERSION,
             "environment": settings.ENVIRONMENT
-        }
+        })
 
     # Root endpoint
     @app.get("/")
@@ -0,0 +1,104 @@
+"""
+Maintenance Commands
+
+This module runs the periodic database maintenance jobs from the command
+line, for cron or a systemd timer:
+
+    python -m app.maintenance refresh-traffic-rollup    # hourly
+    python -m app.maintenance flush-staged-sessions --every 5
+    python -m app.maintenance create-billing-partitions  # daily or monthly
+
+``--every`` keeps the process running and repeats the job at that
+interval, for jobs that have to run more often than cron allows.
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Awaitable, Callable, Dict, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger, setup_logging
+from app.db.session import AsyncSessionLocal, engine
+from app.repositories.accounting import AccountingRepository
+from app.repositories.billing import BillingHistoryRepository
+from app.repositories.graphs import TrafficStatisticsRepository
+
+logger = get_logger(__name__)
+
+
+async def refresh_traffic_rollup(db: AsyncSession) -> str:
+    """Refresh the mv_traffic_by_day rollup behind the top-users graphs"""
+    await TrafficStatisticsRepository(db).refresh_traffic_rollup()
+    return "mv_traffic_by_day refreshed"
+
+
+async def flush_staged_sessions(db: AsyncSession) -> str:
+    """Move Accounting-Start rows from radacct_stage into radacct"""
+    result = await AccountingRepository(db).flush_staged_sessions()
+    return result['message']
+
+
+async def create_billing_partitions(db: AsyncSession) -> str:
+    """Create the billing_history partitions for the coming months"""
+    created = await BillingHistoryRepository(db).create_monthly_partitions()
+    if not created:
+        return "billing_history is not partitioned"
+    return "billing_history partitions ensured for the next 2 months"
+
+
+COMMANDS: Dict[str, Callable[[AsyncSession], Awaitable[str]]] = {
+    "create-billing-partitions": create_billing_partitions,
+    "flush-staged-sessions": flush_staged_sessions,
+    "refresh-traffic-rollup": refresh_traffic_rollup,
+}
+
+
+async def run(command: str, every: Optional[float] = None) -> str:
+    """Run one maintenance command, each time in its own session
+
+    With ``every`` the command is repeated at that interval until it fails
+    or the process is interrupted.
+    """
+    try:
+        while True:
+            async with AsyncSessionLocal() as db:
+                message = await COMMANDS[command](db)
+            if every is None:
+                return message
+            logger.info(f"{command}: {message}")
+            await asyncio.sleep(every)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Parse the command line and run the requested command"""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.maintenance",
+        description="Run a daloRADIUS database maintenance job",
+    )
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument(
+        "--every", type=float, metavar="SECONDS",
+        help="repeat the command every SECONDS until interrupted",
+    )
+    args = parser.parse_args(argv)
+    if args.every is not None and args.every <= 0:
+        parser.error("--every must be positive")
+
+    setup_logging()
+    try:
+        message = asyncio.run(run(args.command, args.every))
+    except KeyboardInterrupt:
+        return 0
+    except Exception:
+        logger.exception(f"Maintenance command {args.command} failed")
+        return 1
+    logger.info(f"{args.command}: {message}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,7 +20,7 @@ from .nas import NasReload, RadIpPool
 from .radius_profile import RadiusProfile, ProfileUsage
 from .nas import Realm, Proxy
 from .radius import RadHuntGroup
-from .billing import BillingPlan, BillingHistory, BillingMerchant, BillingRate, BillingPlanProfile, Invoice, Payment, Refund, PaymentType, POS
+from .billing import BillingPlan, BillingHistory, BillingMerchant, BillingMerchantPayer, BillingRate, BillingPlanProfile, Invoice, Payment, Refund, PaymentType, POS
 from .access_control import OperatorAcl, OperatorAclFile, Dictionary, Message, MessageType
 from .hotspot import Hotspot
 from .reports import UpsStatus, RaidStatus, HeartBeat, ReportTemplate, ReportGeneration, ServerMonitoring
@@ -70,6 +70,7 @@ __all__ = [
     "BillingPlan",
     "BillingHistory",
     "BillingMerchant",
+    "BillingMerchantPayer",
     "BillingRate",
     "BillingPlanProfile",
     "Invoice",
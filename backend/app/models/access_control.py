@@ -9,7 +9,7 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
     Column, Integer, String, DateTime, Text, Boolean,
-    ForeignKey, Enum, SmallInteger
+    ForeignKey, Enum, SmallInteger, Index, CheckConstraint
 )
 from sqlalchemy.orm import relationship
 import enum
@@ -32,7 +32,7 @@ class OperatorAcl(BaseModel):
     __tablename__ = "operators_acl"
 
     operator_id = Column(Integer, ForeignKey(
-        'operators.id', ondelete='CASCADE'), nullable=False, index=True)
+        'operators.id', ondelete='CASCADE'), nullable=False)
     file = Column(String(128), nullable=False, index=True)
     access = Column(SmallInteger, nullable=False, default=0)
 
@@ -40,6 +40,7 @@ class OperatorAcl(BaseModel):
     operator = relationship("Operator", back_populates="acl_entries")
 
     __table_args__ = (
+        Index('uq_operators_acl_operator_file', 'operator_id', 'file', unique=True),
         {'extend_existing': True}
     )
 
@@ -83,11 +84,22 @@ class Message(BaseModel):
     Maps to messages table
     """
     __tablename__ = "messages"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('idx_messages_created_on_brin', 'created_on',
+              postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+        CheckConstraint("type IN ('login', 'support', 'dashboard')", name='ck_messages_type'),
+        {'extend_existing': True}
+    )
 
-    type = Column(Enum(MessageType), nullable=False, index=True)
+    # Stored as VARCHAR(16) holding the enum values; ck_messages_type
+    # restricts them instead of a native PostgreSQL ENUM
+    type = Column(
+        Enum(MessageType, native_enum=False, length=16,
+             values_callable=lambda types: [t.value for t in types]),
+        nullable=False, index=True
+    )
     content = Column(Text, nullable=False)
-    created_on = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_on = Column(DateTime(timezone=True), nullable=False)
     created_by = Column(String(32), nullable=True)
     modified_on = Column(DateTime(timezone=True), nullable=True)
     modified_by = Column(String(32), nullable=True)
@@ -11,7 +11,7 @@ from sqlalchemy import (
     Column, Integer, String, DateTime, BigInteger,
     Text, Index, func
 )
-from sqlalchemy.dialects.postgresql import INET
+from sqlalchemy.dialects.postgresql import CIDR, INET
 import enum
 
 from .base import RadiusBaseModel
@@ -37,12 +37,12 @@ class RadAcct(RadiusBaseModel):
     # User and session identification
     username = Column(String(64), nullable=False, index=True)
     realm = Column(String(64), nullable=True)
-    acctsessionid = Column(String(64), nullable=False, index=True)
-    acctuniqueid = Column(String(32), nullable=False, index=True)
+    acctsessionid = Column(String(64), nullable=False)
+    acctuniqueid = Column(String(32), nullable=False)
     groupname = Column(String(64), nullable=True, index=True)
 
     # NAS identification
-    nasipaddress = Column(INET, nullable=False, index=True)
+    nasipaddress = Column(INET, nullable=False)
     nasportid = Column(String(15), nullable=True)
     nasporttype = Column(String(32), nullable=True)
     nasidentifier = Column(String(64), nullable=True)
@@ -51,10 +51,10 @@ class RadAcct(RadiusBaseModel):
     calledstationid = Column(String(50), nullable=True)
     callingstationid = Column(String(50), nullable=True, index=True)
     framedipaddress = Column(INET, nullable=True, index=True)
-    framedipv6address = Column(String(45), nullable=True, index=True)
-    framedipv6prefix = Column(String(45), nullable=True, index=True)
+    framedipv6address = Column(INET, nullable=True)
+    framedipv6prefix = Column(CIDR, nullable=True)
     framedinterfaceid = Column(String(44), nullable=True, index=True)
-    delegatedipv6prefix = Column(String(45), nullable=True, index=True)
+    delegatedipv6prefix = Column(CIDR, nullable=True)
     framedprotocol = Column(String(32), nullable=True)
 
     # Service type and class
@@ -65,7 +65,6 @@ class RadAcct(RadiusBaseModel):
     acctstarttime = Column(
         DateTime(timezone=True),
         nullable=True,
-        index=True,
         comment="Session start time"
     )
     acctupdatetime = Column(
@@ -77,7 +76,6 @@ class RadAcct(RadiusBaseModel):
     acctstoptime = Column(
         DateTime(timezone=True),
         nullable=True,
-        index=True,
         comment="Session stop time"
     )
     acctsessiontime = Column(
@@ -133,16 +131,35 @@ class RadAcct(RadiusBaseModel):
     __table_args__ = (
         # Primary query indexes
         Index('idx_radacct_username', 'username'),
-        Index('idx_radacct_nasipaddress', 'nasipaddress'),
-        Index('idx_radacct_acctsessionid', 'acctsessionid'),
-        Index('idx_radacct_acctuniqueid', 'acctuniqueid'),
+        Index('idx_radacct_nasipaddress_brin', 'nasipaddress',
+              postgresql_using='brin',
+              postgresql_ops={'nasipaddress': 'inet_minmax_ops'},
+              postgresql_with={'pages_per_range': 32}),
+        Index('idx_radacct_acctsessionid_hash', 'acctsessionid',
+              postgresql_using='hash'),
+        Index('idx_radacct_acctuniqueid_hash', 'acctuniqueid',
+              postgresql_using='hash'),
         Index('idx_radacct_framedipaddress', 'framedipaddress'),
         Index('idx_radacct_callingstationid', 'callingstationid'),
+        Index('idx_radacct_framedipv6address_gist', 'framedipv6address',
+              postgresql_using='gist',
+              postgresql_ops={'framedipv6address': 'inet_ops'}),
+        Index('idx_radacct_framedipv6prefix_gist', 'framedipv6prefix',
+              postgresql_using='gist',
+              postgresql_ops={'framedipv6prefix': 'inet_ops'}),
+        Index('idx_radacct_delegatedipv6prefix_gist', 'delegatedipv6prefix',
+              postgresql_using='gist',
+              postgresql_ops={'delegatedipv6prefix': 'inet_ops'}),
 
         # Time-based indexes for reporting
-        Index('idx_radacct_acctstarttime', 'acctstarttime'),
-        Index('idx_radacct_acctstoptime', 'acctstoptime'),
+        Index('idx_radacct_acctstarttime_brin', 'acctstarttime',
+              postgresql_using='brin',
+              postgresql_with={'pages_per_range': 32}),
+        Index('idx_radacct_acctstoptime_brin', 'acctstoptime',
+              postgresql_using='brin',
+              postgresql_with={'pages_per_range': 32}),
         Index('idx_radacct_username_starttime', 'username', 'acctstarttime'),
+        Index('idx_radacct_starttime_id', 'acctstarttime', 'radacctid'),
         Index('idx_radacct_username_stoptime', 'username', 'acctstoptime'),
 
         # Composite indexes for common queries
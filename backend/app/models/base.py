@@ -7,7 +7,7 @@ that all other models can inherit from.
 
 from datetime import datetime
 from typing import Any, Dict
-from sqlalchemy import Column, Integer, DateTime, String, Boolean, text
+from sqlalchemy import Column, Identity, Integer, DateTime, String, Boolean, text
 from sqlalchemy.ext.declarative import declarative_base, declared_attr
 from sqlalchemy.sql import func
 
@@ -80,9 +80,9 @@ class BaseModel(Base, TimestampMixin, AuditMixin):
 
     id = Column(
         Integer,
+        Identity(always=False),
         primary_key=True,
         index=True,
-        autoincrement=True,
         comment="Primary key"
     )
 
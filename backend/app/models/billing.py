@@ -8,13 +8,14 @@ including plans, history, merchant transactions, and rates.
 from datetime import datetime, date
 from typing import Optional
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Date, Text, Numeric,
-    Boolean, ForeignKey, Index
+    Column, Integer, String, CHAR, DateTime, Date, Text, Numeric,
+    Boolean, ForeignKey, Index, text
 )
+from sqlalchemy.dialects.postgresql import MACADDR
 from sqlalchemy.orm import relationship
 import enum
 
-from .base import BaseModel, LegacyBaseModel
+from .base import Base, BaseModel, LegacyBaseModel
 
 
 class BillingPlan(BaseModel):
@@ -24,7 +25,9 @@ class BillingPlan(BaseModel):
     """
     __tablename__ = "billing_plans"
     __table_args__ = (
-        Index('idx_billing_plans_active', 'planActive'),
+        Index('idx_billing_plans_active_only', 'planName',
+              postgresql_where=text('"planActive" = \'yes\'')),
+        Index('idx_billing_plans_type_active', 'planType', 'planActive', 'id'),
         {'extend_existing': True}
     )
 
@@ -55,9 +58,9 @@ class BillingPlan(BaseModel):
         String(128), nullable=False, default='Fixed')
 
     # Pricing
-    planCost = Column(String(128), nullable=True)
-    planSetupCost = Column(String(128), nullable=True)
-    planTax = Column(String(128), nullable=True)
+    planCost = Column(Numeric(14, 4), nullable=True)
+    planSetupCost = Column(Numeric(14, 4), nullable=True)
+    planTax = Column(Numeric(14, 4), nullable=True)
     planCurrency = Column(String(128), nullable=True)
 
     # Group and status
@@ -79,18 +82,33 @@ class BillingHistory(BaseModel):
     Maps to billing_history table
     """
     __tablename__ = "billing_history"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('idx_billing_history_user_date', 'username', text('creationdate DESC'),
+              postgresql_include=['billAmount', 'billAction']),
+        Index('idx_billing_history_plan_date', 'planId', text('creationdate DESC')),
+        Index('idx_billing_history_plan_id', 'planId', 'id'),
+        Index('idx_billing_history_creationdate_brin', 'creationdate',
+              postgresql_using='brin', postgresql_with={'pages_per_range': 32}),
+        # Monthly partitions; the database key is (id, creationdate) while
+        # the ORM keeps identifying rows by id alone
+        {'extend_existing': True, 'postgresql_partition_by': 'RANGE (creationdate)'}
+    )
 
-    username = Column(String(128), nullable=True, index=True)
-    planId = Column(Integer, nullable=True, index=True)
-    billAmount = Column(String(200), nullable=True)
+    username = Column(String(128), nullable=True)
+    planId = Column(Integer, ForeignKey(
+        'billing_plans.id', name='fk_billing_history_plan', ondelete='RESTRICT'), nullable=True)
+    billAmount = Column(Numeric(14, 4), nullable=True)
+    # Plan name and cost frozen when the record is written, so listings
+    # do not need to join billing_plans
+    planName_snapshot = Column(String(128), nullable=True)
+    planCost_snapshot = Column(Numeric(14, 4), nullable=True)
     billAction = Column(String(128), nullable=False, default='Unavailable')
     billPerformer = Column(String(200), nullable=True)
     billReason = Column(String(200), nullable=True)
 
     # Payment details
     paymentmethod = Column(String(200), nullable=True)
-    cash = Column(String(200), nullable=True)
+    cash = Column(Numeric(14, 4), nullable=True)
     creditcardname = Column(String(200), nullable=True)
     creditcardnumber = Column(String(200), nullable=True)
     creditcardverification = Column(String(200), nullable=True)
@@ -99,7 +117,7 @@ class BillingHistory(BaseModel):
 
     # Discounts and promotions
     coupon = Column(String(200), nullable=True)
-    discount = Column(String(200), nullable=True)
+    discount = Column(Numeric(14, 4), nullable=True)
     notes = Column(String(200), nullable=True)
 
     # Legacy timestamp fields
@@ -115,18 +133,24 @@ class BillingMerchant(BaseModel):
     Maps to billing_merchant table
     """
     __tablename__ = "billing_merchant"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('idx_billing_merchant_date_status', 'payment_date', 'payment_status'),
+        Index('idx_billing_merchant_planId', 'planId'),
+        Index('idx_billing_merchant_txn_id', 'txn_id'),
+        Index('idx_billing_merchant_business_id', 'business_id', 'id'),
+        {'extend_existing': True}
+    )
 
     # User credentials
     username = Column(String(128), nullable=False, index=True)
     password = Column(String(128), nullable=False)
-    mac = Column(String(200), nullable=False)
+    mac = Column(MACADDR, nullable=True)
     pin = Column(String(200), nullable=False)
 
     # Transaction details
-    txnId = Column(String(200), nullable=False, index=True)
     planName = Column(String(128), nullable=False)
-    planId = Column(Integer, nullable=False)
+    planId = Column(Integer, ForeignKey(
+        'billing_plans.id', name='fk_billing_merchant_plan', ondelete='RESTRICT'), nullable=False)
     quantity = Column(String(200), nullable=False)
 
     # Business details
@@ -137,35 +161,60 @@ class BillingMerchant(BaseModel):
 
     # Payment details
     payment_type = Column(String(200), nullable=False)
-    payment_tax = Column(String(200), nullable=False)
-    payment_cost = Column(String(200), nullable=False)
-    payment_fee = Column(String(200), nullable=False)
-    payment_total = Column(String(200), nullable=False)
-    payment_currency = Column(String(200), nullable=False)
+    payment_tax = Column(Numeric(14, 4), nullable=False)
+    payment_cost = Column(Numeric(14, 4), nullable=False)
+    payment_fee = Column(Numeric(14, 4), nullable=False)
+    payment_total = Column(Numeric(14, 4), nullable=False)
+    payment_currency = Column(CHAR(3), nullable=False)
+
+    # Payment status
+    payment_date = Column(DateTime, nullable=False)
+    payment_status = Column(String(200), nullable=False)
+    pending_reason = Column(String(200), nullable=False)
+    reason_code = Column(String(200), nullable=False)
+    receipt_ID = Column(String(200), nullable=False)
+    vendor_type = Column(String(200), nullable=False)
+
+    # Legacy timestamp fields
+    creationdate = Column(DateTime, nullable=False)
+    creationby = Column(String(128), nullable=True)
+    updatedate = Column(DateTime, nullable=False)
+    updateby = Column(String(128), nullable=True)
+
+    # Payer and address details live in billing_merchant_payer so reporting
+    # scans over this table don't drag the wide PII columns through cache
+    payer = relationship(
+        "BillingMerchantPayer", uselist=False,
+        cascade="all, delete-orphan", passive_deletes=True
+    )
+
+
+class BillingMerchantPayer(Base):
+    """
+    Payer details of a merchant transaction, one row per billing_merchant row
+    Maps to billing_merchant_payer table
+    """
+    __tablename__ = "billing_merchant_payer"
+    __table_args__ = {'extend_existing': True}
+
+    merchant_id = Column(Integer, ForeignKey(
+        'billing_merchant.id', ondelete='CASCADE'), primary_key=True)
 
     # Payer information
     first_name = Column(String(200), nullable=False)
     last_name = Column(String(200), nullable=False)
     payer_email = Column(String(200), nullable=False)
+    payer_status = Column(String(200), nullable=False)
 
     # Address information
     payer_address_name = Column(String(200), nullable=False)
     payer_address_street = Column(String(200), nullable=False)
     payer_address_country = Column(String(200), nullable=False)
-    payer_address_country_code = Column(String(200), nullable=False)
+    payer_address_country_code = Column(CHAR(2), nullable=False)
     payer_address_city = Column(String(200), nullable=False)
     payer_address_state = Column(String(200), nullable=False)
     payer_address_zip = Column(String(200), nullable=False)
-
-    # Payment status
-    payment_date = Column(DateTime, nullable=False)
-    payment_status = Column(String(200), nullable=False)
-    pending_reason = Column(String(200), nullable=False)
-    reason_code = Column(String(200), nullable=False)
-    receipt_ID = Column(String(200), nullable=False)
     payment_address_status = Column(String(200), nullable=False)
-    vendor_type = Column(String(200), nullable=False)
-    payer_status = Column(String(200), nullable=False)
 
 
 class BillingRate(BaseModel):
@@ -458,6 +507,7 @@ __all__ = [
     "BillingPlan",
     "BillingHistory",
     "BillingMerchant",
+    "BillingMerchantPayer",
     "BillingRate",
     "BillingPlanProfile",
     "Invoice",
@@ -66,7 +66,7 @@ class GraphStatistics(Base):
     value_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     # Additional metadata
-    metadata: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    extra_metadata: Mapped[Optional[dict]] = mapped_column("metadata", JSON, nullable=True)
 
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
@@ -5,7 +5,7 @@ This module contains SQLAlchemy models for hotspot management functionality.
 Based on the 'hotspots' table structure in the database schema.
 """
 
-from sqlalchemy import Column, BigInteger, String, DateTime, func
+from sqlalchemy import Column, BigInteger, Identity, String, DateTime, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import validates
 from typing import Optional, Dict, Any
@@ -27,7 +27,7 @@ class Hotspot(Base):
     __tablename__ = "hotspots"
 
     # Primary Key
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigInteger, Identity(always=False), primary_key=True)
 
     # Core hotspot information
     name = Column(String(200), nullable=True, index=True,
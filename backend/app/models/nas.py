@@ -8,7 +8,7 @@ including NAS devices, realms, proxies, and IP pools.
 from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Boolean,
+    Column, Identity, Integer, String, Text, DateTime, Boolean,
     Index, UniqueConstraint
 )
 from sqlalchemy.dialects.postgresql import INET
@@ -225,7 +225,7 @@ class RadIpPool(RadiusBaseModel):
     """RADIUS IP pool management (canonical, legacy-compatible)"""
     __tablename__ = "radippool"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(Integer, Identity(always=False), primary_key=True)
     pool_name = Column(String(30), nullable=False, index=True)
     framedipaddress = Column(INET, nullable=False, index=True)
     nasipaddress = Column(INET, nullable=False, index=True)
@@ -8,7 +8,7 @@ including radcheck, radreply, radgroupcheck, radgroupreply, and radpostauth.
 from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime,
+    Column, Identity, Integer, String, Text, DateTime,
     ForeignKey, Enum, Index, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
@@ -61,19 +61,20 @@ class RadCheck(RadiusBaseModel):
     """
     __tablename__ = "radcheck"
 
-    username = Column(String(64), nullable=False, index=True)
+    username = Column(String(64), nullable=False)
     attribute = Column(String(64), nullable=False)
     op = Column(Enum(AttributeOperator),
                 default=AttributeOperator.EQUAL, nullable=False)
     value = Column(String(253), nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="rad_checks")
+    user = relationship("User", primaryjoin="foreign(RadCheck.username) == User.username",
+                        uselist=False, viewonly=True)
 
     # Indexes for performance
     __table_args__ = (
-        Index('idx_radcheck_username', 'username'),
-        Index('idx_radcheck_username_attribute', 'username', 'attribute'),
+        Index('idx_radcheck_username_covering', 'username',
+              postgresql_include=['attribute', 'op', 'value']),
     )
 
 
@@ -84,19 +85,20 @@ class RadReply(RadiusBaseModel):
     """
     __tablename__ = "radreply"
 
-    username = Column(String(64), nullable=False, index=True)
+    username = Column(String(64), nullable=False)
     attribute = Column(String(64), nullable=False)
     op = Column(Enum(AttributeOperator),
                 default=AttributeOperator.EQUAL, nullable=False)
     value = Column(String(253), nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="rad_replies")
+    user = relationship("User", primaryjoin="foreign(RadReply.username) == User.username",
+                        uselist=False, viewonly=True)
 
     # Indexes for performance
     __table_args__ = (
-        Index('idx_radreply_username', 'username'),
-        Index('idx_radreply_username_attribute', 'username', 'attribute'),
+        Index('idx_radreply_username_covering', 'username',
+              postgresql_include=['attribute', 'op', 'value']),
     )
 
 
@@ -110,19 +112,19 @@ class GroupCheck(RadiusBaseModel):
     """
     __tablename__ = "radgroupcheck"
 
-    groupname = Column(String(64), nullable=False, index=True)
+    groupname = Column(String(64), nullable=False)
     attribute = Column(String(64), nullable=False)
     # Stored as raw two-char operator per legacy schema (==, =, :=, += ...)
     op = Column(String(2), nullable=False, default='==')
     value = Column(String(253), nullable=False)
 
     # Relationship placeholder (optional backref)
-    group = relationship("Group", back_populates="group_checks",
-                         uselist=False, viewonly=True, foreign_keys=[])  # type: ignore
+    group = relationship("Group", primaryjoin="foreign(GroupCheck.groupname) == Group.groupname",
+                         uselist=False, viewonly=True)
 
     __table_args__ = (
-        Index('idx_radgroupcheck_groupname', 'groupname'),
-        Index('idx_radgroupcheck_groupname_attribute', 'groupname', 'attribute'),
+        Index('idx_radgroupcheck_groupname_covering', 'groupname',
+              postgresql_include=['attribute', 'op', 'value']),
         {'extend_existing': True}
     )
 
@@ -134,17 +136,17 @@ class GroupReply(RadiusBaseModel):
     """
     __tablename__ = "radgroupreply"
 
-    groupname = Column(String(64), nullable=False, index=True)
+    groupname = Column(String(64), nullable=False)
     attribute = Column(String(64), nullable=False)
     op = Column(String(2), nullable=False, default='=')
     value = Column(String(253), nullable=False)
 
-    group = relationship("Group", back_populates="group_replies",
-                         uselist=False, viewonly=True, foreign_keys=[])  # type: ignore
+    group = relationship("Group", primaryjoin="foreign(GroupReply.groupname) == Group.groupname",
+                         uselist=False, viewonly=True)
 
     __table_args__ = (
-        Index('idx_radgroupreply_groupname', 'groupname'),
-        Index('idx_radgroupreply_groupname_attribute', 'groupname', 'attribute'),
+        Index('idx_radgroupreply_groupname_covering', 'groupname',
+              postgresql_include=['attribute', 'op', 'value']),
         {'extend_existing': True}
     )
 
@@ -215,7 +217,7 @@ class RadiusDictionary(BaseModel):
     """
     __tablename__ = "dalodictionary"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(Integer, Identity(always=False), primary_key=True)
     type = Column(String(64), nullable=True)
     attribute = Column(String(64), nullable=False, index=True)
     value = Column(String(64), nullable=True)
@@ -8,11 +8,11 @@ including user profiles, authentication, and authorization.
 from datetime import datetime, date
 from typing import Optional, List
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Date, Boolean,
-    ForeignKey, Enum, UniqueConstraint, Index
+    Column, Identity, Integer, String, Text, DateTime, Date, Boolean,
+    ForeignKey, Enum, UniqueConstraint, Index, text
 )
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship, synonym
+from sqlalchemy.dialects.postgresql import JSONB, MACADDR, UUID
 import uuid
 import enum
 
@@ -113,7 +113,7 @@ class User(BaseModel):
 
     # Additional fields
     notes = Column(Text, nullable=True, comment="User notes")
-    mac_address = Column(String(17), nullable=True, comment="MAC address")
+    mac_address = Column(MACADDR, nullable=True, comment="MAC address")
     pin_code = Column(String(32), nullable=True, comment="PIN code")
 
     # Portal settings
@@ -150,19 +150,13 @@ class User(BaseModel):
 
     def set_password(self, password: str) -> None:
         """Set user password (hashed)"""
-        import bcrypt
-        password_bytes = password.encode('utf-8')
-        hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
-        self.password_hash = hashed.decode('utf-8')
+        from app.core.security import get_password_hash
+        self.password_hash = get_password_hash(password)
 
     def verify_password(self, password: str) -> bool:
         """Verify user password"""
-        if not self.password_hash:
-            return False
-        import bcrypt
-        password_bytes = password.encode('utf-8')
-        hash_bytes = self.password_hash.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hash_bytes)
+        from app.core.security import verify_password
+        return verify_password(password, self.password_hash)
 
     def __init__(self, **kwargs):
         # Handle password during initialization
@@ -175,7 +169,8 @@ class User(BaseModel):
 
     # Index for common queries
     __table_args__ = (
-        Index('idx_users_username_active', 'username', 'is_active'),
+        Index('idx_users_active_true', 'username',
+              postgresql_include=['email'], postgresql_where=text('is_active')),
         Index('idx_users_email_active', 'email', 'is_active'),
         Index('idx_users_status', 'status'),
     )
@@ -195,7 +190,7 @@ class UserInfo(LegacyBaseModel):
     """
     __tablename__ = "userinfo"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(Integer, Identity(always=False), primary_key=True)
     username = Column(String(64), nullable=False, index=True)
     firstname = Column(String(200), nullable=True)
     lastname = Column(String(200), nullable=True)
@@ -223,7 +218,7 @@ class UserBillingInfo(LegacyBaseModel):
     """
     __tablename__ = "dalouserbillinfo"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(Integer, Identity(always=False), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     username = Column(String(64), nullable=False, index=True)
     planname = Column(String(128), nullable=True)
@@ -270,6 +265,10 @@ class UserBillingInfo(LegacyBaseModel):
 
     # Relationship (simplified for initial implementation)
 
+    __table_args__ = (
+        Index('idx_userbillinfo_user_id', 'user_id'),
+    )
+
 
 class UserGroup(BaseModel):
     """
@@ -290,6 +289,7 @@ class UserGroup(BaseModel):
         UniqueConstraint('username', 'groupname', name='uq_user_group'),
         Index('idx_user_group_username', 'username'),
         Index('idx_user_group_groupname', 'groupname'),
+        Index('idx_radusergroup_user_id', 'user_id'),
     )
 
 
@@ -314,11 +314,26 @@ class BatchHistory(LegacyBaseModel):
     """
     __tablename__ = "batch_history"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(Integer, Identity(always=False), primary_key=True)
     batch_name = Column(String(128), nullable=False)
     batch_description = Column(Text, nullable=True)
     hotspot_id = Column(Integer, nullable=True)
 
+    # Operation tracking
+    operation_type = Column(String(50), nullable=False)
+    operation_details = Column(JSONB, nullable=True)
+    total_count = Column(Integer, default=0, nullable=False)
+    success_count = Column(Integer, default=0, nullable=False)
+    failure_count = Column(Integer, default=0, nullable=False)
+    status = Column(String(20), default='pending', nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    # API names of the legacy timestamp columns
+    created_at = synonym('creationdate')
+    updated_at = synonym('updatedate')
+
 
 class Operator(BaseModel):
     """
@@ -340,13 +355,13 @@ class Operator(BaseModel):
     lastname = Column(String(32), nullable=True)
     title = Column(String(32), nullable=True)
     company = Column(String(32), nullable=True)
-    phone1 = Column(String(32), nullable=True)
-    phone2 = Column(String(32), nullable=True)
-    email1 = Column(String(32), nullable=True)
-    email2 = Column(String(32), nullable=True)
-    messenger1 = Column(String(32), nullable=True)
-    messenger2 = Column(String(32), nullable=True)
-    notes = Column(String(128), nullable=True)
+    phone1 = Column(String(64), nullable=True)
+    phone2 = Column(String(64), nullable=True)
+    email1 = Column(String(254), nullable=True)
+    email2 = Column(String(254), nullable=True)
+    messenger1 = Column(Text, nullable=True)
+    messenger2 = Column(Text, nullable=True)
+    notes = Column(Text, nullable=True)
 
     # Permissions and roles will be handled separately
     permissions = Column(Text, nullable=True,
@@ -356,21 +371,19 @@ class Operator(BaseModel):
     acl_entries = relationship(
         "OperatorAcl", back_populates="operator", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('idx_operators_active_true', 'username', postgresql_where=text('is_active')),
+    )
+
     def set_password(self, password: str) -> None:
         """Set operator password (hashed)"""
-        import bcrypt
-        password_bytes = password.encode('utf-8')
-        hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
-        self.password = hashed.decode('utf-8')
+        from app.core.security import get_password_hash
+        self.password = get_password_hash(password)
 
     def verify_password(self, password: str) -> bool:
         """Verify operator password"""
-        if not self.password:
-            return False
-        import bcrypt
-        password_bytes = password.encode('utf-8')
-        hash_bytes = self.password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hash_bytes)
+        from app.core.security import verify_password
+        return verify_password(password, self.password)
 
     def __init__(self, **kwargs):
         # Handle password during initialization
@@ -5,10 +5,15 @@ This module provides data access layer for accounting-related operations,
 supporting session tracking, traffic analysis, and usage statistics.
 """
 
+import re
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any, Tuple
-from sqlalchemy import desc, asc, and_, or_, func, text, case, extract
-from sqlalchemy.orm import Session, aliased
+from typing import Optional, List, Dict, Any, Tuple, Callable, AsyncIterator, Sequence
+from sqlalchemy import (
+    desc, asc, and_, or_, func, text, case, extract, tuple_, select, delete, lambda_stmt
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
 from sqlalchemy.exc import SQLAlchemyError
 from decimal import Decimal
 
@@ -17,13 +22,50 @@ from app.models.accounting import (
 )
 from app.models.billing import BillingPlan
 from app.core.exceptions import DatabaseError, NotFoundError
-from app.core.logging import logger
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Statements a custom report query may not contain, matched as whole words
+# so column names such as acctupdatetime do not trip them
+_FORBIDDEN_SQL = re.compile(
+    r"\b(insert|update|delete|merge|drop|truncate|alter|create|grant|revoke|"
+    r"copy|vacuum|analyze|cluster|reindex|lock|call|do|set|reset|listen|notify)\b",
+    re.IGNORECASE,
+)
+_LEADING_COMMENTS = re.compile(r"^\s*(?:--[^\n]*\n\s*|/\*.*?\*/\s*)*", re.DOTALL)
+_HAS_LIMIT = re.compile(r"\blimit\b", re.IGNORECASE)
+
+
+def check_read_only_sql(query_sql: str) -> str:
+    """
+    Check that a custom query is a single read-only SELECT
+
+    This runs before any connection is taken, so rejected input never holds
+    a pool slot.
+
+    Returns:
+        str: The query without leading comments or a trailing semicolon
+
+    Raises:
+        ValueError: If the query is not a single SELECT/WITH statement or
+            contains a data-modifying or administrative keyword
+    """
+    query = _LEADING_COMMENTS.sub("", query_sql).strip().rstrip(";").rstrip()
+    if ";" in query:
+        raise ValueError("Only a single statement is allowed")
+    if not re.match(r"(select|with)\b", query, re.IGNORECASE):
+        raise ValueError("Only SELECT queries are allowed")
+    if _FORBIDDEN_SQL.search(query):
+        raise ValueError("Query contains prohibited keywords")
+    return query
 
 
 class AccountingRepository:
     """Repository for RADIUS accounting operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     # =====================================================================
@@ -40,37 +82,102 @@ class AccountingRepository:
     ) -> Tuple[List[RadAcct], int]:
         """Get all accounting sessions with filtering and pagination"""
         try:
-            query = self.session.query(RadAcct)
+            query = select(RadAcct)
 
             # Apply filters
             if filters:
                 query = self._apply_filters(query, filters)
 
             # Get total count
-            total = query.count()
+            total = await self._count(query)
 
-            # Apply sorting
+            # Apply sorting; radacctid breaks ties so pages are stable and
+            # the last row can seed a keyset cursor
             sort_column = getattr(RadAcct, sort_field, RadAcct.acctstarttime)
-            if sort_order == "desc":
-                query = query.order_by(desc(sort_column))
-            else:
-                query = query.order_by(asc(sort_column))
+            direction = desc if sort_order == "desc" else asc
+            query = query.order_by(direction(sort_column), direction(RadAcct.radacctid))
 
             # Apply pagination
             offset = (page - 1) * page_size
-            sessions = query.offset(offset).limit(page_size).all()
+            result = await self.session.execute(query.offset(offset).limit(page_size))
 
-            return sessions, total
+            return result.scalars().all(), total
 
         except SQLAlchemyError as e:
             logger.error(f"Error fetching accounting sessions: {str(e)}")
             raise DatabaseError(
                 f"Failed to fetch accounting sessions: {str(e)}")
 
+    async def get_sessions_after(
+        self,
+        after: Optional[Tuple[datetime, int]] = None,
+        page_size: int = 20,
+        filters: Optional[Dict[str, Any]] = None,
+        sort_order: str = "desc"
+    ) -> Tuple[List[RadAcct], bool]:
+        """Get the page of sessions following ``after`` in (acctstarttime, radacctid) order
+
+        Keyset pagination: the page starts right after the last row of the
+        previous one, so deep pages cost the same as the first. One extra
+        row is read to tell whether another page follows instead of
+        counting the whole result.
+        """
+        try:
+            query = select(RadAcct)
+
+            if filters:
+                query = self._apply_filters(query, filters)
+
+            key = tuple_(RadAcct.acctstarttime, RadAcct.radacctid)
+            if sort_order == "desc":
+                if after:
+                    query = query.filter(key < tuple_(*after))
+                query = query.order_by(desc(RadAcct.acctstarttime), desc(RadAcct.radacctid))
+            else:
+                if after:
+                    query = query.filter(key > tuple_(*after))
+                query = query.order_by(asc(RadAcct.acctstarttime), asc(RadAcct.radacctid))
+
+            result = await self.session.execute(query.limit(page_size + 1))
+            sessions = result.scalars().all()
+            return sessions[:page_size], len(sessions) > page_size
+
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching accounting sessions: {str(e)}")
+            raise DatabaseError(
+                f"Failed to fetch accounting sessions: {str(e)}")
+
+    async def stream_sessions(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        sort_order: str = "desc",
+        chunk: int = 1000
+    ) -> AsyncIterator[Sequence[RadAcct]]:
+        """Stream filtered sessions from a server-side cursor, ``chunk`` at a time
+
+        Only one partition is held in memory, and no COUNT(*) is run.
+        """
+        query = select(RadAcct)
+
+        if filters:
+            query = self._apply_filters(query, filters)
+
+        direction = desc if sort_order == "desc" else asc
+        query = query.order_by(direction(RadAcct.acctstarttime), direction(RadAcct.radacctid))
+
+        result = await self.session.stream_scalars(query.execution_options(yield_per=chunk))
+        try:
+            async for partition in result.partitions(chunk):
+                yield partition
+        finally:
+            await result.close()
+
     async def get_session_by_id(self, radacctid: int) -> Optional[RadAcct]:
         """Get accounting session by ID"""
         try:
-            return self.session.query(RadAcct).filter(RadAcct.radacctid == radacctid).first()
+            result = await self.session.execute(
+                lambda_stmt(lambda: select(RadAcct).where(RadAcct.radacctid == radacctid)))
+            return result.scalars().first()
         except SQLAlchemyError as e:
             logger.error(f"Error fetching session {radacctid}: {str(e)}")
             raise DatabaseError(f"Failed to fetch session: {str(e)}")
@@ -84,24 +191,16 @@ class AccountingRepository:
     ) -> Tuple[List[RadAcct], int]:
         """Get active sessions (no stop time)"""
         try:
-            query = self.session.query(RadAcct).filter(
-                RadAcct.acctstoptime.is_(None))
+            criteria = [lambda s: s.where(RadAcct.acctstoptime.is_(None))]
 
             if nas_ip:
-                query = query.filter(RadAcct.nasipaddress == nas_ip)
+                criteria.append(lambda s: s.where(RadAcct.nasipaddress == nas_ip))
 
             if username:
-                query = query.filter(RadAcct.username.ilike(f"%{username}%"))
-
-            # Get total count
-            total = query.count()
-
-            # Apply pagination and sorting
-            offset = (page - 1) * page_size
-            sessions = query.order_by(desc(RadAcct.acctstarttime)).offset(
-                offset).limit(page_size).all()
+                pattern = f"%{username}%"
+                criteria.append(lambda s: s.where(RadAcct.username.ilike(pattern)))
 
-            return sessions, total
+            return await self._newest_sessions_page(criteria, page, page_size)
 
         except SQLAlchemyError as e:
             logger.error(f"Error fetching active sessions: {str(e)}")
@@ -117,24 +216,15 @@ class AccountingRepository:
     ) -> Tuple[List[RadAcct], int]:
         """Get sessions for a specific user"""
         try:
-            query = self.session.query(RadAcct).filter(
-                RadAcct.username == username)
+            criteria = [lambda s: s.where(RadAcct.username == username)]
 
             if date_from:
-                query = query.filter(RadAcct.acctstarttime >= date_from)
+                criteria.append(lambda s: s.where(RadAcct.acctstarttime >= date_from))
 
             if date_to:
-                query = query.filter(RadAcct.acctstarttime <= date_to)
-
-            # Get total count
-            total = query.count()
+                criteria.append(lambda s: s.where(RadAcct.acctstarttime <= date_to))
 
-            # Apply pagination and sorting
-            offset = (page - 1) * page_size
-            sessions = query.order_by(desc(RadAcct.acctstarttime)).offset(
-                offset).limit(page_size).all()
-
-            return sessions, total
+            return await self._newest_sessions_page(criteria, page, page_size)
 
         except SQLAlchemyError as e:
             logger.error(
@@ -153,7 +243,7 @@ class AccountingRepository:
     ) -> Dict[str, Any]:
         """Get session statistics for a time period"""
         try:
-            query = self.session.query(RadAcct)
+            query = select(RadAcct)
 
             # Apply date filters
             if date_from:
@@ -166,13 +256,13 @@ class AccountingRepository:
                 query = self._apply_filters(query, filters)
 
             # Calculate statistics
-            stats = query.with_entities(
+            result = await self.session.execute(query.with_only_columns(
                 func.count(RadAcct.radacctid).label('total_sessions'),
                 func.count(
-                    case([(RadAcct.acctstoptime.is_(None), 1)])
+                    case((RadAcct.acctstoptime.is_(None), 1))
                 ).label('active_sessions'),
                 func.count(
-                    case([(RadAcct.acctstoptime.isnot(None), 1)])
+                    case((RadAcct.acctstoptime.isnot(None), 1))
                 ).label('completed_sessions'),
                 func.sum(RadAcct.acctsessiontime).label('total_session_time'),
                 func.avg(RadAcct.acctsessiontime).label('avg_session_time'),
@@ -182,7 +272,8 @@ class AccountingRepository:
                          RadAcct.acctoutputoctets).label('total_bytes'),
                 func.sum(RadAcct.acctinputoctets).label('total_input_octets'),
                 func.sum(RadAcct.acctoutputoctets).label('total_output_octets')
-            ).first()
+            ))
+            stats = result.first()
 
             return {
                 'total_sessions': stats.total_sessions or 0,
@@ -209,24 +300,25 @@ class AccountingRepository:
     ) -> List[Dict[str, Any]]:
         """Get top users by traffic consumption"""
         try:
-            query = self.session.query(RadAcct)
-
-            if date_from:
-                query = query.filter(RadAcct.acctstarttime >= date_from)
-            if date_to:
-                query = query.filter(RadAcct.acctstarttime <= date_to)
-
             # Group by username and calculate totals
-            results = query.with_entities(
+            stmt = lambda_stmt(lambda: select(
                 RadAcct.username,
                 func.count(RadAcct.radacctid).label('total_sessions'),
                 func.sum(RadAcct.acctinputoctets +
                          RadAcct.acctoutputoctets).label('total_bytes'),
                 func.sum(RadAcct.acctsessiontime).label('total_session_time'),
                 func.max(RadAcct.acctstarttime).label('last_session')
-            ).group_by(RadAcct.username)\
-             .order_by(desc('total_bytes'))\
-             .limit(limit).all()
+            ))
+
+            if date_from:
+                stmt += lambda s: s.where(RadAcct.acctstarttime >= date_from)
+            if date_to:
+                stmt += lambda s: s.where(RadAcct.acctstarttime <= date_to)
+
+            stmt += lambda s: s.group_by(RadAcct.username).order_by(
+                desc('total_bytes')).limit(limit)
+            result = await self.session.execute(stmt)
+            results = result.all()
 
             # Add ranking
             top_users = []
@@ -253,7 +345,7 @@ class AccountingRepository:
     ) -> List[Dict[str, Any]]:
         """Get hourly traffic distribution"""
         try:
-            query = self.session.query(RadAcct)
+            query = select(RadAcct)
 
             if date_from:
                 query = query.filter(RadAcct.acctstarttime >= date_from)
@@ -261,15 +353,16 @@ class AccountingRepository:
                 query = query.filter(RadAcct.acctstarttime <= date_to)
 
             # Group by hour and calculate statistics
-            results = query.with_entities(
+            result = await self.session.execute(query.with_only_columns(
                 extract('hour', RadAcct.acctstarttime).label('hour'),
                 func.count(RadAcct.radacctid).label('session_count'),
                 func.sum(RadAcct.acctinputoctets +
                          RadAcct.acctoutputoctets).label('total_bytes'),
                 func.count(func.distinct(RadAcct.username)
                            ).label('unique_users')
-            ).group_by('hour')\
-             .order_by('hour').all()
+            ).group_by('hour')
+             .order_by('hour'))
+            results = result.all()
 
             # Format results
             hourly_data = []
@@ -295,7 +388,7 @@ class AccountingRepository:
     ) -> List[Dict[str, Any]]:
         """Get NAS usage statistics"""
         try:
-            query = self.session.query(RadAcct)
+            query = select(RadAcct)
 
             if date_from:
                 query = query.filter(RadAcct.acctstarttime >= date_from)
@@ -303,16 +396,17 @@ class AccountingRepository:
                 query = query.filter(RadAcct.acctstarttime <= date_to)
 
             # Group by NAS IP and calculate statistics
-            results = query.with_entities(
+            result = await self.session.execute(query.with_only_columns(
                 RadAcct.nasipaddress,
                 func.count(RadAcct.radacctid).label('total_sessions'),
                 func.count(
-                    case([(RadAcct.acctstoptime.is_(None), 1)])
+                    case((RadAcct.acctstoptime.is_(None), 1))
                 ).label('active_sessions'),
                 func.sum(RadAcct.acctinputoctets +
                          RadAcct.acctoutputoctets).label('total_bytes')
-            ).group_by(RadAcct.nasipaddress)\
-             .order_by(desc('total_sessions')).all()
+            ).group_by(RadAcct.nasipaddress)
+             .order_by(desc('total_sessions')))
+            results = result.all()
 
             # Format results
             nas_stats = []
@@ -339,36 +433,38 @@ class AccountingRepository:
         self,
         query_sql: str,
         parameters: Optional[Dict[str, Any]] = None,
-        limit: int = 1000
+        limit: int = 1000,
+        timeout_seconds: int = 10
     ) -> Dict[str, Any]:
-        """Execute custom SQL query with safety checks"""
-        try:
-            # Basic safety checks
-            query_lower = query_sql.lower().strip()
-
-            # Only allow SELECT statements
-            if not query_lower.startswith('select'):
-                raise ValueError("Only SELECT queries are allowed")
+        """Execute custom SQL query with safety checks
 
-            # Block dangerous keywords
-            dangerous_keywords = ['drop', 'delete',
-                                  'update', 'insert', 'truncate', 'alter']
-            if any(keyword in query_lower for keyword in dangerous_keywords):
-                raise ValueError("Query contains prohibited keywords")
+        The query runs read-only under a statement_timeout inside a
+        savepoint, which is rolled back afterwards so neither setting
+        outlives it.
+        """
+        try:
+            query_sql = check_read_only_sql(query_sql)
 
             # Add limit if not present
-            if 'limit' not in query_lower:
+            if not _HAS_LIMIT.search(query_sql):
                 query_sql += f" LIMIT {limit}"
 
             # Execute query
             start_time = datetime.now()
-            result = self.session.execute(text(query_sql), parameters or {})
+            savepoint = await self.session.begin_nested()
+            try:
+                await self.session.execute(text("SET LOCAL transaction_read_only = on"))
+                await self.session.execute(text(
+                    f"SET LOCAL statement_timeout = {int(timeout_seconds * 1000)}"))
+                result = await self.session.execute(text(query_sql), parameters or {})
+
+                # Fetch results
+                columns = list(result.keys())
+                rows = [list(row) for row in result.fetchall()]
+            finally:
+                await savepoint.rollback()
             execution_time = (datetime.now() - start_time).total_seconds()
 
-            # Fetch results
-            columns = list(result.keys())
-            rows = [list(row) for row in result.fetchall()]
-
             return {
                 'columns': columns,
                 'rows': rows,
@@ -394,21 +490,22 @@ class AccountingRepository:
             cutoff_date = datetime.now() - timedelta(days=days_old)
 
             # Count records to be deleted
-            count_query = self.session.query(func.count(RadAcct.radacctid)).filter(
+            old_sessions = (
                 RadAcct.acctstarttime < cutoff_date,
                 # Only delete completed sessions
                 RadAcct.acctstoptime.isnot(None)
             )
-            record_count = count_query.scalar()
+            record_count = await self.session.scalar(
+                select(func.count(RadAcct.radacctid)).where(*old_sessions))
 
             if not dry_run and record_count > 0:
                 # Delete old records
-                delete_query = self.session.query(RadAcct).filter(
-                    RadAcct.acctstarttime < cutoff_date,
-                    RadAcct.acctstoptime.isnot(None)
+                result = await self.session.execute(
+                    delete(RadAcct).where(*old_sessions),
+                    execution_options={"synchronize_session": False}
                 )
-                deleted_count = delete_query.delete(synchronize_session=False)
-                self.session.commit()
+                deleted_count = result.rowcount
+                await self.session.commit()
 
                 return {
                     'operation_type': 'cleanup',
@@ -428,10 +525,69 @@ class AccountingRepository:
             logger.error(f"Error during cleanup operation: {str(e)}")
             raise DatabaseError(f"Cleanup operation failed: {str(e)}")
 
+    async def flush_staged_sessions(self) -> Dict[str, Any]:
+        """Move rows from the UNLOGGED radacct_stage table into radacct
+
+        Staged sessions are invisible to every radacct query, and to the
+        Interim-Update / Stop updates, until they are flushed, so this runs
+        every few seconds through ``python -m app.maintenance
+        flush-staged-sessions --every 5``.
+        """
+        try:
+            # DELETE ... RETURNING instead of INSERT + TRUNCATE so rows staged
+            # while the flush runs are not dropped without being copied
+            result = await self.session.execute(text(
+                "WITH moved AS (DELETE FROM radacct_stage RETURNING *) "
+                "INSERT INTO radacct SELECT * FROM moved"
+            ))
+            await self.session.commit()
+
+            return {
+                'operation_type': 'flush_stage',
+                'affected_rows': result.rowcount,
+                'success': True,
+                'message': f"Moved {result.rowcount} staged session records"
+            }
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error(f"Error flushing staged sessions: {str(e)}")
+            raise DatabaseError(f"Flushing staged sessions failed: {str(e)}")
+
     # =====================================================================
     # Helper Methods
     # =====================================================================
 
+    async def _newest_sessions_page(
+        self,
+        criteria: List[Callable[[Select], Select]],
+        page: int,
+        page_size: int
+    ) -> Tuple[List[RadAcct], int]:
+        """Run a newest-first page of sessions and its total as lambda statements
+
+        Each ``lambda s: s.where(...)`` step is cached by its code location
+        with its closure values as bound parameters, so repeated calls skip
+        building and compiling the SELECT and COUNT from scratch.
+        """
+        count_stmt = lambda_stmt(lambda: select(func.count(RadAcct.radacctid)))
+        page_stmt = lambda_stmt(lambda: select(RadAcct))
+        for criterion in criteria:
+            count_stmt += criterion
+            page_stmt += criterion
+
+        offset = (page - 1) * page_size
+        page_stmt += lambda s: s.order_by(desc(RadAcct.acctstarttime)).offset(offset).limit(page_size)
+
+        total = await self.session.scalar(count_stmt)
+        result = await self.session.execute(page_stmt)
+        return result.scalars().all(), total
+
+    async def _count(self, query) -> int:
+        """Count the rows a filtered SELECT would return"""
+        return await self.session.scalar(
+            query.with_only_columns(func.count(RadAcct.radacctid)).order_by(None))
+
     def _apply_filters(self, query, filters: Dict[str, Any]):
         """Apply filters to query"""
         for key, value in filters.items():
@@ -485,7 +641,7 @@ class AccountingRepository:
 class UserTrafficSummaryRepository:
     """Repository for user traffic summary operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_user_summary(
@@ -496,7 +652,7 @@ class UserTrafficSummaryRepository:
     ) -> List[UserTrafficSummary]:
         """Get traffic summary for a user"""
         try:
-            query = self.session.query(UserTrafficSummary).filter(
+            query = select(UserTrafficSummary).filter(
                 UserTrafficSummary.username == username
             )
 
@@ -507,7 +663,8 @@ class UserTrafficSummaryRepository:
                 query = query.filter(
                     UserTrafficSummary.summary_date <= date_to)
 
-            return query.order_by(desc(UserTrafficSummary.summary_date)).all()
+            result = await self.session.execute(query.order_by(desc(UserTrafficSummary.summary_date)))
+            return result.scalars().all()
 
         except SQLAlchemyError as e:
             logger.error(f"Error fetching user traffic summary: {str(e)}")
@@ -522,7 +679,7 @@ class UserTrafficSummaryRepository:
 class NasTrafficSummaryRepository:
     """Repository for NAS traffic summary operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_nas_summary(
@@ -533,7 +690,7 @@ class NasTrafficSummaryRepository:
     ) -> List[NasTrafficSummary]:
         """Get traffic summary for a NAS"""
         try:
-            query = self.session.query(NasTrafficSummary).filter(
+            query = select(NasTrafficSummary).filter(
                 NasTrafficSummary.nasipaddress == nasipaddress
             )
 
@@ -543,7 +700,8 @@ class NasTrafficSummaryRepository:
             if date_to:
                 query = query.filter(NasTrafficSummary.summary_date <= date_to)
 
-            return query.order_by(desc(NasTrafficSummary.summary_date)).all()
+            result = await self.session.execute(query.order_by(desc(NasTrafficSummary.summary_date)))
+            return result.scalars().all()
 
         except SQLAlchemyError as e:
             logger.error(f"Error fetching NAS traffic summary: {str(e)}")
@@ -6,24 +6,212 @@ following the repository pattern to abstract database operations.
 """
 
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any
-from sqlalchemy import desc, asc, and_, or_, func
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy.exc import SQLAlchemyError
+from typing import Optional, List, Dict, Any, Sequence, Tuple
+from sqlalchemy import Select, desc, asc, and_, or_, func, insert, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.models.billing import (
-    BillingPlan, BillingHistory, BillingMerchant,
+    BillingPlan, BillingHistory, BillingMerchant, BillingMerchantPayer,
     BillingRate, BillingPlanProfile, Invoice, Payment,
     Refund, PaymentType, POS
 )
-from app.core.exceptions import DatabaseError, NotFoundError
-from app.core.logging import logger
+from app.core.exceptions import BusinessLogicError, DatabaseError, NotFoundError, ValidationError
+from app.core.logging import get_logger
+from app.db.partitions import monthly_partition_statements
+
+logger = get_logger(__name__)
+
+
+# Sortable columns of each list, keyed by the sort_field values the API
+# accepts (the *SortField literals in app.schemas.billing)
+PLAN_SORT_COLUMNS = {
+    "id": BillingPlan.id,
+    "planName": BillingPlan.planName,
+    "planType": BillingPlan.planType,
+    "planCost": BillingPlan.planCost,
+    "planActive": BillingPlan.planActive,
+    "creationdate": BillingPlan.creationdate,
+    "updatedate": BillingPlan.updatedate,
+}
+HISTORY_SORT_COLUMNS = {
+    "id": BillingHistory.id,
+    "username": BillingHistory.username,
+    "planId": BillingHistory.planId,
+    "billAmount": BillingHistory.billAmount,
+    "billAction": BillingHistory.billAction,
+    "paymentmethod": BillingHistory.paymentmethod,
+    "creationdate": BillingHistory.creationdate,
+}
+RATE_SORT_COLUMNS = {
+    "id": BillingRate.id,
+    "rateName": BillingRate.rateName,
+    "rateType": BillingRate.rateType,
+    "rateCost": BillingRate.rateCost,
+    "creationdate": BillingRate.creationdate,
+}
+MERCHANT_SORT_COLUMNS = {
+    "id": BillingMerchant.id,
+    "username": BillingMerchant.username,
+    "planId": BillingMerchant.planId,
+    "business_id": BillingMerchant.business_id,
+    "txn_type": BillingMerchant.txn_type,
+    "payment_type": BillingMerchant.payment_type,
+    "payment_total": BillingMerchant.payment_total,
+    "payment_date": BillingMerchant.payment_date,
+    "payment_status": BillingMerchant.payment_status,
+}
+INVOICE_SORT_COLUMNS = {
+    "id": Invoice.id,
+    "invoice_number": Invoice.invoice_number,
+    "customer_id": Invoice.customer_id,
+    "customer_name": Invoice.customer_name,
+    "total_amount": Invoice.total_amount,
+    "status": Invoice.status,
+    "issue_date": Invoice.issue_date,
+    "due_date": Invoice.due_date,
+    "paid_date": Invoice.paid_date,
+    "creationdate": Invoice.creationdate,
+}
+PAYMENT_SORT_COLUMNS = {
+    "id": Payment.id,
+    "payment_number": Payment.payment_number,
+    "customer_id": Payment.customer_id,
+    "invoice_id": Payment.invoice_id,
+    "amount": Payment.amount,
+    "payment_method": Payment.payment_method,
+    "payment_date": Payment.payment_date,
+    "status": Payment.status,
+    "creationdate": Payment.creationdate,
+}
+REFUND_SORT_COLUMNS = {
+    "id": Refund.id,
+    "refund_number": Refund.refund_number,
+    "payment_id": Refund.payment_id,
+    "customer_id": Refund.customer_id,
+    "amount": Refund.amount,
+    "refund_date": Refund.refund_date,
+    "status": Refund.status,
+    "creationdate": Refund.creationdate,
+}
+PAYMENT_TYPE_SORT_COLUMNS = {
+    "id": PaymentType.id,
+    "name": PaymentType.name,
+    "display_name": PaymentType.display_name,
+    "code": PaymentType.code,
+    "is_active": PaymentType.is_active,
+    "sort_order": PaymentType.sort_order,
+    "creationdate": PaymentType.creationdate,
+}
+POS_SORT_COLUMNS = {
+    "id": POS.id,
+    "name": POS.name,
+    "serial_number": POS.serial_number,
+    "model": POS.model,
+    "location_name": POS.location_name,
+    "status": POS.status,
+    "last_heartbeat": POS.last_heartbeat,
+    "creationdate": POS.creationdate,
+}
+
+# Rows sent per multi-row INSERT by the bulk create methods
+BULK_INSERT_CHUNK = 1000
+
+
+def _chunks(rows: Sequence[Dict[str, Any]], size: int = BULK_INSERT_CHUNK):
+    """Split ``rows`` into consecutive slices of at most ``size``"""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def _count(session: AsyncSession, query: Select) -> int:
+    """Count the rows a filtered select would return"""
+    return await session.scalar(
+        select(func.count()).select_from(query.order_by(None).subquery()))
+
+
+def _key_value(column, value: Any) -> Any:
+    """Convert a JSON-decoded cursor value back to the column's Python type"""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type in (datetime, date):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+async def _fetch_page(
+    session: AsyncSession,
+    query: Select,
+    model,
+    sort_column,
+    sort_order: str,
+    page_size: int,
+    offset: int = 0,
+    after: Optional[Sequence[Any]] = None
+) -> Tuple[List[Any], Optional[Tuple[Any, int]]]:
+    """
+    Fetch one page of ``query`` ordered by (sort column, id)
+
+    With ``after`` the page seeks past that key instead of skipping
+    ``offset`` rows, so deep pages cost the same as the first. One extra
+    row is read to tell whether another page follows.
+
+    Rows with a NULL sort value come last in either direction. A row
+    comparison against NULL is never true, so on nullable columns the seek
+    also takes the NULL rows after a non-NULL key, and once the key itself
+    is NULL it walks the NULL rows by id.
+
+    Returns:
+        The rows, and the (sort value, id) key of the last row when
+        another page follows
+
+    Raises:
+        ValidationError: If ``after`` does not fit the sort columns
+    """
+    descending = sort_order == "desc"
+    order = desc if descending else asc
+
+    if after is not None:
+        try:
+            sort_value, row_id = after
+            sort_value = _key_value(sort_column, sort_value)
+            row_id = int(row_id)
+        except (ValueError, TypeError):
+            raise ValidationError("Invalid cursor")
+        if sort_value is None:
+            if not sort_column.nullable:
+                raise ValidationError("Invalid cursor")
+            query = query.where(
+                sort_column.is_(None),
+                model.id < row_id if descending else model.id > row_id)
+        else:
+            key = tuple_(sort_column, model.id)
+            after_key = tuple_(sort_value, row_id)
+            seek = key < after_key if descending else key > after_key
+            if sort_column.nullable:
+                seek = or_(seek, sort_column.is_(None))
+            query = query.where(seek)
+
+    sort_key = order(sort_column)
+    if sort_column.nullable:
+        sort_key = sort_key.nulls_last()
+    query = query.order_by(sort_key, order(model.id))
+    rows = (await session.scalars(query.offset(offset).limit(page_size + 1))).all()
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, (getattr(rows[-1], sort_column.key), rows[-1].id)
 
 
 class BillingPlanRepository:
     """Repository for billing plan operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_all(
@@ -34,39 +222,45 @@ class BillingPlanRepository:
         type_filter: Optional[str] = None,
         active_only: bool = False,
         sort_field: str = "id",
-        sort_order: str = "asc"
-    ) -> tuple[List[BillingPlan], int]:
-        """Get all billing plans with filtering and pagination"""
+        sort_order: str = "asc",
+        after: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[BillingPlan], Optional[int], Optional[Tuple[Any, int]]]:
+        """
+        Get all billing plans with filtering and pagination
+
+        With ``after``, the (sort value, id) key of the previous page's last
+        row, the page is found by keyset seek and the total is not counted.
+        """
         try:
             # Base query
-            query = self.session.query(BillingPlan)
+            query = select(BillingPlan)
 
             # Apply filters
             if name_filter:
-                query = query.filter(
+                query = query.where(
                     BillingPlan.planName.ilike(f"%{name_filter}%"))
 
             if type_filter:
-                query = query.filter(BillingPlan.planType == type_filter)
+                query = query.where(BillingPlan.planType == type_filter)
 
             if active_only:
-                query = query.filter(BillingPlan.planActive == True)
+                query = query.where(BillingPlan.planActive == 'yes')
 
-            # Get total count
-            total = query.count()
+            sort_column = PLAN_SORT_COLUMNS.get(sort_field, BillingPlan.id)
+            if after is not None:
+                plans, next_key = await _fetch_page(
+                    self.session, query, BillingPlan, sort_column, sort_order,
+                    page_size, after=after)
+                return plans, None, next_key
 
-            # Apply sorting
-            sort_column = getattr(BillingPlan, sort_field, BillingPlan.id)
-            if sort_order == "desc":
-                query = query.order_by(desc(sort_column))
-            else:
-                query = query.order_by(asc(sort_column))
+            # Get total count
+            total = await _count(self.session, query)
 
-            # Apply pagination
-            offset = (page - 1) * page_size
-            plans = query.offset(offset).limit(page_size).all()
+            plans, next_key = await _fetch_page(
+                self.session, query, BillingPlan, sort_column, sort_order,
+                page_size, offset=(page - 1) * page_size)
 
-            return plans, total
+            return plans, total, next_key
 
         except SQLAlchemyError as e:
             logger.error(f"Error fetching billing plans: {str(e)}")
@@ -75,7 +269,7 @@ class BillingPlanRepository:
     async def get_by_id(self, plan_id: int) -> Optional[BillingPlan]:
         """Get a billing plan by ID"""
         try:
-            return self.session.query(BillingPlan).filter(BillingPlan.id == plan_id).first()
+            return await self.session.get(BillingPlan, plan_id)
         except SQLAlchemyError as e:
             logger.error(f"Error fetching billing plan {plan_id}: {str(e)}")
             raise DatabaseError(f"Failed to fetch billing plan: {str(e)}")
@@ -83,7 +277,8 @@ class BillingPlanRepository:
     async def get_by_name(self, plan_name: str) -> Optional[BillingPlan]:
         """Get a billing plan by name"""
         try:
-            return self.session.query(BillingPlan).filter(BillingPlan.planName == plan_name).first()
+            return await self.session.scalar(
+                select(BillingPlan).where(BillingPlan.planName == plan_name).limit(1))
         except SQLAlchemyError as e:
             logger.error(
                 f"Error fetching billing plan by name {plan_name}: {str(e)}")
@@ -95,11 +290,11 @@ class BillingPlanRepository:
         try:
             plan = BillingPlan(**plan_data)
             self.session.add(plan)
-            self.session.flush()  # Get the ID before commit
+            await self.session.flush()  # Get the ID before commit
             return plan
         except SQLAlchemyError as e:
             logger.error(f"Error creating billing plan: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to create billing plan: {str(e)}")
 
     async def update(self, plan_id: int, update_data: Dict[str, Any]) -> Optional[BillingPlan]:
@@ -116,12 +311,12 @@ class BillingPlanRepository:
             # Update timestamp
             plan.updatedate = datetime.utcnow()
 
-            self.session.flush()
+            await self.session.flush()
             return plan
 
         except SQLAlchemyError as e:
             logger.error(f"Error updating billing plan {plan_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to update billing plan: {str(e)}")
 
     async def delete(self, plan_id: int) -> bool:
@@ -131,19 +326,29 @@ class BillingPlanRepository:
             if not plan:
                 return False
 
-            self.session.delete(plan)
-            self.session.flush()
+            await self.session.delete(plan)
+            await self.session.flush()
             return True
 
+        except IntegrityError:
+            # The planId foreign keys are ON DELETE RESTRICT
+            await self.session.rollback()
+            raise BusinessLogicError(
+                f"Billing plan {plan_id} is still referenced by billing history "
+                "or merchant transactions")
         except SQLAlchemyError as e:
             logger.error(f"Error deleting billing plan {plan_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to delete billing plan: {str(e)}")
 
     async def get_active_plans(self) -> List[BillingPlan]:
         """Get all active billing plans"""
         try:
-            return self.session.query(BillingPlan).filter(BillingPlan.planActive == True).all()
+            return (await self.session.scalars(
+                select(BillingPlan)
+                .where(BillingPlan.planActive == 'yes')
+                .order_by(BillingPlan.planName)
+            )).all()
         except SQLAlchemyError as e:
             logger.error(f"Error fetching active billing plans: {str(e)}")
             raise DatabaseError(
@@ -152,16 +357,22 @@ class BillingPlanRepository:
     async def get_plan_statistics(self) -> Dict[str, Any]:
         """Get billing plan statistics"""
         try:
-            total_plans = self.session.query(BillingPlan).count()
-            active_plans = self.session.query(BillingPlan).filter(
-                BillingPlan.planActive == True).count()
+            # Total and active counts in one pass
+            total_plans, active_plans = (await self.session.execute(
+                select(
+                    func.count(BillingPlan.id),
+                    func.count(BillingPlan.id).filter(BillingPlan.planActive == 'yes'),
+                )
+            )).one()
             inactive_plans = total_plans - active_plans
 
             # Get plans by type
-            type_stats = self.session.query(
-                BillingPlan.planType,
-                func.count(BillingPlan.id).label('count')
-            ).group_by(BillingPlan.planType).all()
+            type_stats = (await self.session.execute(
+                select(
+                    BillingPlan.planType,
+                    func.count(BillingPlan.id).label('count')
+                ).group_by(BillingPlan.planType)
+            )).all()
 
             return {
                 "total_plans": total_plans,
@@ -177,7 +388,7 @@ class BillingPlanRepository:
 class BillingHistoryRepository:
     """Repository for billing history operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_all(
@@ -189,42 +400,47 @@ class BillingHistoryRepository:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         sort_field: str = "id",
-        sort_order: str = "desc"
-    ) -> tuple[List[BillingHistory], int]:
-        """Get billing history with filtering and pagination"""
+        sort_order: str = "desc",
+        after: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[BillingHistory], Optional[int], Optional[Tuple[Any, int]]]:
+        """
+        Get billing history with filtering and pagination
+
+        With ``after``, the (sort value, id) key of the previous page's last
+        row, the page is found by keyset seek and the total is not counted.
+        """
         try:
-            query = self.session.query(BillingHistory)
+            query = select(BillingHistory)
 
             # Apply filters
             if username_filter:
-                query = query.filter(
+                query = query.where(
                     BillingHistory.username.ilike(f"%{username_filter}%"))
 
             if plan_id_filter:
-                query = query.filter(BillingHistory.planId == plan_id_filter)
+                query = query.where(BillingHistory.planId == plan_id_filter)
 
             if start_date:
-                query = query.filter(BillingHistory.creationdate >= start_date)
+                query = query.where(BillingHistory.creationdate >= start_date)
 
             if end_date:
-                query = query.filter(BillingHistory.creationdate <= end_date)
+                query = query.where(BillingHistory.creationdate <= end_date)
 
-            # Get total count
-            total = query.count()
+            sort_column = HISTORY_SORT_COLUMNS.get(sort_field, BillingHistory.id)
+            if after is not None:
+                history, next_key = await _fetch_page(
+                    self.session, query, BillingHistory, sort_column, sort_order,
+                    page_size, after=after)
+                return history, None, next_key
 
-            # Apply sorting
-            sort_column = getattr(
-                BillingHistory, sort_field, BillingHistory.id)
-            if sort_order == "desc":
-                query = query.order_by(desc(sort_column))
-            else:
-                query = query.order_by(asc(sort_column))
+            # Get total count
+            total = await _count(self.session, query)
 
-            # Apply pagination
-            offset = (page - 1) * page_size
-            history = query.offset(offset).limit(page_size).all()
+            history, next_key = await _fetch_page(
+                self.session, query, BillingHistory, sort_column, sort_order,
+                page_size, offset=(page - 1) * page_size)
 
-            return history, total
+            return history, total, next_key
 
         except SQLAlchemyError as e:
             logger.error(f"Error fetching billing history: {str(e)}")
@@ -233,7 +449,7 @@ class BillingHistoryRepository:
     async def get_by_id(self, history_id: int) -> Optional[BillingHistory]:
         """Get billing history by ID"""
         try:
-            return self.session.query(BillingHistory).filter(BillingHistory.id == history_id).first()
+            return await self.session.get(BillingHistory, history_id)
         except SQLAlchemyError as e:
             logger.error(
                 f"Error fetching billing history {history_id}: {str(e)}")
@@ -242,11 +458,12 @@ class BillingHistoryRepository:
     async def get_by_username(self, username: str, limit: int = 50) -> List[BillingHistory]:
         """Get billing history for a specific user"""
         try:
-            return (self.session.query(BillingHistory)
-                    .filter(BillingHistory.username == username)
-                    .order_by(desc(BillingHistory.creationdate))
-                    .limit(limit)
-                    .all())
+            return (await self.session.scalars(
+                select(BillingHistory)
+                .where(BillingHistory.username == username)
+                .order_by(desc(BillingHistory.creationdate))
+                .limit(limit)
+            )).all()
         except SQLAlchemyError as e:
             logger.error(
                 f"Error fetching billing history for user {username}: {str(e)}")
@@ -256,27 +473,87 @@ class BillingHistoryRepository:
     async def create(self, history_data: Dict[str, Any]) -> BillingHistory:
         """Create a new billing history record"""
         try:
+            plan_id = history_data.get('planId')
+            if plan_id and 'planName_snapshot' not in history_data:
+                plan = (await self.session.execute(
+                    select(BillingPlan.planName, BillingPlan.planCost)
+                    .where(BillingPlan.id == plan_id)
+                )).first()
+                if plan:
+                    history_data = {
+                        **history_data,
+                        'planName_snapshot': plan.planName,
+                        'planCost_snapshot': plan.planCost,
+                    }
+
             history = BillingHistory(**history_data)
             self.session.add(history)
-            self.session.flush()
+            await self.session.flush()
             return history
         except SQLAlchemyError as e:
             logger.error(f"Error creating billing history: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
+            raise DatabaseError(f"Failed to create billing history: {str(e)}")
+
+    async def bulk_create(
+        self,
+        history_data: Sequence[Dict[str, Any]],
+        created_by: Optional[str] = None
+    ) -> List[BillingHistory]:
+        """
+        Insert many billing history records with multi-row INSERT ... RETURNING
+
+        Plan snapshots are filled from one SELECT over every referenced plan.
+        Rows are sent BULK_INSERT_CHUNK at a time; nothing is committed here.
+        ``created_by`` is recorded as the creationby of every row.
+        """
+        try:
+            plan_ids = {row['planId'] for row in history_data
+                        if row.get('planId') and 'planName_snapshot' not in row}
+            plans = {}
+            if plan_ids:
+                plans = {
+                    plan.id: plan for plan in (await self.session.execute(
+                        select(BillingPlan.id, BillingPlan.planName, BillingPlan.planCost)
+                        .where(BillingPlan.id.in_(plan_ids))
+                    ))
+                }
+
+            rows = []
+            for row in history_data:
+                plan = plans.get(row.get('planId')) if 'planName_snapshot' not in row else None
+                if plan:
+                    row = {
+                        **row,
+                        'planName_snapshot': plan.planName,
+                        'planCost_snapshot': plan.planCost,
+                    }
+                if created_by:
+                    row = {**row, 'creationby': created_by}
+                rows.append(row)
+
+            history = []
+            for chunk in _chunks(rows):
+                history.extend(await self.session.scalars(
+                    insert(BillingHistory).returning(
+                        BillingHistory, sort_by_parameter_order=True), chunk))
+            return history
+        except SQLAlchemyError as e:
+            logger.error(f"Error bulk creating billing history: {str(e)}")
+            await self.session.rollback()
             raise DatabaseError(f"Failed to create billing history: {str(e)}")
 
     async def get_user_statistics(self, username: str) -> Dict[str, Any]:
         """Get billing statistics for a specific user"""
         try:
-            total_records = (self.session.query(BillingHistory)
-                             .filter(BillingHistory.username == username)
-                             .count())
-
-            # Get payment statistics
-            payment_stats = (self.session.query(
-                func.count(BillingHistory.id).label('count'),
-                func.sum(BillingHistory.billAmount).label('total_amount')
-            ).filter(BillingHistory.username == username).first())
+            # Get payment statistics; the record count is the same count
+            payment_stats = (await self.session.execute(
+                select(
+                    func.count(BillingHistory.id).label('count'),
+                    func.sum(BillingHistory.billAmount).label('total_amount')
+                ).where(BillingHistory.username == username)
+            )).first()
+            total_records = payment_stats.count if payment_stats else 0
 
             return {
                 "total_records": total_records,
@@ -288,11 +565,39 @@ class BillingHistoryRepository:
                 f"Error fetching user statistics for {username}: {str(e)}")
             raise DatabaseError(f"Failed to fetch user statistics: {str(e)}")
 
+    async def create_monthly_partitions(self, months_ahead: int = 2) -> int:
+        """Create billing_history partitions up to ``months_ahead`` months ahead
+
+        Partitions must exist before rows for their month arrive, or those
+        rows land in billing_history_default and the month's partition can
+        no longer be created. Run at least monthly through ``python -m
+        app.maintenance create-billing-partitions``. Returns the number of
+        partition statements issued, 0 when billing_history is not
+        partitioned.
+        """
+        try:
+            partitioned = await self.session.scalar(text(
+                "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('billing_history')"
+            ))
+            if not partitioned:
+                return 0
+
+            statements = monthly_partition_statements(
+                'billing_history', months_back=0, months_ahead=months_ahead)
+            for statement in statements:
+                await self.session.execute(text(statement))
+            await self.session.commit()
+            return len(statements)
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error(f"Error creating billing history partitions: {str(e)}")
+            raise DatabaseError(f"Failed to create billing history partitions: {str(e)}")
+
 
 class BillingRateRepository:
     """Repository for billing rate operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_all(
@@ -302,35 +607,41 @@ class BillingRateRepository:
         name_filter: Optional[str] = None,
         type_filter: Optional[str] = None,
         sort_field: str = "id",
-        sort_order: str = "asc"
-    ) -> tuple[List[BillingRate], int]:
-        """Get all billing rates with filtering and pagination"""
+        sort_order: str = "asc",
+        after: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[BillingRate], Optional[int], Optional[Tuple[Any, int]]]:
+        """
+        Get all billing rates with filtering and pagination
+
+        With ``after``, the (sort value, id) key of the previous page's last
+        row, the page is found by keyset seek and the total is not counted.
+        """
         try:
-            query = self.session.query(BillingRate)
+            query = select(BillingRate)
 
             # Apply filters
             if name_filter:
-                query = query.filter(
+                query = query.where(
                     BillingRate.rateName.ilike(f"%{name_filter}%"))
 
             if type_filter:
-                query = query.filter(BillingRate.rateType == type_filter)
+                query = query.where(BillingRate.rateType == type_filter)
 
-            # Get total count
-            total = query.count()
+            sort_column = RATE_SORT_COLUMNS.get(sort_field, BillingRate.id)
+            if after is not None:
+                rates, next_key = await _fetch_page(
+                    self.session, query, BillingRate, sort_column, sort_order,
+                    page_size, after=after)
+                return rates, None, next_key
 
-            # Apply sorting
-            sort_column = getattr(BillingRate, sort_field, BillingRate.id)
-            if sort_order == "desc":
-                query = query.order_by(desc(sort_column))
-            else:
-                query = query.order_by(asc(sort_column))
+            # Get total count
+            total = await _count(self.session, query)
 
-            # Apply pagination
-            offset = (page - 1) * page_size
-            rates = query.offset(offset).limit(page_size).all()
+            rates, next_key = await _fetch_page(
+                self.session, query, BillingRate, sort_column, sort_order,
+                page_size, offset=(page - 1) * page_size)
 
-            return rates, total
+            return rates, total, next_key
 
         except SQLAlchemyError as e:
             logger.error(f"Error fetching billing rates: {str(e)}")
@@ -339,7 +650,7 @@ class BillingRateRepository:
     async def get_by_id(self, rate_id: int) -> Optional[BillingRate]:
         """Get a billing rate by ID"""
         try:
-            return self.session.query(BillingRate).filter(BillingRate.id == rate_id).first()
+            return await self.session.get(BillingRate, rate_id)
         except SQLAlchemyError as e:
             logger.error(f"Error fetching billing rate {rate_id}: {str(e)}")
             raise DatabaseError(f"Failed to fetch billing rate: {str(e)}")
@@ -349,11 +660,11 @@ class BillingRateRepository:
         try:
             rate = BillingRate(**rate_data)
             self.session.add(rate)
-            self.session.flush()
+            await self.session.flush()
             return rate
         except SQLAlchemyError as e:
             logger.error(f"Error creating billing rate: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to create billing rate: {str(e)}")
 
     async def update(self, rate_id: int, update_data: Dict[str, Any]) -> Optional[BillingRate]:
@@ -370,12 +681,12 @@ class BillingRateRepository:
             # Update timestamp
             rate.updatedate = datetime.utcnow()
 
-            self.session.flush()
+            await self.session.flush()
             return rate
 
         except SQLAlchemyError as e:
             logger.error(f"Error updating billing rate {rate_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to update billing rate: {str(e)}")
 
     async def delete(self, rate_id: int) -> bool:
@@ -385,22 +696,34 @@ class BillingRateRepository:
             if not rate:
                 return False
 
-            self.session.delete(rate)
-            self.session.flush()
+            await self.session.delete(rate)
+            await self.session.flush()
             return True
 
         except SQLAlchemyError as e:
             logger.error(f"Error deleting billing rate {rate_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to delete billing rate: {str(e)}")
 
 
 class BillingMerchantRepository:
     """Repository for billing merchant operations"""
 
-    def __init__(self, session: Session):
+    # Fields stored on billing_merchant_payer rather than billing_merchant
+    PAYER_FIELDS = frozenset(
+        column.name for column in BillingMerchantPayer.__table__.columns
+        if column.name != 'merchant_id'
+    )
+
+    def __init__(self, session: AsyncSession):
         self.session = session
 
+    def _split_payer_fields(self, data: Dict[str, Any]) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """Split input data into (billing_merchant fields, payer fields)"""
+        merchant_fields = {k: v for k, v in data.items() if k not in self.PAYER_FIELDS}
+        payer_fields = {k: v for k, v in data.items() if k in self.PAYER_FIELDS}
+        return merchant_fields, payer_fields
+
     async def get_all(
         self,
         page: int = 1,
@@ -408,37 +731,42 @@ class BillingMerchantRepository:
         username_filter: Optional[str] = None,
         business_id_filter: Optional[str] = None,
         sort_field: str = "id",
-        sort_order: str = "desc"
-    ) -> tuple[List[BillingMerchant], int]:
-        """Get all merchant transactions with filtering and pagination"""
+        sort_order: str = "desc",
+        after: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[BillingMerchant], Optional[int], Optional[Tuple[Any, int]]]:
+        """
+        Get all merchant transactions with filtering and pagination
+
+        With ``after``, the (sort value, id) key of the previous page's last
+        row, the page is found by keyset seek and the total is not counted.
+        """
         try:
-            query = self.session.query(BillingMerchant)
+            query = select(BillingMerchant)
 
             # Apply filters
             if username_filter:
-                query = query.filter(
+                query = query.where(
                     BillingMerchant.username.ilike(f"%{username_filter}%"))
 
             if business_id_filter:
-                query = query.filter(
+                query = query.where(
                     BillingMerchant.business_id == business_id_filter)
 
+            sort_column = MERCHANT_SORT_COLUMNS.get(sort_field, BillingMerchant.id)
+            if after is not None:
+                merchants, next_key = await _fetch_page(
+                    self.session, query, BillingMerchant, sort_column, sort_order,
+                    page_size, after=after)
+                return merchants, None, next_key
+
             # Get total count
-            total = query.count()
+            total = await _count(self.session, query)
 
-            # Apply sorting
-            sort_column = getattr(
-                BillingMerchant, sort_field, BillingMerchant.id)
-            if sort_order == "desc":
-                query = query.order_by(desc(sort_column))
-            else:
-                query = query.order_by(asc(sort_column))
+            merchants, next_key = await _fetch_page(
+                self.session, query, BillingMerchant, sort_column, sort_order,
+                page_size, offset=(page - 1) * page_size)
 
-            # Apply pagination
-            offset = (page - 1) * page_size
-            merchants = query.offset(offset).limit(page_size).all()
-
-            return merchants, total
+            return merchants, total, next_key
 
         except SQLAlchemyError as e:
             logger.error(f"Error fetching merchant transactions: {str(e)}")
@@ -448,7 +776,11 @@ class BillingMerchantRepository:
     async def get_by_id(self, merchant_id: int) -> Optional[BillingMerchant]:
         """Get merchant transaction by ID"""
         try:
-            return self.session.query(BillingMerchant).filter(BillingMerchant.id == merchant_id).first()
+            # The payer row is loaded up front; update and the delete
+            # cascade both touch it and async sessions cannot lazy-load
+            return await self.session.get(
+                BillingMerchant, merchant_id,
+                options=[selectinload(BillingMerchant.payer)])
         except SQLAlchemyError as e:
             logger.error(
                 f"Error fetching merchant transaction {merchant_id}: {str(e)}")
@@ -458,16 +790,60 @@ class BillingMerchantRepository:
     async def create(self, merchant_data: Dict[str, Any]) -> BillingMerchant:
         """Create a new merchant transaction"""
         try:
-            merchant = BillingMerchant(**merchant_data)
+            merchant_fields, payer_fields = self._split_payer_fields(merchant_data)
+            merchant = BillingMerchant(**merchant_fields)
+            if payer_fields:
+                # Flushed with the merchant row, in the same transaction
+                merchant.payer = BillingMerchantPayer(**payer_fields)
             self.session.add(merchant)
-            self.session.flush()
+            await self.session.flush()
             return merchant
         except SQLAlchemyError as e:
             logger.error(f"Error creating merchant transaction: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(
                 f"Failed to create merchant transaction: {str(e)}")
 
+    async def bulk_create(
+        self,
+        merchant_data: Sequence[Dict[str, Any]],
+        created_by: Optional[str] = None
+    ) -> List[BillingMerchant]:
+        """
+        Insert many merchant transactions with multi-row INSERT ... RETURNING
+
+        Payer rows, when given, are inserted the same way keyed by the
+        returned merchant ids. Rows are sent BULK_INSERT_CHUNK at a time;
+        nothing is committed here. ``created_by`` is recorded as the
+        creationby of every transaction.
+        """
+        try:
+            if created_by:
+                merchant_data = [{**row, 'creationby': created_by} for row in merchant_data]
+
+            merchants = []
+            for chunk in _chunks(merchant_data):
+                split = [self._split_payer_fields(row) for row in chunk]
+                # Returned rows must line up with ``split`` to key the payers
+                inserted = (await self.session.scalars(
+                    insert(BillingMerchant).returning(
+                        BillingMerchant, sort_by_parameter_order=True),
+                    [merchant_fields for merchant_fields, _ in split])).all()
+                payers = [
+                    {**payer_fields, 'merchant_id': merchant.id}
+                    for merchant, (_, payer_fields) in zip(inserted, split)
+                    if payer_fields
+                ]
+                if payers:
+                    await self.session.execute(insert(BillingMerchantPayer), payers)
+                merchants.extend(inserted)
+            return merchants
+        except SQLAlchemyError as e:
+            logger.error(f"Error bulk creating merchant transactions: {str(e)}")
+            await self.session.rollback()
+            raise DatabaseError(
+                f"Failed to create merchant transactions: {str(e)}")
+
     async def update(self, merchant_id: int, merchant_data: Dict[str, Any]) -> Optional[BillingMerchant]:
         """Update an existing merchant transaction"""
         try:
@@ -475,17 +851,25 @@ class BillingMerchantRepository:
             if not merchant:
                 return None
 
-            for key, value in merchant_data.items():
+            merchant_fields, payer_fields = self._split_payer_fields(merchant_data)
+            for key, value in merchant_fields.items():
                 if hasattr(merchant, key):
                     setattr(merchant, key, value)
 
-            self.session.flush()
+            if payer_fields:
+                if merchant.payer is None:
+                    merchant.payer = BillingMerchantPayer(**payer_fields)
+                else:
+                    for key, value in payer_fields.items():
+                        setattr(merchant.payer, key, value)
+
+            await self.session.flush()
             return merchant
 
         except SQLAlchemyError as e:
             logger.error(
                 f"Error updating merchant transaction {merchant_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(
                 f"Failed to update merchant transaction: {str(e)}")
 
@@ -496,14 +880,14 @@ class BillingMerchantRepository:
             if not merchant:
                 return False
 
-            self.session.delete(merchant)
-            self.session.flush()
+            await self.session.delete(merchant)
+            await self.session.flush()
             return True
 
         except SQLAlchemyError as e:
             logger.error(
                 f"Error deleting merchant transaction {merchant_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(
                 f"Failed to delete merchant transaction: {str(e)}")
 
@@ -515,7 +899,7 @@ class BillingMerchantRepository:
 class InvoiceRepository:
     """Repository for invoice operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_all(
@@ -531,11 +915,11 @@ class InvoiceRepository:
     ) -> tuple[List[Invoice], int]:
         """Get all invoices with filtering and pagination"""
         try:
-            query = self.session.query(Invoice)
+            query = select(Invoice)
 
             # Apply filters
             if customer_filter:
-                query = query.filter(
+                query = query.where(
                     or_(
                         Invoice.customer_name.ilike(f"%{customer_filter}%"),
                         Invoice.customer_id.ilike(f"%{customer_filter}%")
@@ -543,19 +927,19 @@ class InvoiceRepository:
                 )
 
             if status_filter:
-                query = query.filter(Invoice.status == status_filter)
+                query = query.where(Invoice.status == status_filter)
 
             if date_from:
-                query = query.filter(Invoice.issue_date >= date_from)
+                query = query.where(Invoice.issue_date >= date_from)
 
             if date_to:
-                query = query.filter(Invoice.issue_date <= date_to)
+                query = query.where(Invoice.issue_date <= date_to)
 
             # Get total count
-            total = query.count()
+            total = await _count(self.session, query)
 
             # Apply sorting
-            sort_column = getattr(Invoice, sort_field, Invoice.id)
+            sort_column = INVOICE_SORT_COLUMNS.get(sort_field, Invoice.id)
             if sort_order == "desc":
                 query = query.order_by(desc(sort_column))
             else:
@@ -563,7 +947,8 @@ class InvoiceRepository:
 
             # Apply pagination
             offset = (page - 1) * page_size
-            invoices = query.offset(offset).limit(page_size).all()
+            invoices = (await self.session.scalars(
+                query.offset(offset).limit(page_size))).all()
 
             return invoices, total
 
@@ -574,7 +959,7 @@ class InvoiceRepository:
     async def get_by_id(self, invoice_id: int) -> Optional[Invoice]:
         """Get invoice by ID"""
         try:
-            return self.session.query(Invoice).filter(Invoice.id == invoice_id).first()
+            return await self.session.get(Invoice, invoice_id)
         except SQLAlchemyError as e:
             logger.error(f"Error fetching invoice {invoice_id}: {str(e)}")
             raise DatabaseError(f"Failed to fetch invoice: {str(e)}")
@@ -582,7 +967,8 @@ class InvoiceRepository:
     async def get_by_invoice_number(self, invoice_number: str) -> Optional[Invoice]:
         """Get invoice by invoice number"""
         try:
-            return self.session.query(Invoice).filter(Invoice.invoice_number == invoice_number).first()
+            return await self.session.scalar(
+                select(Invoice).where(Invoice.invoice_number == invoice_number).limit(1))
         except SQLAlchemyError as e:
             logger.error(f"Error fetching invoice {invoice_number}: {str(e)}")
             raise DatabaseError(f"Failed to fetch invoice: {str(e)}")
@@ -592,11 +978,11 @@ class InvoiceRepository:
         try:
             invoice = Invoice(**invoice_data)
             self.session.add(invoice)
-            self.session.flush()
+            await self.session.flush()
             return invoice
         except SQLAlchemyError as e:
             logger.error(f"Error creating invoice: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to create invoice: {str(e)}")
 
     async def update(self, invoice_id: int, invoice_data: Dict[str, Any]) -> Optional[Invoice]:
@@ -610,12 +996,12 @@ class InvoiceRepository:
                 if hasattr(invoice, key):
                     setattr(invoice, key, value)
 
-            self.session.flush()
+            await self.session.flush()
             return invoice
 
         except SQLAlchemyError as e:
             logger.error(f"Error updating invoice {invoice_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to update invoice: {str(e)}")
 
     async def delete(self, invoice_id: int) -> bool:
@@ -625,13 +1011,13 @@ class InvoiceRepository:
             if not invoice:
                 return False
 
-            self.session.delete(invoice)
-            self.session.flush()
+            await self.session.delete(invoice)
+            await self.session.flush()
             return True
 
         except SQLAlchemyError as e:
             logger.error(f"Error deleting invoice {invoice_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to delete invoice: {str(e)}")
 
 
@@ -642,7 +1028,7 @@ class InvoiceRepository:
 class PaymentRepository:
     """Repository for payment operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_all(
@@ -659,31 +1045,31 @@ class PaymentRepository:
     ) -> tuple[List[Payment], int]:
         """Get all payments with filtering and pagination"""
         try:
-            query = self.session.query(Payment)
+            query = select(Payment)
 
             # Apply filters
             if customer_filter:
-                query = query.filter(
+                query = query.where(
                     Payment.customer_id.ilike(f"%{customer_filter}%"))
 
             if payment_method_filter:
-                query = query.filter(
+                query = query.where(
                     Payment.payment_method == payment_method_filter)
 
             if status_filter:
-                query = query.filter(Payment.status == status_filter)
+                query = query.where(Payment.status == status_filter)
 
             if date_from:
-                query = query.filter(Payment.payment_date >= date_from)
+                query = query.where(Payment.payment_date >= date_from)
 
             if date_to:
-                query = query.filter(Payment.payment_date <= date_to)
+                query = query.where(Payment.payment_date <= date_to)
 
             # Get total count
-            total = query.count()
+            total = await _count(self.session, query)
 
             # Apply sorting
-            sort_column = getattr(Payment, sort_field, Payment.id)
+            sort_column = PAYMENT_SORT_COLUMNS.get(sort_field, Payment.id)
             if sort_order == "desc":
                 query = query.order_by(desc(sort_column))
             else:
@@ -691,7 +1077,8 @@ class PaymentRepository:
 
             # Apply pagination
             offset = (page - 1) * page_size
-            payments = query.offset(offset).limit(page_size).all()
+            payments = (await self.session.scalars(
+                query.offset(offset).limit(page_size))).all()
 
             return payments, total
 
@@ -702,7 +1089,7 @@ class PaymentRepository:
     async def get_by_id(self, payment_id: int) -> Optional[Payment]:
         """Get payment by ID"""
         try:
-            return self.session.query(Payment).filter(Payment.id == payment_id).first()
+            return await self.session.get(Payment, payment_id)
         except SQLAlchemyError as e:
             logger.error(f"Error fetching payment {payment_id}: {str(e)}")
             raise DatabaseError(f"Failed to fetch payment: {str(e)}")
@@ -710,7 +1097,8 @@ class PaymentRepository:
     async def get_by_customer(self, customer_id: str) -> List[Payment]:
         """Get payments by customer ID"""
         try:
-            return self.session.query(Payment).filter(Payment.customer_id == customer_id).all()
+            return (await self.session.scalars(
+                select(Payment).where(Payment.customer_id == customer_id))).all()
         except SQLAlchemyError as e:
             logger.error(
                 f"Error fetching payments for customer {customer_id}: {str(e)}")
@@ -721,11 +1109,11 @@ class PaymentRepository:
         try:
             payment = Payment(**payment_data)
             self.session.add(payment)
-            self.session.flush()
+            await self.session.flush()
             return payment
         except SQLAlchemyError as e:
             logger.error(f"Error creating payment: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to create payment: {str(e)}")
 
     async def update(self, payment_id: int, payment_data: Dict[str, Any]) -> Optional[Payment]:
@@ -739,12 +1127,12 @@ class PaymentRepository:
                 if hasattr(payment, key):
                     setattr(payment, key, value)
 
-            self.session.flush()
+            await self.session.flush()
             return payment
 
         except SQLAlchemyError as e:
             logger.error(f"Error updating payment {payment_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to update payment: {str(e)}")
 
     async def delete(self, payment_id: int) -> bool:
@@ -754,13 +1142,13 @@ class PaymentRepository:
             if not payment:
                 return False
 
-            self.session.delete(payment)
-            self.session.flush()
+            await self.session.delete(payment)
+            await self.session.flush()
             return True
 
         except SQLAlchemyError as e:
             logger.error(f"Error deleting payment {payment_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to delete payment: {str(e)}")
 
 
@@ -771,7 +1159,7 @@ class PaymentRepository:
 class RefundRepository:
     """Repository for refund operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_all(
@@ -786,24 +1174,24 @@ class RefundRepository:
     ) -> tuple[List[Refund], int]:
         """Get all refunds with filtering and pagination"""
         try:
-            query = self.session.query(Refund)
+            query = select(Refund)
 
             # Apply filters
             if customer_filter:
-                query = query.filter(
+                query = query.where(
                     Refund.customer_id.ilike(f"%{customer_filter}%"))
 
             if status_filter:
-                query = query.filter(Refund.status == status_filter)
+                query = query.where(Refund.status == status_filter)
 
             if payment_id_filter:
-                query = query.filter(Refund.payment_id == payment_id_filter)
+                query = query.where(Refund.payment_id == payment_id_filter)
 
             # Get total count
-            total = query.count()
+            total = await _count(self.session, query)
 
             # Apply sorting
-            sort_column = getattr(Refund, sort_field, Refund.id)
+            sort_column = REFUND_SORT_COLUMNS.get(sort_field, Refund.id)
             if sort_order == "desc":
                 query = query.order_by(desc(sort_column))
             else:
@@ -811,7 +1199,8 @@ class RefundRepository:
 
             # Apply pagination
             offset = (page - 1) * page_size
-            refunds = query.offset(offset).limit(page_size).all()
+            refunds = (await self.session.scalars(
+                query.offset(offset).limit(page_size))).all()
 
             return refunds, total
 
@@ -822,7 +1211,7 @@ class RefundRepository:
     async def get_by_id(self, refund_id: int) -> Optional[Refund]:
         """Get refund by ID"""
         try:
-            return self.session.query(Refund).filter(Refund.id == refund_id).first()
+            return await self.session.get(Refund, refund_id)
         except SQLAlchemyError as e:
             logger.error(f"Error fetching refund {refund_id}: {str(e)}")
             raise DatabaseError(f"Failed to fetch refund: {str(e)}")
@@ -830,7 +1219,8 @@ class RefundRepository:
     async def get_by_payment(self, payment_id: int) -> List[Refund]:
         """Get refunds by payment ID"""
         try:
-            return self.session.query(Refund).filter(Refund.payment_id == payment_id).all()
+            return (await self.session.scalars(
+                select(Refund).where(Refund.payment_id == payment_id))).all()
         except SQLAlchemyError as e:
             logger.error(
                 f"Error fetching refunds for payment {payment_id}: {str(e)}")
@@ -841,11 +1231,11 @@ class RefundRepository:
         try:
             refund = Refund(**refund_data)
             self.session.add(refund)
-            self.session.flush()
+            await self.session.flush()
             return refund
         except SQLAlchemyError as e:
             logger.error(f"Error creating refund: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to create refund: {str(e)}")
 
     async def update(self, refund_id: int, refund_data: Dict[str, Any]) -> Optional[Refund]:
@@ -859,12 +1249,12 @@ class RefundRepository:
                 if hasattr(refund, key):
                     setattr(refund, key, value)
 
-            self.session.flush()
+            await self.session.flush()
             return refund
 
         except SQLAlchemyError as e:
             logger.error(f"Error updating refund {refund_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to update refund: {str(e)}")
 
     async def delete(self, refund_id: int) -> bool:
@@ -874,13 +1264,13 @@ class RefundRepository:
             if not refund:
                 return False
 
-            self.session.delete(refund)
-            self.session.flush()
+            await self.session.delete(refund)
+            await self.session.flush()
             return True
 
         except SQLAlchemyError as e:
             logger.error(f"Error deleting refund {refund_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to delete refund: {str(e)}")
 
 
@@ -891,7 +1281,7 @@ class RefundRepository:
 class PaymentTypeRepository:
     """Repository for payment type operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_all(
@@ -905,11 +1295,11 @@ class PaymentTypeRepository:
     ) -> tuple[List[PaymentType], int]:
         """Get all payment types with filtering and pagination"""
         try:
-            query = self.session.query(PaymentType)
+            query = select(PaymentType)
 
             # Apply filters
             if name_filter:
-                query = query.filter(
+                query = query.where(
                     or_(
                         PaymentType.name.ilike(f"%{name_filter}%"),
                         PaymentType.display_name.ilike(f"%{name_filter}%")
@@ -917,14 +1307,14 @@ class PaymentTypeRepository:
                 )
 
             if active_only:
-                query = query.filter(PaymentType.is_active == True)
+                query = query.where(PaymentType.is_active == True)
 
             # Get total count
-            total = query.count()
+            total = await _count(self.session, query)
 
             # Apply sorting
-            sort_column = getattr(PaymentType, sort_field,
-                                  PaymentType.sort_order)
+            sort_column = PAYMENT_TYPE_SORT_COLUMNS.get(
+                sort_field, PaymentType.sort_order)
             if sort_order == "desc":
                 query = query.order_by(desc(sort_column))
             else:
@@ -932,7 +1322,8 @@ class PaymentTypeRepository:
 
             # Apply pagination
             offset = (page - 1) * page_size
-            payment_types = query.offset(offset).limit(page_size).all()
+            payment_types = (await self.session.scalars(
+                query.offset(offset).limit(page_size))).all()
 
             return payment_types, total
 
@@ -943,7 +1334,7 @@ class PaymentTypeRepository:
     async def get_by_id(self, payment_type_id: int) -> Optional[PaymentType]:
         """Get payment type by ID"""
         try:
-            return self.session.query(PaymentType).filter(PaymentType.id == payment_type_id).first()
+            return await self.session.get(PaymentType, payment_type_id)
         except SQLAlchemyError as e:
             logger.error(
                 f"Error fetching payment type {payment_type_id}: {str(e)}")
@@ -952,7 +1343,8 @@ class PaymentTypeRepository:
     async def get_by_code(self, code: str) -> Optional[PaymentType]:
         """Get payment type by code"""
         try:
-            return self.session.query(PaymentType).filter(PaymentType.code == code).first()
+            return await self.session.scalar(
+                select(PaymentType).where(PaymentType.code == code).limit(1))
         except SQLAlchemyError as e:
             logger.error(f"Error fetching payment type {code}: {str(e)}")
             raise DatabaseError(f"Failed to fetch payment type: {str(e)}")
@@ -962,11 +1354,11 @@ class PaymentTypeRepository:
         try:
             payment_type = PaymentType(**payment_type_data)
             self.session.add(payment_type)
-            self.session.flush()
+            await self.session.flush()
             return payment_type
         except SQLAlchemyError as e:
             logger.error(f"Error creating payment type: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to create payment type: {str(e)}")
 
     async def update(self, payment_type_id: int, payment_type_data: Dict[str, Any]) -> Optional[PaymentType]:
@@ -980,13 +1372,13 @@ class PaymentTypeRepository:
                 if hasattr(payment_type, key):
                     setattr(payment_type, key, value)
 
-            self.session.flush()
+            await self.session.flush()
             return payment_type
 
         except SQLAlchemyError as e:
             logger.error(
                 f"Error updating payment type {payment_type_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to update payment type: {str(e)}")
 
     async def delete(self, payment_type_id: int) -> bool:
@@ -996,14 +1388,14 @@ class PaymentTypeRepository:
             if not payment_type:
                 return False
 
-            self.session.delete(payment_type)
-            self.session.flush()
+            await self.session.delete(payment_type)
+            await self.session.flush()
             return True
 
         except SQLAlchemyError as e:
             logger.error(
                 f"Error deleting payment type {payment_type_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to delete payment type: {str(e)}")
 
 
@@ -1014,7 +1406,7 @@ class PaymentTypeRepository:
 class POSRepository:
     """Repository for POS terminal operations"""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_all(
@@ -1029,11 +1421,11 @@ class POSRepository:
     ) -> tuple[List[POS], int]:
         """Get all POS terminals with filtering and pagination"""
         try:
-            query = self.session.query(POS)
+            query = select(POS)
 
             # Apply filters
             if name_filter:
-                query = query.filter(
+                query = query.where(
                     or_(
                         POS.name.ilike(f"%{name_filter}%"),
                         POS.serial_number.ilike(f"%{name_filter}%")
@@ -1041,7 +1433,7 @@ class POSRepository:
                 )
 
             if location_filter:
-                query = query.filter(
+                query = query.where(
                     or_(
                         POS.location_id.ilike(f"%{location_filter}%"),
                         POS.location_name.ilike(f"%{location_filter}%")
@@ -1049,13 +1441,13 @@ class POSRepository:
                 )
 
             if status_filter:
-                query = query.filter(POS.status == status_filter)
+                query = query.where(POS.status == status_filter)
 
             # Get total count
-            total = query.count()
+            total = await _count(self.session, query)
 
             # Apply sorting
-            sort_column = getattr(POS, sort_field, POS.id)
+            sort_column = POS_SORT_COLUMNS.get(sort_field, POS.id)
             if sort_order == "desc":
                 query = query.order_by(desc(sort_column))
             else:
@@ -1063,7 +1455,8 @@ class POSRepository:
 
             # Apply pagination
             offset = (page - 1) * page_size
-            pos_terminals = query.offset(offset).limit(page_size).all()
+            pos_terminals = (await self.session.scalars(
+                query.offset(offset).limit(page_size))).all()
 
             return pos_terminals, total
 
@@ -1074,7 +1467,7 @@ class POSRepository:
     async def get_by_id(self, pos_id: int) -> Optional[POS]:
         """Get POS terminal by ID"""
         try:
-            return self.session.query(POS).filter(POS.id == pos_id).first()
+            return await self.session.get(POS, pos_id)
         except SQLAlchemyError as e:
             logger.error(f"Error fetching POS terminal {pos_id}: {str(e)}")
             raise DatabaseError(f"Failed to fetch POS terminal: {str(e)}")
@@ -1082,7 +1475,8 @@ class POSRepository:
     async def get_by_serial_number(self, serial_number: str) -> Optional[POS]:
         """Get POS terminal by serial number"""
         try:
-            return self.session.query(POS).filter(POS.serial_number == serial_number).first()
+            return await self.session.scalar(
+                select(POS).where(POS.serial_number == serial_number).limit(1))
         except SQLAlchemyError as e:
             logger.error(
                 f"Error fetching POS terminal {serial_number}: {str(e)}")
@@ -1093,11 +1487,11 @@ class POSRepository:
         try:
             pos = POS(**pos_data)
             self.session.add(pos)
-            self.session.flush()
+            await self.session.flush()
             return pos
         except SQLAlchemyError as e:
             logger.error(f"Error creating POS terminal: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to create POS terminal: {str(e)}")
 
     async def update(self, pos_id: int, pos_data: Dict[str, Any]) -> Optional[POS]:
@@ -1111,12 +1505,12 @@ class POSRepository:
                 if hasattr(pos, key):
                     setattr(pos, key, value)
 
-            self.session.flush()
+            await self.session.flush()
             return pos
 
         except SQLAlchemyError as e:
             logger.error(f"Error updating POS terminal {pos_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to update POS terminal: {str(e)}")
 
     async def delete(self, pos_id: int) -> bool:
@@ -1126,11 +1520,11 @@ class POSRepository:
             if not pos:
                 return False
 
-            self.session.delete(pos)
-            self.session.flush()
+            await self.session.delete(pos)
+            await self.session.flush()
             return True
 
         except SQLAlchemyError as e:
             logger.error(f"Error deleting POS terminal {pos_id}: {str(e)}")
-            self.session.rollback()
+            await self.session.rollback()
             raise DatabaseError(f"Failed to delete POS terminal: {str(e)}")
@@ -5,10 +5,15 @@ This module contains repository classes for graphs data access.
 """
 
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any, Tuple
-from sqlalchemy import func, and_, or_, desc, asc, text
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Sequence
+from sqlalchemy import (
+    Date, DateTime, Integer, String, func, and_, or_, desc, asc, text,
+    bindparam, update, delete
+)
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import Select
 from sqlalchemy.orm import joinedload, selectinload
 
 from app.models.graphs import (
@@ -22,12 +27,57 @@ from app.models.graphs import (
     GraphType,
     TimeGranularity
 )
-from app.models.user import User, UserSession
-from app.models.radacct import RadAcct
-from app.models.radcheck import RadCheck
+from app.models.user import User
+from app.models.accounting import RadAcct
+from app.models.radius import RadCheck
 from app.models.nas import Nas
 
 
+_PERIOD_AGGREGATE_SQL = """
+    SELECT
+        DATE_TRUNC('{unit}', recorded_date) as period_start,
+        SUM(value_count) as total_count,
+        SUM(value_sum) as total_sum,
+        AVG(value_avg) as avg_value,
+        MIN(value_min) as min_value,
+        MAX(value_max) as max_value
+    FROM graph_statistics
+    WHERE graph_type = :graph_type
+        AND metric_name = :metric_name
+        AND recorded_date >= :start_date
+        AND recorded_date <= :end_date
+    GROUP BY DATE_TRUNC('{unit}', recorded_date)
+    ORDER BY period_start
+"""
+
+# Week/month/year rollups of graph_statistics, built once with typed bind
+# parameters so every call reuses the same compiled and prepared statement
+_PERIOD_AGGREGATE_STMTS = {
+    unit: text(_PERIOD_AGGREGATE_SQL.format(unit=unit)).bindparams(
+        bindparam('graph_type', type_=String),
+        bindparam('metric_name', type_=String),
+        bindparam('start_date', type_=Date),
+        bindparam('end_date', type_=Date),
+    )
+    for unit in ('week', 'month', 'year')
+}
+
+
+async def stream_rows(db: AsyncSession, query: Select, chunk: int = 1000) -> AsyncIterator[Sequence[Row]]:
+    """
+    Run ``query`` on a server-side cursor and yield its rows ``chunk`` at a time
+
+    Only one partition is held in memory, so exports of long date ranges
+    don't materialize the whole result.
+    """
+    result = await db.stream(query.execution_options(yield_per=chunk))
+    try:
+        async for partition in result.partitions(chunk):
+            yield partition
+    finally:
+        await result.close()
+
+
 class GraphStatisticsRepository:
     """Repository for graph statistics operations"""
 
@@ -175,105 +225,26 @@ class GraphStatisticsRepository:
         self, graph_type: str, metric_name: str, start_date: date, end_date: date
     ) -> List[Dict[str, Any]]:
         """Aggregate data by week"""
-        result = await self.db.execute(
-            text("""
-                SELECT 
-                    DATE_TRUNC('week', recorded_date) as week_start,
-                    SUM(value_count) as total_count,
-                    SUM(value_sum) as total_sum,
-                    AVG(value_avg) as avg_value,
-                    MIN(value_min) as min_value,
-                    MAX(value_max) as max_value
-                FROM graph_statistics 
-                WHERE graph_type = :graph_type 
-                    AND metric_name = :metric_name
-                    AND recorded_date >= :start_date 
-                    AND recorded_date <= :end_date
-                GROUP BY DATE_TRUNC('week', recorded_date)
-                ORDER BY week_start
-            """),
-            {
-                'graph_type': graph_type,
-                'metric_name': metric_name,
-                'start_date': start_date,
-                'end_date': end_date
-            }
-        )
-
-        return [
-            {
-                'week_start': row.week_start,
-                'count': row.total_count or 0,
-                'sum': row.total_sum or 0,
-                'avg': row.avg_value or 0,
-                'min': row.min_value or 0,
-                'max': row.max_value or 0
-            }
-            for row in result
-        ]
+        return await self._aggregate_by_period('week', graph_type, metric_name, start_date, end_date)
 
     async def _aggregate_monthly(
         self, graph_type: str, metric_name: str, start_date: date, end_date: date
     ) -> List[Dict[str, Any]]:
         """Aggregate data by month"""
-        result = await self.db.execute(
-            text("""
-                SELECT 
-                    DATE_TRUNC('month', recorded_date) as month_start,
-                    SUM(value_count) as total_count,
-                    SUM(value_sum) as total_sum,
-                    AVG(value_avg) as avg_value,
-                    MIN(value_min) as min_value,
-                    MAX(value_max) as max_value
-                FROM graph_statistics 
-                WHERE graph_type = :graph_type 
-                    AND metric_name = :metric_name
-                    AND recorded_date >= :start_date 
-                    AND recorded_date <= :end_date
-                GROUP BY DATE_TRUNC('month', recorded_date)
-                ORDER BY month_start
-            """),
-            {
-                'graph_type': graph_type,
-                'metric_name': metric_name,
-                'start_date': start_date,
-                'end_date': end_date
-            }
-        )
-
-        return [
-            {
-                'month_start': row.month_start,
-                'count': row.total_count or 0,
-                'sum': row.total_sum or 0,
-                'avg': row.avg_value or 0,
-                'min': row.min_value or 0,
-                'max': row.max_value or 0
-            }
-            for row in result
-        ]
+        return await self._aggregate_by_period('month', graph_type, metric_name, start_date, end_date)
 
     async def _aggregate_yearly(
         self, graph_type: str, metric_name: str, start_date: date, end_date: date
     ) -> List[Dict[str, Any]]:
         """Aggregate data by year"""
+        return await self._aggregate_by_period('year', graph_type, metric_name, start_date, end_date)
+
+    async def _aggregate_by_period(
+        self, unit: str, graph_type: str, metric_name: str, start_date: date, end_date: date
+    ) -> List[Dict[str, Any]]:
+        """Aggregate data by a DATE_TRUNC unit; rows are keyed ``<unit>_start``"""
         result = await self.db.execute(
-            text("""
-                SELECT 
-                    DATE_TRUNC('year', recorded_date) as year_start,
-                    SUM(value_count) as total_count,
-                    SUM(value_sum) as total_sum,
-                    AVG(value_avg) as avg_value,
-                    MIN(value_min) as min_value,
-                    MAX(value_max) as max_value
-                FROM graph_statistics 
-                WHERE graph_type = :graph_type 
-                    AND metric_name = :metric_name
-                    AND recorded_date >= :start_date 
-                    AND recorded_date <= :end_date
-                GROUP BY DATE_TRUNC('year', recorded_date)
-                ORDER BY year_start
-            """),
+            _PERIOD_AGGREGATE_STMTS[unit],
             {
                 'graph_type': graph_type,
                 'metric_name': metric_name,
@@ -284,7 +255,7 @@ class GraphStatisticsRepository:
 
         return [
             {
-                'year_start': row.year_start,
+                f'{unit}_start': row.period_start,
                 'count': row.total_count or 0,
                 'sum': row.total_sum or 0,
                 'avg': row.avg_value or 0,
@@ -352,6 +323,30 @@ class LoginStatisticsRepository:
             for stat in stats
         ]
 
+    def export_query(
+        self, start_date: date, end_date: date, granularity: TimeGranularity = TimeGranularity.DAY
+    ) -> Select:
+        """Build the query behind the login graph export, selecting only exported columns"""
+        query = select(
+            LoginStatistics.stat_date,
+            LoginStatistics.stat_hour,
+            LoginStatistics.successful_logins,
+            LoginStatistics.failed_logins,
+            LoginStatistics.unique_users
+        ).where(
+            and_(
+                LoginStatistics.stat_date >= start_date,
+                LoginStatistics.stat_date <= end_date
+            )
+        )
+
+        if granularity == TimeGranularity.HOUR:
+            query = query.where(LoginStatistics.stat_hour.isnot(None))
+        else:
+            query = query.where(LoginStatistics.stat_hour.is_(None))
+
+        return query.order_by(LoginStatistics.stat_date, LoginStatistics.stat_hour)
+
     async def get_nas_breakdown(
         self, start_date: date, end_date: date
     ) -> Dict[str, int]:
@@ -418,6 +413,59 @@ class LoginStatisticsRepository:
         }
 
 
+_TOP_USERS_ORDER = {
+    'upload': 'total_upload',
+    'download': 'total_download',
+    'total': 'total_traffic',
+}
+
+# Days before the rollup's newest bucket come from mv_traffic_by_day. That
+# bucket was still filling when the view was last refreshed, so it and
+# everything after it are aggregated from radacct; an empty or stale view
+# only makes the radacct half longer. GREATEST skips the NULL high-water
+# mark of an empty view.
+_TOP_USERS_SQL = """
+    WITH rollup AS (
+        SELECT max(bucket_start) AS high_water FROM mv_traffic_by_day
+    ), usage AS (
+        SELECT username, bytes_down, bytes_up, session_count, total_time
+        FROM mv_traffic_by_day
+        WHERE bucket_start BETWEEN :start_date AND :end_date
+          AND bucket_start < (SELECT high_water FROM rollup)
+        UNION ALL
+        SELECT username,
+               SUM(acctinputoctets), SUM(acctoutputoctets),
+               COUNT(*), SUM(acctsessiontime)
+        FROM radacct
+        WHERE acctstarttime >= GREATEST(:start_date, (SELECT high_water FROM rollup))
+          AND acctstarttime <= :live_end
+        GROUP BY username
+    )
+    SELECT username,
+           SUM(bytes_down) AS total_download,
+           SUM(bytes_up) AS total_upload,
+           SUM(bytes_down + bytes_up) AS total_traffic,
+           SUM(session_count) AS session_count,
+           SUM(total_time) AS total_time
+    FROM usage
+    GROUP BY username
+    ORDER BY {order_column} DESC
+    LIMIT :limit
+"""
+
+# One statement per sort column, built once so repeated calls hit
+# SQLAlchemy's compiled cache and asyncpg's prepared statement cache
+_TOP_USERS_STMTS = {
+    order_column: text(_TOP_USERS_SQL.format(order_column=order_column)).bindparams(
+        bindparam('start_date', type_=Date),
+        bindparam('end_date', type_=Date),
+        bindparam('live_end', type_=DateTime(timezone=True)),
+        bindparam('limit', type_=Integer),
+    )
+    for order_column in _TOP_USERS_ORDER.values()
+}
+
+
 class TrafficStatisticsRepository:
     """Repository for traffic statistics operations"""
 
@@ -478,42 +526,49 @@ class TrafficStatisticsRepository:
             for stat in stats
         ]
 
+    def export_query(
+        self, start_date: date, end_date: date, granularity: TimeGranularity = TimeGranularity.DAY
+    ) -> Select:
+        """Build the query behind the traffic graph export, selecting only exported columns"""
+        query = select(
+            TrafficStatistics.stat_date,
+            TrafficStatistics.stat_hour,
+            TrafficStatistics.total_upload,
+            TrafficStatistics.total_download
+        ).where(
+            and_(
+                TrafficStatistics.stat_date >= start_date,
+                TrafficStatistics.stat_date <= end_date
+            )
+        )
+
+        if granularity == TimeGranularity.HOUR:
+            query = query.where(TrafficStatistics.stat_hour.isnot(None))
+        else:
+            query = query.where(TrafficStatistics.stat_hour.is_(None))
+
+        return query.order_by(TrafficStatistics.stat_date, TrafficStatistics.stat_hour)
+
     async def get_top_users_by_traffic(
         self, start_date: date, end_date: date, limit: int = 10, traffic_type: str = 'total'
     ) -> List[Dict[str, Any]]:
-        """Get top users by traffic usage"""
-        if traffic_type == 'upload':
-            order_field = desc(RadAcct.acctoutputoctets)
-            traffic_field = RadAcct.acctoutputoctets
-        elif traffic_type == 'download':
-            order_field = desc(RadAcct.acctinputoctets)
-            traffic_field = RadAcct.acctinputoctets
-        else:
-            order_field = desc(RadAcct.acctinputoctets +
-                               RadAcct.acctoutputoctets)
-            traffic_field = RadAcct.acctinputoctets + RadAcct.acctoutputoctets
+        """Get top users by traffic usage
+
+        Days the mv_traffic_by_day rollup has complete come from the view;
+        sessions from its last refreshed day onwards are aggregated from
+        radacct, so the result stays exact however long ago the view was
+        refreshed (see refresh_traffic_rollup).
+        """
+        order_column = _TOP_USERS_ORDER.get(traffic_type, 'total_traffic')
 
         result = await self.db.execute(
-            select(
-                RadAcct.username,
-                func.sum(RadAcct.acctinputoctets).label('total_download'),
-                func.sum(RadAcct.acctoutputoctets).label('total_upload'),
-                func.sum(RadAcct.acctinputoctets +
-                         RadAcct.acctoutputoctets).label('total_traffic'),
-                func.count(RadAcct.radacctid).label('session_count'),
-                func.sum(RadAcct.acctsessiontime).label('total_time')
-            )
-            .where(
-                and_(
-                    RadAcct.acctstarttime >= datetime.combine(
-                        start_date, datetime.min.time()),
-                    RadAcct.acctstarttime <= datetime.combine(
-                        end_date, datetime.max.time())
-                )
-            )
-            .group_by(RadAcct.username)
-            .order_by(order_field)
-            .limit(limit)
+            _TOP_USERS_STMTS[order_column],
+            {
+                'start_date': start_date,
+                'end_date': end_date,
+                'live_end': datetime.combine(end_date, datetime.max.time()),
+                'limit': limit,
+            }
         )
 
         return [
@@ -532,6 +587,15 @@ class TrafficStatisticsRepository:
             for row in result
         ]
 
+    async def refresh_traffic_rollup(self) -> None:
+        """Refresh mv_traffic_by_day without blocking readers
+
+        Run periodically through ``python -m app.maintenance
+        refresh-traffic-rollup``.
+        """
+        await self.db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_traffic_by_day"))
+        await self.db.commit()
+
     async def get_traffic_comparison(
         self, start_date: date, end_date: date, comparison_type: str = 'daily'
     ) -> Dict[str, Any]:
@@ -650,6 +714,25 @@ class UserStatisticsRepository:
             for stat in stats
         ]
 
+    def export_query(self, start_date: date, end_date: date) -> Select:
+        """Build the query behind the user activity graph export, selecting only exported columns"""
+        return (
+            select(
+                UserStatistics.stat_date,
+                UserStatistics.total_users,
+                UserStatistics.active_users,
+                UserStatistics.online_users,
+                UserStatistics.new_users
+            )
+            .where(
+                and_(
+                    UserStatistics.stat_date >= start_date,
+                    UserStatistics.stat_date <= end_date
+                )
+            )
+            .order_by(UserStatistics.stat_date)
+        )
+
     async def get_user_distribution(self, target_date: date) -> Dict[str, Any]:
         """Get user distribution by activity level"""
         result = await self.db.execute(
@@ -839,6 +922,22 @@ class SystemMetricsRepository:
         return round(total_score, 1)
 
 
+# Columns served by the template listing
+_TEMPLATE_LIST_COLUMNS = (
+    GraphTemplate.id,
+    GraphTemplate.name,
+    GraphTemplate.description,
+    GraphTemplate.category,
+    GraphTemplate.graph_type,
+    GraphTemplate.title,
+    GraphTemplate.subtitle,
+    GraphTemplate.chart_config,
+    GraphTemplate.data_source,
+    GraphTemplate.default_filters,
+    GraphTemplate.group_by_options,
+)
+
+
 class GraphTemplateRepository:
     """Repository for graph template operations"""
 
@@ -886,6 +985,50 @@ class GraphTemplateRepository:
         )
         return result.scalars().all()
 
+    async def list_templates(self, category: Optional[str] = None) -> Sequence[Row]:
+        """List active templates in ``category``, or all public ones, as plain rows
+
+        Only the columns the template listing returns are selected, and
+        they come back as rows rather than ORM instances, so no identity
+        map or attribute instrumentation is set up per template.
+        """
+        query = select(*_TEMPLATE_LIST_COLUMNS).where(GraphTemplate.is_active == True)
+
+        if category:
+            query = query.where(GraphTemplate.category == category).order_by(
+                GraphTemplate.sort_order, GraphTemplate.name)
+        else:
+            query = query.where(GraphTemplate.is_public == True).order_by(
+                GraphTemplate.category, GraphTemplate.sort_order, GraphTemplate.name)
+
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def exists(self, template_id: int) -> bool:
+        """Check whether a template exists"""
+        result = await self.db.execute(
+            select(GraphTemplate.id).where(GraphTemplate.id == template_id)
+        )
+        return result.first() is not None
+
+    async def update_owned(
+        self, template_id: int, owner: str, **values
+    ) -> Optional[GraphTemplate]:
+        """Update a template owned by ``owner`` in a single statement
+
+        Returns None when the template does not exist or belongs to another
+        user; use ``exists`` to tell the two apart.
+        """
+        result = await self.db.execute(
+            update(GraphTemplate)
+            .where(GraphTemplate.id == template_id, GraphTemplate.created_by == owner)
+            .values(**values)
+            .returning(GraphTemplate)
+        )
+        template = result.scalar_one_or_none()
+        await self.db.commit()
+        return template
+
     async def update(self, template_id: int, **kwargs) -> Optional[GraphTemplate]:
         """Update graph template"""
         template = await self.get_by_id(template_id)
@@ -949,42 +1092,52 @@ class DashboardWidgetRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
 
-    async def update_position(
-        self, widget_id: int, position_x: int, position_y: int
-    ) -> Optional[DashboardWidget]:
-        """Update widget position"""
-        widget = await self.get_by_id(widget_id)
-        if not widget:
-            return None
+    async def exists(self, widget_id: int) -> bool:
+        """Check whether a widget exists"""
+        result = await self.db.execute(
+            select(DashboardWidget.id).where(DashboardWidget.id == widget_id)
+        )
+        return result.first() is not None
 
-        widget.position_x = position_x
-        widget.position_y = position_y
+    async def update_owned(
+        self, widget_id: int, owner: str, **values
+    ) -> Optional[DashboardWidget]:
+        """Update a widget owned by ``owner`` in a single statement
 
+        Returns None when the widget does not exist or belongs to another
+        user; use ``exists`` to tell the two apart.
+        """
+        result = await self.db.execute(
+            update(DashboardWidget)
+            .where(DashboardWidget.id == widget_id, DashboardWidget.created_by == owner)
+            .values(**values)
+            .returning(DashboardWidget)
+        )
+        widget = result.scalar_one_or_none()
         await self.db.commit()
-        await self.db.refresh(widget)
         return widget
 
+    async def update_position(
+        self, widget_id: int, owner: str, position_x: int, position_y: int
+    ) -> Optional[DashboardWidget]:
+        """Update widget position"""
+        return await self.update_owned(
+            widget_id, owner, position_x=position_x, position_y=position_y
+        )
+
     async def update_size(
-        self, widget_id: int, width: int, height: int
+        self, widget_id: int, owner: str, width: int, height: int
     ) -> Optional[DashboardWidget]:
         """Update widget size"""
-        widget = await self.get_by_id(widget_id)
-        if not widget:
-            return None
-
-        widget.width = width
-        widget.height = height
+        return await self.update_owned(widget_id, owner, width=width, height=height)
 
+    async def delete(self, widget_id: int, owner: str) -> bool:
+        """Delete a widget owned by ``owner``"""
+        result = await self.db.execute(
+            delete(DashboardWidget)
+            .where(DashboardWidget.id == widget_id, DashboardWidget.created_by == owner)
+            .returning(DashboardWidget.id)
+        )
+        deleted = result.first() is not None
         await self.db.commit()
-        await self.db.refresh(widget)
-        return widget
-
-    async def delete(self, widget_id: int) -> bool:
-        """Delete widget"""
-        widget = await self.get_by_id(widget_id)
-        if not widget:
-            return False
-
-        await self.db.delete(widget)
-        await self.db.commit()
-        return True
+        return deleted
@@ -5,7 +5,7 @@ This module contains repository classes for user management operations
 including users, operators, groups, and their relationships.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
@@ -40,6 +40,29 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         """Get user by email address"""
         return await self.get_by_field("email", email, load_relationships=True)
 
+    async def username_or_email_taken(self, username: str, email: str) -> Tuple[bool, bool]:
+        """
+        Check whether a username and an email are in use, in one query
+
+        Only two booleans come back; no user rows are loaded.
+
+        Args:
+            username: Username to look for
+            email: Email address to look for
+
+        Returns:
+            (username_taken, email_taken)
+        """
+        result = await self.db.execute(
+            select(
+                func.bool_or(User.username == username),
+                func.bool_or(User.email == email),
+            ).where(or_(User.username == username, User.email == email))
+        )
+        username_taken, email_taken = result.one()
+        # bool_or over no rows is NULL
+        return bool(username_taken), bool(email_taken)
+
     async def authenticate(self, username: str, password: str) -> Optional[User]:
         """
         Authenticate user with username and password
@@ -157,6 +157,8 @@ class AccountingQuery(BaseModel):
     sort_field: str = Field("acctstarttime", description="Sort field")
     sort_order: str = Field("desc", regex="^(asc|desc)$",
                             description="Sort order")
+    cursor: Optional[str] = Field(
+        None, description="Cursor from a previous page's next_cursor; replaces page")
 
 
 # =====================================================================
@@ -285,6 +287,17 @@ class NasUsageReport(BaseModel):
         0.0, description="Utilization percentage")
 
 
+class CustomQueryRequest(BaseModel):
+    """Custom read-only query request"""
+    query_sql: str = Field(..., description="SELECT statement to run")
+    parameters: Optional[Dict[str, Any]] = Field(
+        None, description="Bound query parameters")
+    limit: int = Field(1000, ge=1, le=10000,
+                       description="Row limit added when the query has none")
+    timeout_seconds: int = Field(10, ge=1, le=30,
+                                 description="Statement timeout in seconds")
+
+
 class CustomQueryResult(BaseModel):
     """Custom query result"""
     columns: List[str] = Field(..., description="Column names")
@@ -309,6 +322,12 @@ class MaintenanceOperation(BaseModel):
     dry_run: bool = Field(True, description="Dry run mode")
 
 
+class MaintenanceRequest(BaseModel):
+    """Old session cleanup request"""
+    days_old: int = Field(365, ge=1, description="Delete sessions older than this")
+    dry_run: bool = Field(True, description="Only count the sessions")
+
+
 class MaintenanceResult(BaseModel):
     """Maintenance operation result"""
     operation_type: str = Field(..., description="Operation type")
@@ -327,12 +346,16 @@ class MaintenanceResult(BaseModel):
 class PaginatedAccountingResponse(BaseModel):
     """Paginated accounting records response"""
     data: List[RadAcctResponse] = Field(..., description="Accounting records")
-    total: int = Field(..., description="Total number of records")
+    total: Optional[int] = Field(
+        ..., description="Total number of records, not counted when paging by cursor")
     page: int = Field(..., description="Current page number")
     page_size: int = Field(..., description="Page size")
-    total_pages: int = Field(..., description="Total number of pages")
+    total_pages: Optional[int] = Field(
+        ..., description="Total number of pages, not counted when paging by cursor")
     has_next: bool = Field(..., description="Has next page")
     has_prev: bool = Field(..., description="Has previous page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page when sorted by start time")
 
 
 class PaginatedTopUsersResponse(BaseModel):
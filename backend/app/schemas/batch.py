@@ -117,19 +117,19 @@ class BatchOperationResult(BaseModel):
 class BatchUserOperationRequest(BatchOperationRequest):
     """Schema for batch user operations"""
     operation_type: str = Field(...,
-                                regex=r'^(create|delete|update|activate|deactivate)$')
+                                pattern=r'^(create|delete|update|activate|deactivate)$')
 
 
 class BatchNasOperationRequest(BatchOperationRequest):
     """Schema for batch NAS operations"""
     operation_type: str = Field(...,
-                                regex=r'^(delete|update|activate|deactivate)$')
+                                pattern=r'^(delete|update|activate|deactivate)$')
 
 
 class BatchGroupOperationRequest(BatchOperationRequest):
     """Schema for batch group operations"""
     operation_type: str = Field(...,
-                                regex=r'^(add_users|remove_users|delete|update)$')
+                                pattern=r'^(add_users|remove_users|delete|update)$')
 
 
 # Query schemas
@@ -143,7 +143,7 @@ class BatchHistoryQuery(BaseModel):
     page: int = Field(1, ge=1)
     size: int = Field(20, ge=1, le=100)
     sort_by: Optional[str] = Field("created_at")
-    sort_order: Optional[str] = Field("desc", regex=r'^(asc|desc)$')
+    sort_order: Optional[str] = Field("desc", pattern=r'^(asc|desc)$')
 
 
 class BatchHistoryListResponse(BaseModel):
@@ -7,7 +7,7 @@ and rate management validation and serialization.
 
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Literal, Dict
 from pydantic import BaseModel, Field, validator
 from enum import Enum
 
@@ -533,11 +533,12 @@ class BillingPlanBase(BaseModel):
         None, max_length=128, description="Recurring period")
     planRecurringBillingSchedule: Optional[str] = Field(
         None, max_length=128, description="Billing schedule")
-    planCost: Optional[str] = Field(
-        None, max_length=128, description="Plan cost")
-    planSetupCost: Optional[str] = Field(
-        None, max_length=128, description="Setup cost")
-    planTax: Optional[str] = Field(None, max_length=128, description="Tax")
+    planCost: Optional[Decimal] = Field(
+        None, ge=0, max_digits=14, decimal_places=4, description="Plan cost")
+    planSetupCost: Optional[Decimal] = Field(
+        None, ge=0, max_digits=14, decimal_places=4, description="Setup cost")
+    planTax: Optional[Decimal] = Field(
+        None, ge=0, max_digits=14, decimal_places=4, description="Tax")
     planCurrency: Optional[str] = Field(
         None, max_length=128, description="Currency")
     planGroup: Optional[str] = Field(
@@ -567,9 +568,9 @@ class BillingPlanUpdate(BaseModel):
     planRecurring: Optional[str] = Field(None, max_length=128)
     planRecurringPeriod: Optional[str] = Field(None, max_length=128)
     planRecurringBillingSchedule: Optional[str] = Field(None, max_length=128)
-    planCost: Optional[str] = Field(None, max_length=128)
-    planSetupCost: Optional[str] = Field(None, max_length=128)
-    planTax: Optional[str] = Field(None, max_length=128)
+    planCost: Optional[Decimal] = Field(None, ge=0, max_digits=14, decimal_places=4)
+    planSetupCost: Optional[Decimal] = Field(None, ge=0, max_digits=14, decimal_places=4)
+    planTax: Optional[Decimal] = Field(None, ge=0, max_digits=14, decimal_places=4)
     planCurrency: Optional[str] = Field(None, max_length=128)
     planGroup: Optional[str] = Field(None, max_length=128)
     planActive: Optional[bool] = Field(None)
@@ -593,8 +594,8 @@ class BillingHistoryBase(BaseModel):
     username: Optional[str] = Field(
         None, max_length=128, description="Username")
     planId: Optional[int] = Field(None, description="Plan ID")
-    billAmount: Optional[str] = Field(
-        None, max_length=200, description="Bill amount")
+    billAmount: Optional[Decimal] = Field(
+        None, max_digits=14, decimal_places=4, description="Bill amount")
     billAction: Optional[str] = Field(
         None, max_length=128, description="Bill action")
     billPerformer: Optional[str] = Field(
@@ -603,8 +604,8 @@ class BillingHistoryBase(BaseModel):
         None, max_length=200, description="Bill reason")
     paymentmethod: Optional[str] = Field(
         None, max_length=200, description="Payment method")
-    cash: Optional[str] = Field(
-        None, max_length=200, description="Cash amount")
+    cash: Optional[Decimal] = Field(
+        None, max_digits=14, decimal_places=4, description="Cash amount")
     creditcardname: Optional[str] = Field(
         None, max_length=200, description="Credit card name")
     creditcardnumber: Optional[str] = Field(
@@ -626,6 +627,8 @@ class BillingHistoryCreate(BillingHistoryBase):
 class BillingHistoryResponse(BillingHistoryBase):
     """Schema for billing history responses"""
     id: int
+    planName_snapshot: Optional[str] = None
+    planCost_snapshot: Optional[Decimal] = None
     creationdate: Optional[datetime] = None
     creationby: Optional[str] = None
 
@@ -678,8 +681,6 @@ class MerchantTransactionBase(BaseModel):
         None, max_length=128, description="Password")
     mac: Optional[str] = Field(None, max_length=200, description="MAC address")
     pin: Optional[str] = Field(None, max_length=200, description="PIN")
-    txnId: Optional[str] = Field(
-        None, max_length=200, description="Transaction ID")
     planName: Optional[str] = Field(
         None, max_length=128, description="Plan name")
     planId: Optional[int] = Field(None, description="Plan ID")
@@ -700,7 +701,7 @@ class MerchantTransactionBase(BaseModel):
 class MerchantTransactionCreate(MerchantTransactionBase):
     """Schema for creating merchant transactions"""
     username: str = Field(..., description="Username is required")
-    txnId: str = Field(..., description="Transaction ID is required")
+    txn_id: str = Field(..., description="Transaction ID is required")
     business_email: str = Field(..., description="Business email is required")
     business_id: str = Field(..., description="Business ID is required")
 
@@ -718,3 +719,58 @@ class MerchantTransactionResponse(MerchantTransactionBase):
 # =====================================================================
 # Invoice Schemas
 # =====================================================================
+
+
+# =====================================================================
+# List Sort Fields
+# =====================================================================
+
+PlanSortField = Literal[
+    "id", "planName", "planType", "planCost", "planActive", "creationdate",
+    "updatedate"
+]
+HistorySortField = Literal[
+    "id", "username", "planId", "billAmount", "billAction", "paymentmethod",
+    "creationdate"
+]
+RateSortField = Literal["id", "rateName", "rateType", "rateCost", "creationdate"]
+MerchantTransactionSortField = Literal[
+    "id", "username", "planId", "business_id", "txn_type", "payment_type",
+    "payment_total", "payment_date", "payment_status"
+]
+InvoiceSortField = Literal[
+    "id", "invoice_number", "customer_id", "customer_name", "total_amount",
+    "status", "issue_date", "due_date", "paid_date", "creationdate"
+]
+PaymentSortField = Literal[
+    "id", "payment_number", "customer_id", "invoice_id", "amount",
+    "payment_method", "payment_date", "status", "creationdate"
+]
+RefundSortField = Literal[
+    "id", "refund_number", "payment_id", "customer_id", "amount",
+    "refund_date", "status", "creationdate"
+]
+PaymentTypeSortField = Literal[
+    "id", "name", "display_name", "code", "is_active", "sort_order",
+    "creationdate"
+]
+POSSortField = Literal[
+    "id", "name", "serial_number", "model", "location_name", "status",
+    "last_heartbeat", "creationdate"
+]
+
+# =====================================================================
+# Pagination Schemas
+# =====================================================================
+
+class PaginatedResponse(BaseModel):
+    """Paginated billing list response"""
+    data: List[Any] = Field(..., description="Page items")
+    total: Optional[int] = Field(
+        None, description="Total number of items, not counted when paging by cursor")
+    page: int = Field(..., description="Current page number")
+    page_size: int = Field(..., description="Page size")
+    total_pages: Optional[int] = Field(
+        None, description="Total number of pages, not counted when paging by cursor")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, absent on the last page")
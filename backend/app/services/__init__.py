@@ -2,26 +2,37 @@
 Services package initialization module
 """
 
-from app.services.user import UserService
-from app.services.group import GroupService
-from app.services.user_group import UserGroupService
-from app.services.nas import NasService
-from app.services.hotspot import HotspotService
-from app.services.radius_management import RadiusManagementService
-from app.services.batch_service import BatchService
-from app.services.billing import (
-    BillingService,
-    InvoiceService,
-    PaymentService,
-    RefundService,
-    PaymentTypeService,
-    PosService
-)
-from app.services.accounting import (
-    AccountingService,
-    UserTrafficSummaryService,
-    NasTrafficSummaryService
-)
+import importlib
+
+# Services are imported from their modules on first access, so importing
+# one service module does not import (and configure) every other one
+_SERVICE_MODULES = {
+    "UserService": "app.services.user",
+    "GroupService": "app.services.group",
+    "UserGroupService": "app.services.user_group",
+    "NasService": "app.services.nas",
+    "HotspotService": "app.services.hotspot",
+    "RadiusManagementService": "app.services.radius_management",
+    "BatchService": "app.services.batch_service",
+    "BillingService": "app.services.billing",
+    "InvoiceService": "app.services.billing",
+    "PaymentService": "app.services.billing",
+    "RefundService": "app.services.billing",
+    "PaymentTypeService": "app.services.billing",
+    "PosService": "app.services.billing",
+    "AccountingService": "app.services.accounting",
+    "UserTrafficSummaryService": "app.services.accounting",
+    "NasTrafficSummaryService": "app.services.accounting",
+}
+
+
+def __getattr__(name: str):
+    """Import a service class from its module on first access"""
+    module = _SERVICE_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
+
 
 __all__ = [
     # User management services
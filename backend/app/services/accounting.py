@@ -5,11 +5,13 @@ This module provides business logic for accounting/session statistics
 and reporting functionality, implementing comprehensive analytics and monitoring.
 """
 
+import asyncio
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 from decimal import Decimal
 
 from app.repositories.accounting import (
+    check_read_only_sql,
     AccountingRepository,
     UserTrafficSummaryRepository,
     NasTrafficSummaryRepository
@@ -25,9 +27,14 @@ from app.schemas.accounting import (
     AccountingTimeRangeEnum
 )
 from app.core.exceptions import NotFoundError, ValidationError, BusinessLogicError
+from app.core.pagination import encode_cursor, decode_cursor
 from app.core.logging import logger
 
 
+# Upper bound for a custom report query's statement timeout
+CUSTOM_QUERY_MAX_TIMEOUT = 30
+
+
 class AccountingService:
     """Service for accounting operations and analytics"""
 
@@ -49,6 +56,9 @@ class AccountingService:
             # Process time range filters
             filters = self._process_filters(query.filters)
 
+            if query.cursor:
+                return await self._get_sessions_by_cursor(query, filters)
+
             # Get sessions from repository
             sessions, total = await self.repository.get_all_sessions(
                 page=query.page,
@@ -65,21 +75,77 @@ class AccountingService:
             # Calculate pagination info
             total_pages = (total + query.page_size - 1) // query.page_size
 
+            has_next = query.page < total_pages
             return PaginatedAccountingResponse(
                 data=session_responses,
                 total=total,
                 page=query.page,
                 page_size=query.page_size,
                 total_pages=total_pages,
-                has_next=query.page < total_pages,
-                has_prev=query.page > 1
+                has_next=has_next,
+                has_prev=query.page > 1,
+                next_cursor=self._next_cursor(query, sessions, has_next)
             )
 
+        except ValidationError:
+            raise
         except Exception as e:
             logger.error(f"Error in get_accounting_sessions: {str(e)}")
             raise BusinessLogicError(
                 f"Failed to get accounting sessions: {str(e)}")
 
+    async def stream_sessions(
+        self,
+        filters: Optional[AccountingQueryFilters] = None,
+        sort_order: str = "desc"
+    ) -> AsyncIterator[List[RadAcctResponse]]:
+        """Stream filtered sessions as response models, one cursor partition at a time"""
+        async for partition in self.repository.stream_sessions(
+            filters=self._process_filters(filters),
+            sort_order=sort_order
+        ):
+            yield [self._to_response_model(session) for session in partition]
+
+    async def _get_sessions_by_cursor(
+        self,
+        query: AccountingQuery,
+        filters: Dict[str, Any]
+    ) -> PaginatedAccountingResponse:
+        """Get the page after ``query.cursor`` without OFFSET or COUNT(*)"""
+        if query.sort_field != "acctstarttime":
+            raise ValidationError("Cursor pagination requires sorting by acctstarttime")
+        try:
+            starttime, radacctid = decode_cursor(query.cursor)
+            after = (datetime.fromisoformat(starttime), int(radacctid))
+        except (ValueError, TypeError):
+            raise ValidationError("Invalid cursor")
+
+        sessions, has_next = await self.repository.get_sessions_after(
+            after=after,
+            page_size=query.page_size,
+            filters=filters,
+            sort_order=query.sort_order
+        )
+
+        return PaginatedAccountingResponse(
+            data=[self._to_response_model(session) for session in sessions],
+            total=None,
+            page=query.page,
+            page_size=query.page_size,
+            total_pages=None,
+            has_next=has_next,
+            has_prev=True,
+            next_cursor=self._next_cursor(query, sessions, has_next)
+        )
+
+    @staticmethod
+    def _next_cursor(query: AccountingQuery, sessions: List[Any], has_next: bool) -> Optional[str]:
+        """Cursor pointing after the last session, when the sort allows keyset paging"""
+        if not has_next or not sessions or query.sort_field != "acctstarttime":
+            return None
+        last = sessions[-1]
+        return encode_cursor((last.acctstarttime.isoformat(), last.radacctid))
+
     async def get_session_by_id(self, session_id: int) -> RadAcctResponse:
         """Get accounting session by ID"""
         try:
@@ -362,22 +428,37 @@ class AccountingService:
         self,
         query_sql: str,
         parameters: Optional[Dict[str, Any]] = None,
-        limit: int = 1000
+        limit: int = 1000,
+        timeout_seconds: int = 10
     ) -> CustomQueryResult:
         """Execute custom accounting query"""
         try:
-            # Validate query
+            # Validate query before it can take a connection
             if not query_sql or not query_sql.strip():
                 raise ValidationError("Query SQL is required")
 
             if limit < 1 or limit > 10000:
                 raise ValidationError("Limit must be between 1 and 10000")
 
-            # Execute query
-            result = await self.repository.execute_custom_query(
-                query_sql=query_sql,
-                parameters=parameters,
-                limit=limit
+            if timeout_seconds < 1 or timeout_seconds > CUSTOM_QUERY_MAX_TIMEOUT:
+                raise ValidationError(
+                    f"Timeout must be between 1 and {CUSTOM_QUERY_MAX_TIMEOUT} seconds")
+
+            try:
+                check_read_only_sql(query_sql)
+            except ValueError as e:
+                raise ValidationError(str(e))
+
+            # statement_timeout cancels the query server-side; the client-side
+            # deadline also covers connecting and fetching
+            result = await asyncio.wait_for(
+                self.repository.execute_custom_query(
+                    query_sql=query_sql,
+                    parameters=parameters,
+                    limit=limit,
+                    timeout_seconds=timeout_seconds
+                ),
+                timeout=timeout_seconds + 1
             )
 
             return CustomQueryResult(
@@ -387,6 +468,11 @@ class AccountingService:
                 execution_time=result['execution_time']
             )
 
+        except ValidationError:
+            raise
+        except asyncio.TimeoutError:
+            raise BusinessLogicError(
+                f"Custom query exceeded {timeout_seconds} seconds")
         except Exception as e:
             logger.error(f"Error in execute_custom_query: {str(e)}")
             raise BusinessLogicError(
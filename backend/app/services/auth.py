@@ -5,19 +5,33 @@ Provides comprehensive authentication and authorization services
 including JWT token management, password handling, and session management.
 """
 
+import asyncio
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 import jwt
-import bcrypt
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import secrets
 import hashlib
 
 from app.core.config import settings
+from app.core.security import get_password_hash, password_needs_rehash
+from app.core.security import verify_password as verify_password_hash
+from app.core.token_cache import (
+    CachedUser, forget_user, get_token_claims, get_token_user, is_token_revoked, revoke_token,
+    set_token_claims, set_token_user
+)
 from app.models.user import User, Operator, UserStatus, AuthType
 from app.repositories.user import UserRepository, OperatorRepository
 
+# Permissions granted to every active user; built once, copied per call
+ACTIVE_USER_PERMISSIONS = (
+    "user.view",
+    "user.edit",
+    "accounting.view",
+    "reports.view",
+)
+
 
 class AuthService:
     """
@@ -25,7 +39,7 @@ class AuthService:
     JWT token management, and authorization.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.user_repository = UserRepository(db)
         self.operator_repository = OperatorRepository(db)
@@ -44,10 +58,15 @@ class AuthService:
         # First try user table
         user = await self.user_repository.get_by_username(username)
         if user and user.is_active and user.status == UserStatus.ACTIVE:
-            if self.verify_password(password, user.password_hash):
-                # Update last login
+            if await asyncio.to_thread(self.verify_password, password, user.password_hash):
+                # Update last login, upgrading a legacy hash while the
+                # plain password is at hand
                 user.last_login = datetime.utcnow()
-                await self.user_repository.update(user.id, {"last_login": user.last_login})
+                update_data = {"last_login": user.last_login}
+                if password_needs_rehash(user.password_hash):
+                    update_data["password_hash"] = await asyncio.to_thread(
+                        self.hash_password, password)
+                await self.user_repository.update(user.id, update_data)
                 return user
 
         return None
@@ -65,28 +84,37 @@ class AuthService:
         """
         operator = await self.operator_repository.get_by_username(username)
         if operator:
-            if self.verify_password(password, operator.password):
-                # Update last login
+            if await asyncio.to_thread(self.verify_password, password, operator.password):
+                # Update last login, upgrading a legacy hash while the
+                # plain password is at hand
                 operator.lastlogin = datetime.utcnow()
-                await self.operator_repository.update(operator.id, {"lastlogin": operator.lastlogin})
+                update_data = {"lastlogin": operator.lastlogin}
+                if password_needs_rehash(operator.password):
+                    update_data["password"] = await asyncio.to_thread(
+                        self.hash_password, password)
+                await self.operator_repository.update(operator.id, update_data)
                 return operator
 
         return None
 
-    def hash_password(self, password: str) -> str:
+    @staticmethod
+    def hash_password(password: str) -> str:
         """
-        Hash password using bcrypt
+        Hash password using Argon2id
+
+        The KDF is CPU-bound; call it through asyncio.to_thread from
+        request handlers.
 
         Args:
             password: Plain text password
 
         Returns:
-            Hashed password
+            Hashed password ($argon2id$ PHC string)
         """
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        return get_password_hash(password)
 
-    def verify_password(self, password: str, hashed_password: str) -> bool:
+    @staticmethod
+    def verify_password(password: str, hashed_password: str) -> bool:
         """
         Verify password against hash
 
@@ -97,15 +125,10 @@ class AuthService:
         Returns:
             True if password matches, False otherwise
         """
-        if not hashed_password:
-            return False
-
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
-        except Exception:
-            return False
+        return verify_password_hash(password, hashed_password)
 
-    def create_access_token(self, user_data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    @staticmethod
+    def create_access_token(user_data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         """
         Create JWT access token
 
@@ -133,7 +156,8 @@ class AuthService:
 
         return encoded_jwt
 
-    def create_refresh_token(self, user_data: Dict[str, Any]) -> str:
+    @staticmethod
+    def create_refresh_token(user_data: Dict[str, Any]) -> str:
         """
         Create JWT refresh token
 
@@ -167,24 +191,28 @@ class AuthService:
         Returns:
             Decoded token payload if valid, None otherwise
         """
-        try:
-            payload = jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM]
-            )
+        if is_token_revoked(token):
+            return None
 
-            if payload.get("type") != token_type:
+        payload = get_token_claims(token)
+        if payload is None:
+            try:
+                payload = jwt.decode(
+                    token,
+                    settings.SECRET_KEY,
+                    algorithms=[settings.ALGORITHM]
+                )
+            except jwt.InvalidTokenError:
+                # Covers ExpiredSignatureError and malformed tokens
                 return None
+            set_token_claims(token, payload)
 
-            return payload
-
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.JWTError:
+        if payload.get("type") != token_type:
             return None
 
-    async def get_current_user(self, token: str) -> Optional[User]:
+        return payload
+
+    async def get_current_user(self, token: str) -> Optional[CachedUser]:
         """
         Get current user from JWT token
 
@@ -192,22 +220,37 @@ class AuthService:
             token: JWT access token
 
         Returns:
-            User instance if token is valid, None otherwise
+            Snapshot of the user if token is valid, None otherwise
         """
         payload = self.verify_token(token, "access")
         if not payload:
             return None
 
+        user = get_token_user(token)
+        if user is not None:
+            return user
+
         username = payload.get("sub")
         if not username:
             return None
 
-        user = await self.user_repository.get_by_username(username)
-        if not user or not user.is_active:
+        row = await self.user_repository.get_by_username(username)
+        if not row or not row.is_active:
             return None
 
+        user = CachedUser.from_user(row)
+        set_token_user(token, user)
         return user
 
+    def revoke_token(self, token: str) -> None:
+        """
+        Revoke a token, e.g. on logout
+
+        Args:
+            token: JWT token to reject from now on
+        """
+        revoke_token(token)
+
     async def get_current_operator(self, token: str) -> Optional[Operator]:
         """
         Get current operator from JWT token
@@ -279,11 +322,11 @@ class AuthService:
             return False
 
         # Verify current password
-        if not self.verify_password(current_password, user.password_hash):
+        if not await asyncio.to_thread(self.verify_password, current_password, user.password_hash):
             return False
 
         # Hash new password
-        new_password_hash = self.hash_password(new_password)
+        new_password_hash = await asyncio.to_thread(self.hash_password, new_password)
 
         # Update password
         update_data = {
@@ -292,6 +335,7 @@ class AuthService:
         }
 
         await self.user_repository.update(user_id, update_data)
+        forget_user(user_id)
         return True
 
     async def reset_password(self, email: str, new_password: str, verification_code: str) -> bool:
@@ -314,7 +358,7 @@ class AuthService:
         # For now, we'll assume it's valid
 
         # Hash new password
-        new_password_hash = self.hash_password(new_password)
+        new_password_hash = await asyncio.to_thread(self.hash_password, new_password)
 
         # Update password
         update_data = {
@@ -323,9 +367,11 @@ class AuthService:
         }
 
         await self.user_repository.update(user.id, update_data)
+        forget_user(user.id)
         return True
 
-    def generate_verification_code(self) -> str:
+    @staticmethod
+    def generate_verification_code() -> str:
         """
         Generate verification code for password reset
 
@@ -353,7 +399,8 @@ class AuthService:
         # This can be extended with proper role-based access control
         return True
 
-    def get_user_permissions(self, user: User) -> List[str]:
+    @staticmethod
+    def get_user_permissions(user: Union[User, CachedUser]) -> List[str]:
         """
         Get user permissions
 
@@ -366,12 +413,7 @@ class AuthService:
         permissions = []
 
         if user.is_active and user.status == UserStatus.ACTIVE:
-            permissions.extend([
-                "user.view",
-                "user.edit",
-                "accounting.view",
-                "reports.view"
-            ])
+            permissions.extend(ACTIVE_USER_PERMISSIONS)
 
         # Add more permissions based on user role if needed
         return permissions
@@ -7,8 +7,8 @@ including executing batch operations and tracking their history.
 
 from datetime import datetime
 from typing import Any, Dict, List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import BatchHistory, User, UserGroup
 from app.models.nas import Nas
@@ -23,9 +23,14 @@ from app.schemas.batch import (
 class BatchService:
     """Service for handling batch operations"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _load_by_ids(self, model: Any, ids: List[int]) -> Dict[int, Any]:
+        """Load every target of a batch in one query, keyed by ID"""
+        result = await self.db.scalars(select(model).where(model.id.in_(ids)))
+        return {row.id: row for row in result}
+
     async def execute_user_batch_operation(
         self,
         operation_request: BatchUserOperationRequest,
@@ -52,8 +57,8 @@ class BatchService:
         )
 
         self.db.add(batch_history)
-        self.db.commit()
-        self.db.refresh(batch_history)
+        await self.db.commit()
+        await self.db.refresh(batch_history)
 
         try:
             success_count = 0
@@ -92,7 +97,7 @@ class BatchService:
                     # Store first 5 errors
                     [str(error) for error in errors[:5]])
 
-            self.db.commit()
+            await self.db.commit()
 
             return BatchOperationResult(
                 batch_history_id=batch_history.id,
@@ -110,7 +115,7 @@ class BatchService:
             batch_history.status = "failed"
             batch_history.error_message = str(e)
             batch_history.completed_at = datetime.utcnow()
-            self.db.commit()
+            await self.db.commit()
             raise
 
     async def _batch_delete_users(self, user_ids: List[int]) -> tuple[int, int, List[Dict[str, Any]]]:
@@ -119,11 +124,12 @@ class BatchService:
         failure_count = 0
         errors = []
 
+        users = await self._load_by_ids(User, user_ids)
         for user_id in user_ids:
             try:
-                user = self.db.query(User).filter(User.id == user_id).first()
+                user = users.get(user_id)
                 if user:
-                    self.db.delete(user)
+                    await self.db.delete(user)
                     success_count += 1
                 else:
                     failure_count += 1
@@ -134,9 +140,9 @@ class BatchService:
                 errors.append({"user_id": user_id, "error": str(e)})
 
         try:
-            self.db.commit()
+            await self.db.commit()
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             # If commit fails, all operations failed
             return 0, len(user_ids), [{"error": f"Commit failed: {str(e)}"}]
 
@@ -150,9 +156,10 @@ class BatchService:
         failure_count = 0
         errors = []
 
+        users = await self._load_by_ids(User, user_ids)
         for user_id in user_ids:
             try:
-                user = self.db.query(User).filter(User.id == user_id).first()
+                user = users.get(user_id)
                 if user:
                     user.status = status
                     success_count += 1
@@ -165,9 +172,9 @@ class BatchService:
                 errors.append({"user_id": user_id, "error": str(e)})
 
         try:
-            self.db.commit()
+            await self.db.commit()
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             return 0, len(user_ids), [{"error": f"Commit failed: {str(e)}"}]
 
         return success_count, failure_count, errors
@@ -180,9 +187,10 @@ class BatchService:
         failure_count = 0
         errors = []
 
+        users = await self._load_by_ids(User, user_ids)
         for user_id in user_ids:
             try:
-                user = self.db.query(User).filter(User.id == user_id).first()
+                user = users.get(user_id)
                 if user:
                     # Update user fields
                     for field, value in update_data.items():
@@ -198,9 +206,9 @@ class BatchService:
                 errors.append({"user_id": user_id, "error": str(e)})
 
         try:
-            self.db.commit()
+            await self.db.commit()
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             return 0, len(user_ids), [{"error": f"Commit failed: {str(e)}"}]
 
         return success_count, failure_count, errors
@@ -231,8 +239,8 @@ class BatchService:
         )
 
         self.db.add(batch_history)
-        self.db.commit()
-        self.db.refresh(batch_history)
+        await self.db.commit()
+        await self.db.refresh(batch_history)
 
         try:
             success_count = 0
@@ -262,7 +270,7 @@ class BatchService:
                 batch_history.error_message = "; ".join(
                     [str(error) for error in errors[:5]])
 
-            self.db.commit()
+            await self.db.commit()
 
             return BatchOperationResult(
                 batch_history_id=batch_history.id,
@@ -279,7 +287,7 @@ class BatchService:
             batch_history.status = "failed"
             batch_history.error_message = str(e)
             batch_history.completed_at = datetime.utcnow()
-            self.db.commit()
+            await self.db.commit()
             raise
 
     async def _batch_delete_nas(self, nas_ids: List[int]) -> tuple[int, int, List[Dict[str, Any]]]:
@@ -288,11 +296,12 @@ class BatchService:
         failure_count = 0
         errors = []
 
+        nas_devices = await self._load_by_ids(Nas, nas_ids)
         for nas_id in nas_ids:
             try:
-                nas = self.db.query(Nas).filter(Nas.id == nas_id).first()
+                nas = nas_devices.get(nas_id)
                 if nas:
-                    self.db.delete(nas)
+                    await self.db.delete(nas)
                     success_count += 1
                 else:
                     failure_count += 1
@@ -302,9 +311,9 @@ class BatchService:
                 errors.append({"nas_id": nas_id, "error": str(e)})
 
         try:
-            self.db.commit()
+            await self.db.commit()
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             return 0, len(nas_ids), [{"error": f"Commit failed: {str(e)}"}]
 
         return success_count, failure_count, errors
@@ -317,9 +326,10 @@ class BatchService:
         failure_count = 0
         errors = []
 
+        nas_devices = await self._load_by_ids(Nas, nas_ids)
         for nas_id in nas_ids:
             try:
-                nas = self.db.query(Nas).filter(Nas.id == nas_id).first()
+                nas = nas_devices.get(nas_id)
                 if nas:
                     for field, value in update_data.items():
                         if hasattr(nas, field):
@@ -333,9 +343,9 @@ class BatchService:
                 errors.append({"nas_id": nas_id, "error": str(e)})
 
         try:
-            self.db.commit()
+            await self.db.commit()
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             return 0, len(nas_ids), [{"error": f"Commit failed: {str(e)}"}]
 
         return success_count, failure_count, errors
@@ -366,8 +376,8 @@ class BatchService:
         )
 
         self.db.add(batch_history)
-        self.db.commit()
-        self.db.refresh(batch_history)
+        await self.db.commit()
+        await self.db.refresh(batch_history)
 
         try:
             success_count = 0
@@ -397,7 +407,7 @@ class BatchService:
                 batch_history.error_message = "; ".join(
                     [str(error) for error in errors[:5]])
 
-            self.db.commit()
+            await self.db.commit()
 
             return BatchOperationResult(
                 batch_history_id=batch_history.id,
@@ -414,7 +424,7 @@ class BatchService:
             batch_history.status = "failed"
             batch_history.error_message = str(e)
             batch_history.completed_at = datetime.utcnow()
-            self.db.commit()
+            await self.db.commit()
             raise
 
     async def _batch_delete_groups(self, group_ids: List[int]) -> tuple[int, int, List[Dict[str, Any]]]:
@@ -423,12 +433,12 @@ class BatchService:
         failure_count = 0
         errors = []
 
+        groups = await self._load_by_ids(UserGroup, group_ids)
         for group_id in group_ids:
             try:
-                group = self.db.query(UserGroup).filter(
-                    UserGroup.id == group_id).first()
+                group = groups.get(group_id)
                 if group:
-                    self.db.delete(group)
+                    await self.db.delete(group)
                     success_count += 1
                 else:
                     failure_count += 1
@@ -439,9 +449,9 @@ class BatchService:
                 errors.append({"group_id": group_id, "error": str(e)})
 
         try:
-            self.db.commit()
+            await self.db.commit()
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             return 0, len(group_ids), [{"error": f"Commit failed: {str(e)}"}]
 
         return success_count, failure_count, errors
@@ -454,10 +464,10 @@ class BatchService:
         failure_count = 0
         errors = []
 
+        groups = await self._load_by_ids(UserGroup, group_ids)
         for group_id in group_ids:
             try:
-                group = self.db.query(UserGroup).filter(
-                    UserGroup.id == group_id).first()
+                group = groups.get(group_id)
                 if group:
                     for field, value in update_data.items():
                         if hasattr(group, field):
@@ -472,9 +482,9 @@ class BatchService:
                 errors.append({"group_id": group_id, "error": str(e)})
 
         try:
-            self.db.commit()
+            await self.db.commit()
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             return 0, len(group_ids), [{"error": f"Commit failed: {str(e)}"}]
 
         return success_count, failure_count, errors
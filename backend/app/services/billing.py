@@ -34,6 +34,35 @@ from app.schemas.billing import (
 )
 from app.core.exceptions import NotFoundError, ValidationError, BusinessLogicError
 from app.core.logging import logger
+from app.core.pagination import encode_cursor, decode_cursor
+
+
+def _decode_after(cursor: Optional[str]) -> Optional[List[Any]]:
+    """Decode a list endpoint's cursor into the key its page starts after"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise ValidationError("Invalid cursor")
+
+
+def _page(
+    items: List[Any],
+    total: Optional[int],
+    page: int,
+    page_size: int,
+    next_key: Optional[tuple]
+) -> PaginatedResponse:
+    """Build a list response; the page counts are only known for offset pages"""
+    return PaginatedResponse(
+        data=items,
+        total=total,
+        page=page,
+        page_size=page_size,
+        total_pages=None if total is None else (total + page_size - 1) // page_size,
+        next_cursor=encode_cursor(next_key) if next_key else None
+    )
 
 
 class BillingPlanService:
@@ -50,7 +79,8 @@ class BillingPlanService:
         type_filter: Optional[str] = None,
         active_only: bool = False,
         sort_field: str = "id",
-        sort_order: str = "asc"
+        sort_order: str = "asc",
+        cursor: Optional[str] = None
     ) -> PaginatedResponse:
         """Get paginated billing plans with filtering"""
         try:
@@ -60,26 +90,21 @@ class BillingPlanService:
             if page_size < 1 or page_size > 100:
                 raise ValidationError("Page size must be between 1 and 100")
 
-            plans, total = await self.repository.get_all(
+            plans, total, next_key = await self.repository.get_all(
                 page=page,
                 page_size=page_size,
                 name_filter=name_filter,
                 type_filter=type_filter,
                 active_only=active_only,
                 sort_field=sort_field,
-                sort_order=sort_order
+                sort_order=sort_order,
+                after=_decode_after(cursor)
             )
 
             # Convert to response models
             plan_responses = [self._to_response_model(plan) for plan in plans]
 
-            return PaginatedResponse(
-                data=plan_responses,
-                total=total,
-                page=page,
-                page_size=page_size,
-                total_pages=(total + page_size - 1) // page_size
-            )
+            return _page(plan_responses, total, page, page_size, next_key)
 
         except Exception as e:
             logger.error(f"Error getting billing plans: {str(e)}")
@@ -176,10 +201,8 @@ class BillingPlanService:
                 raise NotFoundError(
                     f"Billing plan with ID {plan_id} not found")
 
-            # Check if plan is in use (business rule)
-            # TODO: Check if plan has active subscriptions or history
-
-            # Delete plan
+            # Plans still referenced by billing history or merchant
+            # transactions are refused by the repository (409)
             success = await self.repository.delete(plan_id)
 
             if success:
@@ -284,9 +307,9 @@ class BillingPlanService:
             planRecurring=plan.planRecurring or "",
             planRecurringPeriod=plan.planRecurringPeriod or "",
             planRecurringBillingSchedule=plan.planRecurringBillingSchedule or "",
-            planCost=plan.planCost or "",
-            planSetupCost=plan.planSetupCost or "",
-            planTax=plan.planTax or "",
+            planCost=plan.planCost,
+            planSetupCost=plan.planSetupCost,
+            planTax=plan.planTax,
             planCurrency=plan.planCurrency or "",
             planGroup=plan.planGroup or "",
             planActive=plan.planActive or False,
@@ -312,7 +335,8 @@ class BillingHistoryService:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         sort_field: str = "id",
-        sort_order: str = "desc"
+        sort_order: str = "desc",
+        cursor: Optional[str] = None
     ) -> PaginatedResponse:
         """Get paginated billing history with filtering"""
         try:
@@ -326,7 +350,7 @@ class BillingHistoryService:
             if start_date and end_date and start_date > end_date:
                 raise ValidationError("Start date cannot be after end date")
 
-            history, total = await self.repository.get_all(
+            history, total, next_key = await self.repository.get_all(
                 page=page,
                 page_size=page_size,
                 username_filter=username_filter,
@@ -334,20 +358,15 @@ class BillingHistoryService:
                 start_date=start_date,
                 end_date=end_date,
                 sort_field=sort_field,
-                sort_order=sort_order
+                sort_order=sort_order,
+                after=_decode_after(cursor)
             )
 
             # Convert to response models
             history_responses = [self._to_response_model(
                 record) for record in history]
 
-            return PaginatedResponse(
-                data=history_responses,
-                total=total,
-                page=page,
-                page_size=page_size,
-                total_pages=(total + page_size - 1) // page_size
-            )
+            return _page(history_responses, total, page, page_size, next_key)
 
         except Exception as e:
             logger.error(f"Error getting billing history: {str(e)}")
@@ -387,6 +406,26 @@ class BillingHistoryService:
             logger.error(f"Error creating billing history record: {str(e)}")
             raise
 
+    async def create_history_records(
+        self,
+        history_data: List[BillingHistoryCreate],
+        created_by: str
+    ) -> List[BillingHistoryResponse]:
+        """Create many billing history records in one transaction"""
+        try:
+            now = datetime.utcnow()
+            records = [{**record.dict(), 'creationdate': now} for record in history_data]
+
+            history = await self.repository.bulk_create(records, created_by=created_by)
+            await self.repository.session.commit()
+
+            logger.info(f"Created {len(history)} billing history records")
+            return [self._to_response_model(record) for record in history]
+
+        except Exception as e:
+            logger.error(f"Error creating billing history records: {str(e)}")
+            raise
+
     async def get_user_statistics(self, username: str) -> Dict[str, Any]:
         """Get billing statistics for a specific user"""
         try:
@@ -414,12 +453,14 @@ class BillingHistoryService:
             id=history.id,
             username=history.username or "",
             planId=history.planId,
-            billAmount=history.billAmount or "",
+            planName_snapshot=history.planName_snapshot,
+            planCost_snapshot=history.planCost_snapshot,
+            billAmount=history.billAmount,
             billAction=history.billAction or "",
             billPerformer=history.billPerformer or "",
             billReason=history.billReason or "",
             paymentmethod=history.paymentmethod or "",
-            cash=history.cash or "",
+            cash=history.cash,
             creditcardname=history.creditcardname or "",
             creditcardnumber=history.creditcardnumber or "",
             creditcardverification=history.creditcardverification or "",
@@ -443,7 +484,8 @@ class BillingRateService:
         name_filter: Optional[str] = None,
         type_filter: Optional[str] = None,
         sort_field: str = "id",
-        sort_order: str = "asc"
+        sort_order: str = "asc",
+        cursor: Optional[str] = None
     ) -> PaginatedResponse:
         """Get paginated billing rates with filtering"""
         try:
@@ -453,25 +495,20 @@ class BillingRateService:
             if page_size < 1 or page_size > 100:
                 raise ValidationError("Page size must be between 1 and 100")
 
-            rates, total = await self.repository.get_all(
+            rates, total, next_key = await self.repository.get_all(
                 page=page,
                 page_size=page_size,
                 name_filter=name_filter,
                 type_filter=type_filter,
                 sort_field=sort_field,
-                sort_order=sort_order
+                sort_order=sort_order,
+                after=_decode_after(cursor)
             )
 
             # Convert to response models
             rate_responses = [self._to_response_model(rate) for rate in rates]
 
-            return PaginatedResponse(
-                data=rate_responses,
-                total=total,
-                page=page,
-                page_size=page_size,
-                total_pages=(total + page_size - 1) // page_size
-            )
+            return _page(rate_responses, total, page, page_size, next_key)
 
         except Exception as e:
             logger.error(f"Error getting billing rates: {str(e)}")
@@ -592,7 +629,8 @@ class BillingMerchantService:
         username_filter: Optional[str] = None,
         business_id_filter: Optional[str] = None,
         sort_field: str = "id",
-        sort_order: str = "desc"
+        sort_order: str = "desc",
+        cursor: Optional[str] = None
     ) -> PaginatedResponse:
         """Get paginated merchant transactions with filtering"""
         try:
@@ -602,26 +640,21 @@ class BillingMerchantService:
             if page_size < 1 or page_size > 100:
                 raise ValidationError("Page size must be between 1 and 100")
 
-            merchants, total = await self.repository.get_all(
+            merchants, total, next_key = await self.repository.get_all(
                 page=page,
                 page_size=page_size,
                 username_filter=username_filter,
                 business_id_filter=business_id_filter,
                 sort_field=sort_field,
-                sort_order=sort_order
+                sort_order=sort_order,
+                after=_decode_after(cursor)
             )
 
             # Convert to response models
             merchant_responses = [self._to_response_model(
                 merchant) for merchant in merchants]
 
-            return PaginatedResponse(
-                data=merchant_responses,
-                total=total,
-                page=page,
-                page_size=page_size,
-                total_pages=(total + page_size - 1) // page_size
-            )
+            return _page(merchant_responses, total, page, page_size, next_key)
 
         except Exception as e:
             logger.error(f"Error getting merchant transactions: {str(e)}")
@@ -650,11 +683,35 @@ class BillingMerchantService:
             logger.error(f"Error creating merchant transaction: {str(e)}")
             raise
 
+    async def create_transactions(
+        self,
+        transaction_data: List[MerchantTransactionCreate],
+        created_by: str
+    ) -> List[MerchantTransactionResponse]:
+        """Create many merchant transactions in one transaction"""
+        try:
+            now = datetime.utcnow()
+            transactions = []
+            for transaction in transaction_data:
+                transaction_dict = transaction.dict()
+                self._validate_transaction_data(transaction_dict)
+                transactions.append({**transaction_dict, 'creationdate': now})
+
+            merchants = await self.repository.bulk_create(transactions, created_by=created_by)
+            await self.repository.session.commit()
+
+            logger.info(f"Created {len(merchants)} merchant transactions")
+            return [self._to_response_model(merchant) for merchant in merchants]
+
+        except Exception as e:
+            logger.error(f"Error creating merchant transactions: {str(e)}")
+            raise
+
     def _validate_transaction_data(self, transaction_data: Dict[str, Any]) -> None:
         """Validate merchant transaction data according to business rules"""
         # Validate required fields
         required_fields = ['username', 'planId',
-                           'txnId', 'business_email', 'business_id']
+                           'txn_id', 'business_email', 'business_id']
         for field in required_fields:
             if field not in transaction_data or not transaction_data[field]:
                 raise ValidationError(
@@ -672,7 +729,6 @@ class BillingMerchantService:
             id=merchant.id,
             username=merchant.username or "",
             planId=merchant.planId or 0,
-            txnId=merchant.txnId or "",
             planName=merchant.planName or "",
             quantity=merchant.quantity or "",
             business_email=merchant.business_email or "",
@@ -4,8 +4,10 @@ Graphs Service Layer
 This module contains business logic services for the graphs system.
 """
 
+import json
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any, Union
+from itertools import chain, repeat
+from typing import Optional, List, Dict, Any, Union, AsyncIterator, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.graphs import (
@@ -15,7 +17,8 @@ from app.repositories.graphs import (
     UserStatisticsRepository,
     SystemMetricsRepository,
     GraphTemplateRepository,
-    DashboardWidgetRepository
+    DashboardWidgetRepository,
+    stream_rows
 )
 from app.schemas.graphs import (
     GraphDataRequest,
@@ -32,10 +35,25 @@ from app.schemas.graphs import (
 )
 from app.models.graphs import GraphType, TimeGranularity
 
+_BYTES_PER_GB = 1024 ** 3
+
+
+def _period_label(stat_date: date, stat_hour: Optional[int] = None) -> str:
+    """Format a statistics period as a chart label"""
+    if stat_hour is not None:
+        return f"{stat_date} {stat_hour:02d}:00"
+    return stat_date.strftime('%Y-%m-%d')
+
 
 class GraphDataService:
     """Service for graph data processing and chart generation"""
 
+    # Graph types get_graph_data can build
+    GRAPH_TYPES = frozenset({
+        "overall_logins", "download_upload_stats", "logged_users", "alltime_stats",
+        "top_users", "traffic_comparison", "system_performance",
+    })
+
     def __init__(self, db: AsyncSession):
         self.db = db
         self.graph_stats_repo = GraphStatisticsRepository(db)
@@ -65,6 +83,61 @@ class GraphDataService:
         else:
             raise ValueError(f"Unsupported graph type: {request.graph_type}")
 
+    async def stream_graph_rows(
+        self, request: GraphDataRequest, chunk: int = 1000
+    ) -> AsyncIterator[Tuple[str, Tuple[Any, ...]]]:
+        """
+        Stream a graph's export rows as ``(label, values)`` tuples
+
+        The first item is the header, ``('Date', column names)``. Login,
+        traffic and user activity graphs are read from their statistics
+        tables on a server-side cursor, ``chunk`` rows at a time; the other
+        graph types are small and come from the regular chart data.
+        """
+        start_date = request.time_range.start_date or date.today() - timedelta(days=30)
+        end_date = request.time_range.end_date or date.today()
+        granularity = request.time_range.granularity or TimeGranularity.DAY
+        hourly = granularity == TimeGranularity.HOUR
+
+        if request.graph_type == "overall_logins":
+            yield 'Date', ('Successful Logins', 'Failed Logins', 'Unique Users')
+            query = self.login_stats_repo.export_query(start_date, end_date, granularity)
+            async for rows in stream_rows(self.db, query, chunk):
+                for row in rows:
+                    yield (
+                        _period_label(row.stat_date, row.stat_hour if hourly else None),
+                        (row.successful_logins, row.failed_logins, row.unique_users)
+                    )
+        elif request.graph_type == "download_upload_stats":
+            yield 'Date', ('Upload (GB)', 'Download (GB)')
+            query = self.traffic_stats_repo.export_query(start_date, end_date, granularity)
+            async for rows in stream_rows(self.db, query, chunk):
+                for row in rows:
+                    yield (
+                        _period_label(row.stat_date, row.stat_hour if hourly else None),
+                        (round(row.total_upload / _BYTES_PER_GB, 2),
+                         round(row.total_download / _BYTES_PER_GB, 2))
+                    )
+        elif request.graph_type == "logged_users":
+            yield 'Date', ('Total Users', 'Active Users', 'Online Users', 'New Users')
+            query = self.user_stats_repo.export_query(start_date, end_date)
+            async for rows in stream_rows(self.db, query, chunk):
+                for row in rows:
+                    yield (
+                        _period_label(row.stat_date),
+                        (row.total_users, row.active_users, row.online_users, row.new_users)
+                    )
+        else:
+            graph_data = await self.get_graph_data(request)
+            labels = graph_data.data.get('labels') or []
+            datasets = graph_data.data.get('datasets') or []
+            yield 'Date', tuple(dataset['label'] for dataset in datasets)
+            # Short datasets are padded with '' so zip aligns every column
+            # with the labels without a per-cell bounds check
+            columns = [chain(dataset['data'], repeat('')) for dataset in datasets]
+            for row in zip(labels, *columns):
+                yield row[0], row[1:]
+
     async def _get_login_graph_data(self, request: GraphDataRequest) -> GraphDataResponse:
         """Generate login statistics graph data"""
         start_date = request.time_range.start_date or date.today() - timedelta(days=30)
@@ -337,6 +410,15 @@ class GraphDataService:
 
     async def _get_alltime_stats_data(self, request: GraphDataRequest) -> GraphDataResponse:
         """Generate all-time statistics data"""
+        return GraphDataResponse(**await self.alltime_stats())
+
+    async def alltime_stats(self) -> Dict[str, Any]:
+        """
+        Build the all-time statistics graph as a plain dict
+
+        The GET endpoint serializes this directly, skipping the request and
+        response model validation a GraphDataResponse would cost.
+        """
         # Get comprehensive stats
         login_stats = await self.login_stats_repo.calculate_real_time_stats()
         traffic_stats = await self.traffic_stats_repo.calculate_real_time_stats()
@@ -386,13 +468,13 @@ class GraphDataService:
             }
         }
 
-        return GraphDataResponse(
-            graph_type=request.graph_type,
-            title="All-Time Statistics Overview",
-            subtitle="Comprehensive system statistics",
-            data=chart_data,
-            options=chart_options,
-            metadata={
+        return {
+            'graph_type': "alltime_stats",
+            'title': "All-Time Statistics Overview",
+            'subtitle': "Comprehensive system statistics",
+            'data': chart_data,
+            'options': chart_options,
+            'metadata': {
                 'login_stats': login_stats,
                 'traffic_stats': traffic_stats,
                 'user_stats': user_stats,
@@ -403,8 +485,8 @@ class GraphDataService:
                     'system_health': system_health
                 }
             },
-            generated_at=datetime.now()
-        )
+            'generated_at': datetime.now()
+        }
 
     async def _get_top_users_data(self, request: GraphDataRequest) -> GraphDataResponse:
         """Generate top users by traffic data"""
@@ -685,10 +767,20 @@ class DashboardService:
             dashboard_id, user, include_shared
         )
 
+        # Widgets sharing a data source (and config, for graph widgets) reuse
+        # one result instead of re-running the same statistics queries
+        data_by_source: Dict[str, Any] = {}
+
         widget_data = []
         for widget in widgets:
             # Get widget data based on data source
-            data = await self._get_widget_data(widget.data_source, widget.widget_config)
+            source_key = widget.data_source
+            if source_key.startswith("graph_"):
+                source_key += json.dumps(widget.widget_config, sort_keys=True, default=str)
+            if source_key not in data_by_source:
+                data_by_source[source_key] = await self._get_widget_data(
+                    widget.data_source, widget.widget_config)
+            data = data_by_source[source_key]
 
             widget_data.append({
                 'id': widget.id,
@@ -744,10 +836,7 @@ class GraphTemplateService:
 
     async def get_available_templates(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get available graph templates"""
-        if category:
-            templates = await self.template_repo.get_by_category(category)
-        else:
-            templates = await self.template_repo.get_public_templates()
+        templates = await self.template_repo.list_templates(category)
 
         return [
             {
@@ -755,7 +844,7 @@ class GraphTemplateService:
                 'name': template.name,
                 'description': template.description,
                 'category': template.category,
-                'graph_type': template.graph_type.value,
+                'graph_type': GraphType(template.graph_type).value,
                 'title': template.title,
                 'subtitle': template.subtitle,
                 'config': template.chart_config,
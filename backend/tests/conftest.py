@@ -0,0 +1,99 @@
+"""
+Shared test fixtures
+
+The tests run against an in-memory SQLite database through aiosqlite and
+create only the tables each test needs. The PostgreSQL column types the
+models use are compiled to their closest SQLite equivalents.
+"""
+
+import os
+import sys
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.dialects.postgresql import CIDR, INET, JSONB, MACADDR
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core import token_cache  # noqa: E402
+
+
+@compiles(MACADDR, "sqlite")
+@compiles(INET, "sqlite")
+@compiles(CIDR, "sqlite")
+def _compile_address(type_, compiler, **kw):
+    return "VARCHAR"
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest_asyncio.fixture
+async def engine():
+    """In-memory SQLite engine shared by every connection of one test"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    """Session factory configured like AsyncSessionLocal"""
+    return async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=True,
+        autocommit=False,
+    )
+
+
+@pytest_asyncio.fixture
+async def db(session_factory):
+    """A session for setting up and checking rows directly"""
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def get_db_override(session_factory):
+    """A get_db replacement with the rollback semantics of get_async_session"""
+    async def _get_db():
+        async with session_factory() as session:
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
+    return _get_db
+
+
+async def create_tables(engine, *models):
+    """Create the tables of the given models"""
+    async with engine.begin() as conn:
+        for model in models:
+            await conn.run_sync(model.__table__.create)
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Keep the process-wide token cache from leaking between tests"""
+    token_cache._token_claims.clear()
+    token_cache._token_users.clear()
+    token_cache._revoked_tokens.clear()
+    yield
+    token_cache._token_claims.clear()
+    token_cache._token_users.clear()
+    token_cache._revoked_tokens.clear()
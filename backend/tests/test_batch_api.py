@@ -0,0 +1,149 @@
+"""
+Tests for the batch operations API
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.api.v1 import batch
+from app.core.security import get_current_user
+from app.core.token_cache import CachedUser
+from app.db.session import get_async_session, get_session_factory
+from app.models.user import BatchHistory, UserStatus, AuthType
+from tests.conftest import create_tables
+
+ADMIN = CachedUser(
+    id=1, username="administrator", email=None, first_name=None, last_name=None,
+    is_active=True, status=UserStatus.ACTIVE, auth_type=AuthType.LOCAL,
+    last_login=None, created_at=None,
+)
+
+
+@pytest_asyncio.fixture
+async def client(engine, session_factory, get_db_override):
+    await create_tables(engine, BatchHistory)
+
+    app = FastAPI()
+    app.include_router(batch.router)
+    app.dependency_overrides[get_async_session] = get_db_override
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    app.dependency_overrides[get_current_user] = lambda: ADMIN
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_batch_stats(client, db):
+    now = datetime.utcnow()
+    rows = [
+        ("user_create", "completed", now - timedelta(days=1)),
+        ("user_create", "completed", now - timedelta(days=30)),
+        ("user_delete", "failed", now - timedelta(days=2)),
+        ("nas_update", "completed", now - timedelta(days=10)),
+        ("user_create", "running", now),
+    ]
+    db.add_all(
+        BatchHistory(batch_name=f"batch {i}", operation_type=operation_type,
+                     status=batch_status, creationdate=created)
+        for i, (operation_type, batch_status, created) in enumerate(rows)
+    )
+    await db.commit()
+
+    response = await client.get("/batch/stats")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_operations": 5,
+        "recent_operations": 3,
+        "status_distribution": {"completed": 3, "failed": 1, "running": 1},
+        "operation_type_distribution": {"user_create": 3, "user_delete": 1, "nas_update": 1},
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_stats_without_history(client):
+    response = await client.get("/batch/stats")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_operations": 0,
+        "recent_operations": 0,
+        "status_distribution": {},
+        "operation_type_distribution": {},
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_and_update_batch_history(client, db):
+    response = await client.post("/batch/history", json={
+        "batch_name": "spring signup",
+        "hotspot_id": 3,
+        "operation_type": "user_create",
+        "operation_details": {"target_ids": [1, 2]},
+        "total_count": 2,
+    })
+
+    assert response.status_code == 200
+    created = response.json()
+    assert created["operation_type"] == "user_create"
+    assert created["operation_details"] == {"target_ids": [1, 2]}
+    assert created["status"] == "pending"
+    assert created["created_at"] is not None
+
+    response = await client.put(f"/batch/history/{created['id']}", json={
+        "status": "completed", "success_count": 2,
+    })
+
+    assert response.status_code == 200
+    updated = response.json()
+    assert (updated["status"], updated["success_count"], updated["total_count"]) == ("completed", 2, 2)
+
+    row = await db.get(BatchHistory, created["id"])
+    assert row.status == "completed"
+
+
+@pytest.mark.asyncio
+async def test_batch_history_pages(client, db, monkeypatch):
+    # Encode two rows per cursor round trip so a page spans several chunks
+    monkeypatch.setattr(batch, "BATCH_HISTORY_STREAM_CHUNK", 2)
+    now = datetime.utcnow()
+    db.add_all(
+        BatchHistory(batch_name=f"batch {i}", operation_type="user_create",
+                     status="completed" if i % 2 else "failed",
+                     operation_details={"target_ids": [i]},
+                     creationdate=now - timedelta(hours=i), updatedate=now)
+        for i in range(7)
+    )
+    await db.commit()
+
+    response = await client.get("/batch/history", params={"page": 1, "size": 5})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["batch_name"] for item in body["items"]] == [f"batch {i}" for i in range(5)]
+    assert body["items"][0]["operation_details"] == {"target_ids": [0]}
+    assert (body["total"], body["page"], body["size"], body["pages"]) == (7, 1, 5, 2)
+
+    response = await client.get("/batch/history", params={
+        "status": "completed", "sort_by": "batch_name", "sort_order": "asc"})
+
+    body = response.json()
+    assert [item["batch_name"] for item in body["items"]] == ["batch 1", "batch 3", "batch 5"]
+    assert body["total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_history_past_the_last_page(client, db):
+    db.add(BatchHistory(batch_name="only", operation_type="user_create",
+                        creationdate=datetime.utcnow()))
+    await db.commit()
+
+    response = await client.get("/batch/history", params={"page": 3, "size": 10})
+
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "total": 1, "page": 3, "size": 10, "pages": 1}
@@ -0,0 +1,202 @@
+"""
+Tests for the billing repositories
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+
+from app.core.exceptions import BusinessLogicError, ValidationError
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.billing import BillingHistory, BillingMerchant, BillingMerchantPayer, BillingPlan
+from app.repositories import billing as billing_repository
+from app.repositories.billing import (
+    BillingHistoryRepository, BillingMerchantRepository, BillingPlanRepository
+)
+from tests.conftest import create_tables
+
+NOW = datetime(2025, 10, 1, 12, 0, 0)
+
+
+async def _walk(get_all, page_size: int, **kwargs):
+    """Collect every id by following the cursors from the first page"""
+    rows, _, next_key = await get_all(page=1, page_size=page_size, **kwargs)
+    ids = [row.id for row in rows]
+    while next_key is not None:
+        # Round-trip the key through the cursor encoding the API uses
+        after = decode_cursor(encode_cursor(next_key))
+        rows, total, next_key = await get_all(page_size=page_size, after=after, **kwargs)
+        assert total is None
+        ids.extend(row.id for row in rows)
+    return ids
+
+
+@pytest_asyncio.fixture
+async def plans(engine, db):
+    await create_tables(engine, BillingPlan)
+    types = ["Prepaid", None, "Postpaid", None, "Prepaid", None, "Postpaid"]
+    costs = [Decimal("10"), None, Decimal("5"), Decimal("5"), None, None, Decimal("20")]
+    db.add_all(
+        BillingPlan(id=i + 1, planName=f"plan{i + 1}", planType=plan_type, planCost=cost,
+                    creationdate=NOW, updatedate=NOW)
+        for i, (plan_type, cost) in enumerate(zip(types, costs))
+    )
+    await db.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+@pytest.mark.parametrize("page_size", [1, 2, 3])
+async def test_plan_cursor_paging_covers_null_sort_values(db, plans, sort_order, page_size):
+    repo = BillingPlanRepository(db)
+
+    ids = await _walk(repo.get_all, page_size, sort_field="planType", sort_order=sort_order)
+
+    # NULLs last in both directions, ties broken by id in the sort direction
+    if sort_order == "asc":
+        assert ids == [3, 7, 1, 5, 2, 4, 6]
+    else:
+        assert ids == [5, 1, 7, 3, 6, 4, 2]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+async def test_plan_cursor_paging_by_nullable_numeric(db, plans, sort_order):
+    repo = BillingPlanRepository(db)
+
+    ids = await _walk(repo.get_all, 2, sort_field="planCost", sort_order=sort_order)
+
+    if sort_order == "asc":
+        assert ids == [3, 4, 1, 7, 2, 5, 6]
+    else:
+        assert ids == [7, 1, 4, 3, 6, 5, 2]
+
+
+@pytest.mark.asyncio
+async def test_cursor_paging_matches_offset_paging(db, plans):
+    repo = BillingPlanRepository(db)
+
+    ids = await _walk(repo.get_all, 2, sort_field="planType")
+    offset_ids = []
+    for page in range(1, 5):
+        rows, total, _ = await repo.get_all(page=page, page_size=2, sort_field="planType")
+        assert total == 7
+        offset_ids.extend(row.id for row in rows)
+
+    assert ids == offset_ids
+
+
+@pytest.mark.asyncio
+async def test_null_cursor_on_not_null_column_is_rejected(db, plans):
+    repo = BillingPlanRepository(db)
+
+    with pytest.raises(ValidationError):
+        await repo.get_all(page_size=2, sort_field="id", after=[None, 3])
+
+
+@pytest.mark.asyncio
+async def test_history_cursor_paging_covers_null_amounts(engine, db):
+    await create_tables(engine, BillingPlan, BillingHistory)
+    amounts = [None, Decimal("3"), None, Decimal("1"), Decimal("3")]
+    db.add_all(
+        BillingHistory(id=i + 1, username="alice", billAmount=amount,
+                       creationdate=NOW, updatedate=NOW)
+        for i, amount in enumerate(amounts)
+    )
+    await db.commit()
+    repo = BillingHistoryRepository(db)
+
+    ids = await _walk(repo.get_all, 2, sort_field="billAmount", sort_order="desc")
+
+    assert ids == [5, 2, 4, 3, 1]
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Send bulk inserts two rows at a time so the tests span several chunks"""
+    chunks = billing_repository._chunks
+    monkeypatch.setattr(billing_repository, "_chunks", lambda rows: chunks(rows, 2))
+
+
+def _merchant_row(txn_id: str, payer: bool) -> dict:
+    """Input for one merchant transaction, with or without payer fields"""
+    row = dict(
+        username=f"user-{txn_id}", password="secret", pin="0000",
+        planName="plan1", planId=1, quantity="1",
+        business_email="shop@example.com", business_id="shop", txn_type="web_accept",
+        txn_id=txn_id, payment_type="instant", payment_tax=Decimal("0"),
+        payment_cost=Decimal("10"), payment_fee=Decimal("0"), payment_total=Decimal("10"),
+        payment_currency="USD", payment_date=NOW, payment_status="Completed",
+        pending_reason="", reason_code="", receipt_ID="", vendor_type="paypal",
+        creationdate=NOW, updatedate=NOW,
+    )
+    if payer:
+        row.update({
+            column: f"{column}-{txn_id}"
+            for column in BillingMerchantRepository.PAYER_FIELDS
+        }, payer_address_country_code="US")
+    return row
+
+
+@pytest.mark.asyncio
+async def test_history_bulk_create_keeps_order_and_fills_snapshots(engine, db, plans, small_chunks):
+    await create_tables(engine, BillingHistory)
+    repo = BillingHistoryRepository(db)
+    plan_ids = [3, None, 1, 3, 7]
+    rows = [
+        dict(username=f"user{i}", planId=plan_id, billAmount=Decimal(i),
+             creationdate=NOW, updatedate=NOW)
+        for i, plan_id in enumerate(plan_ids)
+    ]
+    # Explicit snapshots are kept rather than looked up
+    rows[3].update(planName_snapshot="renamed", planCost_snapshot=Decimal("1"))
+
+    history = await repo.bulk_create(rows, created_by="operator1")
+
+    assert [row.username for row in history] == [f"user{i}" for i in range(5)]
+    assert {row.creationby for row in history} == {"operator1"}
+    assert len({row.id for row in history}) == 5
+    assert [row.planName_snapshot for row in history] == ["plan3", None, "plan1", "renamed", "plan7"]
+    assert [row.planCost_snapshot for row in history] == [
+        Decimal("5"), None, Decimal("10"), Decimal("1"), Decimal("20")]
+
+
+@pytest.mark.asyncio
+async def test_merchant_bulk_create_keys_payers_to_their_merchants(engine, db, plans, small_chunks):
+    await create_tables(engine, BillingMerchant, BillingMerchantPayer)
+    repo = BillingMerchantRepository(db)
+    with_payer = [True, False, True, True, False]
+    rows = [_merchant_row(f"txn{i}", payer) for i, payer in enumerate(with_payer)]
+
+    merchants = await repo.bulk_create(rows, created_by="operator1")
+
+    assert [merchant.txn_id for merchant in merchants] == [f"txn{i}" for i in range(5)]
+    assert {merchant.creationby for merchant in merchants} == {"operator1"}
+    payers = dict((await db.execute(
+        select(BillingMerchantPayer.merchant_id, BillingMerchantPayer.first_name)
+    )).all())
+    assert payers == {
+        merchant.id: f"first_name-{merchant.txn_id}"
+        for merchant, payer in zip(merchants, with_payer) if payer
+    }
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_plan_with_history_is_a_conflict(engine, db, plans):
+    await create_tables(engine, BillingHistory)
+    # SQLite only enforces the planId foreign key with this pragma
+    await db.execute(text("PRAGMA foreign_keys = ON"))
+    db.add(BillingHistory(username="alice", planId=1, creationdate=NOW, updatedate=NOW))
+    await db.commit()
+    repo = BillingPlanRepository(db)
+
+    with pytest.raises(BusinessLogicError):
+        await repo.delete(1)
+
+    assert await repo.delete(2) is True
+    await db.commit()
+    assert await db.get(BillingPlan, 1) is not None
+    assert await db.get(BillingPlan, 2) is None
@@ -0,0 +1,36 @@
+"""
+Tests for the range partition DDL
+"""
+
+from datetime import date
+
+from app.db.partitions import monthly_partition_statements
+
+
+def test_monthly_partition_statements_cover_the_window():
+    statements = monthly_partition_statements(
+        'billing_history', months_back=1, months_ahead=2, today=date(2025, 12, 15))
+
+    assert statements == [
+        "CREATE TABLE IF NOT EXISTS billing_history_2025_11 PARTITION OF billing_history "
+        "FOR VALUES FROM ('2025-11-01') TO ('2025-12-01')",
+        "CREATE TABLE IF NOT EXISTS billing_history_2025_12 PARTITION OF billing_history "
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')",
+        "CREATE TABLE IF NOT EXISTS billing_history_2026_01 PARTITION OF billing_history "
+        "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')",
+        "CREATE TABLE IF NOT EXISTS billing_history_2026_02 PARTITION OF billing_history "
+        "FOR VALUES FROM ('2026-02-01') TO ('2026-03-01')",
+        "CREATE TABLE IF NOT EXISTS billing_history_default PARTITION OF billing_history DEFAULT",
+    ]
+
+
+def test_monthly_partition_statements_carry_storage_parameters():
+    statements = monthly_partition_statements(
+        'radacct', months_back=0, months_ahead=0, today=date(2025, 1, 31),
+        storage_parameters={'fillfactor': 90})
+
+    assert statements == [
+        "CREATE TABLE IF NOT EXISTS radacct_2025_01 PARTITION OF radacct "
+        "FOR VALUES FROM ('2025-01-01') TO ('2025-02-01') WITH (fillfactor = 90)",
+        "CREATE TABLE IF NOT EXISTS radacct_default PARTITION OF radacct DEFAULT WITH (fillfactor = 90)",
+    ]
@@ -0,0 +1,117 @@
+"""
+Tests for the bearer token cache and the auth dependencies built on it
+"""
+
+import dataclasses
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException, Request
+from httpx import AsyncClient
+
+from app.api.middleware import BearerTokenMiddleware
+from app.core.security import create_access_token, get_current_user
+from app.core.token_cache import CachedUser, forget_user, get_token_user, set_token_user
+from app.db.session import get_async_session
+from app.models.user import AuthType, User, UserStatus
+from tests.conftest import create_tables
+
+
+def _snapshot(**overrides) -> CachedUser:
+    fields = dict(
+        id=1, username="alice", email=None, first_name=None, last_name=None,
+        is_active=True, status=UserStatus.ACTIVE, auth_type=AuthType.LOCAL,
+        last_login=None, created_at=None,
+    )
+    fields.update(overrides)
+    return CachedUser(**fields)
+
+
+def test_cached_user_is_frozen():
+    user = _snapshot()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        user.username = "mallory"
+
+
+def test_forget_user_drops_every_token_of_the_user():
+    set_token_user("token-a", _snapshot())
+    set_token_user("token-b", _snapshot())
+    set_token_user("token-c", _snapshot(id=2, username="bob"))
+
+    forget_user(1)
+
+    assert get_token_user("token-a") is None
+    assert get_token_user("token-b") is None
+    assert get_token_user("token-c").username == "bob"
+
+
+@pytest.fixture
+def auth_app(get_db_override):
+    app = FastAPI()
+    app.add_middleware(BearerTokenMiddleware)
+    app.dependency_overrides[get_async_session] = get_db_override
+
+    @app.get("/me")
+    async def me(current_user: CachedUser = Depends(get_current_user)):
+        return {"id": current_user.id, "username": current_user.username}
+
+    @app.get("/state")
+    async def state(request: Request):
+        return {"user": type(getattr(request.state, "user", None)).__name__}
+
+    @app.get("/missing")
+    async def missing(current_user: CachedUser = Depends(get_current_user)):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_token_reused_after_404_still_authenticates(engine, db, auth_app):
+    await create_tables(engine, User)
+    db.add(User(username="alice", email="alice@example.com", is_active=True))
+    await db.commit()
+
+    token = create_access_token({"sub": "alice", "type": "access"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with AsyncClient(app=auth_app, base_url="http://test") as client:
+        # Cold cache: the user is loaded in the session the 404 rolls back
+        response = await client.get("/missing", headers=headers)
+        assert response.status_code == 404
+
+        cached = get_token_user(token)
+        assert isinstance(cached, CachedUser)
+
+        # Served from the cache by the middleware
+        for _ in range(2):
+            response = await client.get("/me", headers=headers)
+            assert response.status_code == 200
+            assert response.json()["username"] == "alice"
+
+
+@pytest.mark.asyncio
+async def test_inactive_user_is_not_cached(engine, db, auth_app):
+    await create_tables(engine, User)
+    db.add(User(username="bob", is_active=False))
+    await db.commit()
+
+    token = create_access_token({"sub": "bob", "type": "access"})
+    async with AsyncClient(app=auth_app, base_url="http://test") as client:
+        response = await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert get_token_user(token) is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_puts_only_the_snapshot_in_request_state(engine, db, auth_app):
+    await create_tables(engine, User)
+    db.add(User(username="carol", is_active=True))
+    await db.commit()
+
+    token = create_access_token({"sub": "carol", "type": "access"})
+    headers = {"Authorization": f"Bearer {token}"}
+    async with AsyncClient(app=auth_app, base_url="http://test") as client:
+        assert (await client.get("/state", headers=headers)).json() == {"user": "NoneType"}
+        assert (await client.get("/me", headers=headers)).status_code == 200
+        assert (await client.get("/state", headers=headers)).json() == {"user": "CachedUser"}